@@ -1,34 +1,95 @@
 import * as path from 'path';
+import { IFingerprintedStorage } from './interfaces/IStorage';
+import { AppConfig, configFromEnvironment } from './AppConfig';
 import { NoteRepository } from './repositories/NoteRepository';
 import { JsonStorage } from './storage/JsonStorage';
+import { BinaryStorage } from './storage/BinaryStorage';
+import { WalStorage } from './storage/WalStorage';
+import { ShardedStorage } from './storage/ShardedStorage';
+import { WriteBehindStorage } from './storage/WriteBehindStorage';
 import { SearchEngine } from './search/SearchEngine';
 import { NoteService } from './services/NoteService';
 import { CLIController } from './controllers/CLIController';
 
+export type { AppConfig, StorageKind } from './AppConfig';
+
 export class App {
   private static instance: App;
+  private config: AppConfig;
   private controller: CLIController;
+  private noteService?: NoteService;
   //commentaire
-  private constructor() {
-    const dataPath = path.join(process.cwd(), 'notes.json');
-    
-    const repository = new NoteRepository();
-    const storage = new JsonStorage(dataPath);
-    const searchEngine = new SearchEngine();
-    
-    const noteService = new NoteService(repository, storage, searchEngine);
-    
-    this.controller = new CLIController(noteService);
+  private constructor(config: AppConfig) {
+    this.config = config;
+    // Le service (et le chargement des notes) attend la première commande qui en a besoin
+    this.controller = new CLIController(() => this.getNoteService());
   }
 
-  public static getInstance(): App {
+  public static getInstance(config: AppConfig = App.configFromEnvironment()): App {
     if (!App.instance) {
-      App.instance = new App();
+      App.instance = new App(config);
     }
     return App.instance;
   }
 
+  /**
+   * Configuration lue dans l'environnement (voir configFromEnvironment)
+   */
+  public static configFromEnvironment(env: NodeJS.ProcessEnv = process.env): AppConfig {
+    return configFromEnvironment(env);
+  }
+
   public getController(): CLIController {
     return this.controller;
   }
-}
\ No newline at end of file
+
+  public getNoteService(): NoteService {
+    if (!this.noteService) {
+      this.noteService = App.createNoteService(this.config);
+    }
+    return this.noteService;
+  }
+
+  /**
+   * Termine le service s'il a été créé : écrit les sauvegardes différées
+   * et attend les backups en cours
+   */
+  public async close(): Promise<void> {
+    await this.noteService?.close();
+  }
+
+  private static createNoteService(config: AppConfig): NoteService {
+    const dataPath = path.join(config.dataDir, 'notes.json');
+
+    const repository = new NoteRepository();
+    const storage = App.createStorage(config, dataPath);
+    // Instantané des index à côté des données : démarrage sans réindexation
+    const searchEngine = new SearchEngine({ snapshotPath: `${dataPath}.idx` });
+
+    const noteService = new NoteService(repository, storage, searchEngine);
+    // Écrit en fin de commande, une seule fois quel que soit le nombre de modifications
+    process.once('exit', () => noteService.saveSearchSnapshot());
+    return noteService;
+  }
+
+  private static createStorage(config: AppConfig, dataPath: string): IFingerprintedStorage {
+    const storage = App.createFileStorage(config, dataPath);
+    return config.writeBehindMs !== undefined
+      ? new WriteBehindStorage(storage, { delayMs: config.writeBehindMs })
+      : storage;
+  }
+
+  private static createFileStorage(config: AppConfig, dataPath: string): IFingerprintedStorage {
+    const writeMode = config.writeMode;
+    switch (config.storage) {
+      case 'binary':
+        return new BinaryStorage(path.join(config.dataDir, 'notes.bin'), { writeMode });
+      case 'wal':
+        return new WalStorage(dataPath, { writeMode });
+      case 'sharded':
+        return new ShardedStorage(path.join(config.dataDir, 'notes.shards'), { shardCount: config.shardCount, writeMode });
+      default:
+        return new JsonStorage(dataPath, { writeMode });
+    }
+  }
+}
@@ -0,0 +1,42 @@
+import { WriteMode } from './storage/AtomicFile';
+
+export type StorageKind = 'json' | 'binary' | 'wal' | 'sharded';
+
+/**
+ * Configuration de l'application. Module séparé d'App : le client du
+ * serveur local n'a besoin que du répertoire des données, sans charger les
+ * stockages ni le moteur de recherche.
+ */
+export interface AppConfig {
+  storage: StorageKind;
+  dataDir: string;
+  shardCount?: number; // stockage 'sharded' : nombre de shards d'un nouveau répertoire
+  writeMode?: WriteMode; // 'durable' par défaut
+  writeBehindMs?: number; // sauvegardes différées et regroupées sur ce délai (WriteBehindStorage)
+}
+
+/**
+ * Configuration lue dans l'environnement :
+ * NOTES_STORAGE (json, binary, wal ou sharded ; json par défaut), NOTES_SHARDS,
+ * NOTES_WRITE_MODE (durable ou fast ; durable par défaut) et
+ * NOTES_WRITE_BEHIND_MS (délai des sauvegardes différées ; immédiates par défaut)
+ */
+export function configFromEnvironment(env: NodeJS.ProcessEnv = process.env): AppConfig {
+  const storage = env.NOTES_STORAGE || 'json';
+  if (storage !== 'json' && storage !== 'binary' && storage !== 'wal' && storage !== 'sharded') {
+    throw new Error(`Stockage inconnu: ${storage} (json, binary, wal ou sharded)`);
+  }
+  const shardCount = env.NOTES_SHARDS ? parseInt(env.NOTES_SHARDS, 10) : undefined;
+  if (shardCount !== undefined && !(shardCount > 0)) {
+    throw new Error(`Nombre de shards invalide: ${env.NOTES_SHARDS}`);
+  }
+  const writeMode = env.NOTES_WRITE_MODE || 'durable';
+  if (writeMode !== 'durable' && writeMode !== 'fast') {
+    throw new Error(`Mode d'écriture inconnu: ${writeMode} (durable ou fast)`);
+  }
+  const writeBehindMs = env.NOTES_WRITE_BEHIND_MS ? Number(env.NOTES_WRITE_BEHIND_MS) : undefined;
+  if (writeBehindMs !== undefined && !(Number.isInteger(writeBehindMs) && writeBehindMs >= 0)) {
+    throw new Error(`Délai de sauvegarde différée invalide: ${env.NOTES_WRITE_BEHIND_MS}`);
+  }
+  return { storage, dataDir: process.cwd(), shardCount, writeMode, writeBehindMs };
+}
@@ -0,0 +1,70 @@
+/**
+ * Écriture bufferisée vers un flux (stdout par défaut), avec contre-pression.
+ *
+ * Le texte est accumulé et écrit par blocs : un appel à write() par bloc et
+ * non par ligne. Quand le flux signale que son tampon est plein, write()
+ * attend l'événement `drain` : la mémoire reste bornée même si le lecteur
+ * (un pipe, un terminal lent) consomme moins vite qu'on ne produit.
+ */
+export class BufferedOutput {
+  private stream: NodeJS.WritableStream;
+  private blockSize: number;
+  private pending: string;
+
+  constructor(stream: NodeJS.WritableStream = process.stdout, blockSize: number = 64 * 1024) {
+    this.stream = stream;
+    this.blockSize = blockSize;
+    this.pending = '';
+  }
+
+  /**
+   * Ajoute du texte ; à attendre pour respecter la contre-pression
+   */
+  public async write(text: string): Promise<void> {
+    this.pending += text;
+    if (this.pending.length >= this.blockSize) {
+      await this.flush();
+    }
+  }
+
+  public async writeLine(line: string = ''): Promise<void> {
+    await this.write(`${line}\n`);
+  }
+
+  /**
+   * Écrit le texte accumulé
+   */
+  public async flush(): Promise<void> {
+    if (this.pending.length === 0) {
+      return;
+    }
+    const block = this.pending;
+    this.pending = '';
+    if (!this.stream.write(block)) {
+      await this.waitForDrain();
+    }
+  }
+
+  /**
+   * Attend que le flux ait vidé son tampon ; rejette si le flux échoue
+   * (ex. EPIPE : le lecteur d'un pipe s'est arrêté)
+   */
+  private waitForDrain(): Promise<void> {
+    return new Promise<void>((resolve, reject) => {
+      const cleanup = (): void => {
+        this.stream.removeListener('drain', onDrain);
+        this.stream.removeListener('error', onError);
+      };
+      const onDrain = (): void => {
+        cleanup();
+        resolve();
+      };
+      const onError = (error: Error): void => {
+        cleanup();
+        reject(error);
+      };
+      this.stream.once('drain', onDrain);
+      this.stream.once('error', onError);
+    });
+  }
+}
@@ -1,210 +1,452 @@
 import { NoteService } from '../services/NoteService';
 import { INote } from '../interfaces/INote';
+import { SearchOptions } from '../interfaces/ISearchEngine';
+import { NoteFileFormat } from '../storage/NoteCodec';
+import { StorageFactory } from '../factories/StorageFactory';
+import { NoteSortKey } from '../interfaces/IRepository';
+import * as readline from 'readline';
+import { BufferedOutput } from './BufferedOutput';
+
+/**
+ * Options de la commande list
+ */
+export interface ListOptions {
+  verbose?: boolean;
+  limit?: number;
+  offset?: number;
+  sort?: NoteSortKey; // ordre d'ajout si absent
+  descending?: boolean;
+  format?: 'text' | 'ndjson';
+}
+
+/**
+ * Format des dates de toLocaleString(), créé une seule fois : le construire
+ * à chaque date coûte plus cher que la mise en forme elle-même
+ */
+const DATE_FORMAT = new Intl.DateTimeFormat(undefined, {
+  year: 'numeric',
+  month: 'numeric',
+  day: 'numeric',
+  hour: 'numeric',
+  minute: 'numeric',
+  second: 'numeric'
+});
+
+function formatDate(date: Date): string {
+  return Number.isNaN(date.getTime()) ? 'Invalid Date' : DATE_FORMAT.format(date);
+}
+
+/**
+ * Sortie des commandes : la console par défaut ; le serveur (`notes serve`)
+ * en fournit une par requête, renvoyée au client
+ */
+export interface CommandOutput {
+  log(message: string): void;
+  error(message: string): void;
+  /** Flux des sorties volumineuses (list) */
+  stream: NodeJS.WritableStream;
+}
+
+/**
+ * Opération de la commande batch : une ligne JSON, par exemple
+ * {"op":"create","title":"T","content":"C","tags":["a"]}
+ */
+export type BatchOperation =
+  | { op: 'create'; title: string; content: string; tags?: string[] }
+  | { op: 'update'; id: string; title?: string; content?: string; tags?: string[] }
+  | { op: 'delete'; id: string }
+  | { op: 'tag'; id: string; add?: string[]; remove?: string[] };
+
+const CONSOLE_OUTPUT: CommandOutput = {
+  log: message => console.log(message),
+  error: message => console.error(message),
+  stream: process.stdout
+};
 
 export class CLIController {
-  private noteService: NoteService;
-
-  constructor(noteService: NoteService) {
-    this.noteService = noteService;
+  private noteService?: NoteService;
+  private createNoteService: () => NoteService;
+  private output: CommandOutput;
+  private failed: boolean;
+
+  /**
+   * noteService peut être une fonction qui le crée : il ne l'est alors qu'à
+   * la première commande qui en a besoin (pas pour --help ou --version)
+   */
+  constructor(noteService: NoteService | (() => NoteService), output: CommandOutput = CONSOLE_OUTPUT) {
+    this.createNoteService = typeof noteService === 'function' ? noteService : () => noteService;
+    this.output = output;
+    this.failed = false;
   }
 
-  public createNote(title: string, content: string, tags: string[]): void {
-    const note = this.noteService.createNote(title, content, tags);
-    console.log('✓ Note créée avec succès!');
-    console.log(`ID: ${note.getId()}`);
-    console.log(`Titre: ${note.getTitle()}`);
-    console.log(`Tags: ${note.getTags().join(', ') || 'Aucun'}`);
+  /**
+   * Signale une erreur d'utilisation (option invalide) ; la commande se
+   * termine alors avec un code de sortie non nul
+   */
+  public reportError(message: string): void {
+    this.output.error(`✗ ${message}`);
+    this.failed = true;
   }
 
-  public listNotes(verbose: boolean = false): void {
-    const notes = this.noteService.getAllNotes();
+  public hasFailed(): boolean {
+    return this.failed;
+  }
 
-    if (notes.length === 0) {
-      console.log('Aucune note trouvée.');
-      return;
+  private getNoteService(): NoteService {
+    if (!this.noteService) {
+      this.noteService = this.createNoteService();
     }
+    return this.noteService;
+  }
 
-    console.log(`\n${notes.length} note(s) trouvée(s):\n`);
+  public createNote(title: string, content: string, tags: string[]): void {
+    const note = this.getNoteService().createNote(title, content, tags);
+    this.output.log('✓ Note créée avec succès!');
+    this.output.log(`ID: ${note.getId()}`);
+    this.output.log(`Titre: ${note.getTitle()}`);
+    this.output.log(`Tags: ${note.getTags().join(', ') || 'Aucun'}`);
+  }
 
-    notes.forEach((note, index) => {
-      console.log(`[${index + 1}] ${note.getTitle()}`);
-      console.log(`    ID: ${note.getId()}`);
+  /**
+   * Liste les notes, dans l'ordre d'ajout ou triées, éventuellement par
+   * tranche. Les notes sont parcourues sans être copiées, à partir de la
+   * première de la tranche (position dans l'index trié), et écrites par
+   * blocs (BufferedOutput) ; le format NDJSON écrit une note JSON par ligne.
+   */
+  public async listNotes(options: ListOptions = {}, output: NodeJS.WritableStream = this.output.stream): Promise<void> {
+    const out = new BufferedOutput(output);
+    const offset = options.offset ?? 0;
+    const limit = options.limit ?? Infinity;
 
-      if (verbose) {
-        console.log(`    Contenu: ${note.getContent()}`);
-        console.log(`    Tags: ${note.getTags().join(', ') || 'Aucun'}`);
-        console.log(`    Créée le: ${note.getCreatedAt().toLocaleString()}`);
-        console.log(`    Modifiée le: ${note.getUpdatedAt().toLocaleString()}`);
-      } else {
-        const content = note.getContent();
-        const preview = content.length > 50 ? content.substring(0, 50) + '...' : content;
-        console.log(`    ${preview}`);
-        const tags = note.getTags();
-        if (tags.length > 0) {
-          console.log(`    Tags: ${tags.join(', ')}`);
+    try {
+      const total = this.getNoteService().getNotesCount();
+      if (options.format !== 'ndjson') {
+        if (total === 0) {
+          await out.writeLine('Aucune note trouvée.');
+          return;
         }
+        const shown = Math.max(0, Math.min(limit, total - offset));
+        const range = shown === total ? '' : shown > 0 ? ` (n° ${offset + 1} à ${offset + shown})` : ' (aucune dans cette tranche)';
+        await out.writeLine(`\n${total} note(s) trouvée(s)${range}:\n`);
       }
-      console.log('');
-    });
+
+      let written = 0;
+      for (const note of this.getNoteService().scanNotes(options.sort, options.descending, offset)) {
+        if (written >= limit) {
+          break;
+        }
+        written++;
+        await out.write(options.format === 'ndjson'
+          ? `${JSON.stringify(note.toJSON())}\n`
+          : this.formatListEntry(note, offset + written, options.verbose === true));
+      }
+    } catch (error) {
+      // Lecteur arrêté (ex. `notes list --ndjson | head`) : rien à signaler
+      if ((error as NodeJS.ErrnoException).code !== 'EPIPE') {
+        throw error;
+      }
+    } finally {
+      await out.flush().catch(() => undefined);
+    }
+  }
+
+  private formatListEntry(note: INote, rank: number, verbose: boolean): string {
+    let entry = `[${rank}] ${note.getTitle()}\n    ID: ${note.getId()}\n`;
+
+    if (verbose) {
+      entry += `    Contenu: ${note.getContent()}\n`;
+      entry += `    Tags: ${note.getTags().join(', ') || 'Aucun'}\n`;
+      entry += `    Créée le: ${formatDate(note.getCreatedAt())}\n`;
+      entry += `    Modifiée le: ${formatDate(note.getUpdatedAt())}\n`;
+    } else {
+      const content = note.getContent();
+      const preview = content.length > 50 ? content.substring(0, 50) + '...' : content;
+      entry += `    ${preview}\n`;
+      const tags = note.getTags();
+      if (tags.length > 0) {
+        entry += `    Tags: ${tags.join(', ')}\n`;
+      }
+    }
+    return `${entry}\n`;
   }
 
   public showNote(id: string): void {
-    const note = this.noteService.getNoteById(id);
+    const note = this.getNoteService().getNoteById(id);
 
     if (!note) {
-      console.log(`✗ Aucune note trouvée avec l'ID "${id}".`);
+      this.output.log(`✗ Aucune note trouvée avec l'ID "${id}".`);
       return;
     }
 
-    console.log('\n' + '='.repeat(60));
-    console.log(note.getTitle());
-    console.log('='.repeat(60));
-    console.log(`\n${note.getContent()}\n`);
-    console.log(`Tags: ${note.getTags().join(', ') || 'Aucun'}`);
-    console.log(`ID: ${note.getId()}`);
-    console.log(`Créée: ${note.getCreatedAt().toLocaleString()}`);
-    console.log(`Modifiée: ${note.getUpdatedAt().toLocaleString()}`);
+    this.output.log('\n' + '='.repeat(60));
+    this.output.log(note.getTitle());
+    this.output.log('='.repeat(60));
+    this.output.log(`\n${note.getContent()}\n`);
+    this.output.log(`Tags: ${note.getTags().join(', ') || 'Aucun'}`);
+    this.output.log(`ID: ${note.getId()}`);
+    this.output.log(`Créée: ${note.getCreatedAt().toLocaleString()}`);
+    this.output.log(`Modifiée: ${note.getUpdatedAt().toLocaleString()}`);
 
     // Afficher les attachements s'il y en a
-    const attachmentService = this.noteService.getAttachmentService();
+    const attachmentService = this.getNoteService().getAttachmentService();
     if (attachmentService) {
       const attachments = attachmentService.listAttachments(id);
       if (attachments.length > 0) {
-        console.log(`\nPièces jointes (${attachments.length}):`);
+        this.output.log(`\nPièces jointes (${attachments.length}):`);
         attachments.forEach((attach, idx) => {
-          console.log(`  [${idx + 1}] ${attach.fileName} (${attach.type}, ${(attach.size / 1024).toFixed(2)} KB)`);
-          console.log(`      ID: ${attach.id}`);
+          this.output.log(`  [${idx + 1}] ${attach.fileName} (${attach.type}, ${(attach.size / 1024).toFixed(2)} KB)`);
+          this.output.log(`      ID: ${attach.id}`);
         });
       }
     }
-    console.log('');
+    this.output.log('');
   }
 
-  public searchNotes(query: string): void {
-    const results = this.noteService.searchNotes(query);
+  public searchNotes(query: string, limit?: number, options?: SearchOptions): void {
+    // Avec une limite, seuls les meilleurs résultats (BM25) sont retournés
+    const results = limit !== undefined && !options?.fuzzy
+      ? this.getNoteService().searchNotesRanked(query, limit)
+      : this.getNoteService().searchNotes(query, options).slice(0, limit);
 
     if (results.length === 0) {
-      console.log(`Aucune note trouvée pour "${query}".`);
+      this.output.log(`Aucune note trouvée pour "${query}".`);
       return;
     }
 
-    console.log(`\n${results.length} note(s) trouvée(s) pour "${query}":\n`);
+    this.output.log(`\n${results.length} note(s) trouvée(s) pour "${query}":\n`);
 
     results.forEach((note, index) => {
-      console.log(`[${index + 1}] ${note.getTitle()}`);
-      console.log(`    ID: ${note.getId()}`);
+      this.output.log(`[${index + 1}] ${note.getTitle()}`);
+      this.output.log(`    ID: ${note.getId()}`);
       const content = note.getContent();
       const preview = content.length > 50 ? content.substring(0, 50) + '...' : content;
-      console.log(`    ${preview}`);
+      this.output.log(`    ${preview}`);
       const tags = note.getTags();
       if (tags.length > 0) {
-        console.log(`    Tags: ${tags.join(', ')}`);
+        this.output.log(`    Tags: ${tags.join(', ')}`);
       }
-      console.log('');
+      this.output.log('');
     });
   }
 
   public filterByTag(tag: string): void {
-    const results = this.noteService.getNotesByTag(tag);
+    const results = this.getNoteService().getNotesByTag(tag);
 
     if (results.length === 0) {
-      console.log(`Aucune note avec l'étiquette "${tag}".`);
+      this.output.log(`Aucune note avec l'étiquette "${tag}".`);
       return;
     }
 
-    console.log(`\n${results.length} note(s) avec l'étiquette "${tag}":\n`);
+    this.output.log(`\n${results.length} note(s) avec l'étiquette "${tag}":\n`);
 
     results.forEach((note, index) => {
-      console.log(`[${index + 1}] ${note.getTitle()}`);
-      console.log(`    ID: ${note.getId()}`);
+      this.output.log(`[${index + 1}] ${note.getTitle()}`);
+      this.output.log(`    ID: ${note.getId()}`);
       const content = note.getContent();
       const preview = content.length > 50 ? content.substring(0, 50) + '...' : content;
-      console.log(`    ${preview}`);
-      console.log('');
+      this.output.log(`    ${preview}`);
+      this.output.log('');
     });
   }
 
   public async deleteNote(id: string): Promise<void> {
-    const deleted = await this.noteService.deleteNote(id);
+    const deleted = await this.getNoteService().deleteNote(id);
 
     if (deleted) {
-      console.log('✓ Note supprimée avec succès!');
+      this.output.log('✓ Note supprimée avec succès!');
     } else {
-      console.log(`✗ Aucune note trouvée avec l'ID "${id}".`);
+      this.output.log(`✗ Aucune note trouvée avec l'ID "${id}".`);
     }
   }
 
-  public exportNotes(path: string): void {
+  /**
+   * Format demandé, sinon celui de l'extension, sinon celui du stockage
+   */
+  public exportNotes(path: string, format?: NoteFileFormat): void {
     try {
-      this.noteService.exportNotes(path);
-      console.log(`✓ Notes exportées avec succès vers ${path}`);
+      this.getNoteService().exportNotes(path, StorageFactory.forExport(path, format));
+      this.output.log(`✓ Notes exportées avec succès vers ${path}`);
     } catch (error) {
-      console.error(`✗ Erreur lors de l'export: ${error}`);
+      this.output.error(`✗ Erreur lors de l'export: ${error}`);
     }
   }
 
   public importNotes(path: string, merge: boolean): void {
     try {
-      this.noteService.importNotes(path, merge);
-      console.log(`✓ Notes importées avec succès depuis ${path}`);
+      this.getNoteService().importNotes(path, merge, StorageFactory.forImport(path));
+      this.output.log(`✓ Notes importées avec succès depuis ${path}`);
     } catch (error) {
-      console.error(`✗ Erreur lors de l'import: ${error}`);
+      this.output.error(`✗ Erreur lors de l'import: ${error}`);
+    }
+  }
+
+  /**
+   * Applique des opérations NDJSON (une par ligne) dans une seule
+   * transaction : une sauvegarde et une mise à jour des index pour tout le
+   * lot. Une opération invalide est signalée et ignorée, les autres sont
+   * appliquées. Le résultat de chaque opération est écrit en NDJSON, le
+   * bilan sur la sortie d'erreur (la sortie reste lisible par un script).
+   */
+  public async runBatch(input: NodeJS.ReadableStream): Promise<void> {
+    const out = new BufferedOutput(this.output.stream);
+    const lines = readline.createInterface({ input, crlfDelay: Infinity });
+    const start = Date.now();
+    let applied = 0;
+    let failed = 0;
+    let lineNumber = 0;
+
+    this.getNoteService().beginTransaction();
+    try {
+      for await (const line of lines) {
+        lineNumber++;
+        if (line.trim().length === 0) {
+          continue;
+        }
+        let result: object;
+        try {
+          const operation = JSON.parse(line) as BatchOperation;
+          const id = await this.applyOperation(operation);
+          result = { line: lineNumber, op: operation.op, ok: true, id };
+          applied++;
+        } catch (error) {
+          result = { line: lineNumber, ok: false, error: error instanceof Error ? error.message : String(error) };
+          failed++;
+        }
+        await out.write(`${JSON.stringify(result)}\n`);
+      }
+      this.getNoteService().commit();
+    } catch (error) {
+      if (this.getNoteService().isInTransaction()) {
+        this.getNoteService().rollback();
+      }
+      await out.flush().catch(() => undefined);
+      this.reportError(`Erreur lors du traitement par lot, aucune opération appliquée: ${error}`);
+      return;
+    }
+    await out.flush();
+
+    const elapsed = Date.now() - start;
+    const rate = Math.round((applied + failed) / Math.max(elapsed, 1) * 1000);
+    this.output.error(`✓ ${applied} opération(s) appliquée(s) en ${elapsed} ms (${rate} op/s)`);
+    if (failed > 0) {
+      this.reportError(`${failed} opération(s) en échec`);
+    }
+  }
+
+  /**
+   * Applique une opération du lot ; retourne l'ID de la note concernée
+   */
+  private async applyOperation(operation: BatchOperation): Promise<string> {
+    const text = (value: unknown, field: string): string => {
+      if (typeof value !== 'string') {
+        throw new Error(`Champ "${field}" manquant ou invalide`);
+      }
+      return value;
+    };
+    const tags = (value: unknown, field: string): string[] | undefined => {
+      if (value !== undefined && (!Array.isArray(value) || value.some(tag => typeof tag !== 'string'))) {
+        throw new Error(`Champ "${field}" invalide (tableau de chaînes attendu)`);
+      }
+      return value as string[] | undefined;
+    };
+    const existing = (id: unknown) => {
+      const note = this.getNoteService().getNoteById(text(id, 'id'));
+      if (!note) {
+        throw new Error(`Aucune note avec l'ID "${id}"`);
+      }
+      return note;
+    };
+
+    switch (operation?.op) {
+      case 'create':
+        return this.getNoteService().createNote(
+          text(operation.title, 'title'),
+          text(operation.content, 'content'),
+          tags(operation.tags, 'tags')
+        ).getId();
+
+      case 'update': {
+        const note = existing(operation.id);
+        this.getNoteService().updateNote(note.getId(), {
+          title: operation.title === undefined ? undefined : text(operation.title, 'title'),
+          content: operation.content === undefined ? undefined : text(operation.content, 'content'),
+          tags: tags(operation.tags, 'tags')
+        });
+        return note.getId();
+      }
+
+      case 'delete': {
+        const note = existing(operation.id);
+        await this.getNoteService().deleteNote(note.getId());
+        return note.getId();
+      }
+
+      case 'tag': {
+        const note = existing(operation.id);
+        const removed = new Set(tags(operation.remove, 'remove') ?? []);
+        const updated = [...note.getTags(), ...(tags(operation.add, 'add') ?? [])].filter(tag => !removed.has(tag));
+        this.getNoteService().updateNote(note.getId(), { tags: Array.from(new Set(updated)) });
+        return note.getId();
+      }
+
+      default:
+        throw new Error(`Opération inconnue: ${(operation as { op?: unknown })?.op} (create, update, delete ou tag)`);
     }
   }
 
   // ========== Commandes pour les backups ==========
 
   public async createBackup(): Promise<void> {
-    const backupService = this.noteService.getBackupService();
+    const backupService = this.getNoteService().getBackupService();
     
     if (!backupService) {
-      console.log('✗ Le service de backup n\'est pas configuré.');
+      this.output.log('✗ Le service de backup n\'est pas configuré.');
       return;
     }
 
     try {
       const metadata = await backupService.createBackup();
-      console.log('✓ Backup créé avec succès!');
-      console.log(`ID: ${metadata.id}`);
-      console.log(`Date: ${metadata.timestamp.toLocaleString()}`);
-      console.log(`Notes sauvegardées: ${metadata.notesCount}`);
-      console.log(`Checksum: ${metadata.checksum.substring(0, 16)}...`);
+      this.output.log('✓ Backup créé avec succès!');
+      this.output.log(`ID: ${metadata.id}`);
+      this.output.log(`Date: ${metadata.timestamp.toLocaleString()}`);
+      this.output.log(`Notes sauvegardées: ${metadata.notesCount}`);
+      this.output.log(`Checksum: ${metadata.checksum.substring(0, 16)}...`);
     } catch (error) {
-      console.error(`✗ Erreur lors de la création du backup: ${error}`);
+      this.output.error(`✗ Erreur lors de la création du backup: ${error}`);
     }
   }
 
   public listBackups(): void {
-    const backupService = this.noteService.getBackupService();
+    const backupService = this.getNoteService().getBackupService();
     
     if (!backupService) {
-      console.log('✗ Le service de backup n\'est pas configuré.');
+      this.output.log('✗ Le service de backup n\'est pas configuré.');
       return;
     }
 
     const backups = backupService.listBackups();
 
     if (backups.length === 0) {
-      console.log('Aucun backup trouvé.');
+      this.output.log('Aucun backup trouvé.');
       return;
     }
 
-    console.log(`\n${backups.length} backup(s) disponible(s):\n`);
+    this.output.log(`\n${backups.length} backup(s) disponible(s):\n`);
 
     backups.forEach((backup, index) => {
-      console.log(`[${index + 1}] ${backup.timestamp.toLocaleString()}`);
-      console.log(`    ID: ${backup.id}`);
-      console.log(`    Notes: ${backup.notesCount}`);
-      console.log(`    Checksum: ${backup.checksum.substring(0, 16)}...`);
-      console.log('');
+      this.output.log(`[${index + 1}] ${backup.timestamp.toLocaleString()}`);
+      this.output.log(`    ID: ${backup.id}`);
+      this.output.log(`    Notes: ${backup.notesCount}`);
+      this.output.log(`    Checksum: ${backup.checksum.substring(0, 16)}...`);
+      this.output.log('');
     });
   }
 
   public async restoreBackup(backupId: string): Promise<void> {
-    const backupService = this.noteService.getBackupService();
+    const backupService = this.getNoteService().getBackupService();
     
     if (!backupService) {
-      console.log('✗ Le service de backup n\'est pas configuré.');
+      this.output.log('✗ Le service de backup n\'est pas configuré.');
       return;
     }
 
@@ -212,19 +454,19 @@ export class CLIController {
       const restored = await backupService.restoreBackup(backupId);
       
       if (restored) {
-        console.log('✓ Backup restauré avec succès!');
-        console.log('Les notes ont été rechargées depuis le backup.');
+        this.output.log('✓ Backup restauré avec succès!');
+        this.output.log('Les notes ont été rechargées depuis le backup.');
       }
     } catch (error) {
-      console.error(`✗ Erreur lors de la restauration: ${error}`);
+      this.output.error(`✗ Erreur lors de la restauration: ${error}`);
     }
   }
 
   public async verifyBackup(backupId: string): Promise<void> {
-    const backupService = this.noteService.getBackupService();
+    const backupService = this.getNoteService().getBackupService();
     
     if (!backupService) {
-      console.log('✗ Le service de backup n\'est pas configuré.');
+      this.output.log('✗ Le service de backup n\'est pas configuré.');
       return;
     }
 
@@ -232,69 +474,69 @@ export class CLIController {
       const isValid = await backupService.verifyBackupIntegrity(backupId);
       
       if (isValid) {
-        console.log('✓ L\'intégrité du backup est validée.');
+        this.output.log('✓ L\'intégrité du backup est validée.');
       } else {
-        console.log('✗ Le backup est corrompu ou introuvable.');
+        this.output.log('✗ Le backup est corrompu ou introuvable.');
       }
     } catch (error) {
-      console.error(`✗ Erreur lors de la vérification: ${error}`);
+      this.output.error(`✗ Erreur lors de la vérification: ${error}`);
     }
   }
 
   // ========== Commandes pour les attachements ==========
 
   public async attachFile(noteId: string, filePath: string): Promise<void> {
-    const attachmentService = this.noteService.getAttachmentService();
+    const attachmentService = this.getNoteService().getAttachmentService();
     
     if (!attachmentService) {
-      console.log('✗ Le service d\'attachements n\'est pas configuré.');
+      this.output.log('✗ Le service d\'attachements n\'est pas configuré.');
       return;
     }
 
     try {
       const attachment = await attachmentService.attachFile(noteId, filePath);
-      console.log('✓ Fichier attaché avec succès!');
-      console.log(`ID: ${attachment.id}`);
-      console.log(`Nom: ${attachment.fileName}`);
-      console.log(`Type: ${attachment.type}`);
-      console.log(`Taille: ${(attachment.size / 1024).toFixed(2)} KB`);
+      this.output.log('✓ Fichier attaché avec succès!');
+      this.output.log(`ID: ${attachment.id}`);
+      this.output.log(`Nom: ${attachment.fileName}`);
+      this.output.log(`Type: ${attachment.type}`);
+      this.output.log(`Taille: ${(attachment.size / 1024).toFixed(2)} KB`);
     } catch (error) {
-      console.error(`✗ Erreur lors de l'attachement: ${error}`);
+      this.output.error(`✗ Erreur lors de l'attachement: ${error}`);
     }
   }
 
   public listAttachments(noteId: string): void {
-    const attachmentService = this.noteService.getAttachmentService();
+    const attachmentService = this.getNoteService().getAttachmentService();
     
     if (!attachmentService) {
-      console.log('✗ Le service d\'attachements n\'est pas configuré.');
+      this.output.log('✗ Le service d\'attachements n\'est pas configuré.');
       return;
     }
 
     const attachments = attachmentService.listAttachments(noteId);
 
     if (attachments.length === 0) {
-      console.log(`Aucune pièce jointe pour la note "${noteId}".`);
+      this.output.log(`Aucune pièce jointe pour la note "${noteId}".`);
       return;
     }
 
-    console.log(`\n${attachments.length} pièce(s) jointe(s) pour la note "${noteId}":\n`);
+    this.output.log(`\n${attachments.length} pièce(s) jointe(s) pour la note "${noteId}":\n`);
 
     attachments.forEach((attach, index) => {
-      console.log(`[${index + 1}] ${attach.fileName}`);
-      console.log(`    ID: ${attach.id}`);
-      console.log(`    Type: ${attach.type}`);
-      console.log(`    Taille: ${(attach.size / 1024).toFixed(2)} KB`);
-      console.log(`    Ajouté le: ${attach.createdAt.toLocaleString()}`);
-      console.log('');
+      this.output.log(`[${index + 1}] ${attach.fileName}`);
+      this.output.log(`    ID: ${attach.id}`);
+      this.output.log(`    Type: ${attach.type}`);
+      this.output.log(`    Taille: ${(attach.size / 1024).toFixed(2)} KB`);
+      this.output.log(`    Ajouté le: ${attach.createdAt.toLocaleString()}`);
+      this.output.log('');
     });
   }
 
   public async detachFile(noteId: string, attachmentId: string): Promise<void> {
-    const attachmentService = this.noteService.getAttachmentService();
+    const attachmentService = this.getNoteService().getAttachmentService();
     
     if (!attachmentService) {
-      console.log('✗ Le service d\'attachements n\'est pas configuré.');
+      this.output.log('✗ Le service d\'attachements n\'est pas configuré.');
       return;
     }
 
@@ -302,12 +544,12 @@ export class CLIController {
       const detached = await attachmentService.detachFile(noteId, attachmentId);
       
       if (detached) {
-        console.log('✓ Fichier détaché avec succès!');
+        this.output.log('✓ Fichier détaché avec succès!');
       } else {
-        console.log('✗ Attachement introuvable ou ID de note incorrect.');
+        this.output.log('✗ Attachement introuvable ou ID de note incorrect.');
       }
     } catch (error) {
-      console.error(`✗ Erreur lors du détachement: ${error}`);
+      this.output.error(`✗ Erreur lors du détachement: ${error}`);
     }
   }
 }
\ No newline at end of file
@@ -0,0 +1,187 @@
+import { Command, CommanderError } from 'commander';
+import * as fs from 'fs';
+import * as path from 'path';
+import { CLIController, CommandOutput } from './CLIController';
+import { NoteService } from '../services/NoteService';
+
+/**
+ * Vrai si la valeur d'une option est un entier positif ou nul
+ */
+function isCount(value: string): boolean {
+  return /^\d+$/.test(value);
+}
+
+/**
+ * Définit les commandes de la CLI. Les chemins relatifs sont résolus depuis
+ * cwd : celui du client quand la commande est exécutée par le serveur.
+ * Avec output, l'aide et les erreurs de commander y sont écrites et ne
+ * terminent pas le processus (CommanderError levée à la place). input
+ * remplace l'entrée standard (lue par batch).
+ */
+export function createProgram(
+  controller: CLIController,
+  cwd: string = process.cwd(),
+  output?: CommandOutput,
+  input: NodeJS.ReadableStream = process.stdin
+): Command {
+  const program = new Command();
+  if (output) {
+    // Avant la déclaration des commandes : les sous-commandes en héritent
+    program
+      .exitOverride()
+      .configureOutput({
+        writeOut: text => output.stream.write(text),
+        writeErr: text => output.error(text.replace(/\n$/, ''))
+      });
+  }
+
+  program
+    .name('notes')
+    .description('Gestionnaire de notes orienté objet en ligne de commande')
+    .version('2.0.0');
+
+  program
+    .command('create')
+    .description('Créer une nouvelle note')
+    .requiredOption('-t, --title <title>', 'Titre de la note')
+    .requiredOption('-c, --content <content>', 'Contenu de la note')
+    .option('-g, --tags <tags>', 'Étiquettes séparées par des virgules', '')
+    .action((options) => {
+      const tags = options.tags ? options.tags.split(',').map((t: string) => t.trim()) : [];
+      controller.createNote(options.title, options.content, tags);
+    });
+
+  program
+    .command('list')
+    .description('Lister toutes les notes')
+    .option('-v, --verbose', 'Afficher tous les détails')
+    .option('-n, --limit <limit>', 'Nombre maximal de notes affichées')
+    .option('-o, --offset <offset>', 'Nombre de notes à sauter', '0')
+    .option('-s, --sort <key>', 'Tri : createdAt, updatedAt ou title (préfixe - : ordre décroissant)')
+    .option('--ndjson', 'Une note JSON par ligne (pour les scripts)')
+    .action(async (options) => {
+      const sort: string | undefined = options.sort;
+      const sortKey = sort?.replace(/^-/, '');
+      if (sortKey !== undefined && sortKey !== 'createdAt' && sortKey !== 'updatedAt' && sortKey !== 'title') {
+        controller.reportError(`Tri inconnu: ${sort} (createdAt, updatedAt ou title)`);
+        return;
+      }
+      if (options.limit !== undefined && !isCount(options.limit)) {
+        controller.reportError(`Limite invalide: ${options.limit} (entier positif ou nul)`);
+        return;
+      }
+      if (!isCount(options.offset)) {
+        controller.reportError(`Décalage invalide: ${options.offset} (entier positif ou nul)`);
+        return;
+      }
+      await controller.listNotes({
+        verbose: options.verbose === true,
+        limit: options.limit !== undefined ? parseInt(options.limit, 10) : undefined,
+        offset: parseInt(options.offset, 10),
+        sort: sortKey,
+        descending: sort?.startsWith('-'),
+        format: options.ndjson ? 'ndjson' : 'text'
+      });
+    });
+
+  program
+    .command('show')
+    .description('Afficher une note par son ID')
+    .requiredOption('-i, --id <id>', 'ID de la note')
+    .action((options) => {
+      controller.showNote(options.id);
+    });
+
+  program
+    .command('search')
+    .description('Rechercher des notes')
+    .requiredOption('-q, --query <query>', 'Terme de recherche')
+    .option('-l, --limit <limit>', 'Nombre maximal de résultats, classés par pertinence')
+    .option('-f, --fuzzy', 'Tolérer les fautes de frappe (distance d\'édition 1 à 2)')
+    .action((options) => {
+      if (options.limit !== undefined && !isCount(options.limit)) {
+        controller.reportError(`Limite invalide: ${options.limit} (entier positif ou nul)`);
+        return;
+      }
+      const limit = options.limit !== undefined ? parseInt(options.limit, 10) : undefined;
+      controller.searchNotes(options.query, limit, { fuzzy: options.fuzzy === true });
+    });
+
+  program
+    .command('tag')
+    .description('Filtrer les notes par étiquette')
+    .requiredOption('-t, --tag <tag>', 'Étiquette à rechercher')
+    .action((options) => {
+      controller.filterByTag(options.tag);
+    });
+
+  program
+    .command('delete')
+    .description('Supprimer une note')
+    .requiredOption('-i, --id <id>', 'ID de la note à supprimer')
+    .action(async (options) => {
+      await controller.deleteNote(options.id);
+    });
+
+  program
+    .command('export')
+    .description('Exporter les notes')
+    .requiredOption('-o, --output <path>', 'Chemin du fichier de sortie')
+    .option('-f, --format <format>', 'Format du fichier : json ou binary (par défaut, d\'après l\'extension .json/.bin, sinon celui du stockage)')
+    .action((options) => {
+      if (options.format !== undefined && options.format !== 'json' && options.format !== 'binary') {
+        controller.reportError(`Format inconnu: ${options.format} (json ou binary)`);
+        return;
+      }
+      controller.exportNotes(path.resolve(cwd, options.output), options.format);
+    });
+
+  program
+    .command('import')
+    .description('Importer des notes')
+    .requiredOption('-i, --input <path>', 'Chemin du fichier à importer')
+    .option('-m, --merge', 'Fusionner avec les notes existantes')
+    .action((options) => {
+      controller.importNotes(path.resolve(cwd, options.input), options.merge);
+    });
+
+  program
+    .command('batch')
+    .description('Appliquer des opérations NDJSON (create, update, delete, tag) en une seule sauvegarde')
+    .option('-i, --input <path>', 'Fichier des opérations (par défaut, l\'entrée standard)')
+    .action(async (options) => {
+      const source = options.input !== undefined
+        ? fs.createReadStream(path.resolve(cwd, options.input), 'utf8')
+        : input;
+      await controller.runBatch(source);
+    });
+
+  return program;
+}
+
+/**
+ * Exécute une ligne de commande (sans `node notes`) sur un service déjà
+ * chargé, en écrivant dans output ; retourne le code de sortie.
+ * Utilisé par le serveur (`notes serve`) : aucune erreur de commander ne
+ * termine le processus.
+ */
+export async function runCommand(
+  noteService: NoteService,
+  argv: string[],
+  cwd: string,
+  output: CommandOutput,
+  input?: NodeJS.ReadableStream
+): Promise<number> {
+  const controller = new CLIController(noteService, output);
+  const program = createProgram(controller, cwd, output, input);
+
+  try {
+    await program.parseAsync(argv, { from: 'user' });
+  } catch (error) {
+    if (error instanceof CommanderError) {
+      return error.exitCode;
+    }
+    throw error;
+  }
+  return controller.hasFailed() ? 1 : 0;
+}
@@ -0,0 +1,108 @@
+import * as net from 'net';
+import { DaemonInput, DaemonMessage, DaemonRequest, LineReader } from './DaemonProtocol';
+
+/**
+ * Transmet une commande au serveur (`notes serve`) et recopie ses sorties.
+ * Retourne le code de sortie de la commande, ou undefined si aucun serveur
+ * n'écoute sur ce socket (la commande est alors à exécuter localement).
+ * stdin n'est transmis qu'aux commandes qui le lisent (batch) : sinon, lire
+ * un terminal bloquerait. Si la sortie se ferme (`notes list | head`), la
+ * connexion est fermée et la commande s'arrête côté serveur.
+ */
+export function forwardToDaemon(
+  socketPath: string,
+  argv: string[],
+  cwd: string = process.cwd(),
+  stdout: NodeJS.WritableStream = process.stdout,
+  stderr: NodeJS.WritableStream = process.stderr,
+  stdin?: NodeJS.ReadableStream
+): Promise<number | undefined> {
+  return new Promise((resolve, reject) => {
+    const socket = net.connect(socketPath);
+    let connected = false;
+    let exitCode: number | undefined;
+    let drained = Promise.resolve(); // sortie recopiée jusqu'au bout
+
+    socket.setEncoding('utf8');
+
+    // Entrée standard, transmise au rythme du socket (le serveur la lit en entier avant d'exécuter)
+    const sendInput = (input: NodeJS.ReadableStream): void => {
+      const send = (message: DaemonInput): boolean => socket.write(`${JSON.stringify(message)}\n`);
+      input.setEncoding('utf8');
+      input.on('data', (text: string) => {
+        if (!send({ in: text })) {
+          input.pause();
+          socket.once('drain', () => input.resume());
+        }
+      });
+      input.once('end', () => send({ end: true }));
+    };
+
+    socket.once('connect', () => {
+      connected = true;
+      const request: DaemonRequest = { argv, cwd, stdin: stdin !== undefined };
+      socket.write(`${JSON.stringify(request)}\n`);
+      if (stdin) {
+        sendInput(stdin);
+      }
+    });
+
+    const reader = new LineReader(value => {
+      const message = value as DaemonMessage;
+      if ('out' in message) {
+        // Lecteur lent (pipe) : le serveur attend que la sortie se vide
+        if (!stdout.write(message.out)) {
+          socket.pause();
+          drained = new Promise(resolveDrain => stdout.once('drain', () => {
+            socket.resume();
+            resolveDrain();
+          }));
+        }
+      } else if ('err' in message) {
+        stderr.write(message.err);
+      } else {
+        exitCode = message.exit;
+      }
+    });
+    socket.on('data', (text: string) => reader.write(text));
+
+    // Lecteur de la sortie arrêté : comme en local, fin silencieuse
+    const onOutputError = (error: NodeJS.ErrnoException): void => {
+      socket.destroy();
+      if (error.code === 'EPIPE') {
+        resolve(0);
+      } else {
+        reject(error);
+      }
+    };
+    stdout.once('error', onOutputError);
+
+    socket.once('error', (error: NodeJS.ErrnoException) => {
+      if (!connected) {
+        // Pas de serveur, ou socket d'un serveur arrêté
+        resolve(undefined);
+      } else {
+        reject(new Error(`Connexion au serveur interrompue: ${error.message}`));
+      }
+    });
+    socket.once('close', () => {
+      if (!connected) {
+        return;
+      }
+      // Commande terminée avant la fin de l'entrée : ne plus la lire
+      if (stdin) {
+        stdin.removeAllListeners('data');
+        stdin.pause();
+      }
+      if (exitCode === undefined) {
+        reject(new Error('Connexion au serveur interrompue'));
+      } else {
+        const code = exitCode;
+        void drained.then(() => {
+          stdout.removeListener('error', onOutputError);
+          resolve(code);
+        });
+      }
+    });
+  });
+}
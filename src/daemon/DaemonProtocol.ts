@@ -0,0 +1,73 @@
+import * as crypto from 'crypto';
+import * as os from 'os';
+import * as path from 'path';
+
+/**
+ * Requête du client : une ligne JSON
+ */
+export interface DaemonRequest {
+  argv: string[]; // arguments de la commande, sans `node notes`
+  cwd: string; // répertoire du client, pour les chemins relatifs
+  stdin?: boolean; // l'entrée standard du client suit (messages DaemonInput)
+}
+
+/**
+ * Entrée standard du client, après la requête : `end` la termine
+ */
+export type DaemonInput =
+  | { in: string }
+  | { end: true };
+
+/**
+ * Réponse du serveur : une ligne JSON par message, dans l'ordre ; `exit`
+ * termine la réponse
+ */
+export type DaemonMessage =
+  | { out: string }
+  | { err: string }
+  | { exit: number };
+
+/**
+ * Longueur maximale d'un chemin de socket Unix (108 octets sous Linux,
+ * 104 sous macOS)
+ */
+const MAX_SOCKET_PATH = 100;
+
+/**
+ * Socket du serveur des données d'un répertoire : à côté des données, ou
+ * dans le répertoire temporaire si ce chemin est trop long ; tube nommé
+ * sous Windows
+ */
+export function socketPathFor(dataDir: string): string {
+  const key = crypto.createHash('sha1').update(path.resolve(dataDir)).digest('hex').slice(0, 16);
+  if (process.platform === 'win32') {
+    return `\\\\.\\pipe\\notes-${key}`;
+  }
+  const local = path.join(dataDir, '.notes.sock');
+  return local.length <= MAX_SOCKET_PATH ? local : path.join(os.tmpdir(), `notes-${key}.sock`);
+}
+
+/**
+ * Découpe un flux de texte en lignes JSON
+ */
+export class LineReader {
+  private buffered: string;
+  private onLine: (value: unknown) => void;
+
+  constructor(onLine: (value: unknown) => void) {
+    this.buffered = '';
+    this.onLine = onLine;
+  }
+
+  public write(text: string): void {
+    this.buffered += text;
+    let newline: number;
+    while ((newline = this.buffered.indexOf('\n')) >= 0) {
+      const line = this.buffered.slice(0, newline);
+      this.buffered = this.buffered.slice(newline + 1);
+      if (line.length > 0) {
+        this.onLine(JSON.parse(line));
+      }
+    }
+  }
+}
@@ -0,0 +1,200 @@
+import * as fs from 'fs';
+import * as net from 'net';
+import { Readable, Writable } from 'stream';
+import { CommandOutput } from '../controllers/CLIController';
+import { DaemonInput, DaemonMessage, DaemonRequest, LineReader } from './DaemonProtocol';
+
+/**
+ * Exécute une commande et retourne son code de sortie ; input est l'entrée
+ * standard du client, si elle lui est transmise
+ */
+export type CommandRunner = (
+  argv: string[],
+  cwd: string,
+  output: CommandOutput,
+  input?: NodeJS.ReadableStream
+) => Promise<number>;
+
+/**
+ * Serveur local (`notes serve`) : garde les notes et les index en mémoire
+ * et exécute les commandes que lui transmettent les clients sur un socket
+ * Unix (tube nommé sous Windows).
+ *
+ * Une connexion porte une commande : une ligne JSON de requête (suivie de
+ * l'entrée standard du client pour batch), puis les sorties de la commande
+ * au fil de l'eau et son code de sortie. Les
+ * commandes s'exécutent l'une après l'autre, jamais en parallèle : elles
+ * partagent le même NoteService.
+ *
+ * Un client ne peut pas bloquer les suivants : son entrée standard est lue
+ * en entier avant que sa commande entre dans la file (un batch saisi au
+ * terminal n'occupe pas le serveur pendant la saisie), et une commande dont
+ * le client se déconnecte s'arrête à sa prochaine écriture.
+ */
+export class NoteDaemon {
+  private socketPath: string;
+  private run: CommandRunner;
+  private server?: net.Server;
+  private queue: Promise<void>;
+
+  constructor(socketPath: string, run: CommandRunner) {
+    this.socketPath = socketPath;
+    this.run = run;
+    this.queue = Promise.resolve();
+  }
+
+  /**
+   * Commence à écouter ; lève une erreur si un serveur répond déjà sur ce
+   * socket. Un socket resté d'un serveur arrêté brutalement est remplacé.
+   */
+  public async listen(): Promise<void> {
+    if (await NoteDaemon.isAlive(this.socketPath)) {
+      throw new Error(`Un serveur est déjà actif sur ${this.socketPath}`);
+    }
+    if (process.platform !== 'win32') {
+      fs.rmSync(this.socketPath, { force: true });
+    }
+
+    const server = net.createServer(socket => this.accept(socket));
+    await new Promise<void>((resolve, reject) => {
+      server.once('error', reject);
+      server.listen(this.socketPath, () => {
+        server.removeListener('error', reject);
+        resolve();
+      });
+    });
+    this.server = server;
+  }
+
+  /**
+   * Arrête d'accepter des connexions et attend la fin des commandes en cours
+   */
+  public async close(): Promise<void> {
+    const server = this.server;
+    this.server = undefined;
+    if (server) {
+      await new Promise<void>(resolve => server.close(() => resolve()));
+    }
+    await this.queue;
+  }
+
+  public getSocketPath(): string {
+    return this.socketPath;
+  }
+
+  /**
+   * Vrai si un serveur répond sur le socket
+   */
+  public static isAlive(socketPath: string): Promise<boolean> {
+    return new Promise(resolve => {
+      const socket = net.connect(socketPath);
+      socket.once('connect', () => {
+        socket.destroy();
+        resolve(true);
+      });
+      socket.once('error', () => resolve(false));
+    });
+  }
+
+  private accept(socket: net.Socket): void {
+    socket.setEncoding('utf8');
+    let request: DaemonRequest | undefined;
+    let input: string[] | undefined; // entrée standard reçue, jusqu'à sa fin
+    const enqueue = (commandInput?: NodeJS.ReadableStream): void => {
+      const current = request!;
+      this.queue = this.queue.then(() => this.execute(current, socket, commandInput));
+    };
+
+    const reader = new LineReader(value => {
+      if (!request) {
+        request = value as DaemonRequest;
+        if (request.stdin) {
+          input = [];
+        } else {
+          enqueue();
+        }
+        return;
+      }
+      if (!input) {
+        return;
+      }
+      const message = value as DaemonInput;
+      if ('end' in message) {
+        enqueue(Readable.from(input));
+        input = undefined;
+      } else {
+        input.push(message.in);
+      }
+    });
+
+    socket.on('data', (text: string) => {
+      try {
+        reader.write(text);
+      } catch (error) {
+        socket.destroy();
+      }
+    });
+    // Client parti avant la fin de son entrée : la commande n'est pas exécutée
+    socket.on('close', () => {
+      input = undefined;
+    });
+    socket.on('error', () => undefined);
+  }
+
+  private async execute(request: DaemonRequest, socket: net.Socket, input?: NodeJS.ReadableStream): Promise<void> {
+    const send = (message: DaemonMessage): boolean =>
+      !socket.destroyed && socket.write(`${JSON.stringify(message)}\n`);
+
+    // Client parti : EPIPE, comme un pipe dont le lecteur s'est arrêté
+    const disconnected = (): Error =>
+      Object.assign(new Error('Client déconnecté'), { code: 'EPIPE' });
+
+    // Sorties volumineuses : la contre-pression du socket remonte jusqu'à la
+    // commande ; une déconnexion pendant l'attente la fait échouer
+    const stream = new Writable({
+      write(chunk: Buffer | string, _encoding, callback) {
+        if (socket.destroyed) {
+          callback(disconnected());
+          return;
+        }
+        if (send({ out: chunk.toString() })) {
+          callback();
+          return;
+        }
+        const onDrain = (): void => {
+          socket.removeListener('close', onClose);
+          callback();
+        };
+        const onClose = (): void => {
+          socket.removeListener('drain', onDrain);
+          callback(disconnected());
+        };
+        socket.once('drain', onDrain);
+        socket.once('close', onClose);
+      }
+    });
+    // Signalée à la commande qui attend l'écriture (voir BufferedOutput)
+    stream.on('error', () => undefined);
+    const output: CommandOutput = {
+      log: message => send({ out: `${message}\n` }),
+      error: message => send({ err: `${message}\n` }),
+      stream
+    };
+
+    let code: number;
+    try {
+      code = await this.run(request.argv, request.cwd, output, input);
+    } catch (error) {
+      output.error(`✗ Erreur inattendue: ${error}`);
+      code = 1;
+    }
+    if (!stream.destroyed) {
+      await new Promise<void>(resolve => {
+        stream.once('close', () => resolve());
+        stream.end();
+      });
+    }
+    send({ exit: code });
+    socket.end();
+  }
+}
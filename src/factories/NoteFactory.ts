@@ -1,5 +1,5 @@
 import { Note } from '../models/Note';
-import { INote } from '../interfaces/INote';
+import { INote, INoteData } from '../interfaces/INote';
 
 export class NoteFactory {
   public static createNote(title: string, content: string, tags: string[] = []): INote {
@@ -15,6 +15,10 @@ export class NoteFactory {
     return new Note(title, content, tags, id);
   }
 
+  public static createFromData(data: INoteData): INote {
+    return Note.fromJSON(data);
+  }
+
   public static createEmptyNote(): INote {
     return new Note('', '');
   }
@@ -0,0 +1,39 @@
+import * as path from 'path';
+import { IStorage } from '../interfaces/IStorage';
+import { BinaryStorage } from '../storage/BinaryStorage';
+import { JsonStorage } from '../storage/JsonStorage';
+import { NoteFileFormat } from '../storage/NoteCodec';
+
+/**
+ * Stockages des fichiers d'export et d'import : le format est celui
+ * demandé, sinon celui de l'extension (.bin, .json) à l'export et celui de
+ * l'en-tête du fichier à l'import. undefined : le format du stockage des
+ * notes convient.
+ */
+export class StorageFactory {
+  public static formatOf(filePath: string): NoteFileFormat | undefined {
+    switch (path.extname(filePath).toLowerCase()) {
+      case '.bin':
+        return 'binary';
+      case '.json':
+        return 'json';
+      default:
+        return undefined;
+    }
+  }
+
+  public static forExport(filePath: string, format?: NoteFileFormat): IStorage | undefined {
+    const selected = format ?? StorageFactory.formatOf(filePath);
+    return selected ? StorageFactory.createFileStorage(filePath, selected) : undefined;
+  }
+
+  public static forImport(filePath: string): IStorage | undefined {
+    return BinaryStorage.isBinaryFile(filePath)
+      ? StorageFactory.createFileStorage(filePath, 'binary')
+      : undefined;
+  }
+
+  public static createFileStorage(filePath: string, format: NoteFileFormat): IStorage {
+    return format === 'binary' ? new BinaryStorage(filePath) : new JsonStorage(filePath);
+  }
+}
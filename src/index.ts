@@ -1,88 +1,77 @@
 #!/usr/bin/env node
 
-import { Command } from 'commander';
-import * as path from 'path';
-import { App } from './App';
+import { AppConfig, configFromEnvironment } from './AppConfig';
+import { createProgram, runCommand } from './controllers/CommandLine';
+import { forwardToDaemon } from './daemon/DaemonClient';
+import { socketPathFor } from './daemon/DaemonProtocol';
+import { NoteDaemon } from './daemon/NoteDaemon';
 
-const program = new Command();
-const app = App.getInstance();
-const controller = app.getController();
+/**
+ * `notes serve` : garde les notes en mémoire et exécute les commandes des
+ * clients jusqu'à SIGINT/SIGTERM
+ */
+async function serve(config: AppConfig, socketPath: string): Promise<void> {
+  const { App } = await import('./App');
+  const noteService = App.getInstance(config).getNoteService();
+  noteService.prepareSearchIndexes();
+  const daemon = new NoteDaemon(socketPath, (argv, cwd, output, input) => runCommand(noteService, argv, cwd, output, input));
+  await daemon.listen();
+  console.log(`✓ Serveur prêt (${noteService.getNotesCount()} notes) sur ${socketPath}`);
 
-program
-  .name('notes')
-  .description('Gestionnaire de notes orienté objet en ligne de commande')
-  .version('2.0.0');
+  const stop = async (): Promise<void> => {
+    await daemon.close();
+    await noteService.close();
+    console.log('✓ Serveur arrêté');
+    process.exit(0);
+  };
+  process.once('SIGINT', () => void stop());
+  process.once('SIGTERM', () => void stop());
+}
 
-program
-  .command('create')
-  .description('Créer une nouvelle note')
-  .requiredOption('-t, --title <title>', 'Titre de la note')
-  .requiredOption('-c, --content <content>', 'Contenu de la note')
-  .option('-g, --tags <tags>', 'Étiquettes séparées par des virgules', '')
-  .action((options) => {
-    const tags = options.tags ? options.tags.split(',').map((t: string) => t.trim()) : [];
-    controller.createNote(options.title, options.content, tags);
-  });
+async function main(): Promise<void> {
+  const args = process.argv.slice(2);
+  const config = configFromEnvironment();
+  const socketPath = socketPathFor(config.dataDir);
 
-program
-  .command('list')
-  .description('Lister toutes les notes')
-  .option('-v, --verbose', 'Afficher tous les détails')
-  .action((options) => {
-    controller.listNotes(options.verbose);
-  });
+  if (args[0] === 'serve') {
+    await serve(config, socketPath);
+    return;
+  }
 
-program
-  .command('show')
-  .description('Afficher une note par son ID')
-  .requiredOption('-i, --id <id>', 'ID de la note')
-  .action((options) => {
-    controller.showNote(options.id);
-  });
+  // Un serveur actif détient les données : la commande lui est transmise
+  if (!process.env.NOTES_NO_DAEMON) {
+    // Seul batch sans fichier lit l'entrée standard
+    const readsStdin = args[0] === 'batch' && !args.some(arg => arg === '-i' || arg.startsWith('--input'));
+    const code = await forwardToDaemon(socketPath, args, process.cwd(), process.stdout, process.stderr,
+      readsStdin ? process.stdin : undefined);
+    if (code !== undefined) {
+      process.exitCode = code;
+      return;
+    }
+  }
 
-program
-  .command('search')
-  .description('Rechercher des notes')
-  .requiredOption('-q, --query <query>', 'Terme de recherche')
-  .action((options) => {
-    controller.searchNotes(options.query);
-  });
+  // Chargé seulement ici : le client du serveur n'en a pas besoin, et les
+  // notes ne sont lues qu'à la première commande qui s'en sert
+  const { App } = await import('./App');
+  const controller = App.getInstance(config).getController();
+  const program = createProgram(controller);
+  program
+    .command('serve')
+    .description('Démarrer le serveur local : les commandes suivantes lui sont transmises');
 
-program
-  .command('tag')
-  .description('Filtrer les notes par étiquette')
-  .requiredOption('-t, --tag <tag>', 'Étiquette à rechercher')
-  .action((options) => {
-    controller.filterByTag(options.tag);
-  });
+  await program.parseAsync(process.argv);
+  // Sauvegardes différées (NOTES_WRITE_BEHIND_MS) écrites avant la fin du processus
+  await App.getInstance(config).close();
 
-program
-  .command('delete')
-  .description('Supprimer une note')
-  .requiredOption('-i, --id <id>', 'ID de la note à supprimer')
-  .action((options) => {
-    controller.deleteNote(options.id);
-  });
+  if (!args.length) {
+    program.outputHelp();
+  }
+  if (controller.hasFailed()) {
+    process.exitCode = 1;
+  }
+}
 
-program
-  .command('export')
-  .description('Exporter les notes')
-  .requiredOption('-o, --output <path>', 'Chemin du fichier de sortie')
-  .action((options) => {
-    controller.exportNotes(path.resolve(options.output));
-  });
-
-program
-  .command('import')
-  .description('Importer des notes')
-  .requiredOption('-i, --input <path>', 'Chemin du fichier à importer')
-  .option('-m, --merge', 'Fusionner avec les notes existantes')
-  .action((options) => {
-    controller.importNotes(path.resolve(options.input), options.merge);
-  });
-
-program.parse(process.argv);
-
-if (!process.argv.slice(2).length) {
-  program.outputHelp();
-}
\ No newline at end of file
+main().catch(error => {
+  console.error(`✗ ${error instanceof Error ? error.message : error}`);
+  process.exitCode = 1;
+});
@@ -1,9 +1,31 @@
+import { CompressionOptions } from '../storage/CompressionCodec';
+import { NoteFileFormat } from '../storage/NoteCodec';
+import { INote } from './INote';
+import { ChangedNotes } from './IStorage';
+
+/**
+ * Format du fichier de données sauvegardé : 'wal' pour l'instantané d'un
+ * WalStorage (sans les journaux qui le suivent), 'unknown' s'il n'a pas
+ * été reconnu
+ */
+export type BackupDataFormat = NoteFileFormat | 'wal' | 'unknown';
+
 export interface IBackupMetadata {
   id: string;
-  timestamp: Date;
+  timestamp: Date; // fin du backup
+  startedAt?: Date; // début de la lecture du fichier de données
   checksum: string;
   notesCount: number;
   filePath: string;
+  /**
+   * 'chunked' : filePath est un manifeste listant des blocs partagés entre
+   * les backups ; 'copy' ou absent : copie complète du fichier de données
+   */
+  format?: 'copy' | 'chunked';
+  /** Compression des blocs : absente pour les backups non compressés */
+  compression?: CompressionOptions;
+  storedBytes?: number; // octets des blocs nouvellement écrits par ce backup (compressés)
+  dataFormat?: BackupDataFormat; // absent : backup antérieur, fichier JSON
 }
 
 export interface IBackupService {
@@ -54,3 +76,49 @@ export interface IBackupService {
    */
   resetModificationCount(): void;
 }
+
+export interface PointInTimeRestoreResult {
+  backup: IBackupMetadata; // backup de départ
+  replayed: number; // modifications rejouées depuis ce backup
+}
+
+/**
+ * Notes telles qu'elles étaient à un instant donné
+ */
+export interface PointInTimeNotes extends PointInTimeRestoreResult {
+  notes: INote[];
+}
+
+/**
+ * Service de backup complété par un journal des modifications de notes :
+ * restauration à n'importe quel instant, pas seulement à celui d'un backup
+ */
+export interface IPointInTimeBackupService extends IBackupService {
+  /**
+   * Vrai si le journal des modifications est tenu (option explicite) : les
+   * autres méthodes ne servent qu'alors
+   */
+  isPointInTimeEnabled(): boolean;
+
+  /**
+   * Prend les notes comme état de référence du journal, sans journaliser
+   */
+  trackNotes(notes: INote[]): void;
+
+  /**
+   * Journalise les différences avec l'état de référence : de toute la
+   * collection, ou des seules notes changées si elles sont connues
+   */
+  recordMutations(notes: INote[] | ChangedNotes): void;
+
+  /**
+   * Notes telles qu'elles étaient à cet instant, sans rien modifier
+   */
+  readNotesAt(timestamp: Date): Promise<PointInTimeNotes>;
+
+  /**
+   * Restaure le fichier de données tel qu'il était à cet instant (aucun
+   * service de notes actif dessus : voir NoteService.restoreToPointInTime)
+   */
+  restoreToPointInTime(timestamp: Date): Promise<PointInTimeRestoreResult>;
+}
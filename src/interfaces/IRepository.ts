@@ -1,5 +1,18 @@
 import { INote } from './INote';
 
+/**
+ * Ordre de parcours des notes
+ */
+export type NoteSortKey = 'createdAt' | 'updatedAt' | 'title';
+
+/**
+ * Page de résultats ; nextCursor est absent sur la dernière page
+ */
+export interface NotePage {
+  notes: INote[];
+  nextCursor?: string;
+}
+
 export interface IRepository {
   add(note: INote): void;
   remove(id: string): boolean;
@@ -7,4 +20,16 @@ export interface IRepository {
   findAll(): INote[];
   update(id: string, note: INote): boolean;
   clear(): void;
+  count(): number;
+  /**
+   * Notes suivant le curseur (celui d'une page précédente, ou undefined
+   * pour la première page) dans l'ordre demandé
+   */
+  findPage(sortKey: NoteSortKey, cursor: string | undefined, limit: number, descending?: boolean): NotePage;
+  /**
+   * Parcourt les notes sans les copier dans un tableau, dans l'ordre
+   * demandé ou, sans clé, dans l'ordre d'ajout, à partir de la position
+   * offset
+   */
+  scan(sortKey?: NoteSortKey, descending?: boolean, offset?: number): IterableIterator<INote>;
 }
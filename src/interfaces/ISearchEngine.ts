@@ -1,8 +1,54 @@
 import { INote } from './INote';
 
+/**
+ * Options de recherche
+ */
+export interface SearchOptions {
+  /**
+   * Tolérance aux fautes de frappe : true pour une distance d'édition
+   * adaptée à la longueur de chaque terme (1 ou 2), ou une distance maximale
+   */
+  fuzzy?: boolean | number;
+}
+
 export interface ISearchEngine {
-  search(notes: INote[], query: string): INote[];
+  search(notes: INote[], query: string, options?: SearchOptions): INote[];
   searchByTag(notes: INote[], tag: string): INote[];
-  searchByTitle(notes: INote[], title: string): INote[];
+  searchByTitle(notes: INote[], title: string, options?: SearchOptions): INote[];
   searchByContent(notes: INote[], content: string): INote[];
 }
+
+/**
+ * Moteur de recherche dont les index peuvent être maintenus note par note
+ */
+export interface IIncrementalSearchEngine extends ISearchEngine {
+  buildIndexes(notes: INote[]): void;
+  indexNote(note: INote): void;
+  reindexNote(note: INote): void;
+  removeNote(noteId: string): void;
+}
+
+/**
+ * Moteur dont les index peuvent être enregistrés sur disque et rechargés
+ * au démarrage sans réindexer les notes. L'empreinte identifie l'état des
+ * données persistées dont les index sont issus.
+ */
+export interface IPersistentSearchEngine extends IIncrementalSearchEngine {
+  loadSnapshot(notes: INote[], fingerprint: string): boolean;
+  saveSnapshot(fingerprint: string): void;
+}
+
+/**
+ * Résultat de recherche accompagné de son score de pertinence
+ */
+export interface ScoredNote {
+  note: INote;
+  score: number;
+}
+
+/**
+ * Moteur de recherche capable de classer les résultats par pertinence
+ */
+export interface IRankedSearchEngine extends ISearchEngine {
+  searchTopK(query: string, k: number): ScoredNote[];
+}
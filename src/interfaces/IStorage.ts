@@ -6,3 +6,50 @@ export interface IStorage {
   export(path: string, notes: INote[]): void;
   import(path: string): INote[];
 }
+
+/**
+ * Stockage capable de fournir une empreinte de l'état persisté, pour
+ * valider les données qui en sont dérivées (instantané des index)
+ */
+export interface IFingerprintedStorage extends IStorage {
+  getFingerprint(): string | undefined;
+}
+
+/**
+ * Notes connues pour avoir changé : leurs identifiants, et la note
+ * correspondante dans la collection (undefined si elle a été supprimée).
+ * all() retourne toute la collection, pour le seul cas où elle doit être
+ * comparée entière (écriture précédente échouée).
+ */
+export interface ChangedNotes {
+  ids: Iterable<string>;
+  find(id: string): INote | undefined;
+  all(): INote[];
+}
+
+/**
+ * Stockage capable de sauvegarder les seules notes données comme changées,
+ * sans recevoir ni comparer toute la collection
+ */
+export interface IIncrementalStorage extends IStorage {
+  saveChanges(changed: ChangedNotes): void;
+}
+
+/**
+ * Stockage capable d'écrire sans bloquer la boucle d'événements
+ */
+export interface INonBlockingStorage extends IStorage {
+  saveAsync(notes: INote[]): Promise<void>;
+}
+
+/**
+ * Stockage à écriture différée : save() peut rendre la main avant que les
+ * notes soient écrites. flush() attend qu'elles le soient (point de
+ * durabilité) ; close() écrit ce qui reste et refuse les sauvegardes
+ * suivantes (isClosed()).
+ */
+export interface IAsyncStorage extends IStorage {
+  flush(): Promise<void>;
+  close(): Promise<void>;
+  isClosed(): boolean;
+}
@@ -1,18 +1,36 @@
-import { IRepository } from '../interfaces/IRepository';
+import { IRepository, NotePage, NoteSortKey } from '../interfaces/IRepository';
 import { INote } from '../interfaces/INote';
 
+type SortValue = number | string;
+
+interface IndexEntry {
+  value: SortValue; // valeur de tri au moment de l'indexation
+  id: string;
+  note: INote;
+}
+
+const SORT_VALUES: Record<NoteSortKey, (note: INote) => SortValue> = {
+  createdAt: note => timeOf(note.getCreatedAt()),
+  updatedAt: note => timeOf(note.getUpdatedAt()),
+  title: note => note.getTitle().toLowerCase()
+};
+
 export class NoteRepository implements IRepository {
   private notes: Map<string, INote>;
+  private indexes: Map<NoteSortKey, SortedNoteIndex>;
 
   constructor() {
     this.notes = new Map<string, INote>();
+    this.indexes = new Map();
   }
 
   public add(note: INote): void {
     this.notes.set(note.getId(), note);
+    this.indexes.forEach(index => index.put(note));
   }
 
   public remove(id: string): boolean {
+    this.indexes.forEach(index => index.delete(id));
     return this.notes.delete(id);
   }
 
@@ -24,16 +42,22 @@ export class NoteRepository implements IRepository {
     return Array.from(this.notes.values());
   }
 
+  /**
+   * Remplace une note ; à appeler aussi après l'avoir modifiée sur place,
+   * pour replacer ses entrées d'index
+   */
   public update(id: string, note: INote): boolean {
     if (!this.notes.has(id)) {
       return false;
     }
     this.notes.set(id, note);
+    this.indexes.forEach(index => index.put(note));
     return true;
   }
 
   public clear(): void {
     this.notes.clear();
+    this.indexes.clear();
   }
 
   public count(): number {
@@ -43,4 +67,182 @@ export class NoteRepository implements IRepository {
   public exists(id: string): boolean {
     return this.notes.has(id);
   }
+
+  /**
+   * Page de notes triées. Le curseur désigne la dernière note de la page
+   * précédente (sa valeur de tri et son identifiant) : les ajouts et
+   * suppressions entre deux pages ne décalent ni ne répètent les notes.
+   */
+  public findPage(sortKey: NoteSortKey, cursor: string | undefined, limit: number, descending: boolean = false): NotePage {
+    const index = this.getIndex(sortKey);
+    const step = descending ? -1 : 1;
+
+    let position = descending ? index.size() - 1 : 0;
+    if (cursor !== undefined) {
+      const { value, id } = decodeCursor(cursor);
+      if ((typeof value === 'string') !== (sortKey === 'title')) {
+        throw new Error(`Curseur invalide pour le tri par ${sortKey}`);
+      }
+      // Première entrée strictement après (ou avant) le curseur
+      const bound = index.lowerBound(value, id);
+      const found = bound < index.size() && index.at(bound).id === id && index.at(bound).value === value;
+      position = descending ? bound - 1 : (found ? bound + 1 : bound);
+    }
+
+    const notes: INote[] = [];
+    let last: IndexEntry | undefined;
+    for (; position >= 0 && position < index.size() && notes.length < limit; position += step) {
+      last = index.at(position);
+      notes.push(last.note);
+    }
+
+    const more = position >= 0 && position < index.size();
+    return { notes, nextCursor: more && last ? encodeCursor(last) : undefined };
+  }
+
+  /**
+   * Parcourt les notes sans les copier ; l'ordre d'ajout sans clé de tri.
+   * Avec une clé, le parcours commence directement à la position offset de
+   * l'index trié ; l'ordre d'ajout n'a pas d'index par position, les notes
+   * qui précèdent sont passées sans être retournées.
+   * La collection ne doit pas être modifiée pendant le parcours.
+   */
+  public *scan(sortKey?: NoteSortKey, descending: boolean = false, offset: number = 0): IterableIterator<INote> {
+    if (!sortKey) {
+      let position = 0;
+      for (const note of this.notes.values()) {
+        if (position++ >= offset) {
+          yield note;
+        }
+      }
+      return;
+    }
+    const index = this.getIndex(sortKey);
+    const size = index.size();
+    for (let i = Math.max(0, offset); i < size; i++) {
+      yield index.at(descending ? size - 1 - i : i).note;
+    }
+  }
+
+  /**
+   * Index trié, construit à la première demande puis tenu à jour : les
+   * chargements en masse ne paient pas d'insertions triées
+   */
+  private getIndex(sortKey: NoteSortKey): SortedNoteIndex {
+    let index = this.indexes.get(sortKey);
+    if (!index) {
+      index = new SortedNoteIndex(SORT_VALUES[sortKey], this.notes.values());
+      this.indexes.set(sortKey, index);
+    }
+    return index;
+  }
+}
+
+/**
+ * Notes triées par une valeur puis par identifiant (ordre total : deux
+ * notes ne sont jamais à égalité), dans un tableau trié
+ */
+class SortedNoteIndex {
+  private sortValue: (note: INote) => SortValue;
+  private entries: IndexEntry[];
+  private byId: Map<string, IndexEntry>;
+
+  constructor(sortValue: (note: INote) => SortValue, notes: Iterable<INote>) {
+    this.sortValue = sortValue;
+    this.entries = [];
+    this.byId = new Map();
+    for (const note of notes) {
+      const entry = { value: sortValue(note), id: note.getId(), note };
+      this.entries.push(entry);
+      this.byId.set(entry.id, entry);
+    }
+    this.entries.sort((a, b) => compare(a.value, a.id, b.value, b.id));
+  }
+
+  /**
+   * Ajoute une note ou replace une note déjà indexée
+   */
+  public put(note: INote): void {
+    const id = note.getId();
+    const value = this.sortValue(note);
+    const existing = this.byId.get(id);
+    if (existing && existing.value === value) {
+      existing.note = note;
+      return;
+    }
+    if (existing) {
+      this.delete(id);
+    }
+    const entry = { value, id, note };
+    this.entries.splice(this.lowerBound(value, id), 0, entry);
+    this.byId.set(id, entry);
+  }
+
+  public delete(id: string): void {
+    const entry = this.byId.get(id);
+    if (!entry) {
+      return;
+    }
+    this.entries.splice(this.lowerBound(entry.value, id), 1);
+    this.byId.delete(id);
+  }
+
+  /**
+   * Position de la première entrée supérieure ou égale à (value, id)
+   */
+  public lowerBound(value: SortValue, id: string): number {
+    let low = 0;
+    let high = this.entries.length;
+    while (low < high) {
+      const middle = (low + high) >>> 1;
+      const entry = this.entries[middle];
+      if (compare(entry.value, entry.id, value, id) < 0) {
+        low = middle + 1;
+      } else {
+        high = middle;
+      }
+    }
+    return low;
+  }
+
+  public at(position: number): IndexEntry {
+    return this.entries[position];
+  }
+
+  public size(): number {
+    return this.entries.length;
+  }
+}
+
+function compare(a: SortValue, aId: string, b: SortValue, bId: string): number {
+  if (a !== b) {
+    return a < b ? -1 : 1;
+  }
+  return aId < bId ? -1 : aId > bId ? 1 : 0;
+}
+
+/**
+ * Date en millisecondes ; les dates invalides sont placées en tête
+ */
+function timeOf(date: Date): number {
+  const time = date.getTime();
+  return Number.isNaN(time) ? -Infinity : time;
+}
+
+function encodeCursor(entry: IndexEntry): string {
+  // JSON ne représente pas -Infinity (date invalide) : null
+  const value = entry.value === -Infinity ? null : entry.value;
+  return Buffer.from(JSON.stringify([value, entry.id]), 'utf8').toString('base64url');
+}
+
+function decodeCursor(cursor: string): { value: SortValue; id: string } {
+  try {
+    const [value, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    if (typeof id === 'string' && (value === null || typeof value === 'number' || typeof value === 'string')) {
+      return { value: value === null ? -Infinity : value, id };
+    }
+  } catch (error) {
+    // Curseur invalide, signalé ci-dessous
+  }
+  throw new Error(`Curseur invalide: ${cursor}`);
 }
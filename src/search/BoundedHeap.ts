@@ -0,0 +1,80 @@
+/**
+ * Tas binaire borné qui conserve les `capacity` meilleurs éléments.
+ *
+ * La racine est le moins bon élément conservé : un nouvel élément n'entre
+ * que s'il est meilleur qu'elle, en O(log capacity).
+ */
+export class BoundedHeap<T> {
+  private items: T[];
+  private capacity: number;
+  private compare: (a: T, b: T) => number;
+
+  /**
+   * @param capacity Nombre maximal d'éléments conservés
+   * @param compare Positif si a est meilleur que b, négatif s'il est moins bon
+   */
+  constructor(capacity: number, compare: (a: T, b: T) => number) {
+    this.items = [];
+    this.capacity = capacity;
+    this.compare = compare;
+  }
+
+  public push(item: T): void {
+    if (this.capacity <= 0) {
+      return;
+    }
+
+    if (this.items.length < this.capacity) {
+      this.items.push(item);
+      this.siftUp(this.items.length - 1);
+    } else if (this.compare(item, this.items[0]) > 0) {
+      this.items[0] = item;
+      this.siftDown(0);
+    }
+  }
+
+  public size(): number {
+    return this.items.length;
+  }
+
+  /**
+   * Retourne les éléments conservés, du meilleur au moins bon
+   */
+  public toSortedArray(): T[] {
+    return [...this.items].sort((a, b) => this.compare(b, a));
+  }
+
+  private siftUp(index: number): void {
+    const items = this.items;
+    while (index > 0) {
+      const parent = (index - 1) >> 1;
+      if (this.compare(items[index], items[parent]) >= 0) {
+        break;
+      }
+      [items[index], items[parent]] = [items[parent], items[index]];
+      index = parent;
+    }
+  }
+
+  private siftDown(index: number): void {
+    const items = this.items;
+    const length = items.length;
+    for (;;) {
+      const left = 2 * index + 1;
+      const right = left + 1;
+      let worst = index;
+
+      if (left < length && this.compare(items[left], items[worst]) < 0) {
+        worst = left;
+      }
+      if (right < length && this.compare(items[right], items[worst]) < 0) {
+        worst = right;
+      }
+      if (worst === index) {
+        break;
+      }
+      [items[index], items[worst]] = [items[worst], items[index]];
+      index = worst;
+    }
+  }
+}
@@ -0,0 +1,40 @@
+/**
+ * Distance de Levenshtein bornée : retourne max + 1 dès que la distance
+ * dépasse max (arrêt anticipé, O(longueur × max) dans le meilleur cas).
+ */
+export function boundedEditDistance(a: string, b: string, max: number): number {
+  if (Math.abs(a.length - b.length) > max) {
+    return max + 1;
+  }
+
+  let previous = Array.from({ length: b.length + 1 }, (_, i) => i);
+  for (let i = 1; i <= a.length; i++) {
+    const current = [i];
+    let rowMin = i;
+    for (let j = 1; j <= b.length; j++) {
+      const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+      const value = Math.min(current[j - 1] + 1, previous[j] + 1, previous[j - 1] + cost);
+      current.push(value);
+      if (value < rowMin) {
+        rowMin = value;
+      }
+    }
+    if (rowMin > max) {
+      return max + 1;
+    }
+    previous = current;
+  }
+
+  return Math.min(previous[b.length], max + 1);
+}
+
+/**
+ * Distance d'édition tolérée pour un terme de requête : aucune faute sur
+ * les termes très courts, une jusqu'à 5 caractères, deux au-delà.
+ */
+export function defaultFuzzyDistance(term: string): number {
+  if (term.length <= 2) {
+    return 0;
+  }
+  return term.length <= 5 ? 1 : 2;
+}
@@ -0,0 +1,167 @@
+import { BinaryReader, BinaryWriter } from '../storage/BinaryIO';
+import { PACKED_THRESHOLD } from './PostingList';
+
+/**
+ * Note indexée, telle qu'enregistrée dans l'instantané
+ */
+export interface SnapshotDocument {
+  noteId: string;
+  contentLength: number; // longueur du contenu (en termes)
+  titleLength: number; // longueur du titre (en termes)
+}
+
+/**
+ * Postings d'un terme : documents croissants (indices dans la liste des
+ * documents de l'instantané) et, pour le contenu et le titre, fréquences
+ */
+export interface SnapshotPostings {
+  term: string;
+  docs: number[] | Uint32Array;
+  frequencies?: number[] | Uint32Array;
+}
+
+export interface IndexSnapshotData {
+  fingerprint: string; // empreinte des données dont les index sont issus
+  documents: SnapshotDocument[];
+  words: SnapshotPostings[];
+  titleWords: SnapshotPostings[];
+  tags: SnapshotPostings[];
+}
+
+const MAGIC = 'NIDX';
+const SNAPSHOT_NAME = 'Instantané d\'index';
+
+/**
+ * Version du format, à incrémenter dès que l'encodage ou le découpage des
+ * textes en termes change : les instantanés existants sont alors reconstruits
+ */
+export const SNAPSHOT_VERSION = 1;
+
+/**
+ * Encode les index en binaire compact.
+ *
+ * Disposition : en-tête (`NIDX`, version, empreinte), documents (identifiant
+ * et longueurs), puis les postings du contenu, du titre et des tags. Les
+ * entiers sont des varints ; les documents d'un posting sont codés par écart.
+ */
+export function encodeSnapshot(data: IndexSnapshotData): Buffer {
+  const writer = new BinaryWriter();
+
+  writer.writeRaw(Buffer.from(MAGIC, 'ascii'));
+  writer.writeUint(SNAPSHOT_VERSION);
+  writer.writeString(data.fingerprint);
+
+  writer.writeUint(data.documents.length);
+  data.documents.forEach(document => {
+    writer.writeString(document.noteId);
+    writer.writeUint(document.contentLength);
+    writer.writeUint(document.titleLength);
+  });
+
+  writePostings(writer, data.words, true);
+  writePostings(writer, data.titleWords, true);
+  writePostings(writer, data.tags, false);
+  return writer.toBuffer();
+}
+
+/**
+ * Empreinte enregistrée dans l'instantané, sans décoder le reste ;
+ * undefined si le fichier n'est pas un instantané de cette version
+ */
+export function readSnapshotFingerprint(buffer: Buffer): string | undefined {
+  try {
+    return readHeader(new BinaryReader(buffer, SNAPSHOT_NAME));
+  } catch (error) {
+    return undefined;
+  }
+}
+
+/**
+ * Décode un instantané ; lève une erreur s'il est tronqué, incohérent ou
+ * d'une autre version
+ */
+export function decodeSnapshot(buffer: Buffer): IndexSnapshotData {
+  const reader = new BinaryReader(buffer, SNAPSHOT_NAME);
+  const fingerprint = readHeader(reader);
+  if (fingerprint === undefined) {
+    throw new Error('Instantané d\'index invalide ou d\'une autre version');
+  }
+
+  const documents = new Array<SnapshotDocument>(reader.readUint());
+  for (let i = 0; i < documents.length; i++) {
+    documents[i] = {
+      noteId: reader.readString(),
+      contentLength: reader.readUint(),
+      titleLength: reader.readUint()
+    };
+  }
+
+  const words = readPostings(reader, true, documents.length);
+  const titleWords = readPostings(reader, true, documents.length);
+  const tags = readPostings(reader, false, documents.length);
+
+  if (!reader.atEnd()) {
+    throw new Error('Instantané d\'index corrompu');
+  }
+  return { fingerprint, documents, words, titleWords, tags };
+}
+
+function readHeader(reader: BinaryReader): string | undefined {
+  if (reader.readRaw(MAGIC.length).toString('ascii') !== MAGIC || reader.readUint() !== SNAPSHOT_VERSION) {
+    return undefined;
+  }
+  return reader.readString();
+}
+
+function writePostings(writer: BinaryWriter, postings: SnapshotPostings[], withFrequencies: boolean): void {
+  writer.writeUint(postings.length);
+  postings.forEach(({ term, docs, frequencies }) => {
+    writer.writeString(term);
+    writer.writeUint(docs.length);
+    let previous = -1;
+    for (let i = 0; i < docs.length; i++) {
+      writer.writeUint(docs[i] - previous);
+      previous = docs[i];
+    }
+    if (withFrequencies) {
+      for (let i = 0; i < docs.length; i++) {
+        writer.writeUint(frequencies ? frequencies[i] : 1);
+      }
+    }
+  });
+}
+
+function readPostings(reader: BinaryReader, withFrequencies: boolean, documentCount: number): SnapshotPostings[] {
+  const postings = new Array<SnapshotPostings>(reader.readUint());
+  for (let i = 0; i < postings.length; i++) {
+    const term = reader.readString();
+    const docs = allocate(reader.readUint());
+    let previous = -1;
+    for (let j = 0; j < docs.length; j++) {
+      const gap = reader.readUint();
+      previous += gap;
+      if (gap === 0 || previous >= documentCount) {
+        throw new Error('Instantané d\'index corrompu');
+      }
+      docs[j] = previous;
+    }
+
+    let frequencies: number[] | Uint32Array | undefined;
+    if (withFrequencies) {
+      frequencies = allocate(docs.length);
+      for (let j = 0; j < docs.length; j++) {
+        frequencies[j] = reader.readUint();
+      }
+    }
+    postings[i] = { term, docs, frequencies };
+  }
+  return postings;
+}
+
+/**
+ * Tableau au format que PostingList retiendra : les petits tableaux typés
+ * coûtent plus cher que des tableaux ordinaires
+ */
+function allocate(length: number): number[] | Uint32Array {
+  return length > PACKED_THRESHOLD ? new Uint32Array(length) : new Array<number>(length);
+}
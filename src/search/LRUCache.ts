@@ -0,0 +1,194 @@
+/**
+ * Statistiques d'utilisation d'un cache
+ */
+export interface CacheStats {
+  hits: number;
+  misses: number;
+  evictions: number; // entrées retirées pour respecter le budget
+  invalidations: number; // entrées retirées car périmées
+  entries: number;
+  maxEntries: number;
+  bytes: number;
+  maxBytes: number;
+  hitRate: number; // hits / (hits + misses), 0 sans lecture
+}
+
+export interface LRUCacheOptions<V> {
+  /** Budget mémoire estimé (en octets) */
+  maxBytes: number;
+  /** Nombre maximal d'entrées (illimité si absent) */
+  maxEntries?: number;
+  /** Estimation de la taille d'une entrée (en octets) */
+  sizeOf: (value: V, key: string) => number;
+}
+
+interface Slot<V> {
+  value: V;
+  size: number;
+  dependencies: string[];
+}
+
+/**
+ * Cache LRU borné en mémoire et en nombre d'entrées.
+ *
+ * L'ordre d'insertion d'une Map sert de liste de récence : une lecture
+ * réinsère l'entrée en fin, l'éviction retire les premières entrées
+ * jusqu'à repasser sous les deux limites. Chaque entrée peut déclarer des
+ * dépendances (noms libres) : invalidate() retire les entrées qui dépendent
+ * des noms donnés via un index inverse, sans parcourir le cache. Le coût
+ * d'une opération ne dépend que du nombre de dépendances concernées.
+ */
+export class LRUCache<V> {
+  private slots: Map<string, Slot<V>>;
+  private dependents: Map<string, Set<string>>; // dépendance -> clés des entrées
+  private maxBytes: number;
+  private maxEntries: number;
+  private sizeOf: (value: V, key: string) => number;
+  private bytes: number;
+  private hits: number;
+  private misses: number;
+  private evictions: number;
+  private invalidations: number;
+
+  constructor(options: LRUCacheOptions<V>) {
+    this.slots = new Map();
+    this.dependents = new Map();
+    this.maxBytes = options.maxBytes;
+    this.maxEntries = options.maxEntries ?? Infinity;
+    this.sizeOf = options.sizeOf;
+    this.bytes = 0;
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+    this.invalidations = 0;
+  }
+
+  /**
+   * Lit une entrée et la marque comme la plus récemment utilisée
+   */
+  public get(key: string): V | undefined {
+    const slot = this.slots.get(key);
+    if (!slot) {
+      this.misses++;
+      return undefined;
+    }
+
+    this.hits++;
+    this.slots.delete(key);
+    this.slots.set(key, slot);
+    return slot.value;
+  }
+
+  /**
+   * Ajoute ou remplace une entrée, puis évince les moins récentes si besoin.
+   * Une entrée plus grosse que le budget entier n'est pas conservée.
+   */
+  public set(key: string, value: V, dependencies: Iterable<string> = []): void {
+    this.remove(key);
+
+    const size = this.sizeOf(value, key);
+    if (size > this.maxBytes || this.maxEntries < 1) {
+      return;
+    }
+
+    const slot: Slot<V> = { value, size, dependencies: Array.from(new Set(dependencies)) };
+    this.slots.set(key, slot);
+    this.bytes += size;
+    slot.dependencies.forEach(dependency => {
+      let keys = this.dependents.get(dependency);
+      if (!keys) {
+        keys = new Set();
+        this.dependents.set(dependency, keys);
+      }
+      keys.add(key);
+    });
+
+    for (const oldestKey of this.slots.keys()) {
+      if (this.bytes <= this.maxBytes && this.slots.size <= this.maxEntries) {
+        break;
+      }
+      this.remove(oldestKey);
+      this.evictions++;
+    }
+  }
+
+  public has(key: string): boolean {
+    return this.slots.has(key);
+  }
+
+  public delete(key: string): boolean {
+    return this.remove(key);
+  }
+
+  /**
+   * Retire les entrées qui dépendent d'au moins un des noms donnés,
+   * retourne leur nombre
+   */
+  public invalidate(dependencies: Iterable<string>): number {
+    let removed = 0;
+    for (const dependency of dependencies) {
+      const keys = this.dependents.get(dependency);
+      if (!keys) {
+        continue;
+      }
+      // remove() modifie l'ensemble parcouru
+      Array.from(keys).forEach(key => {
+        if (this.remove(key)) {
+          removed++;
+        }
+      });
+    }
+    this.invalidations += removed;
+    return removed;
+  }
+
+  public clear(): void {
+    this.invalidations += this.slots.size;
+    this.slots.clear();
+    this.dependents.clear();
+    this.bytes = 0;
+  }
+
+  public get size(): number {
+    return this.slots.size;
+  }
+
+  public getStats(): CacheStats {
+    const reads = this.hits + this.misses;
+    return {
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      invalidations: this.invalidations,
+      entries: this.slots.size,
+      maxEntries: this.maxEntries,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes,
+      hitRate: reads > 0 ? this.hits / reads : 0
+    };
+  }
+
+  public resetStats(): void {
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+    this.invalidations = 0;
+  }
+
+  private remove(key: string): boolean {
+    const slot = this.slots.get(key);
+    if (!slot) {
+      return false;
+    }
+    this.slots.delete(key);
+    this.bytes -= slot.size;
+    slot.dependencies.forEach(dependency => {
+      const keys = this.dependents.get(dependency);
+      keys?.delete(key);
+      if (keys?.size === 0) {
+        this.dependents.delete(dependency);
+      }
+    });
+    return true;
+  }
+}
@@ -0,0 +1,343 @@
+/**
+ * Taille au-delà de laquelle une liste passe en Uint32Array : en deçà, un
+ * tableau ordinaire coûte moins cher que l'en-tête d'un tableau typé
+ * (la plupart des termes n'apparaissent que dans quelques notes)
+ */
+export const PACKED_THRESHOLD = 32;
+
+/**
+ * Copies à la taille exacte : splice() et push() réservent de la place
+ * supplémentaire, multipliée ici par le nombre de termes
+ */
+function insertAt(values: number[], position: number, value: number): number[] {
+  return values.slice(0, position).concat([value], values.slice(position));
+}
+
+function removeAt(values: number[], position: number): number[] {
+  return values.slice(0, position).concat(values.slice(position + 1));
+}
+
+function toPacked(values: number[] | Uint32Array): Uint32Array {
+  return Array.isArray(values) ? Uint32Array.from(values) : values;
+}
+
+function toPlain(values: number[] | Uint32Array): number[] {
+  return Array.isArray(values) ? values : Array.from(values);
+}
+
+/**
+ * Liste de postings compacte : identifiants de documents entiers triés,
+ * stockés dans un Uint32Array, avec en option la fréquence du terme dans
+ * chaque document.
+ *
+ * Les identifiants étant attribués dans l'ordre d'indexation, l'ajout d'une
+ * nouvelle note se fait en fin de tableau (O(1) amorti). Le tri permet les
+ * intersections par recherche galopante et les unions par fusion.
+ */
+export class PostingList {
+  private docs: number[] | Uint32Array;
+  private frequencies?: number[] | Uint32Array;
+  private length: number;
+
+  constructor(withFrequencies: boolean = false) {
+    this.docs = [];
+    this.frequencies = withFrequencies ? [] : undefined;
+    this.length = 0;
+  }
+
+  public get size(): number {
+    return this.length;
+  }
+
+  /**
+   * Ajoute un document (ou met à jour sa fréquence)
+   */
+  public set(doc: number, frequency: number = 1): void {
+    const position = this.lowerBound(doc, 0, this.length);
+
+    if (position < this.length && this.docs[position] === doc) {
+      if (this.frequencies) {
+        this.frequencies[position] = frequency;
+      }
+      return;
+    }
+
+    const docs = this.docs;
+    const frequencies = this.frequencies;
+
+    if (Array.isArray(docs)) {
+      this.docs = insertAt(docs, position, doc);
+      if (frequencies) {
+        this.frequencies = insertAt(frequencies as number[], position, frequency);
+      }
+      this.length++;
+      if (this.length > PACKED_THRESHOLD) {
+        this.pack();
+      }
+      return;
+    }
+
+    this.ensureCapacity(this.length + 1);
+    this.docs.copyWithin(position + 1, position, this.length);
+    this.docs[position] = doc;
+    if (this.frequencies) {
+      this.frequencies.copyWithin(position + 1, position, this.length);
+      this.frequencies[position] = frequency;
+    }
+    this.length++;
+  }
+
+  public delete(doc: number): boolean {
+    const position = this.lowerBound(doc, 0, this.length);
+    if (position >= this.length || this.docs[position] !== doc) {
+      return false;
+    }
+
+    const docs = this.docs;
+    if (Array.isArray(docs)) {
+      this.docs = removeAt(docs, position);
+      if (this.frequencies) {
+        this.frequencies = removeAt(this.frequencies as number[], position);
+      }
+    } else {
+      docs.copyWithin(position, position + 1, this.length);
+      this.frequencies?.copyWithin(position, position + 1, this.length);
+    }
+    this.length--;
+    return true;
+  }
+
+  public has(doc: number): boolean {
+    const position = this.lowerBound(doc, 0, this.length);
+    return position < this.length && this.docs[position] === doc;
+  }
+
+  /**
+   * Parcourt les documents dans l'ordre croissant
+   */
+  public forEach(callback: (frequency: number, doc: number) => void): void {
+    for (let i = 0; i < this.length; i++) {
+      callback(this.frequencies ? this.frequencies[i] : 1, this.docs[i]);
+    }
+  }
+
+  /**
+   * Identifiants triés (vue sans copie une fois la liste compactée)
+   */
+  public toArray(): Uint32Array {
+    const docs = this.docs;
+    return Array.isArray(docs) ? Uint32Array.from(docs) : docs.subarray(0, this.length);
+  }
+
+  /**
+   * Remplace chaque document par renumbered[document] ; la renumérotation
+   * doit préserver l'ordre (compactage des identifiants)
+   */
+  public renumber(renumbered: ArrayLike<number>): void {
+    for (let i = 0; i < this.length; i++) {
+      this.docs[i] = renumbered[this.docs[i]];
+    }
+  }
+
+  /**
+   * Liste construite d'un bloc à partir de documents croissants, sans
+   * insertion une à une (rechargement d'un instantané). Les tableaux à la
+   * taille exacte et déjà au bon format sont repris tels quels.
+   */
+  public static fromSorted(docs: number[] | Uint32Array, frequencies?: number[] | Uint32Array): PostingList {
+    const list = new PostingList(frequencies !== undefined);
+    const convert = docs.length > PACKED_THRESHOLD ? toPacked : toPlain;
+    list.docs = convert(docs);
+    list.frequencies = frequencies && convert(frequencies);
+    list.length = docs.length;
+    return list;
+  }
+
+  /**
+   * Documents présents dans toutes les listes
+   */
+  public static intersect(lists: PostingList[]): Uint32Array {
+    return intersectSorted(lists.map(list => list.view()));
+  }
+
+  /**
+   * Documents présents dans au moins une des listes (triés, sans doublon)
+   */
+  public static union(lists: PostingList[]): Uint32Array {
+    return unionSorted(lists.map(list => list.view()));
+  }
+
+  /**
+   * Identifiants triés, sans copie (les tableaux ordinaires sont à la taille exacte)
+   */
+  private view(): ArrayLike<number> {
+    const docs = this.docs;
+    return Array.isArray(docs) ? docs : docs.subarray(0, this.length);
+  }
+
+  private lowerBound(doc: number, low: number, high: number): number {
+    return lowerBound(this.docs, doc, low, high);
+  }
+
+  /**
+   * Passe du tableau ordinaire au Uint32Array
+   */
+  private pack(): void {
+    const capacity = this.length * 2;
+    this.docs = this.copyInto(new Uint32Array(capacity), this.docs);
+    if (this.frequencies) {
+      this.frequencies = this.copyInto(new Uint32Array(capacity), this.frequencies);
+    }
+  }
+
+  private ensureCapacity(capacity: number): void {
+    if (capacity <= this.docs.length) {
+      return;
+    }
+
+    const grownCapacity = Math.max(capacity, this.docs.length * 2);
+    this.docs = this.copyInto(new Uint32Array(grownCapacity), this.docs);
+    if (this.frequencies) {
+      this.frequencies = this.copyInto(new Uint32Array(grownCapacity), this.frequencies);
+    }
+  }
+
+  private copyInto(target: Uint32Array, source: number[] | Uint32Array): Uint32Array {
+    target.set(Array.isArray(source) ? source : source.subarray(0, this.length));
+    return target;
+  }
+}
+
+/**
+ * Documents présents dans tous les tableaux triés.
+ * Le plus court sert de référence ; chaque identifiant est cherché dans
+ * les autres par recherche galopante à partir de la position précédente :
+ * O(m log(n / m)) au lieu de O(m + n).
+ */
+export function intersectSorted(arrays: ArrayLike<number>[]): Uint32Array {
+  if (arrays.length === 0) {
+    return new Uint32Array(0);
+  }
+
+  const sorted = [...arrays].sort((a, b) => a.length - b.length);
+  const smallest = sorted[0];
+  const cursors = new Array<number>(sorted.length).fill(0);
+  const result = new Uint32Array(smallest.length);
+  let count = 0;
+
+  candidates:
+  for (let i = 0; i < smallest.length; i++) {
+    const doc = smallest[i];
+    for (let j = 1; j < sorted.length; j++) {
+      const docs = sorted[j];
+      const position = gallop(docs, doc, cursors[j]);
+      cursors[j] = position;
+      if (position >= docs.length) {
+        break candidates;
+      }
+      if (docs[position] !== doc) {
+        continue candidates;
+      }
+    }
+    result[count++] = doc;
+  }
+
+  return result.slice(0, count);
+}
+
+/**
+ * Documents présents dans au moins un des tableaux triés (sans doublon).
+ * Fusion deux à deux, par tours : chaque identifiant est recopié une fois
+ * par tour, soit O(n log k) pour k tableaux au lieu d'un tri de l'ensemble.
+ */
+export function unionSorted(arrays: ArrayLike<number>[]): Uint32Array {
+  let merged = arrays.filter(docs => docs.length > 0);
+  if (merged.length === 0) {
+    return new Uint32Array(0);
+  }
+  if (merged.length === 1) {
+    return Uint32Array.from(merged[0]);
+  }
+
+  while (merged.length > 1) {
+    const next: ArrayLike<number>[] = [];
+    for (let i = 0; i < merged.length; i += 2) {
+      next.push(i + 1 < merged.length ? mergeSorted(merged[i], merged[i + 1]) : merged[i]);
+    }
+    merged = next;
+  }
+  return merged[0] as Uint32Array;
+}
+
+/**
+ * Fusion de deux tableaux triés sans doublon
+ */
+function mergeSorted(a: ArrayLike<number>, b: ArrayLike<number>): Uint32Array {
+  const result = new Uint32Array(a.length + b.length);
+  let count = 0;
+  let i = 0;
+  let j = 0;
+
+  while (i < a.length && j < b.length) {
+    if (a[i] < b[j]) {
+      result[count++] = a[i++];
+    } else if (a[i] > b[j]) {
+      result[count++] = b[j++];
+    } else {
+      result[count++] = a[i++];
+      j++;
+    }
+  }
+  while (i < a.length) {
+    result[count++] = a[i++];
+  }
+  while (j < b.length) {
+    result[count++] = b[j++];
+  }
+  return count === result.length ? result : result.slice(0, count);
+}
+
+/**
+ * Documents du premier tableau trié absents du second
+ */
+export function subtractSorted(docs: ArrayLike<number>, excluded: ArrayLike<number>): Uint32Array {
+  const result = new Uint32Array(docs.length);
+  let count = 0;
+  let cursor = 0;
+
+  for (let i = 0; i < docs.length; i++) {
+    cursor = gallop(excluded, docs[i], cursor);
+    if (cursor >= excluded.length || excluded[cursor] !== docs[i]) {
+      result[count++] = docs[i];
+    }
+  }
+  return result.slice(0, count);
+}
+
+/**
+ * Première position >= from dont l'identifiant est >= doc, en doublant
+ * le pas avant de finir par une recherche dichotomique
+ */
+function gallop(docs: ArrayLike<number>, doc: number, from: number): number {
+  if (from >= docs.length || docs[from] >= doc) {
+    return from;
+  }
+
+  let bound = 1;
+  while (from + bound < docs.length && docs[from + bound] < doc) {
+    bound *= 2;
+  }
+  return lowerBound(docs, doc, from + (bound >> 1) + 1, Math.min(from + bound, docs.length));
+}
+
+function lowerBound(docs: ArrayLike<number>, doc: number, low: number, high: number): number {
+  while (low < high) {
+    const middle = (low + high) >>> 1;
+    if (docs[middle] < doc) {
+      low = middle + 1;
+    } else {
+      high = middle;
+    }
+  }
+  return low;
+}
@@ -0,0 +1,230 @@
+/**
+ * Champ ciblé par un terme (`tag:`, `title:`, `content:`)
+ */
+export type QueryField = 'tag' | 'title' | 'content';
+
+/**
+ * Arbre d'une requête analysée
+ */
+export type QueryNode =
+  | { type: 'term'; value: string; prefix: boolean; field?: QueryField }
+  | { type: 'phrase'; words: string[]; field?: QueryField }
+  | { type: 'and'; children: QueryNode[] }
+  | { type: 'or'; children: QueryNode[] }
+  | { type: 'not'; child: QueryNode };
+
+type Token =
+  | { kind: 'word' | 'quoted'; text: string; field?: QueryField }
+  | { kind: 'and' | 'or' | 'not' | 'open' | 'close' };
+
+const FIELDS: QueryField[] = ['tag', 'title', 'content'];
+const OPERATORS: Record<string, 'and' | 'or' | 'not'> = { AND: 'and', OR: 'or', NOT: 'not' };
+
+/**
+ * Analyseur du langage de requête.
+ *
+ * - Termes juxtaposés : OU implicite (comportement historique)
+ * - `AND`, `OR`, `NOT` (en majuscules) et parenthèses ; AND est prioritaire
+ * - `"une phrase"` : mots consécutifs
+ * - `tag:`, `title:`, `content:` : restreint un terme ou une phrase à un champ
+ * - `terme*` : préfixe
+ *
+ * Les mots sont normalisés par la fonction fournie (celle de l'indexation),
+ * pour que la requête et les index découpent le texte de la même façon.
+ * Une requête mal formée ne lève pas d'erreur : les opérateurs orphelins
+ * sont ignorés.
+ */
+export class QueryParser {
+  private normalize: (text: string) => string[];
+  private tokens: Token[];
+  private position: number;
+
+  constructor(normalize: (text: string) => string[]) {
+    this.normalize = normalize;
+    this.tokens = [];
+    this.position = 0;
+  }
+
+  /**
+   * Analyse une requête ; undefined si elle ne contient aucun terme
+   */
+  public parse(query: string): QueryNode | undefined {
+    this.tokens = this.tokenize(query);
+    this.position = 0;
+
+    const children: QueryNode[] = [];
+    while (this.position < this.tokens.length) {
+      const node = this.parseOr();
+      if (node) {
+        children.push(node);
+      } else {
+        // Parenthèse fermante ou opérateur orphelin
+        this.position++;
+      }
+    }
+    return this.combine('or', children);
+  }
+
+  private tokenize(query: string): Token[] {
+    const tokens: Token[] = [];
+    let i = 0;
+
+    while (i < query.length) {
+      const char = query[i];
+
+      if (/\s/.test(char)) {
+        i++;
+      } else if (char === '(' || char === ')') {
+        tokens.push({ kind: char === '(' ? 'open' : 'close' });
+        i++;
+      } else if (char === '"') {
+        const end = query.indexOf('"', i + 1);
+        const close = end === -1 ? query.length : end;
+        tokens.push({ kind: 'quoted', text: query.slice(i + 1, close) });
+        i = close + 1;
+      } else {
+        let end = i;
+        while (end < query.length && !/[\s()"]/.test(query[end])) {
+          end++;
+        }
+        const text = query.slice(i, end);
+        i = end;
+
+        const field = this.fieldOf(text);
+        if (field && text.length === field.length + 1 && query[i] === '"') {
+          // Champ suivi d'une phrase : title:"compte rendu"
+          const quoteEnd = query.indexOf('"', i + 1);
+          const close = quoteEnd === -1 ? query.length : quoteEnd;
+          tokens.push({ kind: 'quoted', text: query.slice(i + 1, close), field });
+          i = close + 1;
+        } else if (field) {
+          tokens.push({ kind: 'word', text: text.slice(field.length + 1), field });
+        } else if (OPERATORS[text]) {
+          tokens.push({ kind: OPERATORS[text] });
+        } else {
+          tokens.push({ kind: 'word', text });
+        }
+      }
+    }
+
+    return tokens;
+  }
+
+  private fieldOf(text: string): QueryField | undefined {
+    const separator = text.indexOf(':');
+    if (separator <= 0) {
+      return undefined;
+    }
+    const name = text.slice(0, separator).toLowerCase();
+    return FIELDS.find(field => field === name);
+  }
+
+  /**
+   * or := and ((OR)? and)*
+   */
+  private parseOr(): QueryNode | undefined {
+    const children: QueryNode[] = [];
+
+    while (this.position < this.tokens.length) {
+      const token = this.tokens[this.position];
+      if (token.kind === 'close') {
+        break;
+      }
+      if (token.kind === 'or' || token.kind === 'and') {
+        // OR explicite, ou AND sans opérande gauche
+        this.position++;
+        continue;
+      }
+      const node = this.parseAnd();
+      if (node) {
+        children.push(node);
+      }
+    }
+
+    return this.combine('or', children);
+  }
+
+  /**
+   * and := unary (AND unary)*
+   */
+  private parseAnd(): QueryNode | undefined {
+    const children: QueryNode[] = [];
+    const first = this.parseUnary();
+    if (first) {
+      children.push(first);
+    }
+
+    while (this.peek() === 'and') {
+      this.position++;
+      const node = this.parseUnary();
+      if (node) {
+        children.push(node);
+      }
+    }
+
+    return this.combine('and', children);
+  }
+
+  /**
+   * unary := NOT unary | ( or ) | terme | phrase
+   */
+  private parseUnary(): QueryNode | undefined {
+    const token = this.tokens[this.position];
+    if (!token) {
+      return undefined;
+    }
+
+    switch (token.kind) {
+      case 'not': {
+        this.position++;
+        const child = this.parseUnary();
+        return child ? { type: 'not', child } : undefined;
+      }
+      case 'open': {
+        this.position++;
+        const node = this.parseOr();
+        if (this.peek() === 'close') {
+          this.position++;
+        }
+        return node;
+      }
+      case 'word':
+      case 'quoted':
+        this.position++;
+        return this.leaf(token.text, token.kind === 'quoted', token.field);
+      default:
+        return undefined;
+    }
+  }
+
+  private leaf(text: string, quoted: boolean, field?: QueryField): QueryNode | undefined {
+    const prefix = !quoted && text.endsWith('*');
+
+    // Les tags ne sont pas découpés en mots
+    if (field === 'tag') {
+      const value = (prefix ? text.slice(0, -1) : text).trim().toLowerCase();
+      return value.length > 0 ? { type: 'term', value, prefix, field } : undefined;
+    }
+
+    const words = this.normalize(text);
+    if (words.length === 0) {
+      return undefined;
+    }
+    if (words.length === 1) {
+      return { type: 'term', value: words[0], prefix, field };
+    }
+    // `l'app`, `e-mail` : les mots issus d'un même terme se suivent
+    return { type: 'phrase', words, field };
+  }
+
+  private combine(type: 'and' | 'or', children: QueryNode[]): QueryNode | undefined {
+    if (children.length <= 1) {
+      return children[0];
+    }
+    return { type, children };
+  }
+
+  private peek(): Token['kind'] | undefined {
+    return this.tokens[this.position]?.kind;
+  }
+}
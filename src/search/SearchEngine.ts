@@ -1,73 +1,687 @@
-import { ISearchEngine } from '../interfaces/ISearchEngine';
+import * as fs from 'fs';
+import {
+  IPersistentSearchEngine,
+  IRankedSearchEngine,
+  ScoredNote,
+  SearchOptions
+} from '../interfaces/ISearchEngine';
 import { INote } from '../interfaces/INote';
+import { BoundedHeap } from './BoundedHeap';
+import { CacheStats, LRUCache } from './LRUCache';
+import { PostingList, intersectSorted, subtractSorted, unionSorted } from './PostingList';
+import { QueryField, QueryNode, QueryParser } from './QueryParser';
+import { Trie } from './Trie';
+import { defaultFuzzyDistance } from './EditDistance';
+import {
+  IndexSnapshotData,
+  SnapshotDocument,
+  SnapshotPostings,
+  decodeSnapshot,
+  encodeSnapshot,
+  readSnapshotFingerprint
+} from './IndexSnapshot';
+
+/**
+ * Positions d'un terme dans un texte : un entier pour une occurrence unique
+ * (cas le plus courant, sans allouer de tableau), sinon la liste croissante
+ */
+type TermPositions = number | number[];
+
+/**
+ * Termes qu'une note a contribués aux index (index direct).
+ * Permet de retirer ou de mettre à jour une note sans reconstruire les index.
+ */
+interface IndexedTerms {
+  title: string;
+  content: string;
+  words: Map<string, TermPositions>; // terme du contenu -> positions
+  titleWords: Map<string, TermPositions>; // terme du titre -> positions
+  tags: Map<string, number>; // tag normalisé -> 1
+  contentLength: number;
+  titleLength: number;
+}
+
+/**
+ * Note rechargée depuis l'instantané dont l'index direct n'est pas encore
+ * calculé : il l'est à la première utilisation, à partir des textes tels
+ * qu'indexés (la note elle-même peut être modifiée en place d'ici là)
+ */
+interface PendingTerms {
+  title: string;
+  content: string;
+  tags: string[];
+  contentLength: number;
+  titleLength: number;
+}
+
+/**
+ * Ensemble de termes touchés par une modification des index
+ */
+interface TermSets {
+  words: Set<string>;
+  titleWords: Set<string>;
+  tags: Set<string>;
+}
+
+/**
+ * Entrée du cache : résultats et termes dont ils dépendent
+ */
+interface CacheEntry {
+  results: INote[];
+  words: string[];
+  titleWords: string[];
+  tags: string[];
+  tagSubstrings?: string[]; // tags contenant ces chaînes
+  prefixes?: string[]; // préfixes de la requête (nouveaux termes correspondants)
+  fuzzyTerms?: Array<[string, number]>; // termes approchés et distance tolérée
+  anyChange?: boolean; // dépend de l'ensemble des notes (NOT sans terme positif)
+}
+
+/**
+ * Taille fixe estimée d'une entrée du cache (objet, tableaux, entrée de Map)
+ */
+const CACHE_ENTRY_OVERHEAD = 160;
+
+/**
+ * Nombre de documents retirés (trous dans la numérotation) en deçà duquel
+ * les identifiants ne sont pas compactés
+ */
+const COMPACT_MIN_HOLES = 1024;
+
+/**
+ * Dépendance des entrées du cache invalidées par toute modification :
+ * recherches approchées, NOT sans terme positif
+ */
+const ANY_CHANGE = '*';
+
+export interface SearchEngineOptions {
+  /** Budget mémoire estimé du cache de résultats (en octets) */
+  cacheMaxBytes?: number;
+  /** Nombre maximal de résultats en cache */
+  cacheMaxEntries?: number;
+  /** Fichier de l'instantané des index (désactivé si absent) */
+  snapshotPath?: string;
+}
+
+/**
+ * Termes et conditions dont dépend le résultat d'une requête
+ */
+interface QueryDependencies extends TermSets {
+  tagSubstrings: Set<string>;
+  prefixes: Set<string>;
+  fuzzyTerms: Array<[string, number]>;
+  anyChange: boolean;
+}
+
+/**
+ * État de l'évaluation d'une requête : dépendances pour le cache et
+ * termes à pondérer pour le classement (hors négations)
+ */
+interface QueryContext {
+  fuzzy?: boolean | number;
+  negated: boolean;
+  dependencies: QueryDependencies;
+  scored: TermSets;
+}
+
+type NotNode = Extract<QueryNode, { type: 'not' }>;
+
+function occurrences(positions: TermPositions): number {
+  return typeof positions === 'number' ? 1 : positions.length;
+}
+
+function hasPosition(positions: TermPositions, position: number): boolean {
+  return typeof positions === 'number' ? positions === position : positions.includes(position);
+}
 
 /**
  * SearchEngine optimisé avec des index pour améliorer les performances.
  * 
  * Optimisations:
- * - Index inversé pour les mots-clés (recherche de contenu)
+ * - Notes identifiées dans les index par des entiers denses (documents)
+ * - Index inversé pour les mots-clés (recherche de contenu), avec fréquences
  * - HashMap pour les tags (recherche par tag)
- * - HashMap pour les titres (recherche par titre)
- * - Cache des résultats de recherche récents
+ * - HashMap pour les titres (recherche par titre), avec fréquences
+ * - Postings compacts (Uint32Array triés) : intersection galopante pour
+ *   la recherche multi-tags, union par fusion ; identifiants compactés
+ *   quand les suppressions laissent plus de trous que de notes
+ * - Index direct par note pour une mise à jour incrémentale des index
+ * - Classement BM25 des meilleurs résultats via un tas borné
+ * - Dictionnaires de termes en arbre préfixe (requêtes `perf*`, autocomplétion,
+ *   recherche de sous-chaîne dans les tags sans parcourir tous les tags)
+ * - Recherche approchée (fautes de frappe) par parcours borné de ces arbres
+ * - Langage de requête (AND/OR/NOT, phrases, champs) ; les phrases et les
+ *   sous-chaînes des recherches par titre et contenu sont vérifiées par les
+ *   positions des termes, sans relire le texte des notes (termes finissant
+ *   par une chaîne : arbre des termes retournés)
+ * - Cache LRU des résultats de recherche, borné en mémoire et en nombre
+ *   d'entrées, invalidé sélectivement par un index des termes dont
+ *   dépendent les entrées
+ * - Instantané binaire des postings : un démarrage à froid les recharge au
+ *   lieu de redécouper tout le corpus ; l'index direct d'une note rechargée
+ *   n'est recalculé qu'à sa première utilisation
  */
-export class SearchEngine implements ISearchEngine {
-  private tagIndex: Map<string, Set<string>>; // tag -> Set of note IDs
-  private wordIndex: Map<string, Set<string>>; // word -> Set of note IDs
-  private titleIndex: Map<string, Set<string>>; // title word -> Set of note IDs
-  private notesMap: Map<string, INote>; // noteId -> Note
-  private searchCache: Map<string, INote[]>; // cache key -> results
-  private readonly MAX_CACHE_SIZE = 100;
-
-  constructor() {
+export class SearchEngine implements IPersistentSearchEngine, IRankedSearchEngine {
+  private tagIndex: Map<string, PostingList>; // tag -> documents
+  private wordIndex: Map<string, PostingList>; // word -> documents et fréquences
+  private titleIndex: Map<string, PostingList>; // title word -> documents et fréquences
+  private docIds: Map<string, number>; // noteId -> document
+  private documents: Array<INote | undefined>; // document -> Note
+  private noteTerms: Array<IndexedTerms | PendingTerms | undefined>; // document -> termes indexés
+  private wordDictionary: Trie; // termes présents dans wordIndex
+  private titleDictionary: Trie; // termes présents dans titleIndex
+  private wordEndings: Trie; // termes de wordIndex retournés (suffixes)
+  private titleEndings: Trie; // termes de titleIndex retournés (suffixes)
+  private tagDictionary: Trie; // tags (préfixes)
+  private tagSubstrings: Trie; // tags indexés par suffixe (sous-chaînes)
+  private totalContentLength: number; // somme des longueurs de contenu (en termes)
+  private totalTitleLength: number; // somme des longueurs de titre (en termes)
+  private searchCache: LRUCache<CacheEntry>; // cache key -> results
+  private queryParser: QueryParser;
+  private snapshotPath?: string;
+  private snapshotFingerprint?: string; // empreinte du dernier instantané lu ou écrit
+  private snapshotStale: boolean; // index modifiés depuis ce dernier instantané
+
+  // Paramètres BM25 et pondération des champs
+  private readonly BM25_K1 = 1.2;
+  private readonly BM25_B = 0.75;
+  private readonly TITLE_BOOST = 2;
+  private readonly TAG_BOOST = 1.5;
+
+  constructor(options: SearchEngineOptions = {}) {
     this.tagIndex = new Map();
     this.wordIndex = new Map();
     this.titleIndex = new Map();
-    this.notesMap = new Map();
-    this.searchCache = new Map();
+    this.docIds = new Map();
+    this.documents = [];
+    this.noteTerms = [];
+    this.wordDictionary = new Trie();
+    this.titleDictionary = new Trie();
+    this.wordEndings = new Trie('reversed');
+    this.titleEndings = new Trie('reversed');
+    this.tagDictionary = new Trie();
+    this.tagSubstrings = new Trie('suffixes');
+    this.totalContentLength = 0;
+    this.totalTitleLength = 0;
+    this.searchCache = new LRUCache<CacheEntry>({
+      maxBytes: options.cacheMaxBytes ?? 8 * 1024 * 1024,
+      maxEntries: options.cacheMaxEntries ?? 100,
+      sizeOf: (entry, key) => this.estimateCacheEntrySize(entry, key)
+    });
+    this.queryParser = new QueryParser(text => this.extractWords(text));
+    this.snapshotPath = options.snapshotPath;
+    this.snapshotStale = true;
   }
 
   /**
    * Construit les index à partir d'une liste de notes.
-   * Cette méthode doit être appelée chaque fois que les notes changent.
+   * Reconstruction complète : à réserver au chargement initial ou à un import,
+   * les modifications unitaires passent par indexNote/reindexNote/removeNote.
    */
   public buildIndexes(notes: INote[]): void {
-    // Réinitialiser les index
+    this.reset();
+    notes.forEach(note => this.addNote(note));
+  }
+
+  /**
+   * Recharge les index depuis l'instantané, s'il a été écrit pour ces
+   * données (même empreinte) et couvre exactement ces notes.
+   * Retourne false si les index doivent être reconstruits.
+   */
+  public loadSnapshot(notes: INote[], fingerprint: string): boolean {
+    if (!this.snapshotPath || !fs.existsSync(this.snapshotPath)) {
+      return false;
+    }
+
+    let snapshot: IndexSnapshotData;
+    try {
+      const buffer = fs.readFileSync(this.snapshotPath);
+      // L'empreinte est vérifiée avant de décoder le reste du fichier
+      if (readSnapshotFingerprint(buffer) !== fingerprint) {
+        return false;
+      }
+      snapshot = decodeSnapshot(buffer);
+    } catch (error) {
+      return false;
+    }
+
+    const notesById = new Map(notes.map(note => [note.getId(), note] as [string, INote]));
+    if (snapshot.documents.length !== notes.length ||
+        notesById.size !== notes.length ||
+        snapshot.documents.some(document => !notesById.has(document.noteId))) {
+      return false;
+    }
+
+    this.reset();
+    snapshot.documents.forEach((document, doc) => {
+      const note = notesById.get(document.noteId)!;
+      this.docIds.set(document.noteId, doc);
+      this.documents.push(note);
+      this.noteTerms.push({
+        title: note.getTitle(),
+        content: note.getContent(),
+        tags: note.getTags(),
+        contentLength: document.contentLength,
+        titleLength: document.titleLength
+      });
+      this.totalContentLength += document.contentLength;
+      this.totalTitleLength += document.titleLength;
+    });
+    this.restorePostings(this.wordIndex, snapshot.words);
+    this.restorePostings(this.titleIndex, snapshot.titleWords);
+    this.restorePostings(this.tagIndex, snapshot.tags);
+
+    this.snapshotFingerprint = fingerprint;
+    this.snapshotStale = false;
+    return true;
+  }
+
+  /**
+   * Écrit l'instantané des index si ceux-ci ont changé depuis le dernier
+   * instantané lu ou écrit. L'empreinte identifie l'état des données que
+   * les index reflètent. Un échec n'est pas bloquant : l'instantané n'est
+   * qu'un cache, les index seront reconstruits au prochain démarrage.
+   */
+  public saveSnapshot(fingerprint: string): void {
+    if (!this.snapshotPath || (!this.snapshotStale && fingerprint === this.snapshotFingerprint)) {
+      return;
+    }
+
+    // Les documents retirés laissent des trous : l'instantané est renuméroté
+    const renumbered = new Array<number>(this.documents.length);
+    const documents: SnapshotDocument[] = [];
+    this.documents.forEach((note, doc) => {
+      if (!note) {
+        return;
+      }
+      const terms = this.noteTerms[doc]!;
+      renumbered[doc] = documents.length;
+      documents.push({ noteId: note.getId(), contentLength: terms.contentLength, titleLength: terms.titleLength });
+    });
+
+    const snapshot: IndexSnapshotData = {
+      fingerprint,
+      documents,
+      words: this.snapshotPostings(this.wordIndex, renumbered),
+      titleWords: this.snapshotPostings(this.titleIndex, renumbered),
+      tags: this.snapshotPostings(this.tagIndex, renumbered)
+    };
+    try {
+      // Écriture dans un fichier temporaire puis renommage : jamais d'instantané à moitié écrit
+      const tempPath = `${this.snapshotPath}.tmp`;
+      fs.writeFileSync(tempPath, encodeSnapshot(snapshot));
+      fs.renameSync(tempPath, this.snapshotPath);
+      this.snapshotFingerprint = fingerprint;
+      this.snapshotStale = false;
+    } catch (error) {
+      console.error('Erreur lors de l\'enregistrement de l\'instantané des index:', error);
+    }
+  }
+
+  private restorePostings(index: Map<string, PostingList>, postings: SnapshotPostings[]): void {
+    const dictionaries = this.dictionariesOf(index);
+    postings.forEach(({ term, docs, frequencies }) => {
+      index.set(term, PostingList.fromSorted(docs, frequencies));
+      dictionaries.forEach(dictionary => dictionary.insert(term));
+    });
+  }
+
+  private snapshotPostings(index: Map<string, PostingList>, renumbered: number[]): SnapshotPostings[] {
+    const withFrequencies = index !== this.tagIndex;
+    const postings: SnapshotPostings[] = [];
+    index.forEach((list, term) => {
+      const docs = new Uint32Array(list.size);
+      const frequencies = withFrequencies ? new Uint32Array(list.size) : undefined;
+      let i = 0;
+      list.forEach((frequency, doc) => {
+        docs[i] = renumbered[doc];
+        if (frequencies) {
+          frequencies[i] = frequency;
+        }
+        i++;
+      });
+      postings.push({ term, docs, frequencies });
+    });
+    return postings;
+  }
+
+  private reset(): void {
     this.tagIndex.clear();
     this.wordIndex.clear();
     this.titleIndex.clear();
-    this.notesMap.clear();
+    this.docIds.clear();
+    this.documents = [];
+    this.noteTerms = [];
+    this.wordDictionary.clear();
+    this.titleDictionary.clear();
+    this.wordEndings.clear();
+    this.titleEndings.clear();
+    this.tagDictionary.clear();
+    this.tagSubstrings.clear();
+    this.totalContentLength = 0;
+    this.totalTitleLength = 0;
     this.searchCache.clear();
+    this.snapshotStale = true;
+  }
+
+  /**
+   * Ajoute une note aux index (ou la réindexe si elle est déjà indexée)
+   */
+  public indexNote(note: INote): void {
+    if (this.docIds.has(note.getId())) {
+      this.reindexNote(note);
+      return;
+    }
 
-    notes.forEach(note => {
-      const noteId = note.getId();
-      this.notesMap.set(noteId, note);
+    const terms = this.addNote(note);
+    this.invalidateCacheFor(this.termSetsOf(terms));
+  }
 
-      // Indexer les tags
-      note.getTags().forEach(tag => {
-        const normalizedTag = tag.toLowerCase();
-        if (!this.tagIndex.has(normalizedTag)) {
-          this.tagIndex.set(normalizedTag, new Set());
-        }
-        this.tagIndex.get(normalizedTag)!.add(noteId);
-      });
+  /**
+   * Met à jour les index d'une note modifiée.
+   * Seules les entrées des termes ajoutés ou retirés sont touchées.
+   */
+  public reindexNote(note: INote): void {
+    const doc = this.docIds.get(note.getId());
 
-      // Indexer les mots du contenu
-      const contentWords = this.extractWords(note.getContent());
-      contentWords.forEach(word => {
-        if (!this.wordIndex.has(word)) {
-          this.wordIndex.set(word, new Set());
-        }
-        this.wordIndex.get(word)!.add(noteId);
-      });
+    if (doc === undefined) {
+      this.indexNote(note);
+      return;
+    }
+
+    // Si l'objet a été remplacé, les résultats en cache référencent l'ancien
+    const previous = this.termsOf(doc);
+    const replaced = this.documents[doc] !== note;
+    const current = this.extractTerms(note);
+    const affected: TermSets = { words: new Set(), titleWords: new Set(), tags: new Set() };
+
+    this.updatePostings(
+      previous.words, current.words, affected.words,
+      replaced || previous.content !== current.content,
+      occurrences,
+      (word, frequency) => this.setPosting(this.wordIndex, word, doc, frequency),
+      word => this.removePosting(this.wordIndex, word, doc)
+    );
+    this.updatePostings(
+      previous.titleWords, current.titleWords, affected.titleWords,
+      replaced || previous.title !== current.title,
+      occurrences,
+      (word, frequency) => this.setPosting(this.titleIndex, word, doc, frequency),
+      word => this.removePosting(this.titleIndex, word, doc)
+    );
+    this.updatePostings(
+      previous.tags, current.tags, affected.tags,
+      replaced,
+      frequency => frequency,
+      tag => this.setPosting(this.tagIndex, tag, doc, 1),
+      tag => this.removePosting(this.tagIndex, tag, doc)
+    );
+
+    this.totalContentLength += current.contentLength - previous.contentLength;
+    this.totalTitleLength += current.titleLength - previous.titleLength;
+    this.documents[doc] = note;
+    this.noteTerms[doc] = current;
+    this.snapshotStale = true;
+    this.invalidateCacheFor(affected);
+  }
+
+  /**
+   * Retire une note des index
+   */
+  public removeNote(noteId: string): void {
+    const doc = this.docIds.get(noteId);
+    if (doc === undefined) {
+      return;
+    }
+
+    const previous = this.termsOf(doc);
+    previous.words.forEach((_, word) => this.removePosting(this.wordIndex, word, doc));
+    previous.titleWords.forEach((_, word) => this.removePosting(this.titleIndex, word, doc));
+    previous.tags.forEach((_, tag) => this.removePosting(this.tagIndex, tag, doc));
+
+    this.totalContentLength -= previous.contentLength;
+    this.totalTitleLength -= previous.titleLength;
+    // L'identifiant n'est pas réutilisé (les ajouts restent en fin de
+    // postings) : les trous sont compactés quand ils deviennent majoritaires
+    this.docIds.delete(noteId);
+    this.documents[doc] = undefined;
+    this.noteTerms[doc] = undefined;
+    this.snapshotStale = true;
+    this.invalidateCacheFor(this.termSetsOf(previous));
+    if (this.documents.length - this.docIds.size > Math.max(COMPACT_MIN_HOLES, this.docIds.size)) {
+      this.compactDocuments();
+    }
+  }
+
+  /**
+   * Renumérote les documents sans trou, dans le même ordre : les postings
+   * restent triés et sont réécrits sur place. Coût proportionnel à la
+   * taille des index, amorti sur les suppressions qui ont créé les trous.
+   */
+  private compactDocuments(): void {
+    const renumbered = new Uint32Array(this.documents.length);
+    const documents: INote[] = [];
+    const noteTerms: Array<IndexedTerms | PendingTerms | undefined> = [];
+    this.documents.forEach((note, doc) => {
+      if (!note) {
+        return;
+      }
+      renumbered[doc] = documents.length;
+      this.docIds.set(note.getId(), documents.length);
+      documents.push(note);
+      noteTerms.push(this.noteTerms[doc]);
+    });
+
+    [this.wordIndex, this.titleIndex, this.tagIndex].forEach(index => {
+      index.forEach(list => list.renumber(renumbered));
+    });
+    this.documents = documents;
+    this.noteTerms = noteTerms;
+  }
+
+  /**
+   * Indexe une note sans toucher au cache et retourne ses termes
+   */
+  private addNote(note: INote): IndexedTerms {
+    const doc = this.documents.length;
+    const terms = this.extractTerms(note);
+
+    this.docIds.set(note.getId(), doc);
+    this.documents.push(note);
+    this.noteTerms.push(terms);
+    this.totalContentLength += terms.contentLength;
+    this.totalTitleLength += terms.titleLength;
+
+    // Indexer les tags, les mots du contenu et les mots du titre
+    terms.tags.forEach((_, tag) => this.setPosting(this.tagIndex, tag, doc, 1));
+    terms.words.forEach((positions, word) => this.setPosting(this.wordIndex, word, doc, occurrences(positions)));
+    terms.titleWords.forEach((positions, word) => this.setPosting(this.titleIndex, word, doc, occurrences(positions)));
+    this.snapshotStale = true;
+
+    return terms;
+  }
+
+  /**
+   * Calcule les termes qu'une note contribue aux index
+   */
+  private extractTerms(note: INote): IndexedTerms {
+    return this.termsFrom(note.getTitle(), note.getContent(), note.getTags());
+  }
+
+  private termsFrom(title: string, content: string, tags: string[]): IndexedTerms {
+    const contentWords = this.extractWords(content);
+    const titleWords = this.extractWords(title);
+    return {
+      title,
+      content,
+      words: this.positionsOf(contentWords),
+      titleWords: this.positionsOf(titleWords),
+      tags: new Map(tags.map(tag => [tag.toLowerCase(), 1] as [string, number])),
+      contentLength: contentWords.length,
+      titleLength: titleWords.length
+    };
+  }
+
+  /**
+   * Positions de chaque terme dans le texte (leur nombre est la fréquence)
+   */
+  private positionsOf(words: string[]): Map<string, TermPositions> {
+    const positions = new Map<string, TermPositions>();
+    words.forEach((word, position) => {
+      const existing = positions.get(word);
+      if (existing === undefined) {
+        positions.set(word, position);
+      } else if (typeof existing === 'number') {
+        positions.set(word, [existing, position]);
+      } else {
+        existing.push(position);
+      }
+    });
+    return positions;
+  }
+
+  /**
+   * Index direct d'un document, calculé à la première utilisation s'il a
+   * été rechargé depuis l'instantané
+   */
+  private termsOf(doc: number): IndexedTerms {
+    const terms = this.noteTerms[doc]!;
+    if ('words' in terms) {
+      return terms;
+    }
+    const indexed = this.termsFrom(terms.title, terms.content, terms.tags);
+    this.noteTerms[doc] = indexed;
+    return indexed;
+  }
+
+  private termSetsOf(terms: IndexedTerms): TermSets {
+    return {
+      words: new Set(terms.words.keys()),
+      titleWords: new Set(terms.titleWords.keys()),
+      tags: new Set(terms.tags.keys())
+    };
+  }
+
+  private setPosting(index: Map<string, PostingList>, term: string, doc: number, frequency: number): void {
+    let postings = index.get(term);
+    if (!postings) {
+      // Les tags n'ont pas de fréquence
+      postings = new PostingList(index !== this.tagIndex);
+      index.set(term, postings);
+      this.dictionariesOf(index).forEach(dictionary => dictionary.insert(term));
+    }
+    postings.set(doc, frequency);
+  }
+
+  private removePosting(index: Map<string, PostingList>, term: string, doc: number): void {
+    const postings = index.get(term);
+    if (!postings) {
+      return;
+    }
+    postings.delete(doc);
+    if (postings.size === 0) {
+      index.delete(term);
+      this.dictionariesOf(index).forEach(dictionary => dictionary.remove(term));
+    }
+  }
+
+  /**
+   * Dictionnaires de termes tenus à jour avec un index
+   */
+  private dictionariesOf(index: Map<string, PostingList>): Trie[] {
+    if (index === this.wordIndex) {
+      return [this.wordDictionary, this.wordEndings];
+    }
+    if (index === this.titleIndex) {
+      return [this.titleDictionary, this.titleEndings];
+    }
+    return [this.tagDictionary, this.tagSubstrings];
+  }
+
+  /**
+   * Distance d'édition tolérée pour un terme (0 hors mode approché)
+   */
+  private fuzzyDistance(term: string, fuzzy: boolean | number | undefined): number {
+    if (fuzzy === undefined || fuzzy === false) {
+      return 0;
+    }
+    return fuzzy === true ? defaultFuzzyDistance(term) : Math.max(0, Math.floor(fuzzy));
+  }
+
+  /**
+   * Termes du dictionnaire proches du terme donné (lui-même hors mode approché)
+   */
+  private fuzzyMatches(term: string, dictionary: Trie, fuzzy: boolean | number | undefined): string[] {
+    const distance = this.fuzzyDistance(term, fuzzy);
+    return distance > 0 ? dictionary.fuzzy(term, distance) : [term];
+  }
+
+  /**
+   * Termes approchés d'une requête avec leur distance, pour le cache
+   */
+  private fuzzyDependencies(terms: string[], fuzzy: boolean | number | undefined): Array<[string, number]> | undefined {
+    if (fuzzy === undefined || fuzzy === false) {
+      return undefined;
+    }
+    return terms.map(term => [term, this.fuzzyDistance(term, fuzzy)] as [string, number]);
+  }
+
+  /**
+   * Tags contenant la chaîne donnée, via l'index des suffixes
+   */
+  private tagsContaining(text: string): string[] {
+    return this.tagSubstrings.withPrefix(text);
+  }
+
+  /**
+   * Autocomplétion des tags : tags commençant par le préfixe
+   */
+  public autocompleteTags(prefix: string, limit: number = 10): string[] {
+    return this.tagDictionary.withPrefix(prefix.toLowerCase(), limit);
+  }
 
-      // Indexer les mots du titre
-      const titleWords = this.extractWords(note.getTitle());
-      titleWords.forEach(word => {
-        if (!this.titleIndex.has(word)) {
-          this.titleIndex.set(word, new Set());
+  /**
+   * Autocomplétion des termes du titre et du contenu
+   */
+  public autocompleteTerms(prefix: string, limit: number = 10): string[] {
+    const normalized = prefix.toLowerCase();
+    return Array.from(new Set([
+      ...this.titleDictionary.withPrefix(normalized, limit),
+      ...this.wordDictionary.withPrefix(normalized, limit)
+    ])).sort().slice(0, limit);
+  }
+
+  /**
+   * Applique la différence entre les anciens et les nouveaux termes d'une note
+   * et collecte les termes touchés (tous si touchAll est vrai).
+   * Un simple changement de fréquence ne modifie que le classement.
+   */
+  private updatePostings<V>(
+    before: Map<string, V>,
+    after: Map<string, V>,
+    affected: Set<string>,
+    touchAll: boolean,
+    frequencyOf: (value: V) => number,
+    write: (term: string, frequency: number) => void,
+    remove: (term: string) => void
+  ): void {
+    before.forEach((_, term) => {
+      if (!after.has(term)) {
+        remove(term);
+        affected.add(term);
+      } else if (touchAll) {
+        affected.add(term);
+      }
+    });
+    after.forEach((value, term) => {
+      const previous = before.get(term);
+      const frequency = frequencyOf(value);
+      if (previous === undefined || frequencyOf(previous) !== frequency) {
+        write(term, frequency);
+        if (previous === undefined) {
+          affected.add(term);
         }
-        this.titleIndex.get(word)!.add(noteId);
-      });
+      }
     });
   }
 
@@ -89,65 +703,387 @@ export class SearchEngine implements ISearchEngine {
     return `${type}:${query}`;
   }
 
+  private withFuzzySuffix(type: string, options?: SearchOptions): string {
+    return options?.fuzzy ? `${type}~${options.fuzzy}` : type;
+  }
+
   /**
-   * Ajoute un résultat au cache
+   * Ajoute un résultat au cache avec les termes dont il dépend
    */
-  private addToCache(key: string, results: INote[]): void {
-    if (this.searchCache.size >= this.MAX_CACHE_SIZE) {
-      // Supprimer la première entrée (FIFO simple)
-      const firstKey = this.searchCache.keys().next().value;
-      if (firstKey !== undefined) {
-        this.searchCache.delete(firstKey);
-      }
+  private addToCache(key: string, results: INote[], dependencies: Omit<CacheEntry, 'results'>): void {
+    const entry: CacheEntry = { results, ...dependencies };
+    this.searchCache.set(key, entry, this.cacheDependenciesOf(entry));
+  }
+
+  /**
+   * Noms des dépendances d'une entrée dans le cache (voir invalidateCacheFor).
+   * Préfixes et sous-chaînes de tags y figurent tels quels ; les termes
+   * approchés, qui demanderaient une distance d'édition avec chaque terme
+   * modifié, sont remplacés par ANY_CHANGE.
+   */
+  private cacheDependenciesOf(entry: CacheEntry): string[] {
+    const dependencies = [
+      ...entry.words.map(word => `word:${word}`),
+      ...entry.titleWords.map(word => `title:${word}`),
+      ...entry.tags.map(tag => `tag:${tag}`),
+      ...(entry.prefixes ?? []).map(prefix => `prefix:${prefix}`),
+      ...(entry.tagSubstrings ?? []).map(substring => `tagSubstring:${substring}`)
+    ];
+    if (entry.anyChange || entry.fuzzyTerms !== undefined) {
+      dependencies.push(ANY_CHANGE);
     }
-    this.searchCache.set(key, results);
+    return dependencies;
+  }
+
+  /**
+   * Taille estimée d'une entrée du cache. Les notes elles-mêmes sont
+   * partagées avec les index : seules les références sont comptées.
+   */
+  private estimateCacheEntrySize(entry: CacheEntry, key: string): number {
+    const strings = [
+      key,
+      ...entry.words,
+      ...entry.titleWords,
+      ...entry.tags,
+      ...(entry.prefixes ?? []),
+      ...(entry.tagSubstrings ?? []),
+      ...(entry.fuzzyTerms ?? []).map(([term]) => term)
+    ];
+    return CACHE_ENTRY_OVERHEAD +
+      entry.results.length * 8 +
+      strings.reduce((total, text) => total + 16 + text.length * 2, 0);
   }
 
   /**
-   * Recherche générale (titre, contenu, tags)
+   * Invalide uniquement les entrées du cache qui dépendent des termes donnés,
+   * par l'index des dépendances du cache : le coût dépend du nombre et de
+   * la longueur des termes modifiés, pas du nombre d'entrées en cache. Un
+   * terme modifié invalide aussi les requêtes sur chacun de ses préfixes,
+   * un tag modifié celles sur chacune de ses sous-chaînes.
    */
-  public search(notes: INote[], query: string): INote[] {
-    const cacheKey = this.getCacheKey('general', query);
+  private invalidateCacheFor(terms: TermSets): void {
+    const dependencies = new Set<string>([ANY_CHANGE]);
+    terms.words.forEach(word => dependencies.add(`word:${word}`));
+    terms.titleWords.forEach(word => dependencies.add(`title:${word}`));
+    terms.tags.forEach(tag => dependencies.add(`tag:${tag}`));
+    [terms.words, terms.titleWords, terms.tags].forEach(changed => changed.forEach(term => {
+      for (let length = 0; length <= term.length; length++) {
+        dependencies.add(`prefix:${term.slice(0, length)}`);
+      }
+    }));
+    terms.tags.forEach(tag => {
+      for (let start = 0; start < tag.length; start++) {
+        for (let end = start + 1; end <= tag.length; end++) {
+          dependencies.add(`tagSubstring:${tag.slice(start, end)}`);
+        }
+      }
+    });
+    this.searchCache.invalidate(dependencies);
+  }
+
+  /**
+   * Recherche générale (titre, contenu, tags), dans le langage de requête
+   * de QueryParser : termes juxtaposés en OU, AND/OR/NOT, phrases entre
+   * guillemets, champs `tag:`/`title:`/`content:` et préfixes `terme*`
+   */
+  public search(notes: INote[], query: string, options?: SearchOptions): INote[] {
+    const cacheKey = this.getCacheKey(this.withFuzzySuffix('general', options), query);
     
-    if (this.searchCache.has(cacheKey)) {
-      return this.searchCache.get(cacheKey)!;
+    const cached = this.searchCache.get(cacheKey);
+    if (cached) {
+      return cached.results;
     }
 
     // Si les index ne sont pas construits, les construire
-    if (this.notesMap.size === 0 && notes.length > 0) {
+    if (this.docIds.size === 0 && notes.length > 0) {
       this.buildIndexes(notes);
     }
 
-    const lowerQuery = query.toLowerCase();
-    const queryWords = this.extractWords(query);
-    const matchedNoteIds = new Set<string>();
+    const context = this.createQueryContext(options?.fuzzy);
+    const parsed = this.queryParser.parse(query);
+    const results = this.notesOf(parsed ? this.evaluate(parsed, context) : []);
+
+    this.addToCache(cacheKey, results, this.dependenciesOf(context));
+    return results;
+  }
+
+  /**
+   * Retourne les k meilleurs résultats de la recherche générale, classés par
+   * score BM25 (titre et tags pondérés). Les scores des notes retenues par
+   * la requête sont accumulés en un passage sur les postings de ses termes
+   * (hors négations), puis un tas borné à k éléments sélectionne les
+   * meilleurs : O(postings + n log k), sans trier tous les résultats.
+   */
+  public searchTopK(query: string, k: number = 20): ScoredNote[] {
+    const parsed = this.queryParser.parse(query);
+    if (k <= 0 || !parsed) {
+      return [];
+    }
 
-    // Recherche par mots-clés dans le contenu et le titre
-    queryWords.forEach(word => {
-      // Chercher dans le contenu
-      if (this.wordIndex.has(word)) {
-        this.wordIndex.get(word)!.forEach(id => matchedNoteIds.add(id));
+    const context = this.createQueryContext();
+    const scores = new Map<number, number>();
+    this.evaluate(parsed, context).forEach(doc => scores.set(doc, 0));
+
+    const documentCount = this.docIds.size;
+    const averageContentLength = documentCount > 0 ? this.totalContentLength / documentCount : 0;
+    const averageTitleLength = documentCount > 0 ? this.totalTitleLength / documentCount : 0;
+
+    context.scored.words.forEach(word => {
+      this.accumulateScores(scores, this.wordIndex.get(word), 1, averageContentLength,
+        doc => this.noteTerms[doc]!.contentLength);
+    });
+    context.scored.titleWords.forEach(word => {
+      this.accumulateScores(scores, this.titleIndex.get(word), this.TITLE_BOOST, averageTitleLength,
+        doc => this.noteTerms[doc]!.titleLength);
+    });
+    context.scored.tags.forEach(tag => {
+      const postings = this.tagIndex.get(tag);
+      if (!postings) {
+        return;
       }
-      // Chercher dans le titre
-      if (this.titleIndex.has(word)) {
-        this.titleIndex.get(word)!.forEach(id => matchedNoteIds.add(id));
+      const weight = this.TAG_BOOST * this.idf(postings.size);
+      postings.forEach((_, doc) => {
+        const score = scores.get(doc);
+        if (score !== undefined) {
+          scores.set(doc, score + weight);
+        }
+      });
+    });
+
+    // Le meilleur score l'emporte, à égalité l'ID le plus petit
+    const heap = new BoundedHeap<ScoredNote>(k, (a, b) =>
+      a.score !== b.score
+        ? a.score - b.score
+        : (a.note.getId() < b.note.getId() ? 1 : -1)
+    );
+    scores.forEach((score, doc) => {
+      const note = this.documents[doc];
+      if (note) {
+        heap.push({ note, score });
       }
     });
 
-    // Chercher dans les tags
-    this.tagIndex.forEach((noteIds, tag) => {
-      if (tag.includes(lowerQuery)) {
-        noteIds.forEach(id => matchedNoteIds.add(id));
+    return heap.toSortedArray();
+  }
+
+  private createQueryContext(fuzzy?: boolean | number): QueryContext {
+    return {
+      fuzzy,
+      negated: false,
+      dependencies: {
+        words: new Set(),
+        titleWords: new Set(),
+        tags: new Set(),
+        tagSubstrings: new Set(),
+        prefixes: new Set(),
+        fuzzyTerms: [],
+        anyChange: false
+      },
+      scored: { words: new Set(), titleWords: new Set(), tags: new Set() }
+    };
+  }
+
+  private dependenciesOf(context: QueryContext): Omit<CacheEntry, 'results'> {
+    const dependencies = context.dependencies;
+    return {
+      words: Array.from(dependencies.words),
+      titleWords: Array.from(dependencies.titleWords),
+      tags: Array.from(dependencies.tags),
+      tagSubstrings: dependencies.tagSubstrings.size > 0 ? Array.from(dependencies.tagSubstrings) : undefined,
+      prefixes: dependencies.prefixes.size > 0 ? Array.from(dependencies.prefixes) : undefined,
+      fuzzyTerms: dependencies.fuzzyTerms.length > 0 ? dependencies.fuzzyTerms : undefined,
+      anyChange: dependencies.anyChange || undefined
+    };
+  }
+
+  /**
+   * Documents (triés) correspondant à un nœud de la requête
+   */
+  private evaluate(node: QueryNode, context: QueryContext): Uint32Array {
+    switch (node.type) {
+      case 'term':
+        return this.evaluateTerm(node.value, node.prefix, node.field, context);
+      case 'phrase':
+        return this.evaluatePhrase(node.words, node.field, context);
+      case 'or':
+        return unionSorted(node.children.map(child => this.evaluate(child, context)));
+      case 'and': {
+        // a AND NOT b : différence plutôt que complément de b
+        const included = node.children
+          .filter(child => child.type !== 'not')
+          .map(child => this.evaluate(child, context));
+        const excluded = node.children
+          .filter((child): child is NotNode => child.type === 'not')
+          .map(child => this.evaluate(child.child, { ...context, negated: !context.negated }));
+
+        const docs = included.length > 0 ? intersectSorted(included) : this.allDocs(context);
+        return excluded.length > 0 ? subtractSorted(docs, unionSorted(excluded)) : docs;
       }
+      case 'not':
+        return subtractSorted(
+          this.allDocs(context),
+          this.evaluate(node.child, { ...context, negated: !context.negated })
+        );
+    }
+  }
+
+  private evaluateTerm(
+    value: string,
+    prefix: boolean,
+    field: QueryField | undefined,
+    context: QueryContext
+  ): Uint32Array {
+    const dependencies = context.dependencies;
+    const scored = context.negated ? undefined : context.scored;
+
+    if (prefix) {
+      dependencies.prefixes.add(value);
+    } else if (context.fuzzy) {
+      dependencies.fuzzyTerms.push([value, this.fuzzyDistance(value, context.fuzzy)]);
+    }
+
+    if (field === 'tag') {
+      const tags = prefix
+        ? this.tagDictionary.withPrefix(value)
+        : this.fuzzyMatches(value, this.tagDictionary, context.fuzzy);
+      return PostingList.union(this.matchTerms(this.tagIndex, tags, dependencies.tags, scored?.tags));
+    }
+
+    const lists: PostingList[] = [];
+    if (field === undefined || field === 'content') {
+      const words = this.expandTerm(value, prefix, this.wordDictionary, context.fuzzy);
+      lists.push(...this.matchTerms(this.wordIndex, words, dependencies.words, scored?.words));
+    }
+    if (field === undefined || field === 'title') {
+      const words = this.expandTerm(value, prefix, this.titleDictionary, context.fuzzy);
+      lists.push(...this.matchTerms(this.titleIndex, words, dependencies.titleWords, scored?.titleWords));
+    }
+    if (field === undefined) {
+      // Tags contenant le terme, ou proches de celui-ci
+      const tags = new Set(this.tagsContaining(value));
+      if (context.fuzzy && !prefix) {
+        this.fuzzyMatches(value, this.tagDictionary, context.fuzzy).forEach(tag => tags.add(tag));
+      }
+      dependencies.tagSubstrings.add(value);
+      lists.push(...this.matchTerms(this.tagIndex, Array.from(tags), undefined, scored?.tags));
+    }
+
+    return PostingList.union(lists);
+  }
+
+  /**
+   * Documents contenant les mots consécutifs, dans le contenu ou le titre
+   */
+  private evaluatePhrase(words: string[], field: QueryField | undefined, context: QueryContext): Uint32Array {
+    const dependencies = context.dependencies;
+    const scored = context.negated ? undefined : context.scored;
+    const matches: Uint32Array[] = [];
+
+    if (field === undefined || field === 'content') {
+      this.matchTerms(this.wordIndex, words, dependencies.words, scored?.words);
+      matches.push(this.phraseDocs(this.wordIndex, words, terms => terms.words));
+    }
+    if (field === undefined || field === 'title') {
+      this.matchTerms(this.titleIndex, words, dependencies.titleWords, scored?.titleWords);
+      matches.push(this.phraseDocs(this.titleIndex, words, terms => terms.titleWords));
+    }
+
+    return unionSorted(matches);
+  }
+
+  /**
+   * Intersection des postings des mots, puis vérification des positions
+   * dans l'index direct des seules notes candidates
+   */
+  private phraseDocs(
+    index: Map<string, PostingList>,
+    words: string[],
+    positionsIn: (terms: IndexedTerms) => Map<string, TermPositions>
+  ): Uint32Array {
+    const lists = this.postingsOf(index, words);
+    if (lists.length < new Set(words).size) {
+      return new Uint32Array(0);
+    }
+    if (words.length === 1) {
+      return lists[0].toArray();
+    }
+
+    return PostingList.intersect(lists).filter(doc => {
+      const positions = positionsIn(this.termsOf(doc));
+      const starts = positions.get(words[0])!;
+      return (typeof starts === 'number' ? [starts] : starts).some(start =>
+        words.every((word, offset) => hasPosition(positions.get(word)!, start + offset))
+      );
     });
+  }
 
-    // Convertir les IDs en notes
-    const results = Array.from(matchedNoteIds)
-      .map(id => this.notesMap.get(id))
-      .filter((note): note is INote => note !== undefined);
+  /**
+   * Postings des termes, enregistrés comme dépendances et termes pondérés
+   */
+  private matchTerms(
+    index: Map<string, PostingList>,
+    terms: string[],
+    dependencies?: Set<string>,
+    scored?: Set<string>
+  ): PostingList[] {
+    terms.forEach(term => {
+      dependencies?.add(term);
+      scored?.add(term);
+    });
+    return this.postingsOf(index, terms);
+  }
 
-    this.addToCache(cacheKey, results);
-    return results;
+  /**
+   * Termes du dictionnaire correspondant à un terme de requête
+   */
+  private expandTerm(value: string, prefix: boolean, dictionary: Trie, fuzzy?: boolean | number): string[] {
+    return prefix ? dictionary.withPrefix(value) : this.fuzzyMatches(value, dictionary, fuzzy);
+  }
+
+  /**
+   * Toutes les notes indexées (négation sans terme positif) : le résultat
+   * dépend alors de toute modification
+   */
+  private allDocs(context: QueryContext): Uint32Array {
+    context.dependencies.anyChange = true;
+    return Uint32Array.from(this.docIds.values()).sort();
+  }
+
+  /**
+   * Ajoute la contribution BM25 d'un terme aux scores des notes retenues
+   */
+  private accumulateScores(
+    scores: Map<number, number>,
+    postings: PostingList | undefined,
+    boost: number,
+    averageLength: number,
+    lengthOf: (doc: number) => number
+  ): void {
+    if (!postings) {
+      return;
+    }
+
+    const weight = boost * this.idf(postings.size);
+    const k1 = this.BM25_K1;
+    const b = this.BM25_B;
+
+    postings.forEach((frequency, doc) => {
+      const score = scores.get(doc);
+      if (score === undefined) {
+        return;
+      }
+      const lengthRatio = averageLength > 0 ? lengthOf(doc) / averageLength : 1;
+      const saturation = (frequency * (k1 + 1)) / (frequency + k1 * (1 - b + b * lengthRatio));
+      scores.set(doc, score + weight * saturation);
+    });
+  }
+
+  /**
+   * IDF de BM25 (toujours positive)
+   */
+  private idf(documentFrequency: number): number {
+    const documentCount = this.docIds.size;
+    return Math.log(1 + (documentCount - documentFrequency + 0.5) / (documentFrequency + 0.5));
   }
 
   /**
@@ -156,96 +1092,171 @@ export class SearchEngine implements ISearchEngine {
   public searchByTag(notes: INote[], tag: string): INote[] {
     const cacheKey = this.getCacheKey('tag', tag);
     
-    if (this.searchCache.has(cacheKey)) {
-      return this.searchCache.get(cacheKey)!;
+    const cached = this.searchCache.get(cacheKey);
+    if (cached) {
+      return cached.results;
     }
 
     // Si les index ne sont pas construits, les construire
-    if (this.notesMap.size === 0 && notes.length > 0) {
+    if (this.docIds.size === 0 && notes.length > 0) {
       this.buildIndexes(notes);
     }
 
     const normalizedTag = tag.toLowerCase();
-    const noteIds = this.tagIndex.get(normalizedTag) || new Set();
-    
-    const results = Array.from(noteIds)
-      .map(id => this.notesMap.get(id))
-      .filter((note): note is INote => note !== undefined);
+    const results = this.notesOf(this.tagIndex.get(normalizedTag)?.toArray() ?? []);
 
-    this.addToCache(cacheKey, results);
+    this.addToCache(cacheKey, results, { words: [], titleWords: [], tags: [normalizedTag] });
     return results;
   }
 
   /**
-   * Recherche par titre (optimisée avec l'index)
+   * Recherche par titre (optimisée avec l'index) : notes dont le titre
+   * contient la requête, sans tenir compte de la casse (voir substringDocs)
    */
-  public searchByTitle(notes: INote[], title: string): INote[] {
-    const cacheKey = this.getCacheKey('title', title);
+  public searchByTitle(notes: INote[], title: string, options?: SearchOptions): INote[] {
+    const cacheKey = this.getCacheKey(this.withFuzzySuffix('title', options), title);
     
-    if (this.searchCache.has(cacheKey)) {
-      return this.searchCache.get(cacheKey)!;
+    const cached = this.searchCache.get(cacheKey);
+    if (cached) {
+      return cached.results;
     }
 
     // Si les index ne sont pas construits, les construire
-    if (this.notesMap.size === 0 && notes.length > 0) {
+    if (this.docIds.size === 0 && notes.length > 0) {
       this.buildIndexes(notes);
     }
 
     const titleWords = this.extractWords(title);
-    const matchedNoteIds = new Set<string>();
 
-    titleWords.forEach(word => {
-      if (this.titleIndex.has(word)) {
-        this.titleIndex.get(word)!.forEach(id => matchedNoteIds.add(id));
-      }
-    });
+    if (options?.fuzzy) {
+      return this.searchByTitleFuzzy(cacheKey, titleWords, options.fuzzy);
+    }
 
-    // Filtrer pour ne garder que les notes dont le titre contient vraiment la requête
-    const lowerTitle = title.toLowerCase();
-    const results = Array.from(matchedNoteIds)
-      .map(id => this.notesMap.get(id))
-      .filter((note): note is INote => 
-        note !== undefined && note.getTitle().toLowerCase().includes(lowerTitle)
-      );
+    const results = this.notesOf(this.substringDocs(
+      title, this.titleIndex, this.titleDictionary, this.titleEndings, terms => terms.titleWords
+    ));
+
+    this.addToCache(cacheKey, results, { words: [], titleWords, tags: [] });
+    return results;
+  }
+
+  /**
+   * Recherche approchée par titre : chaque terme de la requête doit être
+   * proche d'au moins un terme du titre de la note
+   */
+  private searchByTitleFuzzy(cacheKey: string, titleWords: string[], fuzzy: boolean | number): INote[] {
+    const expansions = titleWords.map(word => this.fuzzyMatches(word, this.titleDictionary, fuzzy));
+    const candidates = PostingList.union(this.postingsOf(this.titleIndex, expansions.flat()));
+
+    const results = this.notesOf(candidates.filter(doc => {
+      const indexed = this.termsOf(doc).titleWords;
+      return expansions.every(terms => terms.some(term => indexed.has(term)));
+    }));
 
-    this.addToCache(cacheKey, results);
+    this.addToCache(cacheKey, results, {
+      words: [],
+      titleWords: Array.from(new Set(expansions.flat())),
+      tags: [],
+      fuzzyTerms: this.fuzzyDependencies(titleWords, fuzzy)
+    });
     return results;
   }
 
   /**
-   * Recherche par contenu (optimisée avec l'index)
+   * Recherche par contenu (optimisée avec l'index), même correspondance
+   * que searchByTitle
    */
   public searchByContent(notes: INote[], content: string): INote[] {
     const cacheKey = this.getCacheKey('content', content);
     
-    if (this.searchCache.has(cacheKey)) {
-      return this.searchCache.get(cacheKey)!;
+    const cached = this.searchCache.get(cacheKey);
+    if (cached) {
+      return cached.results;
     }
 
     // Si les index ne sont pas construits, les construire
-    if (this.notesMap.size === 0 && notes.length > 0) {
+    if (this.docIds.size === 0 && notes.length > 0) {
       this.buildIndexes(notes);
     }
 
     const contentWords = this.extractWords(content);
-    const matchedNoteIds = new Set<string>();
+    const results = this.notesOf(this.substringDocs(
+      content, this.wordIndex, this.wordDictionary, this.wordEndings, terms => terms.words
+    ));
 
-    contentWords.forEach(word => {
-      if (this.wordIndex.has(word)) {
-        this.wordIndex.get(word)!.forEach(id => matchedNoteIds.add(id));
-      }
-    });
+    this.addToCache(cacheKey, results, { words: contentWords, titleWords: [], tags: [] });
+    return results;
+  }
 
-    // Filtrer pour ne garder que les notes dont le contenu contient vraiment la requête
-    const lowerContent = content.toLowerCase();
-    const results = Array.from(matchedNoteIds)
-      .map(id => this.notesMap.get(id))
-      .filter((note): note is INote => 
-        note !== undefined && note.getContent().toLowerCase().includes(lowerContent)
-      );
+  /**
+   * Documents dont le texte contient la requête, retrouvés par les index
+   * sans relire le texte des notes. La requête est découpée en mots comme
+   * le texte : ses mots intérieurs sont des termes entiers et consécutifs ;
+   * le premier peut être la fin d'un terme (arbre des termes retournés) et
+   * le dernier le début d'un terme (arbre préfixe), sauf si la requête
+   * commence ou finit par un séparateur. Les positions sont vérifiées dans
+   * l'index direct des seules notes candidates. Comme pour les phrases, la
+   * ponctuation et les espaces entre les mots ne sont pas comparés.
+   * Au moins un mot de la requête doit être un terme entier : `lai` ne
+   * trouve pas `lait`, mais `du lai` le trouve dans `du lait`. Toute note
+   * correspondante contient donc un mot de la requête : ces mots suffisent
+   * comme dépendances du cache.
+   */
+  private substringDocs(
+    query: string,
+    index: Map<string, PostingList>,
+    dictionary: Trie,
+    endings: Trie,
+    positionsIn: (terms: IndexedTerms) => Map<string, TermPositions>
+  ): Uint32Array {
+    const words = this.extractWords(query);
+    if (words.length === 0) {
+      return new Uint32Array(0);
+    }
+    if (words.length === 1) {
+      return PostingList.union(this.postingsOf(index, words));
+    }
 
-    this.addToCache(cacheKey, results);
-    return results;
+    const normalized = query.toLowerCase();
+    const first = words[0];
+    const last = words[words.length - 1];
+    const inner = words.slice(1, -1);
+
+    const firstTerms = /^\w/.test(normalized) ? endings.withSuffix(first) : [first];
+    const lastTerms = /\w$/.test(normalized) ? dictionary.withPrefix(last) : [last];
+
+    const firstLists = this.postingsOf(index, firstTerms);
+    const lastLists = this.postingsOf(index, lastTerms);
+    const innerLists = this.postingsOf(index, inner);
+    if (firstLists.length === 0 || lastLists.length === 0 || innerLists.length < new Set(inner).size) {
+      return new Uint32Array(0);
+    }
+
+    const candidates = intersectSorted([
+      PostingList.union(firstLists),
+      PostingList.union(lastLists),
+      ...innerLists.map(list => list.toArray())
+    ]);
+    const lastOffset = words.length - 1;
+
+    return candidates.filter(doc => {
+      const positions = positionsIn(this.termsOf(doc));
+      return firstTerms.some(firstTerm => {
+        const starts = positions.get(firstTerm);
+        if (starts === undefined) {
+          return false;
+        }
+        return (typeof starts === 'number' ? [starts] : starts).some(start =>
+          inner.every((word, offset) => hasPosition(positions.get(word)!, start + 1 + offset)) &&
+          lastTerms.some(lastTerm => {
+            const ends = positions.get(lastTerm);
+            return ends !== undefined && hasPosition(ends, start + lastOffset) &&
+              // Sans mot intérieur, l'un des deux mots doit être entier
+              (inner.length > 0 || firstTerm === first || lastTerm === last);
+          })
+        );
+      });
+    });
   }
 
   /**
@@ -257,49 +1268,72 @@ export class SearchEngine implements ISearchEngine {
       tags.join(',')
     );
     
-    if (this.searchCache.has(cacheKey)) {
-      return this.searchCache.get(cacheKey)!;
+    const cached = this.searchCache.get(cacheKey);
+    if (cached) {
+      return cached.results;
     }
 
     // Si les index ne sont pas construits, les construire
-    if (this.notesMap.size === 0 && notes.length > 0) {
+    if (this.docIds.size === 0 && notes.length > 0) {
       this.buildIndexes(notes);
     }
 
     const normalizedTags = tags.map(t => t.toLowerCase());
-    const tagSets = normalizedTags
-      .map(tag => this.tagIndex.get(tag) || new Set<string>());
+    const postings = this.postingsOf(this.tagIndex, normalizedTags);
 
-    let matchedNoteIds: Set<string>;
+    let matchedDocs: Uint32Array;
 
     if (matchAll) {
-      // Intersection de tous les sets
-      if (tagSets.length === 0) {
-        matchedNoteIds = new Set();
-      } else {
-        matchedNoteIds = new Set(tagSets[0]);
-        for (let i = 1; i < tagSets.length; i++) {
-          matchedNoteIds = new Set(
-            Array.from(matchedNoteIds).filter(id => tagSets[i].has(id))
-          );
-        }
-      }
+      // Intersection galopante ; un tag absent rend l'intersection vide
+      matchedDocs = postings.length === new Set(normalizedTags).size
+        ? PostingList.intersect(postings)
+        : new Uint32Array(0);
     } else {
-      // Union de tous les sets
-      matchedNoteIds = new Set();
-      tagSets.forEach(set => {
-        set.forEach(id => matchedNoteIds.add(id));
-      });
+      // Union de toutes les listes
+      matchedDocs = PostingList.union(postings);
     }
 
-    const results = Array.from(matchedNoteIds)
-      .map(id => this.notesMap.get(id))
-      .filter((note): note is INote => note !== undefined);
+    const results = this.notesOf(matchedDocs);
 
-    this.addToCache(cacheKey, results);
+    this.addToCache(cacheKey, results, { words: [], titleWords: [], tags: normalizedTags });
     return results;
   }
 
+  /**
+   * Listes de postings des termes présents dans l'index
+   */
+  private postingsOf(index: Map<string, PostingList>, terms: string[]): PostingList[] {
+    const postings: PostingList[] = [];
+    new Set(terms).forEach(term => {
+      const list = index.get(term);
+      if (list) {
+        postings.push(list);
+      }
+    });
+    return postings;
+  }
+
+  /**
+   * Notes correspondant à des documents
+   */
+  private notesOf(docs: ArrayLike<number>): INote[] {
+    const notes: INote[] = [];
+    for (let i = 0; i < docs.length; i++) {
+      const note = this.documents[docs[i]];
+      if (note) {
+        notes.push(note);
+      }
+    }
+    return notes;
+  }
+
+  /**
+   * Compteurs du cache de résultats (succès, échecs, évictions)
+   */
+  public getCacheStats(): CacheStats {
+    return this.searchCache.getStats();
+  }
+
   /**
    * Invalide le cache (à appeler après modification des notes)
    */
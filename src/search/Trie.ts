@@ -0,0 +1,225 @@
+interface TrieNode {
+  children: Map<string, TrieNode>;
+  terms?: Set<string>; // termes dont une clé se termine sur ce nœud
+}
+
+function reverse(text: string): string {
+  return Array.from(text).reverse().join('');
+}
+
+/**
+ * Clés sous lesquelles un terme est inséré : le terme lui-même, chacun de
+ * ses suffixes, ou le terme retourné
+ */
+export type TrieKeys = 'term' | 'suffixes' | 'reversed';
+
+/**
+ * Dictionnaire de termes en arbre préfixe.
+ *
+ * Une recherche par préfixe coûte O(longueur du préfixe + correspondances).
+ * En mode suffixes, chaque suffixe d'un terme est inséré : la recherche par
+ * préfixe retourne alors les termes qui *contiennent* la chaîne donnée
+ * (utile pour les tags, courts et peu nombreux). En mode retourné, chaque
+ * terme est inséré à l'envers : withSuffix retourne les termes qui
+ * *finissent* par la chaîne donnée, pour une seule clé par terme.
+ */
+export class Trie {
+  private root: TrieNode;
+  private keys: TrieKeys;
+  private termCount: number;
+
+  constructor(keys: TrieKeys = 'term') {
+    this.root = { children: new Map() };
+    this.keys = keys;
+    this.termCount = 0;
+  }
+
+  public insert(term: string): void {
+    if (this.has(term)) {
+      return;
+    }
+    this.keysOf(term).forEach(key => {
+      let node = this.root;
+      for (const char of key) {
+        let child = node.children.get(char);
+        if (!child) {
+          child = { children: new Map() };
+          node.children.set(char, child);
+        }
+        node = child;
+      }
+      if (!node.terms) {
+        node.terms = new Set();
+      }
+      node.terms.add(term);
+    });
+    this.termCount++;
+  }
+
+  public remove(term: string): void {
+    if (!this.has(term)) {
+      return;
+    }
+    this.keysOf(term).forEach(key => this.removeKey(this.root, Array.from(key), 0, term));
+    this.termCount--;
+  }
+
+  public has(term: string): boolean {
+    const node = this.find(this.keysOf(term)[0]);
+    return node !== undefined && node.terms !== undefined && node.terms.has(term);
+  }
+
+  /**
+   * Termes commençant par le préfixe (ou le contenant, en mode suffixes),
+   * triés par ordre lexicographique.
+   */
+  public withPrefix(prefix: string, limit: number = Infinity): string[] {
+    const node = this.find(prefix);
+    if (!node || limit <= 0) {
+      return [];
+    }
+
+    const found = new Set<string>();
+    this.collect(node, found, limit);
+    return Array.from(found).sort();
+  }
+
+  /**
+   * Termes finissant par le suffixe (mode retourné), triés par ordre
+   * lexicographique.
+   */
+  public withSuffix(suffix: string, limit: number = Infinity): string[] {
+    return this.withPrefix(reverse(suffix), limit);
+  }
+
+  /**
+   * Termes à une distance d'édition d'au plus maxDistance du terme donné.
+   *
+   * Parcours de l'arbre en calculant une ligne de la matrice de Levenshtein
+   * par nœud (équivalent d'un automate de Levenshtein) : une branche est
+   * abandonnée dès que toute sa ligne dépasse la distance maximale, sans
+   * comparer le terme à chaque entrée du dictionnaire.
+   * Réservé aux dictionnaires dont les clés sont les termes eux-mêmes.
+   */
+  public fuzzy(term: string, maxDistance: number): string[] {
+    const target = Array.from(term);
+    const firstRow = target.map((_, i) => i).concat(target.length);
+    const found: string[] = [];
+
+    if (maxDistance >= target.length && this.root.terms) {
+      this.root.terms.forEach(match => found.push(match));
+    }
+    this.root.children.forEach((child, char) =>
+      this.fuzzyWalk(child, char, target, firstRow, maxDistance, found)
+    );
+    return found.sort();
+  }
+
+  public clear(): void {
+    this.root = { children: new Map() };
+    this.termCount = 0;
+  }
+
+  public size(): number {
+    return this.termCount;
+  }
+
+  private keysOf(term: string): string[] {
+    switch (this.keys) {
+      case 'term':
+        return [term];
+      case 'reversed':
+        return [reverse(term)];
+      case 'suffixes': {
+        const chars = Array.from(term);
+        return chars.map((_, start) => chars.slice(start).join(''));
+      }
+    }
+  }
+
+  private find(key: string): TrieNode | undefined {
+    let node: TrieNode | undefined = this.root;
+    for (const char of key) {
+      node = node.children.get(char);
+      if (!node) {
+        return undefined;
+      }
+    }
+    return node;
+  }
+
+  /**
+   * Parcours en profondeur, arrêté dès que la limite est atteinte
+   */
+  private collect(node: TrieNode, found: Set<string>, limit: number): boolean {
+    if (node.terms) {
+      for (const term of node.terms) {
+        found.add(term);
+        if (found.size >= limit) {
+          return true;
+        }
+      }
+    }
+
+    const chars = Array.from(node.children.keys()).sort();
+    for (const char of chars) {
+      if (this.collect(node.children.get(char)!, found, limit)) {
+        return true;
+      }
+    }
+    return false;
+  }
+
+  private fuzzyWalk(
+    node: TrieNode,
+    char: string,
+    target: string[],
+    previousRow: number[],
+    maxDistance: number,
+    found: string[]
+  ): void {
+    const row = [previousRow[0] + 1];
+    let rowMin = row[0];
+
+    for (let i = 1; i <= target.length; i++) {
+      const value = Math.min(
+        row[i - 1] + 1, // insertion
+        previousRow[i] + 1, // suppression
+        previousRow[i - 1] + (target[i - 1] === char ? 0 : 1) // substitution
+      );
+      row.push(value);
+      if (value < rowMin) {
+        rowMin = value;
+      }
+    }
+
+    if (row[target.length] <= maxDistance && node.terms) {
+      node.terms.forEach(match => found.push(match));
+    }
+    if (rowMin <= maxDistance) {
+      node.children.forEach((child, next) =>
+        this.fuzzyWalk(child, next, target, row, maxDistance, found)
+      );
+    }
+  }
+
+  /**
+   * Retire le terme du nœud de la clé et élague les nœuds devenus vides.
+   * Retourne true si le nœud courant peut être supprimé.
+   */
+  private removeKey(node: TrieNode, chars: string[], depth: number, term: string): boolean {
+    if (depth === chars.length) {
+      node.terms?.delete(term);
+      if (node.terms && node.terms.size === 0) {
+        node.terms = undefined;
+      }
+    } else {
+      const char = chars[depth];
+      const child = node.children.get(char);
+      if (child && this.removeKey(child, chars, depth + 1, term)) {
+        node.children.delete(char);
+      }
+    }
+    return node.children.size === 0 && node.terms === undefined;
+  }
+}
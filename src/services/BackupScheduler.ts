@@ -0,0 +1,196 @@
+import { IBackupMetadata, IBackupService } from '../interfaces/IBackupService';
+import { BackupService } from './BackupService';
+import { WorkerBackupRunner } from './BackupWorker';
+
+/**
+ * Exécute un backup complet : création puis suppression des plus anciens
+ */
+export interface BackupRunner {
+  run(maxBackups: number): Promise<IBackupMetadata>;
+  close(): Promise<void>;
+}
+
+/**
+ * Backup dans le thread principal : lecture, compression et écriture des
+ * blocs sont asynchrones, mais le découpage et les empreintes des blocs
+ * occupent la boucle d'événements à chaque morceau lu
+ */
+export class InlineBackupRunner implements BackupRunner {
+  private backupService: IBackupService;
+
+  constructor(backupService: IBackupService) {
+    this.backupService = backupService;
+  }
+
+  public async run(maxBackups: number): Promise<IBackupMetadata> {
+    const metadata = await this.backupService.createBackup();
+    this.backupService.cleanOldBackups(maxBackups);
+    return metadata;
+  }
+
+  public async close(): Promise<void> {
+    // Rien à libérer
+  }
+}
+
+/**
+ * Backup dans un thread séparé si le thread est disponible (code compilé,
+ * ou sources avec ts-node), sinon dans le thread principal
+ */
+export function createBackupRunner(backupService: BackupService): BackupRunner {
+  return WorkerBackupRunner.isAvailable()
+    ? new WorkerBackupRunner(backupService)
+    : new InlineBackupRunner(backupService);
+}
+
+export interface BackupSchedulerOptions {
+  everyModifications?: number; // backup après ce nombre de modifications
+  intervalMs?: number; // backup périodique, s'il y a eu des modifications depuis le précédent
+  maxBackups?: number; // backups conservés (5 par défaut)
+  beforeBackup?: () => Promise<void> | void; // ex. écrire les sauvegardes différées
+}
+
+export interface BackupSchedulerStatistics {
+  completed: number;
+  failed: number;
+  skipped: number; // déclenchements ignorés : un backup était déjà en cours
+}
+
+/**
+ * Déclenche les backups automatiques, après un nombre de modifications
+ * et/ou à intervalle régulier, et les exécute via un BackupRunner (thread
+ * séparé : les écritures de notes ne l'attendent jamais).
+ *
+ * Un seul backup à la fois : un déclenchement pendant un backup en cours
+ * est ignoré plutôt que mis en file. Les modifications restent comptées et
+ * le backup suivant les inclut ; si elles atteignent le seuil pendant le
+ * backup, un seul backup est relancé à sa fin, quel que soit le nombre de
+ * déclenchements ignorés.
+ */
+export class BackupScheduler {
+  private runner: BackupRunner;
+  private options: BackupSchedulerOptions;
+  private modifications: number; // depuis le début du dernier backup
+  private running?: Promise<void>;
+  private timer?: NodeJS.Timeout;
+  private stopped: boolean;
+  private statistics: BackupSchedulerStatistics;
+
+  constructor(runner: BackupRunner, options: BackupSchedulerOptions) {
+    const { everyModifications, intervalMs, maxBackups } = options;
+    if (everyModifications !== undefined && !(everyModifications > 0)) {
+      throw new Error(`Nombre de modifications invalide: ${everyModifications}`);
+    }
+    if (intervalMs !== undefined && !(intervalMs > 0)) {
+      throw new Error(`Intervalle de backup invalide: ${intervalMs}`);
+    }
+    if (maxBackups !== undefined && !(maxBackups > 0)) {
+      throw new Error(`Nombre de backups conservés invalide: ${maxBackups}`);
+    }
+
+    this.runner = runner;
+    this.options = options;
+    this.modifications = 0;
+    this.stopped = false;
+    this.statistics = { completed: 0, failed: 0, skipped: 0 };
+    if (intervalMs !== undefined) {
+      this.timer = setInterval(() => {
+        if (this.modifications > 0) {
+          this.trigger();
+        }
+      }, intervalMs);
+      // Le minuteur seul ne retient pas le processus
+      this.timer.unref();
+    }
+  }
+
+  /**
+   * Compte des modifications enregistrées ; déclenche un backup si le
+   * seuil est atteint
+   */
+  public recordModifications(count: number = 1): void {
+    this.modifications += count;
+    if (this.isDue()) {
+      this.trigger();
+    }
+  }
+
+  /**
+   * Lance un backup ; retourne false s'il est ignoré (backup déjà en cours
+   * ou planificateur arrêté)
+   */
+  public trigger(): boolean {
+    if (this.stopped) {
+      return false;
+    }
+    if (this.running) {
+      this.statistics.skipped++;
+      return false;
+    }
+
+    const modifications = this.modifications;
+    this.modifications = 0;
+    this.running = this.runBackup(modifications).then(succeeded => {
+      this.running = undefined;
+      // Seuil atteint pendant le backup : un seul backup de rattrapage
+      // (pas après un échec : il serait relancé en boucle)
+      if (succeeded && this.isDue()) {
+        this.trigger();
+      }
+    });
+    return true;
+  }
+
+  /**
+   * Attend la fin du backup en cours (et de celui relancé à sa fin)
+   */
+  public async whenIdle(): Promise<void> {
+    while (this.running) {
+      await this.running;
+    }
+  }
+
+  /**
+   * Arrête les déclenchements, attend le backup en cours et libère le runner
+   */
+  public async stop(): Promise<void> {
+    this.stopped = true;
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = undefined;
+    }
+    await this.whenIdle();
+    await this.runner.close();
+  }
+
+  public getStatistics(): BackupSchedulerStatistics {
+    return { ...this.statistics };
+  }
+
+  public getPendingModifications(): number {
+    return this.modifications;
+  }
+
+  private isDue(): boolean {
+    const { everyModifications } = this.options;
+    return everyModifications !== undefined && this.modifications >= everyModifications;
+  }
+
+  private async runBackup(modifications: number): Promise<boolean> {
+    try {
+      // Sans préparation, le backup démarre dès le déclenchement
+      if (this.options.beforeBackup) {
+        await this.options.beforeBackup();
+      }
+      await this.runner.run(this.options.maxBackups ?? 5);
+      this.statistics.completed++;
+      return true;
+    } catch (error) {
+      this.statistics.failed++;
+      // Non sauvegardées : à inclure dans le prochain backup
+      this.modifications += modifications;
+      console.error('Erreur lors de la création du backup automatique:', error);
+      return false;
+    }
+  }
+}
@@ -1,21 +1,89 @@
-import { IBackupService, IBackupMetadata } from '../interfaces/IBackupService';
+import {
+  IBackupMetadata,
+  IPointInTimeBackupService,
+  PointInTimeNotes,
+  PointInTimeRestoreResult
+} from '../interfaces/IBackupService';
+import { INote, INoteData } from '../interfaces/INote';
+import { ChangedNotes } from '../interfaces/IStorage';
+import { Note } from '../models/Note';
 import * as fs from 'fs';
 import * as path from 'path';
 import * as crypto from 'crypto';
+import { StringDecoder } from 'string_decoder';
+import { replaceFile, replaceFileSync } from '../storage/AtomicFile';
+import { ChunkStore, ContentChunker, chunkFileName, hashChunk } from '../storage/ChunkStore';
+import { CompressionCodec, CompressionOptions, resolveCompression } from '../storage/CompressionCodec';
+import { MutationLog, MutationRecord } from '../storage/MutationLog';
+import { decodeNotes, encodeNotes, isBinaryNotes } from '../storage/NoteCodec';
+import { NoteChangeTracker, NoteChanges } from '../storage/NoteChangeTracker';
+import { NoteStreamParser, writeNotesFileAsync } from '../storage/NoteStream';
+
+/**
+ * Manifeste d'un backup par blocs : le fichier de données est la
+ * concaténation des blocs, dans l'ordre
+ */
+interface BackupManifest {
+  size: number;
+  codec?: CompressionCodec; // compression des blocs ('none' si absent)
+  chunks: string[]; // empreintes SHA-256 des blocs (non compressés)
+  storedHashes?: string[]; // empreintes SHA-256 des blocs tels que stockés (compressés)
+  storedSizes?: number[]; // tailles des blocs stockés
+}
+
+const MANIFEST_SUFFIX = '.manifest.json';
+
+export interface BackupServiceOptions {
+  /** Compression des blocs : gzip par défaut ; brotli, zstd (selon la version de Node) ou none */
+  compression?: CompressionCodec;
+  /** Niveau de compression (par défaut, celui de l'algorithme) */
+  compressionLevel?: number;
+  /**
+   * Journal des modifications de notes, pour la restauration à une date
+   * (désactivé par défaut : rien n'est journalisé)
+   */
+  pointInTime?: boolean;
+  /** Taille (en octets) au-delà de laquelle le journal des modifications change de segment */
+  mutationLogSegmentBytes?: number;
+}
 
-export class BackupService implements IBackupService {
+/**
+ * Paramètres d'un BackupService : de quoi en créer un équivalent dans un
+ * autre thread (voir WorkerBackupRunner)
+ */
+export interface BackupServiceSettings {
+  dataFile: string;
+  backupsDir: string;
+  options: BackupServiceOptions;
+}
+
+export class BackupService implements IPointInTimeBackupService {
   private backupsDir: string;
   private dataFile: string;
   private backupMetadataFile: string;
   private backups: IBackupMetadata[];
+  private chunkStore: ChunkStore;
+  private compression: CompressionOptions;
+  private pointInTime: boolean;
+  private mutationLog: MutationLog;
+  private mutationLogSegmentBytes: number;
+  private mutationTracker: NoteChangeTracker; // état des notes déjà journalisé
+  private mutationLogBehind: boolean; // écriture du journal en échec : différences à rattraper
   private modificationCount: number;
   private lastBackupTime: Date;
 
-  constructor(dataFile: string, backupsDir: string = './data/backups') {
+  constructor(dataFile: string, backupsDir: string = './data/backups', options: BackupServiceOptions = {}) {
     this.dataFile = dataFile;
     this.backupsDir = backupsDir;
     this.backupMetadataFile = path.join(backupsDir, 'backups-metadata.json');
     this.backups = [];
+    this.chunkStore = new ChunkStore(path.join(backupsDir, 'chunks'));
+    this.compression = resolveCompression(options.compression ?? 'gzip', options.compressionLevel);
+    this.pointInTime = options.pointInTime ?? false;
+    this.mutationLogSegmentBytes = options.mutationLogSegmentBytes ?? 1024 * 1024;
+    this.mutationLog = new MutationLog(path.join(backupsDir, 'mutations'), this.mutationLogSegmentBytes);
+    this.mutationTracker = new NoteChangeTracker();
+    this.mutationLogBehind = false;
     this.modificationCount = 0;
     this.lastBackupTime = new Date();
     this.ensureDirectories();
@@ -30,12 +98,15 @@ export class BackupService implements IBackupService {
 
   private loadBackupMetadata(): void {
     try {
-      if (fs.existsSync(this.backupMetadataFile)) {
+      if (!fs.existsSync(this.backupMetadataFile)) {
+        this.backups = [];
+      } else {
         const data = fs.readFileSync(this.backupMetadataFile, 'utf-8');
         const backupsData = JSON.parse(data);
         this.backups = backupsData.map((b: any) => ({
           ...b,
-          timestamp: new Date(b.timestamp)
+          timestamp: new Date(b.timestamp),
+          startedAt: b.startedAt !== undefined ? new Date(b.startedAt) : undefined
         }));
       }
     } catch (error) {
@@ -45,56 +116,226 @@ export class BackupService implements IBackupService {
 
   private saveBackupMetadata(): void {
     try {
-      fs.writeFileSync(this.backupMetadataFile, JSON.stringify(this.backups, null, 2));
+      // Écrit à côté puis renommé : relu par le thread de backup (voir reloadMetadata)
+      replaceFileSync(this.backupMetadataFile, tempPath => fs.writeFileSync(tempPath, JSON.stringify(this.backups, null, 2)), 'fast');
     } catch (error) {
       console.error('Erreur lors de la sauvegarde des métadonnées de backup:', error);
       throw error;
     }
   }
 
-  private calculateChecksum(filePath: string): string {
-    const fileBuffer = fs.readFileSync(filePath);
+  /**
+   * Vérifie les blocs d'un manifeste tels qu'ils sont stockés : taille et
+   * empreinte des octets compressés, sans décompression
+   */
+  private async verifyStoredChunks(manifest: BackupManifest): Promise<boolean> {
+    const storedHashes = manifest.storedHashes!;
+    const storedSizes = manifest.storedSizes!;
+    for (let i = 0; i < manifest.chunks.length; i++) {
+      const data = await this.chunkStore.readStored(manifest.chunks[i], manifest.codec);
+      if (data.length !== storedSizes[i] || hashChunk(data) !== storedHashes[i]) {
+        return false;
+      }
+    }
+    return true;
+  }
+
+  /**
+   * Checksum du contenu sauvegardé, calculé au fil de la lecture
+   */
+  private async calculateChecksum(backup: IBackupMetadata): Promise<string> {
     const hashSum = crypto.createHash('sha256');
-    hashSum.update(fileBuffer);
+    for await (const block of this.readBackupBlocks(backup)) {
+      hashSum.update(block);
+    }
     return hashSum.digest('hex');
   }
 
+  /**
+   * Contenu du fichier de données sauvegardé, morceau par morceau : les
+   * blocs du manifeste, ou la copie complète lue par morceaux. La mémoire
+   * utilisée ne dépend pas de la taille du backup.
+   */
+  private async *readBackupBlocks(backup: IBackupMetadata): AsyncGenerator<Buffer> {
+    try {
+      if (backup.format !== 'chunked') {
+        for await (const block of fs.createReadStream(backup.filePath)) {
+          yield block as Buffer;
+        }
+        return;
+      }
+      const manifest = this.readManifest(backup.filePath);
+      let size = 0;
+      for (const hash of manifest.chunks) {
+        const chunk = await this.chunkStore.read(hash, manifest.codec);
+        size += chunk.length;
+        yield chunk;
+      }
+      if (size !== manifest.size) {
+        throw new Error(`taille ${size} au lieu de ${manifest.size}`);
+      }
+    } catch (error) {
+      throw new Error(`Le backup "${backup.id}" est corrompu (${error})`);
+    }
+  }
+
+  private readManifest(manifestPath: string): BackupManifest {
+    const manifest = JSON.parse(fs.readFileSync(manifestPath, 'utf-8'));
+    if (typeof manifest.size !== 'number' || !Array.isArray(manifest.chunks)) {
+      throw new Error(`Manifeste de backup invalide: ${manifestPath}`);
+    }
+    return manifest;
+  }
+
+  /**
+   * Supprime les blocs qui ne sont plus référencés par aucun backup. Les
+   * manifestes sont ceux du répertoire, pas ceux de la liste de cette
+   * instance : une autre instance (thread de backup) a pu en ajouter.
+   */
+  private removeUnusedChunks(): void {
+    this.chunkStore.collectGarbage(() => {
+      const referenced = new Set<string>();
+      fs.readdirSync(this.backupsDir)
+        .filter(name => name.endsWith(MANIFEST_SUFFIX))
+        .forEach(name => {
+          try {
+            const manifest = this.readManifest(path.join(this.backupsDir, name));
+            manifest.chunks.forEach(hash => referenced.add(chunkFileName(hash, manifest.codec ?? 'none')));
+          } catch (error) {
+            // Manifeste illisible : ce backup échoue déjà à la vérification
+          }
+        });
+      return referenced;
+    });
+  }
+
+  /**
+   * Blocs stockés du dernier backup (même compression) : un bloc présent
+   * de la taille attendue est réutilisé sans être relu (voir ChunkStore)
+   */
+  private rememberStoredChunks(): void {
+    const latest = this.listBackups().find(backup =>
+      backup.format === 'chunked' && backup.compression?.codec === this.compression.codec);
+    if (!latest) {
+      return;
+    }
+    try {
+      const manifest = this.readManifest(latest.filePath);
+      const codec = manifest.codec ?? 'none';
+      manifest.storedHashes?.forEach((hash, i) =>
+        this.chunkStore.remember(manifest.chunks[i], codec, { hash, size: manifest.storedSizes![i] }));
+    } catch (error) {
+      // Manifeste illisible : les blocs présents seront relus et contrôlés
+    }
+  }
+
   private generateBackupId(): string {
     return `backup_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
   }
 
+  /**
+   * Crée un backup incrémental : le fichier de données est découpé en blocs
+   * définis par leur contenu (voir ContentChunker), et seuls les blocs
+   * absents des backups précédents sont écrits. Le backup lui-même n'est
+   * qu'un manifeste, la liste de ses blocs. Chaque bloc est compressé
+   * séparément (algorithme et niveau des options), au fil de la lecture,
+   * hors de la boucle d'événements ; les blocs d'un même morceau lu sont
+   * compressés en parallèle.
+   *
+   * Compresser des blocs d'environ 5 Ko plutôt que le fichier entier coûte
+   * en taux de compression : le dictionnaire repart de zéro à chaque bloc,
+   * et un premier backup de notes très semblables occupe 2 à 3 fois plus
+   * qu'un fichier compressé d'un seul tenant (test de performance 16).
+   * C'est le prix de la déduplication : un bloc inchangé n'est ni
+   * recompressé ni réécrit par les backups suivants.
+   *
+   * Le fichier est lu une seule fois, en flux : découpage, checksum et
+   * comptage des notes se font sur chaque morceau lu, en mémoire constante.
+   * La compression suit ce flux bloc par bloc : chaque bloc (32 Ko au plus)
+   * est compressé d'un seul appel zlib asynchrone, un flux zlib par bloc
+   * n'apporterait rien à cette taille.
+   *
+   * Le manifeste garde l'empreinte et la taille de chaque bloc tel qu'il
+   * est stocké : la vérification (verifyBackupIntegrity) relit les octets
+   * compressés sans les décompresser ; seule la restauration décompresse.
+   */
   public async createBackup(): Promise<IBackupMetadata> {
     if (!fs.existsSync(this.dataFile)) {
       throw new Error(`Le fichier de données "${this.dataFile}" n'existe pas`);
     }
 
+    const startedAt = new Date();
     const backupId = this.generateBackupId();
-    const backupFileName = `${backupId}.json`;
+    const backupFileName = `${backupId}${MANIFEST_SUFFIX}`;
     const backupFilePath = path.join(this.backupsDir, backupFileName);
 
-    // Copier le fichier de données
-    fs.copyFileSync(this.dataFile, backupFilePath);
+    const manifest: BackupManifest = { size: 0, codec: this.compression.codec, chunks: [], storedHashes: [], storedSizes: [] };
+    const hashSum = crypto.createHash('sha256');
+    const chunker = new ContentChunker();
+    let storedBytes = 0;
+    const storeChunks = async (chunks: Buffer[]): Promise<void> => {
+      const stored = await Promise.all(chunks.map(chunk => this.chunkStore.put(chunk, this.compression)));
+      stored.forEach(({ hash, stored: storedChunk, written }, i) => {
+        manifest.chunks.push(hash);
+        manifest.storedHashes!.push(storedChunk.hash);
+        manifest.storedSizes!.push(storedChunk.size);
+        manifest.size += chunks[i].length;
+        storedBytes += written;
+      });
+    };
 
-    // Calculer le checksum
-    const checksum = this.calculateChecksum(backupFilePath);
+    // Compter les notes (format de JsonStorage ou tableau de notes) ; un
+    // fichier binaire est reconnu à son en-tête et n'est pas analysé
+    const decoder = new StringDecoder('utf8');
+    let parser: NoteStreamParser | undefined = new NoteStreamParser(() => undefined);
+    let binary: boolean | undefined;
+    let fields: Record<string, unknown> | undefined;
+    const countNotes = (text: string, last: boolean): void => {
+      try {
+        parser?.write(text);
+        if (last) {
+          fields = parser?.end();
+        }
+      } catch (error) {
+        console.warn('Impossible de compter les notes dans le backup');
+        parser = undefined;
+      }
+    };
 
-    // Compter les notes
-    let notesCount = 0;
+    // Les blocs réutilisés ne doivent pas être supprimés avant l'écriture du manifeste
+    const endWrite = await this.chunkStore.beginWrite();
     try {
-      const data = fs.readFileSync(backupFilePath, 'utf-8');
-      const notes = JSON.parse(data);
-      notesCount = Array.isArray(notes) ? notes.length : 0;
-    } catch (error) {
-      console.warn('Impossible de compter les notes dans le backup');
+      this.rememberStoredChunks();
+      for await (const block of fs.createReadStream(this.dataFile)) {
+        if (binary === undefined) {
+          binary = isBinaryNotes(block as Buffer);
+          parser = binary ? undefined : parser;
+        }
+        hashSum.update(block as Buffer);
+        countNotes(decoder.write(block as Buffer), false);
+        await storeChunks(chunker.push(block as Buffer));
+      }
+      await storeChunks(chunker.end());
+      countNotes(decoder.end(), true);
+
+      // Le manifeste est écrit après ses blocs : un backup visible est complet
+      replaceFileSync(backupFilePath, tempPath => fs.writeFileSync(tempPath, JSON.stringify(manifest)), 'durable');
+    } finally {
+      endWrite();
     }
 
     // Créer les métadonnées
     const metadata: IBackupMetadata = {
       id: backupId,
       timestamp: new Date(),
-      checksum,
-      notesCount,
-      filePath: backupFilePath
+      startedAt,
+      checksum: hashSum.digest('hex'),
+      notesCount: parser ? parser.getCount() : 0,
+      filePath: backupFilePath,
+      format: 'chunked',
+      compression: { ...this.compression },
+      storedBytes,
+      dataFormat: binary ? 'binary' : !fields ? 'unknown' : typeof fields.walGeneration === 'number' ? 'wal' : 'json'
     };
 
     this.backups.push(metadata);
@@ -116,36 +357,200 @@ export class BackupService implements IBackupService {
       throw new Error(`Le fichier de backup "${backup.filePath}" n'existe pas`);
     }
 
-    // Vérifier l'intégrité avant de restaurer
-    const isValid = await this.verifyBackupIntegrity(backupId);
-    if (!isValid) {
-      throw new Error(`Le backup "${backupId}" est corrompu (échec de vérification du checksum)`);
+    // Écrit à côté puis renommé, une seule lecture du backup : le checksum
+    // est vérifié avant le renommage, le fichier actuel reste intact en cas d'échec
+    await replaceFile(this.dataFile, async tempPath => {
+      const hashSum = crypto.createHash('sha256');
+      const handle = await fs.promises.open(tempPath, 'w');
+      try {
+        for await (const block of this.readBackupBlocks(backup)) {
+          hashSum.update(block);
+          await handle.write(block);
+        }
+      } finally {
+        await handle.close();
+      }
+      if (hashSum.digest('hex') !== backup.checksum) {
+        throw new Error(`Le backup "${backupId}" est corrompu (échec de vérification du checksum)`);
+      }
+    }, 'durable');
+
+    this.resetModificationCount();
+    return true;
+  }
+
+  /**
+   * Restaure le fichier de données tel qu'il était à un instant donné (voir
+   * readNotesAt), dans le format du backup (JSON ou binaire). Réservé au cas où aucun service
+   * de notes n'a ces données en mémoire : il les réécrirait à sa prochaine
+   * sauvegarde (NoteService.restoreToPointInTime passe par son stockage).
+   *
+   * La restauration est elle-même journalisée (différences avec l'état
+   * suivi) : une restauration ultérieure à un instant postérieur en tient
+   * compte.
+   */
+  public async restoreToPointInTime(timestamp: Date): Promise<PointInTimeRestoreResult> {
+    const { backup, replayed, notes } = await this.readNotesAt(timestamp);
+    await replaceFile(this.dataFile, tempPath => backup.dataFormat === 'binary'
+      ? fs.promises.writeFile(tempPath, encodeNotes(notes))
+      : writeNotesFileAsync(tempPath, notes), 'durable');
+    this.recordMutations(notes);
+    this.resetModificationCount();
+    return { backup, replayed };
+  }
+
+  /**
+   * Notes telles qu'elles étaient à un instant donné : le dernier backup
+   * terminé à cet instant, puis les modifications journalisées depuis son
+   * début jusqu'à cet instant (voir recordMutations). La durée ne dépend
+   * que de la taille de ce backup et du journal qui le suit, pas du nombre
+   * de backups. Le backup est décodé selon le format relevé à sa création ;
+   * l'instantané d'un WalStorage (sans ses journaux) ou un fichier non
+   * reconnu sont refusés avant toute lecture.
+   */
+  public async readNotesAt(timestamp: Date): Promise<PointInTimeNotes> {
+    if (!this.pointInTime) {
+      throw new Error('Restauration à une date non configurée (option pointInTime du service de backup)');
+    }
+    const target = timestamp.getTime();
+    if (Number.isNaN(target)) {
+      throw new Error('Date de restauration invalide');
     }
+    const backup = this.listBackups().find(b => b.timestamp.getTime() <= target);
+    if (!backup) {
+      throw new Error(`Aucun backup antérieur au ${timestamp.toISOString()}`);
+    }
+    if (backup.dataFormat === 'wal') {
+      throw new Error(`Restauration à une date impossible depuis le backup "${backup.id}" : instantané d'un journal (WalStorage), sans les modifications qui le suivent`);
+    }
+    if (backup.dataFormat === 'unknown') {
+      throw new Error(`Restauration à une date impossible depuis le backup "${backup.id}" : format de données non reconnu`);
+    }
+
+    const notes = await this.readBackupNotes(backup);
+    // Depuis le début du backup : les modifications pendant sa lecture y
+    // sont peut-être déjà, les rejouer ne change rien
+    const records = this.mutationLog.read((backup.startedAt ?? backup.timestamp).getTime(), target);
+    records.forEach(record => {
+      if (record.op === 'put') {
+        notes.set(record.note.id, record.note);
+      } else {
+        notes.delete(record.id);
+      }
+    });
+
+    return {
+      backup,
+      replayed: records.length,
+      notes: Array.from(notes.values()).map(data => Note.fromJSON(data))
+    };
+  }
 
-    // Sauvegarder le fichier actuel au cas où
-    const tempFile = this.dataFile + '.tmp';
-    if (fs.existsSync(this.dataFile)) {
-      fs.copyFileSync(this.dataFile, tempFile);
+  /**
+   * Notes d'un backup, par identifiant ; le checksum est vérifié au fil de
+   * la lecture. Un fichier binaire est décodé d'un bloc (NoteCodec ne lit
+   * pas en flux).
+   */
+  private async readBackupNotes(backup: IBackupMetadata): Promise<Map<string, INoteData>> {
+    if (backup.dataFormat === 'binary') {
+      return this.readBinaryBackupNotes(backup);
     }
+    const notes = new Map<string, INoteData>();
+    const hashSum = crypto.createHash('sha256');
+    const decoder = new StringDecoder('utf8');
+    const parser = new NoteStreamParser(data => notes.set(data.id, data));
 
-    try {
-      // Restaurer le backup
-      fs.copyFileSync(backup.filePath, this.dataFile);
-      
-      // Supprimer le fichier temporaire
-      if (fs.existsSync(tempFile)) {
-        fs.unlinkSync(tempFile);
+    for await (const block of this.readBackupBlocks(backup)) {
+      hashSum.update(block);
+      try {
+        parser.write(decoder.write(block));
+      } catch (error) {
+        throw new Error(`Le backup "${backup.id}" est illisible (${error})`);
       }
-      
-      this.resetModificationCount();
-      return true;
+    }
+    try {
+      parser.write(decoder.end());
+      parser.end();
     } catch (error) {
-      // En cas d'erreur, restaurer le fichier temporaire
-      if (fs.existsSync(tempFile)) {
-        fs.copyFileSync(tempFile, this.dataFile);
-        fs.unlinkSync(tempFile);
-      }
-      throw error;
+      throw new Error(`Le backup "${backup.id}" est illisible (${error})`);
+    }
+    if (hashSum.digest('hex') !== backup.checksum) {
+      throw new Error(`Le backup "${backup.id}" est corrompu (échec de vérification du checksum)`);
+    }
+    return notes;
+  }
+
+  private async readBinaryBackupNotes(backup: IBackupMetadata): Promise<Map<string, INoteData>> {
+    const blocks: Buffer[] = [];
+    const hashSum = crypto.createHash('sha256');
+    for await (const block of this.readBackupBlocks(backup)) {
+      hashSum.update(block);
+      blocks.push(block);
+    }
+    if (hashSum.digest('hex') !== backup.checksum) {
+      throw new Error(`Le backup "${backup.id}" est corrompu (échec de vérification du checksum)`);
+    }
+
+    let decoded: INote[];
+    try {
+      decoded = decodeNotes(Buffer.concat(blocks));
+    } catch (error) {
+      throw new Error(`Le backup "${backup.id}" est illisible (${error})`);
+    }
+    return new Map(decoded.map(note => [note.getId(), note.toJSON()] as [string, INoteData]));
+  }
+
+  public isPointInTimeEnabled(): boolean {
+    return this.pointInTime;
+  }
+
+  /**
+   * Prend les notes données comme état de référence du journal des
+   * modifications, sans rien journaliser (notes chargées au démarrage)
+   */
+  public trackNotes(notes: INote[]): void {
+    if (this.pointInTime) {
+      this.mutationTracker.reset(notes);
+    }
+  }
+
+  /**
+   * Journalise les différences entre les notes données et l'état suivi :
+   * une ligne par note créée, modifiée ou supprimée. Si les notes changées
+   * sont connues (ChangedNotes), seules elles sont comparées : coût
+   * proportionnel au changement ; sinon toute la collection l'est (import,
+   * restauration). Une erreur d'écriture est signalée sans faire échouer la
+   * sauvegarde des notes ; la suivante compare toute la collection pour les
+   * rattraper.
+   */
+  public recordMutations(notes: INote[] | ChangedNotes): void {
+    if (!this.pointInTime) {
+      return;
+    }
+    let changes: NoteChanges;
+    if (Array.isArray(notes)) {
+      changes = this.mutationTracker.diff(notes);
+    } else if (this.mutationLogBehind) {
+      changes = this.mutationTracker.diff(notes.all());
+    } else {
+      changes = this.mutationTracker.diffNotes(notes.ids, id => notes.find(id));
+    }
+    if (NoteChangeTracker.isEmpty(changes)) {
+      this.mutationLogBehind = false;
+      return;
+    }
+    const t = Date.now();
+    const records: MutationRecord[] = [
+      ...changes.upserted.map(note => ({ t, op: 'put' as const, note: note.toJSON() })),
+      ...changes.removed.map(id => ({ t, op: 'del' as const, id }))
+    ];
+    try {
+      this.mutationLog.append(records);
+      this.mutationTracker.commit(changes);
+      this.mutationLogBehind = false;
+    } catch (error) {
+      this.mutationLogBehind = true;
+      console.error('Erreur lors de l\'écriture du journal des modifications:', error);
     }
   }
 
@@ -166,7 +571,14 @@ export class BackupService implements IBackupService {
     }
 
     try {
-      const currentChecksum = this.calculateChecksum(backup.filePath);
+      if (backup.format === 'chunked') {
+        const manifest = this.readManifest(backup.filePath);
+        if (manifest.storedHashes && manifest.storedSizes) {
+          return await this.verifyStoredChunks(manifest);
+        }
+      }
+      // Backup antérieur aux empreintes des blocs stockés : contenu décompressé
+      const currentChecksum = await this.calculateChecksum(backup);
       return currentChecksum === backup.checksum;
     } catch (error) {
       console.error(`Erreur lors de la vérification du backup ${backupId}:`, error);
@@ -174,7 +586,13 @@ export class BackupService implements IBackupService {
     }
   }
 
-  public cleanOldBackups(maxBackups: number): void {
+  /**
+   * Supprime les backups les plus anciens au-delà de maxBackups, leurs blocs
+   * et le journal des modifications qui les précède. Sans
+   * pruneMutationLog, le journal est laissé à l'instance qui l'écrit (voir
+   * pruneMutationLog).
+   */
+  public cleanOldBackups(maxBackups: number, options: { pruneMutationLog?: boolean } = {}): void {
     if (this.backups.length <= maxBackups) {
       return;
     }
@@ -205,6 +623,47 @@ export class BackupService implements IBackupService {
     });
 
     this.saveBackupMetadata();
+    this.removeUnusedChunks();
+    if (options.pruneMutationLog ?? true) {
+      this.pruneMutationLog();
+    }
+  }
+
+  /**
+   * Supprime les segments du journal des modifications antérieurs au
+   * début du plus ancien backup conservé ; retourne leur nombre.
+   *
+   * À appeler depuis l'instance qui écrit le journal (celle du service de
+   * notes) : ses ajouts sont synchrones et ne peuvent pas s'intercaler
+   * entre la date lue d'un segment et sa suppression, ce que ceux d'un
+   * autre thread pourraient faire (ajout perdu).
+   */
+  public pruneMutationLog(): number {
+    const oldest = this.backups.reduce<number>(
+      (start, backup) => Math.min(start, (backup.startedAt ?? backup.timestamp).getTime()),
+      Infinity
+    );
+    return oldest === Infinity ? 0 : this.mutationLog.prune(oldest);
+  }
+
+  /**
+   * Relit la liste des backups : ceux créés ou supprimés par un autre
+   * BackupService sur le même répertoire (thread de backup)
+   */
+  public reloadMetadata(): void {
+    this.loadBackupMetadata();
+  }
+
+  public getSettings(): BackupServiceSettings {
+    return {
+      dataFile: this.dataFile,
+      backupsDir: this.backupsDir,
+      options: {
+        compression: this.compression.codec,
+        compressionLevel: this.compression.level,
+        mutationLogSegmentBytes: this.mutationLogSegmentBytes
+      }
+    };
   }
 
   public getModificationsSinceLastBackup(): number {
@@ -240,6 +699,8 @@ export class BackupService implements IBackupService {
     });
     
     this.backups = [];
+    this.chunkStore.clear();
+    this.mutationLog.clear();
     
     if (fs.existsSync(this.backupMetadataFile)) {
       fs.unlinkSync(this.backupMetadataFile);
@@ -0,0 +1,166 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { isMainThread, parentPort, Worker, workerData } from 'worker_threads';
+import { IBackupMetadata } from '../interfaces/IBackupService';
+import { BackupService, BackupServiceSettings } from './BackupService';
+
+/**
+ * Point d'entrée du thread de backup : ce module compilé, ou ses sources
+ * chargées par ts-node (npm run dev, tests) ; undefined si aucun des deux
+ * n'est disponible
+ */
+const WORKER_ENTRY = ((): { script: string; eval: boolean } | undefined => {
+  const compiled = path.join(__dirname, 'BackupWorker.js');
+  if (fs.existsSync(compiled)) {
+    return { script: compiled, eval: false };
+  }
+  if (path.extname(__filename) !== '.ts') {
+    return undefined;
+  }
+  try {
+    const tsNode = require.resolve('ts-node');
+    return {
+      script: `require(${JSON.stringify(tsNode)}).register({ transpileOnly: true }); require(${JSON.stringify(__filename)});`,
+      eval: true
+    };
+  } catch (error) {
+    return undefined;
+  }
+})();
+
+interface BackupWorkerData {
+  backupWorker: BackupServiceSettings;
+}
+
+interface BackupJob {
+  id: number;
+  maxBackups: number;
+}
+
+type BackupJobResult =
+  | { id: number; metadata: IBackupMetadata }
+  | { id: number; error: string };
+
+interface PendingJob {
+  resolve: (metadata: IBackupMetadata) => void;
+  reject: (error: Error) => void;
+}
+
+/**
+ * Backup dans un thread séparé (worker_threads) : lecture, checksum,
+ * compression, écriture des blocs et suppression des anciens backups ne
+ * bloquent pas le thread principal.
+ *
+ * Le thread a son propre BackupService sur le même répertoire ; les deux
+ * relisent la liste des backups avant (thread) et après (thread principal)
+ * chaque backup. Le thread démarre au premier backup et ne retient pas le
+ * processus entre deux backups.
+ */
+export class WorkerBackupRunner {
+  private backupService: BackupService;
+  private worker?: Worker;
+  private jobs: Map<number, PendingJob>;
+  private nextJobId: number;
+
+  constructor(backupService: BackupService) {
+    this.backupService = backupService;
+    this.jobs = new Map();
+    this.nextJobId = 0;
+  }
+
+  /**
+   * Le thread exécute le code compilé, ou les sources si ts-node est installé
+   */
+  public static isAvailable(): boolean {
+    return WORKER_ENTRY !== undefined;
+  }
+
+  public async run(maxBackups: number): Promise<IBackupMetadata> {
+    const worker = this.getWorker();
+    const id = this.nextJobId++;
+    const metadata = await new Promise<IBackupMetadata>((resolve, reject) => {
+      this.jobs.set(id, { resolve, reject });
+      // Un backup en cours retient le processus jusqu'à sa fin
+      worker.ref();
+      worker.postMessage({ id, maxBackups } as BackupJob);
+    });
+    this.backupService.reloadMetadata();
+    // Le thread ne touche pas au journal : ce thread-ci y écrit
+    this.backupService.pruneMutationLog();
+    this.backupService.resetModificationCount();
+    return metadata;
+  }
+
+  public async close(): Promise<void> {
+    const worker = this.worker;
+    this.worker = undefined;
+    if (worker) {
+      await worker.terminate();
+    }
+  }
+
+  private getWorker(): Worker {
+    if (this.worker) {
+      return this.worker;
+    }
+    if (!WORKER_ENTRY) {
+      throw new Error('Thread de backup indisponible (ni code compilé, ni ts-node)');
+    }
+    const data: BackupWorkerData = { backupWorker: this.backupService.getSettings() };
+    const worker = new Worker(WORKER_ENTRY.script, { eval: WORKER_ENTRY.eval, workerData: data });
+    worker.on('message', (result: BackupJobResult) => {
+      const job = this.jobs.get(result.id);
+      this.jobs.delete(result.id);
+      if (this.jobs.size === 0) {
+        worker.unref();
+      }
+      if ('error' in result) {
+        job?.reject(new Error(result.error));
+      } else {
+        job?.resolve(result.metadata);
+      }
+    });
+    // Thread arrêté (erreur ou close()) : les backups en cours échouent, le suivant en relance un
+    const fail = (error: Error): void => {
+      if (this.worker === worker) {
+        this.worker = undefined;
+      }
+      this.jobs.forEach(job => job.reject(error));
+      this.jobs.clear();
+    };
+    worker.on('error', fail);
+    worker.on('exit', code => fail(new Error(`Thread de backup arrêté (code ${code})`)));
+    worker.unref();
+    this.worker = worker;
+    return worker;
+  }
+}
+
+/**
+ * Côté thread : exécute les backups demandés, un à la fois
+ */
+function serveBackupJobs(settings: BackupServiceSettings): void {
+  const port = parentPort!;
+  const backupService = new BackupService(settings.dataFile, settings.backupsDir, settings.options);
+  let queue = Promise.resolve();
+
+  port.on('message', (job: BackupJob) => {
+    queue = queue.then(async () => {
+      let result: BackupJobResult;
+      try {
+        // Backups créés par le thread principal depuis le précédent
+        backupService.reloadMetadata();
+        const metadata = await backupService.createBackup();
+        backupService.cleanOldBackups(job.maxBackups, { pruneMutationLog: false });
+        result = { id: job.id, metadata };
+      } catch (error) {
+        result = { id: job.id, error: error instanceof Error ? error.message : String(error) };
+      }
+      port.postMessage(result);
+    });
+  });
+}
+
+if (!isMainThread && (workerData as Partial<BackupWorkerData> | null)?.backupWorker) {
+  serveBackupJobs((workerData as BackupWorkerData).backupWorker);
+}
@@ -1,22 +1,58 @@
-import { INote } from '../interfaces/INote';
-import { IRepository } from '../interfaces/IRepository';
-import { IStorage } from '../interfaces/IStorage';
-import { ISearchEngine } from '../interfaces/ISearchEngine';
-import { IBackupService } from '../interfaces/IBackupService';
+import { INote, INoteData } from '../interfaces/INote';
+import { IRepository, NotePage, NoteSortKey } from '../interfaces/IRepository';
+import { ChangedNotes, IAsyncStorage, IFingerprintedStorage, IIncrementalStorage, IStorage } from '../interfaces/IStorage';
+import {
+  ISearchEngine,
+  IIncrementalSearchEngine,
+  IPersistentSearchEngine,
+  IRankedSearchEngine,
+  SearchOptions
+} from '../interfaces/ISearchEngine';
+import { IBackupService, IPointInTimeBackupService, PointInTimeRestoreResult } from '../interfaces/IBackupService';
 import { IAttachmentService } from '../interfaces/IAttachmentService';
+import { BackupService } from './BackupService';
+import { BackupRunner, BackupScheduler, InlineBackupRunner, createBackupRunner } from './BackupScheduler';
 import { NoteFactory } from '../factories/NoteFactory';
 
+/**
+ * Modification à répercuter sur les index de recherche
+ */
+type IndexChange =
+  | { type: 'index'; note: INote }
+  | { type: 'reindex'; note: INote }
+  | { type: 'remove'; id: string }
+  | { type: 'rebuild' };
+
+/**
+ * Transaction en cours : les modifications sont appliquées au repository
+ * mais la persistance et la mise à jour des index sont différées au commit.
+ */
+interface Transaction {
+  originals: Map<string, INoteData | null>; // état avant modification (null si créée)
+  baseline?: INoteData[]; // état complet si toute la collection est remplacée
+  touched: Set<string>;
+  rebuild: boolean;
+  modifications: number;
+}
+
+/**
+ * Options du backup automatique
+ */
+export interface AutoBackupOptions {
+  intervalMs?: number; // backup périodique en plus du seuil de modifications
+  runner?: BackupRunner; // par défaut, thread séparé si disponible (voir createBackupRunner)
+}
+
 export class NoteService {
   private repository: IRepository;
   private storage: IStorage;
   private searchEngine: ISearchEngine;
   private backupService?: IBackupService;
   private attachmentService?: IAttachmentService;
-  private autoBackupConfig: {
-    enabled: boolean;
-    maxModifications: number;
-    maxBackups: number;
-  };
+  private backupScheduler?: BackupScheduler;
+  private transaction?: Transaction;
+  private stoppingSchedulers: Set<Promise<void>>; // backup automatique désactivé, backup en cours
+  private searchIndexesReady: boolean; // index chargés ou construits
 
   constructor(
     repository: IRepository,
@@ -30,55 +66,210 @@ export class NoteService {
     this.searchEngine = searchEngine;
     this.backupService = backupService;
     this.attachmentService = attachmentService;
-    this.autoBackupConfig = {
-      enabled: false,
-      maxModifications: 10,
-      maxBackups: 5
-    };
+    this.stoppingSchedulers = new Set();
+    this.searchIndexesReady = false;
     this.loadNotes();
   }
 
   private loadNotes(): void {
     const notes = this.storage.load();
     notes.forEach(note => this.repository.add(note));
+    // État de départ du journal des modifications des backups
+    this.getPointInTimeBackupService()?.trackNotes(notes);
+  }
+
+  /**
+   * Charge ou construit les index de recherche maintenant plutôt qu'à leur
+   * première utilisation (serveur : la première commande n'attend pas).
+   * Ils le sont sinon à la première recherche ou modification : les
+   * commandes en lecture seule (show, list) ne les construisent jamais.
+   */
+  public prepareSearchIndexes(): void {
+    if (this.searchIndexesReady) {
+      return;
+    }
+    this.searchIndexesReady = true;
+
+    // Recharger les index depuis leur instantané s'il est à jour, sinon les construire
+    if (!this.loadSearchSnapshot()) {
+      this.rebuildSearchIndexes();
+    }
+    // Construits avec des modifications non validées : à reconstruire au commit
+    if (this.transaction && this.transaction.modifications > 0) {
+      this.transaction.rebuild = true;
+    }
+  }
+
+  private loadSearchSnapshot(): boolean {
+    const engine = this.getPersistentEngine();
+    const fingerprint = this.getStorageFingerprint();
+    return engine !== undefined &&
+      fingerprint !== undefined &&
+      engine.loadSnapshot(this.repository.findAll(), fingerprint);
+  }
+
+  /**
+   * Point de durabilité : attend que les sauvegardes différées du stockage
+   * (IAsyncStorage) et les backups automatiques en cours soient terminés
+   */
+  public async flush(): Promise<void> {
+    await this.getAsyncStorage()?.flush();
+    await this.backupScheduler?.whenIdle();
+    while (this.stoppingSchedulers.size > 0) {
+      await Promise.all(Array.from(this.stoppingSchedulers));
+    }
+  }
+
+  /**
+   * Termine le service : écrit ce qui reste, ferme le stockage et
+   * enregistre l'instantané des index
+   */
+  public async close(): Promise<void> {
+    this.disableAutoBackup();
+    await this.flush();
+    await this.getAsyncStorage()?.close();
+    this.saveSearchSnapshot();
+  }
+
+  /**
+   * Enregistre l'instantané des index de recherche s'ils ont changé, pour
+   * que le prochain démarrage évite de réindexer toutes les notes.
+   * À appeler avant la fin du processus.
+   */
+  public saveSearchSnapshot(): void {
+    // Index jamais construits : l'instantané existant reste valable ou sera ignoré
+    if (!this.searchIndexesReady) {
+      return;
+    }
+    const engine = this.getPersistentEngine();
+    const fingerprint = this.getStorageFingerprint();
+    if (engine && fingerprint !== undefined) {
+      engine.saveSnapshot(fingerprint);
+    }
+  }
+
+  private persist(change: IndexChange): void {
+    // En transaction, tout est différé jusqu'au commit
+    if (this.transaction) {
+      this.recordChange(this.transaction, change);
+      return;
+    }
+
+    this.saveNotes(1, NoteService.changedIds(change));
     
-    // Construire les index de recherche après le chargement
-    this.rebuildSearchIndexes();
+    // Ne mettre à jour que les entrées d'index de la note modifiée
+    this.updateSearchIndexes(change);
+  }
+
+  /**
+   * Notes concernées par une modification ; undefined si toute la
+   * collection peut avoir changé
+   */
+  private static changedIds(change: IndexChange): string[] | undefined {
+    switch (change.type) {
+      case 'index':
+      case 'reindex':
+        return [change.note.getId()];
+      case 'remove':
+        return [change.id];
+      default:
+        return undefined;
+    }
   }
 
-  private persist(): void {
-    const notes = this.repository.findAll();
-    this.storage.save(notes);
+  /**
+   * Sauvegarde la collection, journalise ses modifications et les compte
+   * pour le backup automatique. Si les notes changées (changedIds) sont
+   * connues, un stockage incrémental et le journal des modifications ne
+   * reçoivent qu'elles : la collection n'est parcourue que pour une
+   * sauvegarde complète.
+   */
+  private saveNotes(modifications: number, changedIds?: Iterable<string>): void {
+    const changed: ChangedNotes | undefined = changedIds && {
+      ids: changedIds,
+      find: id => this.repository.findById(id),
+      all: () => this.repository.findAll()
+    };
+    let mutations: INote[] | ChangedNotes;
+    if (changed && 'saveChanges' in this.storage) {
+      (this.storage as IIncrementalStorage).saveChanges(changed);
+      mutations = changed;
+    } else {
+      const notes = this.repository.findAll();
+      this.storage.save(notes);
+      mutations = changed ?? notes;
+    }
+    this.getPointInTimeBackupService()?.recordMutations(mutations);
     
     // Incrémenter le compteur de modifications pour le backup automatique
-    if (this.backupService && this.autoBackupConfig.enabled) {
-      this.backupService.incrementModificationCount();
-      
-      // Vérifier si un backup automatique est nécessaire
-      if (this.backupService.getModificationsSinceLastBackup() >= this.autoBackupConfig.maxModifications) {
-        this.createAutoBackup();
+    if (this.backupScheduler) {
+      for (let i = 0; i < modifications; i++) {
+        this.backupService?.incrementModificationCount();
       }
+
+      // Backup déclenché si nécessaire, non attendu ici : flush() et close() l'attendent
+      this.backupScheduler.recordModifications(modifications);
     }
-    
-    // Invalider le cache de recherche et reconstruire les index
-    this.rebuildSearchIndexes();
   }
 
-  private async createAutoBackup(): Promise<void> {
-    if (!this.backupService) return;
-    
-    try {
-      await this.backupService.createBackup();
-      this.backupService.cleanOldBackups(this.autoBackupConfig.maxBackups);
-    } catch (error) {
-      console.error('Erreur lors de la création du backup automatique:', error);
+  /**
+   * Mémorise l'état d'origine d'une note avant sa première modification
+   * dans la transaction courante (pour le rollback).
+   */
+  private trackOriginal(id: string): void {
+    const transaction = this.transaction;
+    if (!transaction || transaction.baseline || transaction.originals.has(id)) {
+      return;
+    }
+    const note = this.repository.findById(id);
+    transaction.originals.set(id, note ? note.toJSON() : null);
+  }
+
+  /**
+   * Mémorise l'état complet avant un remplacement de toute la collection
+   */
+  private trackBaseline(): void {
+    const transaction = this.transaction;
+    if (!transaction || transaction.baseline) {
+      return;
+    }
+    const current = this.repository.findAll().map(note => note.toJSON());
+    // Les notes modifiées avant ce point reprennent leur état d'origine
+    const byId = new Map(current.map(data => [data.id, data] as [string, INoteData]));
+    transaction.originals.forEach((data, id) => {
+      if (data === null) {
+        byId.delete(id);
+      } else {
+        byId.set(id, data);
+      }
+    });
+    transaction.baseline = Array.from(byId.values());
+  }
+
+  private recordChange(transaction: Transaction, change: IndexChange): void {
+    transaction.modifications++;
+    switch (change.type) {
+      case 'index':
+      case 'reindex':
+        transaction.touched.add(change.note.getId());
+        break;
+      case 'remove':
+        transaction.touched.add(change.id);
+        break;
+      case 'rebuild':
+        transaction.rebuild = true;
+        break;
     }
   }
 
   /**
    * Reconstruit les index de recherche pour optimiser les performances
+   * (s'ils sont déjà construits : sinon ils le seront à la première recherche)
    */
   private rebuildSearchIndexes(): void {
+    if (!this.searchIndexesReady) {
+      return;
+    }
     const allNotes = this.repository.findAll();
     // Le SearchEngine optimisé utilise buildIndexes pour construire ses index
     if ('buildIndexes' in this.searchEngine) {
@@ -87,37 +278,271 @@ export class NoteService {
   }
 
   /**
-   * Configure le backup automatique
+   * Répercute une modification sur les index de recherche.
+   * Se rabat sur une reconstruction complète si le moteur n'est pas incrémental.
+   */
+  private updateSearchIndexes(change: IndexChange): void {
+    if (!this.searchIndexesReady) {
+      return;
+    }
+    const engine = this.getIncrementalEngine();
+
+    if (!engine || change.type === 'rebuild') {
+      this.rebuildSearchIndexes();
+      return;
+    }
+
+    switch (change.type) {
+      case 'index':
+        engine.indexNote(change.note);
+        break;
+      case 'reindex':
+        engine.reindexNote(change.note);
+        break;
+      case 'remove':
+        engine.removeNote(change.id);
+        break;
+    }
+  }
+
+  private getIncrementalEngine(): IIncrementalSearchEngine | undefined {
+    return 'indexNote' in this.searchEngine
+      ? this.searchEngine as IIncrementalSearchEngine
+      : undefined;
+  }
+
+  private getPersistentEngine(): IPersistentSearchEngine | undefined {
+    return 'loadSnapshot' in this.searchEngine
+      ? this.searchEngine as IPersistentSearchEngine
+      : undefined;
+  }
+
+  /**
+   * Notes à transmettre au moteur de recherche. Un moteur incrémental
+   * n'en a pas besoin : ses index sont tenus à jour à chaque modification
+   * validée. En transaction, la collection contient des modifications non
+   * validées : il ne doit pas s'en servir pour construire ses index.
    */
-  public configureAutoBackup(maxModifications: number, maxBackups: number): void {
-    this.autoBackupConfig.enabled = true;
-    this.autoBackupConfig.maxModifications = maxModifications;
-    this.autoBackupConfig.maxBackups = maxBackups;
+  private getNotesToSearch(): INote[] {
+    return this.getIncrementalEngine() ? [] : this.repository.findAll();
   }
 
   /**
-   * Désactive le backup automatique
+   * Refuse une modification une fois le stockage fermé, avant qu'elle ne
+   * touche au repository (elle ne pourrait pas être sauvegardée)
+   */
+  private assertWritable(): void {
+    if (this.getAsyncStorage()?.isClosed()) {
+      throw new Error('Erreur lors de la sauvegarde: stockage fermé');
+    }
+  }
+
+  private getAsyncStorage(): IAsyncStorage | undefined {
+    return 'flush' in this.storage && 'close' in this.storage
+      ? this.storage as IAsyncStorage
+      : undefined;
+  }
+
+  /**
+   * Service de backup tenant le journal des modifications : seulement si la
+   * restauration à une date y est activée, sinon rien n'est journalisé
+   */
+  private getPointInTimeBackupService(): IPointInTimeBackupService | undefined {
+    if (!this.backupService || !('recordMutations' in this.backupService)) {
+      return undefined;
+    }
+    const backupService = this.backupService as IPointInTimeBackupService;
+    return backupService.isPointInTimeEnabled() ? backupService : undefined;
+  }
+
+  private getStorageFingerprint(): string | undefined {
+    return 'getFingerprint' in this.storage
+      ? (this.storage as IFingerprintedStorage).getFingerprint()
+      : undefined;
+  }
+
+  /**
+   * Démarre une transaction : les modifications suivantes sont appliquées en
+   * mémoire, puis persistées et indexées une seule fois au commit().
+   * Avec un moteur incrémental, les recherches reflètent l'état validé
+   * jusqu'au commit : une note modifiée l'est sur une copie, l'original
+   * reste celui des index (getNoteById retourne la copie).
+   */
+  public beginTransaction(): void {
+    if (this.transaction) {
+      throw new Error('Une transaction est déjà en cours');
+    }
+    this.transaction = {
+      originals: new Map(),
+      touched: new Set(),
+      rebuild: false,
+      modifications: 0
+    };
+  }
+
+  /**
+   * Valide la transaction : une sauvegarde, un comptage des modifications
+   * pour le backup et une mise à jour des index.
+   */
+  public commit(): void {
+    const transaction = this.transaction;
+    if (!transaction) {
+      throw new Error('Aucune transaction en cours');
+    }
+    if (transaction.modifications === 0) {
+      this.transaction = undefined;
+      return;
+    }
+
+    // En cas d'échec de la sauvegarde, la transaction reste ouverte (rollback possible)
+    this.saveNotes(transaction.modifications, transaction.rebuild ? undefined : transaction.touched);
+    this.transaction = undefined;
+
+    if (!this.searchIndexesReady) {
+      return;
+    }
+    const engine = this.getIncrementalEngine();
+    if (!engine || transaction.rebuild) {
+      this.rebuildSearchIndexes();
+      return;
+    }
+    transaction.touched.forEach(id => {
+      const note = this.repository.findById(id);
+      if (note) {
+        engine.indexNote(note);
+      } else {
+        engine.removeNote(id);
+      }
+    });
+  }
+
+  /**
+   * Annule la transaction : le repository retrouve son état d'origine.
+   * Les index n'ayant pas été modifiés, seules les références aux notes
+   * restaurées y sont remplacées. La suppression des pièces jointes
+   * (deleteNote) n'est pas annulable.
+   */
+  public rollback(): void {
+    const transaction = this.transaction;
+    if (!transaction) {
+      throw new Error('Aucune transaction en cours');
+    }
+    this.transaction = undefined;
+
+    if (transaction.baseline) {
+      this.repository.clear();
+      transaction.baseline.forEach(data => this.repository.add(NoteFactory.createFromData(data)));
+      this.rebuildSearchIndexes();
+      return;
+    }
+
+    const engine = this.searchIndexesReady ? this.getIncrementalEngine() : undefined;
+    transaction.originals.forEach((data, id) => {
+      if (data === null) {
+        this.repository.remove(id);
+        return;
+      }
+      const restored = NoteFactory.createFromData(data);
+      if (!this.repository.update(id, restored)) {
+        this.repository.add(restored);
+      }
+      engine?.reindexNote(restored);
+    });
+    if (!engine && transaction.originals.size > 0) {
+      this.rebuildSearchIndexes();
+    }
+  }
+
+  /**
+   * Exécute fn dans une transaction : commit si fn réussit, rollback sinon
+   */
+  public async batch<T>(fn: () => T | Promise<T>): Promise<T> {
+    this.beginTransaction();
+    try {
+      const result = await fn();
+      this.commit();
+      return result;
+    } catch (error) {
+      if (this.transaction) {
+        this.rollback();
+      }
+      throw error;
+    }
+  }
+
+  public isInTransaction(): boolean {
+    return this.transaction !== undefined;
+  }
+
+  /**
+   * Configure le backup automatique : après maxModifications modifications
+   * (Infinity : jamais) et/ou toutes les intervalMs millisecondes, dans un
+   * thread séparé si disponible. Les écritures de notes n'attendent jamais
+   * le backup ; un backup déclenché pendant le précédent est ignoré (voir
+   * BackupScheduler).
+   */
+  public configureAutoBackup(maxModifications: number, maxBackups: number, options: AutoBackupOptions = {}): void {
+    this.disableAutoBackup();
+    const runner = options.runner ?? this.createBackupRunner();
+    if (!runner) {
+      return;
+    }
+    this.backupScheduler = new BackupScheduler(runner, {
+      everyModifications: maxModifications,
+      intervalMs: options.intervalMs,
+      maxBackups,
+      // Le backup copie le fichier de données : les écritures différées doivent y être
+      beforeBackup: () => this.getAsyncStorage()?.flush()
+    });
+  }
+
+  /**
+   * Désactive le backup automatique ; le backup en cours se termine (flush() l'attend)
    */
   public disableAutoBackup(): void {
-    this.autoBackupConfig.enabled = false;
+    const scheduler = this.backupScheduler;
+    this.backupScheduler = undefined;
+    if (scheduler) {
+      const stopping = scheduler.stop();
+      this.stoppingSchedulers.add(stopping);
+      void stopping.finally(() => this.stoppingSchedulers.delete(stopping));
+    }
+  }
+
+  public getBackupScheduler(): BackupScheduler | undefined {
+    return this.backupScheduler;
+  }
+
+  private createBackupRunner(): BackupRunner | undefined {
+    if (this.backupService instanceof BackupService) {
+      return createBackupRunner(this.backupService);
+    }
+    return this.backupService && new InlineBackupRunner(this.backupService);
   }
 
   public createNote(title: string, content: string, tags: string[] = []): INote {
+    this.assertWritable();
+    // Avant la modification : l'instantané des index correspond encore aux données
+    this.prepareSearchIndexes();
     const note = NoteFactory.createNote(title, content, tags);
+    this.trackOriginal(note.getId());
     this.repository.add(note);
-    this.persist();
+    this.persist({ type: 'index', note });
     return note;
   }
 
   public async deleteNote(id: string): Promise<boolean> {
+    this.assertWritable();
     // Supprimer les attachements associés
     if (this.attachmentService) {
       await this.attachmentService.deleteNoteAttachments(id);
     }
     
+    this.prepareSearchIndexes();
+    this.trackOriginal(id);
     const deleted = this.repository.remove(id);
     if (deleted) {
-      this.persist();
+      this.persist({ type: 'remove', id });
     }
     return deleted;
   }
@@ -127,11 +552,16 @@ export class NoteService {
     content?: string;
     tags?: string[];
   }): INote | null {
-    const note = this.repository.findById(id);
-    if (!note) {
+    const found = this.repository.findById(id);
+    if (!found) {
       return null;
     }
 
+    this.assertWritable();
+    this.prepareSearchIndexes();
+    this.trackOriginal(id);
+    // En transaction, les index référencent l'original jusqu'au commit
+    const note = this.transaction ? NoteFactory.createFromData(found.toJSON()) : found;
     if (updates.title !== undefined) {
       note.setTitle(updates.title);
     }
@@ -143,7 +573,7 @@ export class NoteService {
     }
 
     this.repository.update(id, note);
-    this.persist();
+    this.persist({ type: 'reindex', note });
     return note;
   }
 
@@ -155,25 +585,61 @@ export class NoteService {
     return this.repository.findAll();
   }
 
-  public searchNotes(query: string): INote[] {
-    const allNotes = this.repository.findAll();
-    return this.searchEngine.search(allNotes, query);
+  /**
+   * Page de notes triées (voir IRepository.findPage)
+   */
+  public getNotesPage(sortKey: NoteSortKey, cursor: string | undefined, limit: number, descending: boolean = false): NotePage {
+    return this.repository.findPage(sortKey, cursor, limit, descending);
+  }
+
+  /**
+   * Parcourt les notes sans les copier (voir IRepository.scan)
+   */
+  public scanNotes(sortKey?: NoteSortKey, descending: boolean = false, offset: number = 0): IterableIterator<INote> {
+    return this.repository.scan(sortKey, descending, offset);
+  }
+
+  public searchNotes(query: string, options?: SearchOptions): INote[] {
+    this.prepareSearchIndexes();
+    return this.searchEngine.search(this.getNotesToSearch(), query, options);
+  }
+
+  /**
+   * Recherche classée par pertinence, limitée aux meilleurs résultats
+   */
+  public searchNotesRanked(query: string, limit: number): INote[] {
+    this.prepareSearchIndexes();
+    if ('searchTopK' in this.searchEngine) {
+      return (this.searchEngine as IRankedSearchEngine)
+        .searchTopK(query, limit)
+        .map(hit => hit.note);
+    }
+    return this.searchNotes(query).slice(0, limit);
   }
 
   public getNotesByTag(tag: string): INote[] {
-    const allNotes = this.repository.findAll();
-    return this.searchEngine.searchByTag(allNotes, tag);
+    this.prepareSearchIndexes();
+    return this.searchEngine.searchByTag(this.getNotesToSearch(), tag);
   }
 
-  public exportNotes(path: string): void {
-    const notes = this.repository.findAll();
-    this.storage.export(path, notes);
+  /**
+   * Exporte les notes au format du stockage, ou par le stockage donné
+   * (autre format, voir StorageFactory)
+   */
+  public exportNotes(path: string, storage: IStorage = this.storage): void {
+    storage.export(path, this.repository.findAll());
   }
 
-  public importNotes(path: string, merge: boolean = false): void {
-    const importedNotes = this.storage.import(path);
+  /**
+   * Importe des notes avec le stockage des notes, ou le stockage donné
+   */
+  public importNotes(path: string, merge: boolean = false, storage: IStorage = this.storage): void {
+    this.assertWritable();
+    const importedNotes = storage.import(path);
     
+    this.prepareSearchIndexes();
     if (!merge) {
+      this.trackBaseline();
       this.repository.clear();
       importedNotes.forEach(note => this.repository.add(note));
     } else {
@@ -185,20 +651,49 @@ export class NoteService {
           note.getContent(),
           note.getTags()
         );
+        this.trackOriginal(newNote.getId());
         this.repository.add(newNote);
       });
     }
 
-    this.persist();
+    this.persist({ type: 'rebuild' });
+  }
+
+  /**
+   * Remplace les notes par leur état à une date donnée (backup et journal
+   * des modifications, voir IPointInTimeBackupService.readNotesAt). Les
+   * notes passent par le stockage et les index du service, comme un
+   * import : la restauration est journalisée et comptée pour le backup
+   * automatique, et la sauvegarde suivante ne l'écrase pas.
+   */
+  public async restoreToPointInTime(timestamp: Date): Promise<PointInTimeRestoreResult> {
+    const backupService = this.getPointInTimeBackupService();
+    if (!backupService) {
+      throw new Error('Le service de backup ne permet pas la restauration à une date');
+    }
+    const { backup, replayed, notes } = await backupService.readNotesAt(timestamp);
+    if (this.transaction) {
+      throw new Error('Restauration impossible pendant une transaction');
+    }
+
+    this.assertWritable();
+    this.prepareSearchIndexes();
+    this.repository.clear();
+    notes.forEach(note => this.repository.add(note));
+    this.persist({ type: 'rebuild' });
+    return { backup, replayed };
   }
 
   public clearAllNotes(): void {
+    this.assertWritable();
+    this.prepareSearchIndexes();
+    this.trackBaseline();
     this.repository.clear();
-    this.persist();
+    this.persist({ type: 'rebuild' });
   }
 
   public getNotesCount(): number {
-    return this.repository.findAll().length;
+    return this.repository.count();
   }
 
   // Méthodes pour le BackupService
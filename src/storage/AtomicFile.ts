@@ -0,0 +1,98 @@
+import * as fs from 'fs';
+import * as path from 'path';
+
+/**
+ * Mode d'écriture des fichiers de données. Dans les deux cas le fichier est
+ * écrit à côté puis renommé sur la cible : un arrêt du processus en cours
+ * d'écriture laisse l'ancienne version intacte.
+ *
+ * - 'durable' : le fichier est de plus synchronisé sur disque (fsync) avant
+ *   le renommage, puis le répertoire après : une panne du système laisse
+ *   l'ancienne ou la nouvelle version, complète
+ * - 'fast' : sans fsync ; après une panne du système, les dernières
+ *   écritures peuvent manquer
+ */
+export type WriteMode = 'durable' | 'fast';
+
+/**
+ * Remplace un fichier : write() écrit le contenu complet dans le chemin
+ * temporaire reçu, qui est ensuite renommé sur filePath
+ */
+export function replaceFileSync(filePath: string, write: (tempPath: string) => void, mode: WriteMode): void {
+  const tempPath = `${filePath}.tmp`;
+  try {
+    write(tempPath);
+    if (mode === 'durable') {
+      syncFileSync(tempPath);
+    }
+    fs.renameSync(tempPath, filePath);
+  } catch (error) {
+    fs.rmSync(tempPath, { force: true });
+    throw error;
+  }
+  if (mode === 'durable') {
+    syncDirectorySync(path.dirname(filePath));
+  }
+}
+
+/**
+ * Comme replaceFileSync, sans bloquer la boucle d'événements
+ */
+export async function replaceFile(
+  filePath: string,
+  write: (tempPath: string) => Promise<void>,
+  mode: WriteMode
+): Promise<void> {
+  const tempPath = `${filePath}.tmp`;
+  try {
+    await write(tempPath);
+    if (mode === 'durable') {
+      await syncFile(tempPath);
+    }
+    await fs.promises.rename(tempPath, filePath);
+  } catch (error) {
+    await fs.promises.rm(tempPath, { force: true });
+    throw error;
+  }
+  if (mode === 'durable') {
+    await syncDirectory(path.dirname(filePath));
+  }
+}
+
+/**
+ * Synchronise sur disque le contenu d'un fichier déjà écrit
+ */
+export function syncFileSync(filePath: string): void {
+  const fd = fs.openSync(filePath, 'r');
+  try {
+    fs.fsyncSync(fd);
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+/**
+ * Synchronise un répertoire : rend durables les créations et renommages
+ * de fichiers qu'il contient. Sans objet sous Windows (les répertoires ne
+ * s'ouvrent pas).
+ */
+export function syncDirectorySync(dirPath: string): void {
+  if (process.platform !== 'win32') {
+    syncFileSync(dirPath);
+  }
+}
+
+async function syncFile(filePath: string): Promise<void> {
+  const handle = await fs.promises.open(filePath, 'r');
+  try {
+    await handle.sync();
+  } finally {
+    await handle.close();
+  }
+}
+
+async function syncDirectory(dirPath: string): Promise<void> {
+  if (process.platform !== 'win32') {
+    await syncFile(dirPath);
+  }
+}
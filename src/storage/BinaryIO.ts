@@ -0,0 +1,121 @@
+/**
+ * Tampon extensible d'entiers varint et de chaînes préfixées par leur longueur
+ */
+export class BinaryWriter {
+  private buffer: Buffer;
+  private length: number;
+
+  constructor(capacity: number = 64 * 1024) {
+    this.buffer = Buffer.allocUnsafe(capacity);
+    this.length = 0;
+  }
+
+  /**
+   * Entier positif (jusqu'à 2^53) : 7 bits par octet
+   */
+  public writeUint(value: number): void {
+    this.ensureCapacity(10);
+    while (value >= 0x80) {
+      this.buffer[this.length++] = (value % 0x80) | 0x80;
+      value = Math.floor(value / 0x80);
+    }
+    this.buffer[this.length++] = value;
+  }
+
+  /**
+   * Entier signé, en zigzag (0, -1, 1, -2… deviennent 0, 1, 2, 3…)
+   */
+  public writeInt(value: number): void {
+    this.writeUint(value < 0 ? -value * 2 - 1 : value * 2);
+  }
+
+  public writeString(value: string): void {
+    const byteLength = Buffer.byteLength(value, 'utf8');
+    this.writeUint(byteLength);
+    this.ensureCapacity(byteLength);
+    this.length += this.buffer.write(value, this.length, 'utf8');
+  }
+
+  public writeRaw(bytes: Buffer): void {
+    this.ensureCapacity(bytes.length);
+    bytes.copy(this.buffer, this.length);
+    this.length += bytes.length;
+  }
+
+  public toBuffer(): Buffer {
+    return this.buffer.subarray(0, this.length);
+  }
+
+  private ensureCapacity(extra: number): void {
+    if (this.length + extra <= this.buffer.length) {
+      return;
+    }
+    const grown = Buffer.allocUnsafe(Math.max(this.length + extra, this.buffer.length * 2));
+    this.buffer.copy(grown, 0, 0, this.length);
+    this.buffer = grown;
+  }
+}
+
+/**
+ * Lecture des valeurs écrites par BinaryWriter ; lève une erreur
+ * « <nom> tronqué » si le tampon se termine trop tôt
+ */
+export class BinaryReader {
+  private buffer: Buffer;
+  private offset: number;
+  private name: string;
+
+  constructor(buffer: Buffer, name: string) {
+    this.buffer = buffer;
+    this.offset = 0;
+    this.name = name;
+  }
+
+  public readUint(): number {
+    let value = 0;
+    let factor = 1;
+    for (;;) {
+      if (this.offset >= this.buffer.length) {
+        throw this.truncated();
+      }
+      const byte = this.buffer[this.offset++];
+      value += (byte & 0x7f) * factor;
+      if (byte < 0x80) {
+        return value;
+      }
+      factor *= 0x80;
+    }
+  }
+
+  public readInt(): number {
+    const value = this.readUint();
+    return value % 2 === 1 ? -(value + 1) / 2 : value / 2;
+  }
+
+  public readString(): string {
+    const byteLength = this.readUint();
+    if (this.offset + byteLength > this.buffer.length) {
+      throw this.truncated();
+    }
+    const value = this.buffer.toString('utf8', this.offset, this.offset + byteLength);
+    this.offset += byteLength;
+    return value;
+  }
+
+  public readRaw(length: number): Buffer {
+    if (this.offset + length > this.buffer.length) {
+      throw this.truncated();
+    }
+    const bytes = this.buffer.subarray(this.offset, this.offset + length);
+    this.offset += length;
+    return bytes;
+  }
+
+  public atEnd(): boolean {
+    return this.offset === this.buffer.length;
+  }
+
+  private truncated(): Error {
+    return new Error(`${this.name} tronqué`);
+  }
+}
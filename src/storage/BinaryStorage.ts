@@ -0,0 +1,129 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import { IFingerprintedStorage, INonBlockingStorage } from '../interfaces/IStorage';
+import { INote } from '../interfaces/INote';
+import { WriteMode, replaceFile, replaceFileSync } from './AtomicFile';
+import { JsonStorage } from './JsonStorage';
+import { decodeNotes, encodeNotes, isBinaryNotes } from './NoteCodec';
+
+export interface BinaryStorageOptions {
+  /** Mode d'écriture du fichier de données ('durable' par défaut) */
+  writeMode?: WriteMode;
+}
+
+/**
+ * Stockage dans un fichier binaire compact (voir NoteCodec) : pas
+ * d'indentation ni de noms de champs, dates en millisecondes, tags
+ * dédupliqués. Le fichier est lu et écrit d'un bloc.
+ *
+ * L'import accepte aussi les exports JSON.
+ */
+export class BinaryStorage implements IFingerprintedStorage, INonBlockingStorage {
+  private filePath: string;
+  private writeMode: WriteMode;
+  private fingerprint?: string; // empreinte du fichier lu ou écrit en dernier
+
+  constructor(filePath: string, options: BinaryStorageOptions = {}) {
+    this.filePath = filePath;
+    this.writeMode = options.writeMode ?? 'durable';
+  }
+
+  public load(): INote[] {
+    try {
+      if (!fs.existsSync(this.filePath)) {
+        return [];
+      }
+
+      this.fingerprint = undefined;
+      const bytes = fs.readFileSync(this.filePath);
+      const notes = decodeNotes(bytes);
+      this.fingerprint = BinaryStorage.hash(bytes);
+      return notes;
+    } catch (error) {
+      console.error('Erreur lors du chargement des notes:', error);
+      return [];
+    }
+  }
+
+  public save(notes: INote[]): void {
+    try {
+      this.fingerprint = undefined;
+      const bytes = encodeNotes(notes);
+      replaceFileSync(this.filePath, tempPath => fs.writeFileSync(tempPath, bytes), this.writeMode);
+      this.fingerprint = BinaryStorage.hash(bytes);
+    } catch (error) {
+      throw new Error(`Erreur lors de la sauvegarde: ${error}`);
+    }
+  }
+
+  /**
+   * Comme save() ; seul l'encodage, rapide, bloque la boucle d'événements
+   */
+  public async saveAsync(notes: INote[]): Promise<void> {
+    try {
+      this.fingerprint = undefined;
+      const bytes = encodeNotes(notes);
+      await replaceFile(this.filePath, tempPath => fs.promises.writeFile(tempPath, bytes), this.writeMode);
+      this.fingerprint = BinaryStorage.hash(bytes);
+    } catch (error) {
+      throw new Error(`Erreur lors de la sauvegarde: ${error}`);
+    }
+  }
+
+  public export(path: string, notes: INote[]): void {
+    try {
+      const bytes = encodeNotes(notes);
+      replaceFileSync(path, tempPath => fs.writeFileSync(tempPath, bytes), this.writeMode);
+    } catch (error) {
+      throw new Error(`Erreur lors de l'export: ${error}`);
+    }
+  }
+
+  public import(path: string): INote[] {
+    if (!BinaryStorage.isBinaryFile(path)) {
+      return new JsonStorage(path).import(path);
+    }
+    try {
+      return decodeNotes(fs.readFileSync(path));
+    } catch (error) {
+      throw new Error(`Erreur lors de l'import: ${error}`);
+    }
+  }
+
+  public getFilePath(): string {
+    return this.filePath;
+  }
+
+  /**
+   * Empreinte (SHA-1) du fichier de données ; undefined sans fichier
+   */
+  public getFingerprint(): string | undefined {
+    if (this.fingerprint === undefined && fs.existsSync(this.filePath)) {
+      this.fingerprint = BinaryStorage.hash(fs.readFileSync(this.filePath));
+    }
+    return this.fingerprint;
+  }
+
+  /**
+   * Vrai si le fichier est au format binaire (d'après son en-tête)
+   */
+  public static isBinaryFile(path: string): boolean {
+    let fd: number | undefined;
+    try {
+      fd = fs.openSync(path, 'r');
+      const header = Buffer.alloc(4);
+      const bytesRead = fs.readSync(fd, header, 0, header.length, 0);
+      return isBinaryNotes(header.subarray(0, bytesRead));
+    } catch (error) {
+      return false;
+    } finally {
+      if (fd !== undefined) {
+        fs.closeSync(fd);
+      }
+    }
+  }
+
+  private static hash(bytes: Buffer): string {
+    return crypto.createHash('sha1').update(bytes).digest('hex');
+  }
+}
@@ -0,0 +1,399 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as path from 'path';
+import { replaceFile } from './AtomicFile';
+import { CODEC_EXTENSIONS, CompressionCodec, CompressionOptions, compress, decompress } from './CompressionCodec';
+
+const NO_COMPRESSION: CompressionOptions = { codec: 'none', level: 0 };
+
+/**
+ * Fichiers de coordination entre instances (threads, processus) partageant
+ * les blocs : un marqueur par écriture en cours, un verrou pendant la
+ * suppression des blocs inutilisés
+ */
+const WRITER_PREFIX = '.writer-';
+const GC_LOCK = '.gc.lock';
+const LOCK_POLL_MS = 10;
+
+/**
+ * Taille des blocs : minimale, maximale, et environ 5 Ko en moyenne (4 Ko
+ * pour les 12 bits du masque de coupure, plus le minimum) ; une modification
+ * de note réécrit un ou deux blocs
+ */
+const MIN_CHUNK_SIZE = 1024;
+const MAX_CHUNK_SIZE = 32 * 1024;
+const BOUNDARY_MASK = 0xfff00000;
+
+/**
+ * Valeurs pseudo-aléatoires du hachage roulant « gear », une par octet ;
+ * fixes (même graine) : les mêmes données donnent toujours les mêmes blocs
+ */
+const GEAR = ((): Uint32Array => {
+  const table = new Uint32Array(256);
+  let state = 0x9e3779b9;
+  for (let i = 0; i < 256; i++) {
+    // xorshift32
+    state ^= state << 13;
+    state ^= state >>> 17;
+    state ^= state << 5;
+    table[i] = state >>> 0;
+  }
+  return table;
+})();
+
+/**
+ * Découpe un flux en blocs définis par leur contenu : une coupure tombe là
+ * où le hachage des derniers octets lus vérifie le masque. Une note ajoutée
+ * ou modifiée ne change que les blocs qui la contiennent, les suivants se
+ * recalent sur les mêmes coupures (contrairement à un découpage en blocs de
+ * taille fixe).
+ *
+ * Les coupures ne dépendent que du contenu, pas de la façon dont il est lu
+ * par morceaux ; seul le bloc en cours est conservé (MAX_CHUNK_SIZE au plus).
+ */
+export class ContentChunker {
+  private pending: Buffer;
+
+  constructor() {
+    this.pending = Buffer.alloc(0);
+  }
+
+  /**
+   * Ajoute des octets ; retourne les blocs complets
+   */
+  public push(data: Buffer): Buffer[] {
+    this.pending = this.pending.length > 0 ? Buffer.concat([this.pending, data]) : data;
+    return this.takeChunks(false);
+  }
+
+  /**
+   * Fin du flux : retourne les derniers blocs
+   */
+  public end(): Buffer[] {
+    return this.takeChunks(true);
+  }
+
+  private takeChunks(final: boolean): Buffer[] {
+    const chunks: Buffer[] = [];
+    let start = 0;
+    while (start < this.pending.length) {
+      const cut = findCut(this.pending, start, final);
+      if (cut === undefined) {
+        break;
+      }
+      chunks.push(this.pending.subarray(start, cut));
+      start = cut;
+    }
+    // Copie du reste : ne pas retenir tout le morceau lu jusqu'au bloc suivant
+    this.pending = Buffer.from(this.pending.subarray(start));
+    return chunks;
+  }
+}
+
+/**
+ * Fin du bloc commençant à start ; undefined s'il faut plus d'octets pour
+ * la connaître
+ */
+function findCut(content: Buffer, start: number, final: boolean): number | undefined {
+  const end = Math.min(start + MAX_CHUNK_SIZE, content.length);
+  let hash = 0;
+  for (let i = start + MIN_CHUNK_SIZE; i < end; i++) {
+    hash = ((hash << 1) + GEAR[content[i]]) >>> 0;
+    if ((hash & BOUNDARY_MASK) === 0) {
+      return i + 1;
+    }
+  }
+  return final || end === start + MAX_CHUNK_SIZE ? end : undefined;
+}
+
+/**
+ * Nom du fichier d'un bloc : son empreinte, suivie du suffixe de
+ * l'algorithme de compression
+ */
+export function chunkFileName(hash: string, codec: CompressionCodec): string {
+  return `${hash}${CODEC_EXTENSIONS[codec]}`;
+}
+
+export function hashChunk(chunk: Buffer): string {
+  return crypto.createHash('sha256').update(chunk).digest('hex');
+}
+
+/**
+ * Bloc tel qu'il est stocké (compressé) : empreinte SHA-256 et taille de
+ * ces octets, pour le vérifier sans le décompresser
+ */
+export interface StoredChunk {
+  hash: string;
+  size: number;
+}
+
+/**
+ * Blocs adressés par leur contenu (SHA-256 du contenu non compressé), un
+ * fichier par bloc et par algorithme de compression : un bloc déjà présent
+ * n'est jamais relu ni réécrit, le coût d'un backup incrémental ne dépend
+ * que des blocs nouveaux.
+ *
+ * Un bloc nouveau est écrit à côté, synchronisé sur disque puis renommé.
+ * Un bloc déjà présent n'est réutilisé qu'après contrôle : sa taille
+ * stockée si elle est connue (bloc écrit ou contrôlé par cette instance,
+ * ou décrit par un manifeste, voir remember), sinon son contenu ; un bloc
+ * tronqué ou altéré est réécrit.
+ *
+ * Plusieurs instances (thread de backup, autre processus) peuvent partager
+ * les blocs : une écriture en cours est marquée sur disque (beginWrite) et
+ * la suppression des blocs inutilisés, sous verrou, attend qu'il n'y en ait
+ * plus (collectGarbage).
+ */
+export class ChunkStore {
+  private dir: string;
+  private writing: Map<string, Promise<{ stored: StoredChunk; written: number }>>; // blocs en cours d'enregistrement
+  private known: Map<string, StoredChunk>; // chemin -> bloc stocké connu
+
+  constructor(dir: string) {
+    this.dir = dir;
+    this.writing = new Map();
+    this.known = new Map();
+  }
+
+  /**
+   * Enregistre un bloc, compressé, s'il est absent ou altéré ; retourne son
+   * empreinte, le bloc tel qu'il est stocké et le nombre d'octets écrits
+   * (0 si le bloc présent a été réutilisé). Des appels simultanés pour le
+   * même bloc ne l'écrivent qu'une fois (les suivants attendent la fin de
+   * l'écriture).
+   */
+  public async put(
+    chunk: Buffer,
+    compression: CompressionOptions = NO_COMPRESSION
+  ): Promise<{ hash: string; stored: StoredChunk; written: number }> {
+    const hash = hashChunk(chunk);
+    const chunkPath = this.pathOf(hash, compression.codec);
+    const pending = this.writing.get(chunkPath);
+    if (pending) {
+      return { hash, stored: (await pending).stored, written: 0 };
+    }
+    const storing = this.store(chunkPath, hash, chunk, compression);
+    this.writing.set(chunkPath, storing);
+    try {
+      return { hash, ...await storing };
+    } finally {
+      this.writing.delete(chunkPath);
+    }
+  }
+
+  /**
+   * Blocs stockés décrits par un manifeste : leur taille suffit ensuite à
+   * contrôler un bloc présent avant de le réutiliser
+   */
+  public remember(hash: string, codec: CompressionCodec, stored: StoredChunk): void {
+    this.known.set(this.pathOf(hash, codec), stored);
+  }
+
+  /**
+   * Contenu d'un bloc, décompressé et contrôlé (empreinte du contenu)
+   */
+  public async read(hash: string, codec: CompressionCodec = 'none'): Promise<Buffer> {
+    const chunk = await decompress(await this.readStored(hash, codec), codec);
+    if (hashChunk(chunk) !== hash) {
+      throw new Error(`bloc ${hash} altéré`);
+    }
+    return chunk;
+  }
+
+  /**
+   * Octets d'un bloc tels qu'ils sont stockés (compressés), sans contrôle
+   */
+  public readStored(hash: string, codec: CompressionCodec = 'none'): Promise<Buffer> {
+    return fs.promises.readFile(this.pathOf(hash, codec));
+  }
+
+  /**
+   * Marque une écriture en cours : les blocs ne sont pas supprimés avant
+   * l'appel de la fonction retournée. Attend la fin d'une suppression en
+   * cours : les blocs trouvés présents ensuite le restent.
+   */
+  public async beginWrite(): Promise<() => void> {
+    fs.mkdirSync(this.dir, { recursive: true });
+    const marker = path.join(this.dir, `${WRITER_PREFIX}${process.pid}-${crypto.randomBytes(6).toString('hex')}`);
+    this.createOwnedFile(marker, false);
+    // Marqueur écrit avant de regarder le verrou : une suppression qui
+    // commence après ce point le voit et s'abstient
+    while (this.isLocked(path.join(this.dir, GC_LOCK))) {
+      await new Promise(resolve => setTimeout(resolve, LOCK_POLL_MS));
+    }
+    return () => fs.rmSync(marker, { force: true });
+  }
+
+  /**
+   * Supprime les blocs qu'aucun backup ne référence plus ; listReferenced
+   * retourne leurs noms de fichiers (voir chunkFileName) et n'est appelée
+   * que sous verrou. Ne fait rien si une écriture est en cours (ici ou dans
+   * une autre instance) ou une autre suppression : ce sera fait à la
+   * suivante. Retourne le nombre de blocs supprimés.
+   */
+  public collectGarbage(listReferenced: () => Set<string>): number {
+    const lockPath = path.join(this.dir, GC_LOCK);
+    if (!this.tryLock(lockPath)) {
+      return 0;
+    }
+    try {
+      // Verrou pris avant de regarder les marqueurs (voir beginWrite)
+      const writing = this.listDirectory(this.dir)
+        .filter(name => name.startsWith(WRITER_PREFIX))
+        .some(name => this.isLocked(path.join(this.dir, name)));
+      if (writing) {
+        return 0;
+      }
+
+      const referenced = listReferenced();
+      let removed = 0;
+      for (const prefix of this.listDirectory(this.dir)) {
+        if (prefix.startsWith('.')) {
+          continue;
+        }
+        const prefixDir = path.join(this.dir, prefix);
+        for (const name of this.listDirectory(prefixDir)) {
+          // Les fichiers temporaires d'une écriture interrompue ne sont jamais référencés
+          if (!referenced.has(name)) {
+            fs.rmSync(path.join(prefixDir, name), { force: true });
+            removed++;
+          }
+        }
+      }
+      return removed;
+    } finally {
+      fs.rmSync(lockPath, { force: true });
+    }
+  }
+
+  /**
+   * Supprime tous les blocs
+   */
+  public clear(): void {
+    fs.rmSync(this.dir, { recursive: true, force: true });
+    this.known.clear();
+  }
+
+  private pathOf(hash: string, codec: CompressionCodec): string {
+    // Sous-répertoires par préfixe : pas de répertoire de dizaines de milliers de fichiers
+    return path.join(this.dir, hash.slice(0, 2), chunkFileName(hash, codec));
+  }
+
+  private async store(
+    chunkPath: string,
+    hash: string,
+    chunk: Buffer,
+    compression: CompressionOptions
+  ): Promise<{ stored: StoredChunk; written: number }> {
+    const existing = await this.checkExisting(chunkPath, hash, compression.codec);
+    if (existing) {
+      return { stored: existing, written: 0 };
+    }
+    const data = await compress(chunk, compression);
+    await fs.promises.mkdir(path.dirname(chunkPath), { recursive: true });
+    await replaceFile(chunkPath, tempPath => fs.promises.writeFile(tempPath, data), 'durable');
+    const stored = { hash: hashChunk(data), size: data.length };
+    this.known.set(chunkPath, stored);
+    return { stored, written: data.length };
+  }
+
+  /**
+   * Bloc présent et réutilisable : de la taille connue, sinon dont le
+   * contenu décompressé a la bonne empreinte. undefined s'il est absent,
+   * tronqué ou altéré (à réécrire).
+   */
+  private async checkExisting(chunkPath: string, hash: string, codec: CompressionCodec): Promise<StoredChunk | undefined> {
+    let size: number;
+    try {
+      size = (await fs.promises.stat(chunkPath)).size;
+    } catch (error) {
+      return undefined;
+    }
+    const known = this.known.get(chunkPath);
+    if (known && known.size === size) {
+      return known;
+    }
+    try {
+      const data = await fs.promises.readFile(chunkPath);
+      if (hashChunk(await decompress(data, codec)) === hash) {
+        const stored = { hash: hashChunk(data), size: data.length };
+        this.known.set(chunkPath, stored);
+        return stored;
+      }
+    } catch (error) {
+      // Bloc illisible (tronqué) : réécrit
+    }
+    console.warn(`Bloc ${hash} altéré : réécrit`);
+    return undefined;
+  }
+
+  private tryLock(lockPath: string): boolean {
+    fs.mkdirSync(this.dir, { recursive: true });
+    for (let attempt = 0; attempt < 2; attempt++) {
+      try {
+        this.createOwnedFile(lockPath, true);
+        return true;
+      } catch (error) {
+        if ((error as NodeJS.ErrnoException).code !== 'EEXIST' || this.isLocked(lockPath)) {
+          return false;
+        }
+        // Verrou d'un processus arrêté : retiré (isLocked), nouvel essai
+      }
+    }
+    return false;
+  }
+
+  /**
+   * Crée un fichier contenant le pid, complet dès qu'il est visible (écrit à
+   * côté) ; exclusive : échoue (EEXIST) s'il existe déjà
+   */
+  private createOwnedFile(filePath: string, exclusive: boolean): void {
+    const tempPath = path.join(this.dir, `.tmp-${process.pid}-${crypto.randomBytes(6).toString('hex')}`);
+    fs.writeFileSync(tempPath, String(process.pid));
+    try {
+      if (exclusive) {
+        fs.linkSync(tempPath, filePath);
+      } else {
+        fs.renameSync(tempPath, filePath);
+      }
+    } finally {
+      fs.rmSync(tempPath, { force: true });
+    }
+  }
+
+  /**
+   * Vrai si le fichier de verrou (ou marqueur) existe et que le processus
+   * qui l'a créé est actif ; celui d'un processus arrêté est supprimé
+   */
+  private isLocked(lockPath: string): boolean {
+    let pid: number;
+    try {
+      pid = parseInt(fs.readFileSync(lockPath, 'utf-8'), 10);
+    } catch (error) {
+      return false;
+    }
+    if (Number.isInteger(pid) && isProcessAlive(pid)) {
+      return true;
+    }
+    fs.rmSync(lockPath, { force: true });
+    return false;
+  }
+
+  private listDirectory(dir: string): string[] {
+    try {
+      return fs.readdirSync(dir);
+    } catch (error) {
+      return [];
+    }
+  }
+}
+
+function isProcessAlive(pid: number): boolean {
+  try {
+    process.kill(pid, 0);
+    return true;
+  } catch (error) {
+    // EPERM : le processus existe, sous un autre utilisateur
+    return (error as NodeJS.ErrnoException).code === 'EPERM';
+  }
+}
@@ -0,0 +1,120 @@
+import { promisify } from 'util';
+import * as zlib from 'zlib';
+
+export type CompressionCodec = 'none' | 'gzip' | 'brotli' | 'zstd';
+
+/**
+ * Algorithme et niveau de compression
+ */
+export interface CompressionOptions {
+  codec: CompressionCodec;
+  level: number;
+}
+
+/**
+ * Niveaux acceptés et niveau par défaut de chaque algorithme
+ */
+const LEVELS: Record<CompressionCodec, { min: number; max: number; default: number }> = {
+  none: { min: 0, max: 0, default: 0 },
+  gzip: { min: 1, max: 9, default: 6 },
+  brotli: { min: 0, max: 11, default: 5 },
+  zstd: { min: 1, max: 22, default: 3 }
+};
+
+/**
+ * Suffixe des fichiers compressés : un même contenu peut exister sous
+ * plusieurs algorithmes
+ */
+export const CODEC_EXTENSIONS: Record<CompressionCodec, string> = {
+  none: '',
+  gzip: '.gz',
+  brotli: '.br',
+  zstd: '.zst'
+};
+
+/**
+ * zstd n'est disponible que dans les versions récentes de Node (zlib,
+ * à partir de 22.15) et absent des types de @types/node 20
+ */
+interface ZstdZlib {
+  zstdCompress(data: Buffer, options: { params?: Record<number, number> }, callback: (error: Error | null, result: Buffer) => void): void;
+  zstdDecompress(data: Buffer, callback: (error: Error | null, result: Buffer) => void): void;
+}
+
+const zstd: ZstdZlib | undefined = 'zstdCompress' in zlib ? zlib as unknown as ZstdZlib : undefined;
+
+const gzip = promisify(zlib.gzip);
+const gunzip = promisify(zlib.gunzip);
+const brotliCompress = promisify(zlib.brotliCompress);
+const brotliDecompress = promisify(zlib.brotliDecompress);
+
+export function isCodecAvailable(codec: CompressionCodec): boolean {
+  return codec !== 'zstd' || zstd !== undefined;
+}
+
+/**
+ * Options complètes (niveau par défaut si absent) ; lève une erreur si
+ * l'algorithme est inconnu ou indisponible, ou le niveau hors limites
+ */
+export function resolveCompression(codec: CompressionCodec, level?: number): CompressionOptions {
+  const levels = LEVELS[codec];
+  if (!levels) {
+    throw new Error(`Compression inconnue: ${codec} (none, gzip, brotli ou zstd)`);
+  }
+  if (!isCodecAvailable(codec)) {
+    throw new Error(`Compression ${codec} indisponible dans cette version de Node (${process.version})`);
+  }
+  const resolved = level ?? levels.default;
+  if (!Number.isInteger(resolved) || resolved < levels.min || resolved > levels.max) {
+    throw new Error(`Niveau de compression invalide pour ${codec}: ${level} (${levels.min} à ${levels.max})`);
+  }
+  return { codec, level: resolved };
+}
+
+/**
+ * Compression et décompression se font dans le pool de threads de libuv
+ * (API asynchrones de zlib) : elles ne bloquent pas la boucle d'événements,
+ * et plusieurs blocs sont traités en parallèle
+ */
+export async function compress(data: Buffer, options: CompressionOptions): Promise<Buffer> {
+  switch (options.codec) {
+    case 'gzip':
+      return gzip(data, { level: options.level });
+    case 'brotli':
+      return brotliCompress(data, {
+        params: {
+          [zlib.constants.BROTLI_PARAM_QUALITY]: options.level,
+          [zlib.constants.BROTLI_PARAM_SIZE_HINT]: data.length
+        }
+      });
+    case 'zstd': {
+      const params = { [(zlib.constants as unknown as Record<string, number>).ZSTD_c_compressionLevel]: options.level };
+      const codec = requireZstd();
+      return new Promise((resolve, reject) => codec.zstdCompress(data, { params }, (error, result) => error ? reject(error) : resolve(result)));
+    }
+    default:
+      return data;
+  }
+}
+
+export async function decompress(data: Buffer, codec: CompressionCodec): Promise<Buffer> {
+  switch (codec) {
+    case 'gzip':
+      return gunzip(data);
+    case 'brotli':
+      return brotliDecompress(data);
+    case 'zstd': {
+      const zstdCodec = requireZstd();
+      return new Promise((resolve, reject) => zstdCodec.zstdDecompress(data, (error, result) => error ? reject(error) : resolve(result)));
+    }
+    default:
+      return data;
+  }
+}
+
+function requireZstd(): ZstdZlib {
+  if (!zstd) {
+    throw new Error(`Compression zstd indisponible dans cette version de Node (${process.version})`);
+  }
+  return zstd;
+}
@@ -1,13 +1,31 @@
+import * as crypto from 'crypto';
 import * as fs from 'fs';
-import { IStorage } from '../interfaces/IStorage';
-import { INote, INoteData } from '../interfaces/INote';
+import { IFingerprintedStorage, INonBlockingStorage } from '../interfaces/IStorage';
+import { INote } from '../interfaces/INote';
 import { Note } from '../models/Note';
+import { WriteMode, replaceFile, replaceFileSync } from './AtomicFile';
+import { readNotesFile, writeNotesFile, writeNotesFileAsync } from './NoteStream';
 
-export class JsonStorage implements IStorage {
+export interface JsonStorageOptions {
+  /** Mode d'écriture du fichier de données ('durable' par défaut) */
+  writeMode?: WriteMode;
+}
+
+/**
+ * Stockage dans un fichier JSON unique.
+ *
+ * Lecture et écriture se font en flux, note par note : ni le texte complet
+ * du fichier ni son arbre JSON ne sont construits en mémoire. Le fichier
+ * est remplacé d'un coup (voir WriteMode) : jamais à moitié écrit.
+ */
+export class JsonStorage implements IFingerprintedStorage, INonBlockingStorage {
   private filePath: string;
+  private writeMode: WriteMode;
+  private fingerprint?: string; // empreinte du fichier lu ou écrit en dernier
 
-  constructor(filePath: string) {
+  constructor(filePath: string, options: JsonStorageOptions = {}) {
     this.filePath = filePath;
+    this.writeMode = options.writeMode ?? 'durable';
   }
 
   public load(): INote[] {
@@ -16,10 +34,13 @@ export class JsonStorage implements IStorage {
         return [];
       }
 
-      const data = fs.readFileSync(this.filePath, 'utf-8');
-      const parsed: { notes: INoteData[] } = JSON.parse(data);
+      const notes: INote[] = [];
+      const digest = crypto.createHash('sha1');
+      this.fingerprint = undefined;
+      readNotesFile(this.filePath, noteData => notes.push(Note.fromJSON(noteData)), chunk => digest.update(chunk));
+      this.fingerprint = digest.digest('hex');
       
-      return parsed.notes.map(noteData => Note.fromJSON(noteData));
+      return notes;
     } catch (error) {
       console.error('Erreur lors du chargement des notes:', error);
       return [];
@@ -28,10 +49,32 @@ export class JsonStorage implements IStorage {
 
   public save(notes: INote[]): void {
     try {
-      const data = {
-        notes: notes.map(note => note.toJSON())
-      };
-      fs.writeFileSync(this.filePath, JSON.stringify(data, null, 2), 'utf-8');
+      const digest = crypto.createHash('sha1');
+      this.fingerprint = undefined;
+      replaceFileSync(
+        this.filePath,
+        tempPath => writeNotesFile(tempPath, notes, text => digest.update(text, 'utf8')),
+        this.writeMode
+      );
+      this.fingerprint = digest.digest('hex');
+    } catch (error) {
+      throw new Error(`Erreur lors de la sauvegarde: ${error}`);
+    }
+  }
+
+  /**
+   * Comme save(), en rendant la main entre deux blocs écrits
+   */
+  public async saveAsync(notes: INote[]): Promise<void> {
+    try {
+      const digest = crypto.createHash('sha1');
+      this.fingerprint = undefined;
+      await replaceFile(
+        this.filePath,
+        tempPath => writeNotesFileAsync(tempPath, notes, text => digest.update(text, 'utf8')),
+        this.writeMode
+      );
+      this.fingerprint = digest.digest('hex');
     } catch (error) {
       throw new Error(`Erreur lors de la sauvegarde: ${error}`);
     }
@@ -39,10 +82,7 @@ export class JsonStorage implements IStorage {
 
   public export(path: string, notes: INote[]): void {
     try {
-      const data = {
-        notes: notes.map(note => note.toJSON())
-      };
-      fs.writeFileSync(path, JSON.stringify(data, null, 2), 'utf-8');
+      replaceFileSync(path, tempPath => writeNotesFile(tempPath, notes), this.writeMode);
     } catch (error) {
       throw new Error(`Erreur lors de l'export: ${error}`);
     }
@@ -50,10 +90,9 @@ export class JsonStorage implements IStorage {
 
   public import(path: string): INote[] {
     try {
-      const data = fs.readFileSync(path, 'utf-8');
-      const parsed: { notes: INoteData[] } = JSON.parse(data);
-      
-      return parsed.notes.map(noteData => Note.fromJSON(noteData));
+      const notes: INote[] = [];
+      readNotesFile(path, noteData => notes.push(Note.fromJSON(noteData)));
+      return notes;
     } catch (error) {
       throw new Error(`Erreur lors de l'import: ${error}`);
     }
@@ -62,4 +101,30 @@ export class JsonStorage implements IStorage {
   public getFilePath(): string {
     return this.filePath;
   }
+
+  /**
+   * Empreinte (SHA-1) du fichier de données, calculée au fil de la lecture
+   * et de l'écriture ; undefined sans fichier
+   */
+  public getFingerprint(): string | undefined {
+    if (this.fingerprint === undefined && fs.existsSync(this.filePath)) {
+      this.fingerprint = JsonStorage.hashFile(this.filePath);
+    }
+    return this.fingerprint;
+  }
+
+  private static hashFile(filePath: string): string {
+    const digest = crypto.createHash('sha1');
+    const buffer = Buffer.allocUnsafe(64 * 1024);
+    const fd = fs.openSync(filePath, 'r');
+    try {
+      let bytesRead: number;
+      while ((bytesRead = fs.readSync(fd, buffer, 0, buffer.length, null)) > 0) {
+        digest.update(buffer.subarray(0, bytesRead));
+      }
+    } finally {
+      fs.closeSync(fd);
+    }
+    return digest.digest('hex');
+  }
 }
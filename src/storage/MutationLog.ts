@@ -0,0 +1,147 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { WalRecord } from './WalStorage';
+
+/**
+ * Modification de note journalisée, datée (millisecondes depuis l'epoch)
+ */
+export type MutationRecord = WalRecord & { t: number };
+
+/**
+ * Marge sur la date de dernière modification des segments : précision de
+ * l'horodatage de certains systèmes de fichiers
+ */
+const MTIME_SLACK_MS = 2000;
+
+/**
+ * Journal des modifications de notes, en ajout seul, découpé en segments
+ * (`<début>-<pid>-<n>.log`, une ligne JSON par modification).
+ *
+ * Un segment couvre les modifications de son début (nom) à sa dernière
+ * écriture (date de modification du fichier) : une relecture entre deux
+ * instants n'ouvre que les segments qui recoupent l'intervalle, et les
+ * segments antérieurs au plus ancien backup conservé sont supprimés. Les
+ * ajouts ne sont pas synchronisés sur disque : après une panne du système,
+ * les dernières modifications peuvent manquer au journal (pas aux notes).
+ */
+export class MutationLog {
+  private dir: string;
+  private segmentBytes: number;
+  private segment?: { path: string; size: number };
+  private segmentCount: number; // segments créés par ce journal (noms uniques)
+
+  constructor(dir: string, segmentBytes: number) {
+    this.dir = dir;
+    this.segmentBytes = segmentBytes;
+    this.segmentCount = 0;
+  }
+
+  public append(records: MutationRecord[]): void {
+    if (records.length === 0) {
+      return;
+    }
+    const lines = records.map(record => JSON.stringify(record)).join('\n') + '\n';
+    const segment = this.getSegment(records[0].t);
+    fs.appendFileSync(segment.path, lines, 'utf-8');
+    segment.size += Buffer.byteLength(lines, 'utf-8');
+  }
+
+  /**
+   * Modifications journalisées dans [from, to], dans l'ordre chronologique
+   */
+  public read(from: number, to: number): MutationRecord[] {
+    const records: MutationRecord[] = [];
+    for (const segment of this.listSegments()) {
+      if (segment.start > to || this.lastWrite(segment.path) + MTIME_SLACK_MS < from) {
+        continue;
+      }
+      this.readSegment(segment.path).forEach(record => {
+        if (record.t >= from && record.t <= to) {
+          records.push(record);
+        }
+      });
+    }
+    // Segments de plusieurs processus : tri stable par date
+    return records.sort((a, b) => a.t - b.t);
+  }
+
+  /**
+   * Supprime les segments dont toutes les modifications sont antérieures à
+   * before (jamais le segment en cours d'écriture) ; retourne leur nombre
+   */
+  public prune(before: number): number {
+    let removed = 0;
+    for (const segment of this.listSegments()) {
+      if (segment.path !== this.segment?.path && this.lastWrite(segment.path) + MTIME_SLACK_MS < before) {
+        fs.rmSync(segment.path, { force: true });
+        removed++;
+      }
+    }
+    return removed;
+  }
+
+  public clear(): void {
+    fs.rmSync(this.dir, { recursive: true, force: true });
+    this.segment = undefined;
+  }
+
+  /**
+   * Segment où ajouter : le courant, le plus récent du répertoire s'il
+   * n'est pas plein (commandes successives), sinon un nouveau
+   */
+  private getSegment(start: number): { path: string; size: number } {
+    if (this.segment && this.segment.size < this.segmentBytes && fs.existsSync(this.segment.path)) {
+      return this.segment;
+    }
+    const latest = this.segment ? undefined : this.listSegments().pop();
+    const latestSize = latest ? fs.statSync(latest.path).size : Infinity;
+    this.segment = latest && latestSize < this.segmentBytes
+      ? { path: latest.path, size: latestSize }
+      : { path: path.join(this.dir, `${start}-${process.pid}-${this.segmentCount++}.log`), size: 0 };
+    fs.mkdirSync(this.dir, { recursive: true });
+    return this.segment;
+  }
+
+  /**
+   * Un enregistrement illisible (ajout interrompu) est ignoré
+   */
+  private readSegment(segmentPath: string): MutationRecord[] {
+    const records: MutationRecord[] = [];
+    fs.readFileSync(segmentPath, 'utf-8').split('\n').forEach(line => {
+      if (line.length === 0) {
+        return;
+      }
+      try {
+        records.push(JSON.parse(line));
+      } catch (error) {
+        console.warn(`Enregistrement tronqué ignoré dans ${segmentPath}`);
+      }
+    });
+    return records;
+  }
+
+  private lastWrite(segmentPath: string): number {
+    try {
+      return fs.statSync(segmentPath).mtimeMs;
+    } catch (error) {
+      return -Infinity;
+    }
+  }
+
+  /**
+   * Segments présents, par date de début
+   */
+  private listSegments(): Array<{ path: string; start: number }> {
+    let names: string[];
+    try {
+      names = fs.readdirSync(this.dir);
+    } catch (error) {
+      return [];
+    }
+    return names
+      .filter(name => name.endsWith('.log'))
+      .map(name => ({ path: path.join(this.dir, name), start: parseInt(name, 10) }))
+      .filter(segment => Number.isFinite(segment.start))
+      .sort((a, b) => a.start - b.start);
+  }
+}
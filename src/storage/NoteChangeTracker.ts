@@ -0,0 +1,122 @@
+import { INote } from '../interfaces/INote';
+
+/**
+ * Empreinte d'une note telle qu'elle a été persistée
+ */
+interface PersistedState {
+  updatedAt: number;
+  title: string;
+  content: string;
+  tags: string;
+}
+
+export interface NoteChanges {
+  upserted: INote[];
+  removed: string[];
+}
+
+/**
+ * Détermine quelles notes ont changé depuis la dernière sauvegarde.
+ *
+ * IStorage.save() reçoit toujours la collection complète : ce suivi permet
+ * aux stockages incrémentaux de n'écrire que les notes créées, modifiées
+ * ou supprimées. La comparaison ne sérialise rien (les chaînes sont
+ * comparées par référence dans le cas courant).
+ */
+export class NoteChangeTracker {
+  private states: Map<string, PersistedState>;
+
+  constructor() {
+    this.states = new Map();
+  }
+
+  /**
+   * Considère les notes données comme l'état persisté de référence
+   */
+  public reset(notes: INote[]): void {
+    this.states.clear();
+    notes.forEach(note => this.states.set(note.getId(), this.snapshot(note)));
+  }
+
+  /**
+   * Calcule les différences entre l'état persisté et la collection donnée.
+   * L'état de référence n'est mis à jour qu'au commit().
+   */
+  public diff(notes: INote[]): NoteChanges {
+    const upserted: INote[] = [];
+    let existing = 0;
+
+    notes.forEach(note => {
+      const previous = this.states.get(note.getId());
+      if (previous) {
+        existing++;
+      }
+      if (!previous || this.hasChanged(previous, note)) {
+        upserted.push(note);
+      }
+    });
+
+    // Des notes suivies ont disparu seulement si toutes n'ont pas été revues
+    const removed: string[] = [];
+    if (existing < this.states.size) {
+      const ids = new Set(notes.map(note => note.getId()));
+      this.states.forEach((_, id) => {
+        if (!ids.has(id)) {
+          removed.push(id);
+        }
+      });
+    }
+
+    return { upserted, removed };
+  }
+
+  /**
+   * Comme diff(), limité aux notes données par leur identifiant (find
+   * retourne undefined pour une note supprimée) : coût proportionnel au
+   * nombre de ces notes, pas à la taille de la collection
+   */
+  public diffNotes(ids: Iterable<string>, find: (id: string) => INote | undefined): NoteChanges {
+    const upserted: INote[] = [];
+    const removed: string[] = [];
+    for (const id of ids) {
+      const note = find(id);
+      const previous = this.states.get(id);
+      if (note && (!previous || this.hasChanged(previous, note))) {
+        upserted.push(note);
+      } else if (!note && previous) {
+        removed.push(id);
+      }
+    }
+    return { upserted, removed };
+  }
+
+  /**
+   * Enregistre des changements comme persistés
+   */
+  public commit(changes: NoteChanges): void {
+    changes.upserted.forEach(note => this.states.set(note.getId(), this.snapshot(note)));
+    changes.removed.forEach(id => this.states.delete(id));
+  }
+
+  public static isEmpty(changes: NoteChanges): boolean {
+    return changes.upserted.length === 0 && changes.removed.length === 0;
+  }
+
+  private snapshot(note: INote): PersistedState {
+    return {
+      updatedAt: note.getUpdatedAt().getTime(),
+      title: note.getTitle(),
+      content: note.getContent(),
+      tags: note.getTags().join('\u0000')
+    };
+  }
+
+  private hasChanged(previous: PersistedState, note: INote): boolean {
+    return (
+      previous.updatedAt !== note.getUpdatedAt().getTime() ||
+      previous.title !== note.getTitle() ||
+      previous.content !== note.getContent() ||
+      previous.tags !== note.getTags().join('\u0000')
+    );
+  }
+}
@@ -0,0 +1,116 @@
+import { INote } from '../interfaces/INote';
+import { Note } from '../models/Note';
+import { BinaryReader, BinaryWriter } from './BinaryIO';
+
+/**
+ * Formats de fichier de notes
+ */
+export type NoteFileFormat = 'json' | 'binary';
+
+const MAGIC = 'NOTB';
+const CODEC_NAME = 'Fichier de notes binaire';
+
+/**
+ * Version du format binaire, à incrémenter à chaque changement d'encodage
+ */
+export const NOTE_CODEC_VERSION = 1;
+
+/**
+ * Encode des notes dans le format binaire.
+ *
+ * Disposition : en-tête (`NOTB`, version), dictionnaire des tags, puis les
+ * notes : identifiant, titre et contenu préfixés par leur longueur, dates
+ * en millisecondes depuis l'epoch, tags en indices du dictionnaire. Les
+ * entiers sont des varints.
+ */
+export function encodeNotes(notes: INote[]): Buffer {
+  const writer = new BinaryWriter(Math.max(64 * 1024, notes.length * 256));
+
+  const dictionary = new Map<string, number>();
+  const noteTags = notes.map(note => note.getTags().map(tag => {
+    let index = dictionary.get(tag);
+    if (index === undefined) {
+      index = dictionary.size;
+      dictionary.set(tag, index);
+    }
+    return index;
+  }));
+
+  writer.writeRaw(Buffer.from(MAGIC, 'ascii'));
+  writer.writeUint(NOTE_CODEC_VERSION);
+
+  writer.writeUint(dictionary.size);
+  dictionary.forEach((_, tag) => writer.writeString(tag));
+
+  writer.writeUint(notes.length);
+  notes.forEach((note, i) => {
+    writer.writeString(note.getId());
+    writer.writeString(note.getTitle());
+    writer.writeString(note.getContent());
+    writer.writeInt(timeOf(note.getCreatedAt()));
+    writer.writeInt(timeOf(note.getUpdatedAt()));
+    writer.writeUint(noteTags[i].length);
+    noteTags[i].forEach(index => writer.writeUint(index));
+  });
+
+  return writer.toBuffer();
+}
+
+/**
+ * Décode des notes du format binaire ; lève une erreur si le contenu est
+ * tronqué, incohérent ou d'une autre version
+ */
+export function decodeNotes(buffer: Buffer): INote[] {
+  const reader = new BinaryReader(buffer, CODEC_NAME);
+  if (!isBinaryNotes(buffer)) {
+    throw new Error(`${CODEC_NAME} invalide`);
+  }
+  reader.readRaw(MAGIC.length);
+  const version = reader.readUint();
+  if (version !== NOTE_CODEC_VERSION) {
+    throw new Error(`${CODEC_NAME} de version non prise en charge: ${version}`);
+  }
+
+  const dictionary = new Array<string>(reader.readUint());
+  for (let i = 0; i < dictionary.length; i++) {
+    dictionary[i] = reader.readString();
+  }
+
+  const notes = new Array<INote>(reader.readUint());
+  for (let i = 0; i < notes.length; i++) {
+    const id = reader.readString();
+    const title = reader.readString();
+    const content = reader.readString();
+    const createdAt = new Date(reader.readInt());
+    const updatedAt = new Date(reader.readInt());
+    const tags = new Array<string>(reader.readUint());
+    for (let j = 0; j < tags.length; j++) {
+      const tag = dictionary[reader.readUint()];
+      if (tag === undefined) {
+        throw new Error(`${CODEC_NAME} corrompu`);
+      }
+      tags[j] = tag;
+    }
+    notes[i] = Note.fromJSON({ id, title, content, tags, createdAt, updatedAt });
+  }
+
+  if (!reader.atEnd()) {
+    throw new Error(`${CODEC_NAME} corrompu`);
+  }
+  return notes;
+}
+
+/**
+ * Vrai si le contenu commence par l'en-tête du format binaire
+ */
+export function isBinaryNotes(bytes: Buffer): boolean {
+  return bytes.length >= MAGIC.length && bytes.toString('ascii', 0, MAGIC.length) === MAGIC;
+}
+
+function timeOf(date: Date): number {
+  const time = date.getTime();
+  if (!Number.isSafeInteger(time)) {
+    throw new Error(`Date invalide: ${date}`);
+  }
+  return time;
+}
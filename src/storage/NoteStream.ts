@@ -0,0 +1,453 @@
+import * as fs from 'fs';
+import { StringDecoder } from 'string_decoder';
+import { INote, INoteData } from '../interfaces/INote';
+
+/**
+ * Taille des blocs lus ou écrits d'un coup
+ */
+const CHUNK_SIZE = 64 * 1024;
+
+type ParserState =
+  | 'start' // avant la valeur de premier niveau
+  | 'key' // clé de l'objet de premier niveau attendue
+  | 'keyText' // dans une clé
+  | 'colon'
+  | 'notesArray' // `[` du tableau des notes attendu
+  | 'element' // note attendue
+  | 'value' // dans une note ou une autre valeur de premier niveau
+  | 'afterElement' // `,` ou `]` attendu
+  | 'afterValue' // `,` ou `}` attendu
+  | 'done';
+
+/**
+ * Analyseur JSON incrémental d'un fichier de notes.
+ *
+ * Accepte `{ "notes": [...] }` (format de JsonStorage, éventuellement avec
+ * d'autres champs) et un tableau de notes au premier niveau (sauvegardes).
+ * Le texte est fourni par morceaux de taille quelconque ; chaque note est
+ * transmise dès que son objet est complet. Seul le texte de la note en
+ * cours est conservé : la mémoire ne dépend pas de la taille du fichier.
+ */
+export class NoteStreamParser {
+  private onNote: (data: INoteData) => void;
+  private state: ParserState;
+  private inObject: boolean; // tableau des notes dans un objet (sinon au premier niveau)
+  private first: boolean; // aucune clé ou note encore lue dans le conteneur courant
+  private key: string;
+  private keyParts: string[];
+  private valueParts: string[];
+  private valueIsNote: boolean;
+  private depth: number;
+  private inString: boolean;
+  private escaped: boolean;
+  private scalar: boolean;
+  private fields: Record<string, unknown>;
+  private count: number;
+
+  constructor(onNote: (data: INoteData) => void) {
+    this.onNote = onNote;
+    this.state = 'start';
+    this.inObject = false;
+    this.first = true;
+    this.key = '';
+    this.keyParts = [];
+    this.valueParts = [];
+    this.valueIsNote = false;
+    this.depth = 0;
+    this.inString = false;
+    this.escaped = false;
+    this.scalar = false;
+    this.fields = {};
+    this.count = 0;
+  }
+
+  /**
+   * Analyse un morceau de texte
+   */
+  public write(text: string): void {
+    let i = 0;
+    // Début du texte en cours de capture dans ce morceau
+    let captureStart = 0;
+
+    while (i < text.length) {
+      const char = text[i];
+
+      switch (this.state) {
+        case 'start':
+          if (char === '[') {
+            this.enterNotes(false);
+          } else if (char === '{') {
+            this.state = 'key';
+            this.first = true;
+          } else if (!isBlank(char) && char !== '\uFEFF') {
+            throw this.unexpected(char);
+          }
+          i++;
+          break;
+
+        case 'key':
+          if (char === '"') {
+            this.state = 'keyText';
+            this.keyParts = [];
+            captureStart = i + 1;
+          } else if (char === '}' && this.first) {
+            this.state = 'done';
+          } else if (!isBlank(char)) {
+            throw this.unexpected(char);
+          }
+          i++;
+          break;
+
+        case 'keyText':
+          if (this.escaped) {
+            this.escaped = false;
+          } else if (char === '\\') {
+            this.escaped = true;
+          } else if (char === '"') {
+            this.keyParts.push(text.slice(captureStart, i));
+            this.key = JSON.parse(`"${this.keyParts.join('')}"`);
+            this.state = 'colon';
+          }
+          i++;
+          break;
+
+        case 'colon':
+          if (char === ':') {
+            if (this.key === 'notes') {
+              this.state = 'notesArray';
+            } else {
+              this.startValue(false);
+              captureStart = i + 1;
+            }
+          } else if (!isBlank(char)) {
+            throw this.unexpected(char);
+          }
+          i++;
+          break;
+
+        case 'notesArray':
+          if (char === '[') {
+            this.enterNotes(true);
+          } else if (!isBlank(char)) {
+            throw this.unexpected(char);
+          }
+          i++;
+          break;
+
+        case 'element':
+          if (char === ']' && this.first) {
+            this.leaveNotes();
+            i++;
+          } else if (char === ']' || char === '}') {
+            throw this.unexpected(char);
+          } else if (!isBlank(char)) {
+            this.startValue(true);
+            captureStart = i;
+          } else {
+            i++;
+          }
+          break;
+
+        case 'value': {
+          const end = this.scanValue(text, i);
+          if (end < 0) {
+            i = text.length;
+            break;
+          }
+          this.valueParts.push(text.slice(captureStart, end));
+          this.completeValue();
+          i = end;
+          break;
+        }
+
+        case 'afterElement':
+          if (char === ',') {
+            this.state = 'element';
+            this.first = false;
+          } else if (char === ']') {
+            this.leaveNotes();
+          } else if (!isBlank(char)) {
+            throw this.unexpected(char);
+          }
+          i++;
+          break;
+
+        case 'afterValue':
+          if (char === ',') {
+            this.state = 'key';
+            this.first = false;
+          } else if (char === '}') {
+            this.state = 'done';
+          } else if (!isBlank(char)) {
+            throw this.unexpected(char);
+          }
+          i++;
+          break;
+
+        case 'done':
+          if (!isBlank(char)) {
+            throw this.unexpected(char);
+          }
+          i++;
+          break;
+      }
+    }
+
+    // Texte partiel conservé jusqu'au morceau suivant
+    if (this.state === 'value') {
+      this.valueParts.push(text.slice(captureStart));
+    } else if (this.state === 'keyText') {
+      this.keyParts.push(text.slice(captureStart));
+    }
+  }
+
+  /**
+   * Termine l'analyse et retourne les champs de premier niveau autres que
+   * les notes (ex. `walGeneration`) ; lève une erreur si le JSON est incomplet
+   */
+  public end(): Record<string, unknown> {
+    if (this.state !== 'done') {
+      throw new Error('JSON incomplet : fin de fichier inattendue');
+    }
+    return this.fields;
+  }
+
+  /**
+   * Nombre de notes lues jusqu'ici
+   */
+  public getCount(): number {
+    return this.count;
+  }
+
+  private enterNotes(inObject: boolean): void {
+    this.inObject = inObject;
+    this.state = 'element';
+    this.first = true;
+  }
+
+  private leaveNotes(): void {
+    this.state = this.inObject ? 'afterValue' : 'done';
+  }
+
+  private startValue(isNote: boolean): void {
+    this.state = 'value';
+    this.valueIsNote = isNote;
+    this.valueParts = [];
+    this.depth = 0;
+    this.inString = false;
+    this.escaped = false;
+    this.scalar = false;
+  }
+
+  /**
+   * Avance dans la valeur en cours ; retourne la position qui suit sa fin,
+   * ou -1 si elle continue dans le morceau suivant.
+   * Les chaînes sont franchies d'un saut jusqu'au guillemet fermant.
+   */
+  private scanValue(text: string, from: number): number {
+    let i = from;
+
+    while (i < text.length) {
+      if (this.inString) {
+        if (this.escaped) {
+          this.escaped = false;
+          i++;
+          continue;
+        }
+        let quote = text.indexOf('"', i);
+        while (quote >= 0 && isEscaped(text, quote, i)) {
+          quote = text.indexOf('"', quote + 1);
+        }
+        if (quote < 0) {
+          // Chaîne coupée : un `\` final échappe le premier caractère du morceau suivant
+          this.escaped = isEscaped(text, text.length, i);
+          return -1;
+        }
+        i = quote + 1;
+        this.inString = false;
+        if (this.depth === 0) {
+          return i;
+        }
+        continue;
+      }
+
+      const char = text[i];
+      if (this.scalar) {
+        // Nombre, booléen ou null : se termine au premier séparateur
+        if (char === ',' || char === '}' || char === ']' || isBlank(char)) {
+          return i;
+        }
+      } else if (char === '"') {
+        this.inString = true;
+      } else if (char === '{' || char === '[') {
+        this.depth++;
+      } else if (char === '}' || char === ']') {
+        this.depth--;
+        if (this.depth === 0) {
+          return i + 1;
+        }
+      } else if (this.depth === 0 && !isBlank(char)) {
+        this.scalar = true;
+        continue;
+      }
+      i++;
+    }
+    return -1;
+  }
+
+  private completeValue(): void {
+    const text = this.valueParts.join('');
+    this.valueParts = [];
+
+    let value: unknown;
+    try {
+      value = JSON.parse(text);
+    } catch (error) {
+      throw new Error(`JSON invalide : ${error instanceof Error ? error.message : error}`);
+    }
+
+    if (this.valueIsNote) {
+      if (typeof value !== 'object' || value === null || Array.isArray(value)) {
+        throw new Error('JSON invalide : une note doit être un objet');
+      }
+      this.count++;
+      this.onNote(value as INoteData);
+      this.state = 'afterElement';
+    } else {
+      this.fields[this.key] = value;
+      this.state = 'afterValue';
+    }
+  }
+
+  private unexpected(char: string): Error {
+    return new Error(`JSON invalide : caractère inattendu '${char}'`);
+  }
+}
+
+function isBlank(char: string): boolean {
+  return char === ' ' || char === '\n' || char === '\r' || char === '\t';
+}
+
+/**
+ * Vrai si le caractère en position est précédé d'un nombre impair de `\`
+ * (sans remonter avant start)
+ */
+function isEscaped(text: string, position: number, start: number): boolean {
+  let backslashes = 0;
+  for (let i = position - 1; i >= start && text[i] === '\\'; i--) {
+    backslashes++;
+  }
+  return backslashes % 2 === 1;
+}
+
+/**
+ * Lit un fichier de notes par blocs et transmet chaque note dès qu'elle est
+ * complète. onChunk reçoit les octets lus (calcul d'empreinte).
+ * Retourne les champs de premier niveau autres que les notes.
+ */
+export function readNotesFile(
+  filePath: string,
+  onNote: (data: INoteData) => void,
+  onChunk?: (chunk: Buffer) => void
+): Record<string, unknown> {
+  const parser = new NoteStreamParser(onNote);
+  const decoder = new StringDecoder('utf8');
+  const buffer = Buffer.allocUnsafe(CHUNK_SIZE);
+  const fd = fs.openSync(filePath, 'r');
+
+  try {
+    let bytesRead: number;
+    while ((bytesRead = fs.readSync(fd, buffer, 0, buffer.length, null)) > 0) {
+      const chunk = buffer.subarray(0, bytesRead);
+      onChunk?.(chunk);
+      parser.write(decoder.write(chunk));
+    }
+    parser.write(decoder.end());
+    return parser.end();
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+/**
+ * Champs de premier niveau écrits avant les notes (valeurs simples)
+ */
+export type NotesFileFields = Record<string, number | string | boolean>;
+
+/**
+ * Texte d'un fichier de notes au format de JsonStorage
+ * (`JSON.stringify({ ...fields, notes }, null, 2)`, à l'identique), par
+ * blocs d'environ CHUNK_SIZE caractères, sans construire le texte complet
+ */
+function* notesFileChunks(notes: INote[], fields: NotesFileFields = {}): Generator<string> {
+  const header = Object.keys(fields)
+    .map(key => `  ${JSON.stringify(key)}: ${JSON.stringify(fields[key])},\n`)
+    .join('');
+  if (notes.length === 0) {
+    yield `{\n${header}  "notes": []\n}`;
+    return;
+  }
+
+  let pending = `{\n${header}  "notes": [\n`;
+  for (let index = 0; index < notes.length; index++) {
+    // Les retours à la ligne d'une note sérialisée ne sont que de l'indentation
+    const json = JSON.stringify(notes[index].toJSON(), null, 2).replace(/\n/g, '\n    ');
+    pending += `${index > 0 ? ',\n' : ''}    ${json}`;
+    if (pending.length >= CHUNK_SIZE) {
+      yield pending;
+      pending = '';
+    }
+  }
+  yield `${pending}\n  ]\n}`;
+}
+
+/**
+ * Écrit les notes au format de JsonStorage, note par note, par blocs.
+ * onChunk reçoit le texte écrit (calcul d'empreinte) ; fields sont écrits
+ * avant les notes.
+ */
+export function writeNotesFile(
+  filePath: string,
+  notes: INote[],
+  onChunk?: (text: string) => void,
+  fields?: NotesFileFields
+): void {
+  const fd = fs.openSync(filePath, 'w');
+  try {
+    for (const text of notesFileChunks(notes, fields)) {
+      const bytes = Buffer.from(text, 'utf8');
+      let written = 0;
+      while (written < bytes.length) {
+        written += fs.writeSync(fd, bytes, written, bytes.length - written);
+      }
+      onChunk?.(text);
+    }
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+/**
+ * Comme writeNotesFile, mais rend la main à la boucle d'événements entre
+ * deux blocs : une grosse sauvegarde ne bloque pas un serveur qui l'héberge
+ */
+export async function writeNotesFileAsync(
+  filePath: string,
+  notes: INote[],
+  onChunk?: (text: string) => void,
+  fields?: NotesFileFields
+): Promise<void> {
+  const handle = await fs.promises.open(filePath, 'w');
+  try {
+    for (const text of notesFileChunks(notes, fields)) {
+      const bytes = Buffer.from(text, 'utf8');
+      let written = 0;
+      while (written < bytes.length) {
+        written += (await handle.write(bytes, written, bytes.length - written)).bytesWritten;
+      }
+      onChunk?.(text);
+    }
+  } finally {
+    await handle.close();
+  }
+}
@@ -0,0 +1,411 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { MessageChannel, Worker, receiveMessageOnPort } from 'worker_threads';
+import { ChangedNotes, IFingerprintedStorage, IIncrementalStorage } from '../interfaces/IStorage';
+import { INote } from '../interfaces/INote';
+import { Note } from '../models/Note';
+import { WriteMode, replaceFileSync } from './AtomicFile';
+import { JsonStorage } from './JsonStorage';
+import { NoteChangeTracker, NoteChanges } from './NoteChangeTracker';
+import { readNotesFile, writeNotesFile } from './NoteStream';
+
+/**
+ * Manifeste du répertoire des shards
+ */
+export interface ShardManifest {
+  version: number;
+  shardCount: number;
+  shards: Array<{ file: string; notes: number; checksum: string }>;
+}
+
+export interface ShardedStorageOptions {
+  /** Nombre de shards d'un nouveau répertoire (ignoré si un manifeste existe) */
+  shardCount?: number;
+  /**
+   * Lecture des shards en parallèle dans des worker threads : true, false,
+   * ou automatique (plusieurs cœurs et assez de données) si absent
+   */
+  parallelLoad?: boolean;
+  /** Mode d'écriture des shards et du manifeste ('durable' par défaut) */
+  writeMode?: WriteMode;
+}
+
+const MANIFEST_FILE = 'manifest.json';
+const MANIFEST_VERSION = 1;
+
+/**
+ * Volume de données en deçà duquel démarrer des workers coûte plus cher
+ * que de lire les shards dans le thread principal
+ */
+const PARALLEL_LOAD_MIN_BYTES = 8 * 1024 * 1024;
+
+/**
+ * Délai maximal d'attente des workers de chargement
+ */
+const PARALLEL_LOAD_TIMEOUT_MS = 5 * 60 * 1000;
+
+/**
+ * Notes d'un shard lues par un worker, en colonnes : un tableau par champ
+ * se clone bien plus vite entre threads qu'un objet par note
+ */
+interface ShardColumns {
+  ids: string[];
+  titles: string[];
+  contents: string[];
+  tags: string[][];
+  createdAt: Float64Array;
+  updatedAt: Float64Array;
+  checksum: string;
+}
+
+type WorkerResult = { shards: ShardColumns[] } | { error: string };
+
+/**
+ * Code des workers de chargement (JavaScript, évalué tel quel : ne dépend
+ * pas de la compilation du projet)
+ */
+const LOAD_WORKER_SOURCE = `
+const { workerData } = require('worker_threads');
+const crypto = require('crypto');
+const fs = require('fs');
+const { files, port, signal } = workerData;
+let result;
+try {
+  const transfer = [];
+  const shards = files.map(file => {
+    const data = fs.readFileSync(file);
+    const parsed = JSON.parse(data.toString('utf8'));
+    const notes = Array.isArray(parsed) ? parsed : parsed.notes;
+    const columns = {
+      ids: notes.map(note => note.id),
+      titles: notes.map(note => note.title),
+      contents: notes.map(note => note.content),
+      tags: notes.map(note => note.tags),
+      createdAt: Float64Array.from(notes, note => new Date(note.createdAt).getTime()),
+      updatedAt: Float64Array.from(notes, note => new Date(note.updatedAt).getTime()),
+      checksum: crypto.createHash('sha1').update(data).digest('hex')
+    };
+    transfer.push(columns.createdAt.buffer, columns.updatedAt.buffer);
+    return columns;
+  });
+  port.postMessage({ shards }, transfer);
+} catch (error) {
+  port.postMessage({ error: String(error && error.message || error) });
+}
+Atomics.add(signal, 0, 1);
+Atomics.notify(signal, 0);
+`;
+
+/**
+ * Stockage réparti en N fichiers (shards) selon un hachage de l'identifiant
+ * des notes, décrits par un petit manifeste.
+ *
+ * - Chaque shard est au format de JsonStorage, lu et écrit en flux
+ * - Une sauvegarde ne réécrit que les shards contenant une note créée,
+ *   modifiée ou supprimée, puis le manifeste (écritures atomiques par
+ *   renommage : le manifeste ne référence que des shards complets)
+ * - saveChanges() déduit ces shards des seules notes changées : les notes
+ *   de chaque shard sont gardées en mémoire pour le réécrire
+ * - Le chargement peut lire les shards en parallèle dans des worker threads
+ * - L'empreinte est un condensat des empreintes des shards
+ *
+ * Les notes sont rechargées dans l'ordre de leur date de création.
+ */
+export class ShardedStorage implements IFingerprintedStorage, IIncrementalStorage {
+  private dirPath: string;
+  private shardCount: number;
+  private parallelLoad?: boolean;
+  private writeMode: WriteMode;
+  private checksums: string[]; // empreinte de chaque shard sur disque
+  private noteCounts: number[];
+  private shardNotes: Array<Map<string, INote>>; // notes de chaque shard, à réécrire s'il change
+  private behind: boolean; // une écriture a échoué : la prochaine compare toute la collection
+  private tracker: NoteChangeTracker;
+  private json: JsonStorage;
+  private loaded: boolean;
+
+  constructor(dirPath: string, options: ShardedStorageOptions = {}) {
+    this.dirPath = dirPath;
+    this.shardCount = Math.max(1, Math.floor(options.shardCount ?? 16));
+    this.parallelLoad = options.parallelLoad;
+    this.writeMode = options.writeMode ?? 'durable';
+    this.checksums = [];
+    this.noteCounts = [];
+    this.shardNotes = [];
+    this.behind = false;
+    this.tracker = new NoteChangeTracker();
+    this.json = new JsonStorage(path.join(dirPath, MANIFEST_FILE));
+    this.loaded = false;
+  }
+
+  public load(): INote[] {
+    try {
+      const manifest = this.readManifest();
+      if (manifest) {
+        this.shardCount = manifest.shardCount;
+      }
+      this.resetShards();
+
+      const notes: INote[] = [];
+      if (manifest) {
+        const files = manifest.shards.map(shard => path.join(this.dirPath, shard.file));
+        const totalBytes = files.reduce((total, file) => total + (fs.existsSync(file) ? fs.statSync(file).size : 0), 0);
+
+        if (this.shouldLoadInParallel(totalBytes)) {
+          this.loadInParallel(files, notes);
+        } else {
+          files.forEach((file, shard) => this.loadShard(file, shard, notes));
+        }
+      }
+
+      // Les shards regroupent les notes par hachage : on retrouve l'ordre chronologique
+      notes.sort((a, b) => a.getCreatedAt().getTime() - b.getCreatedAt().getTime());
+      notes.forEach(note => this.shardNotes[this.shardOf(note.getId())].set(note.getId(), note));
+      this.tracker.reset(notes);
+      this.behind = false;
+      this.loaded = true;
+      return notes;
+    } catch (error) {
+      console.error('Erreur lors du chargement des notes:', error);
+      this.resetShards();
+      this.tracker.reset([]);
+      this.behind = false;
+      this.loaded = true;
+      return [];
+    }
+  }
+
+  public save(notes: INote[]): void {
+    if (this.loaded && fs.existsSync(this.getManifestPath())) {
+      this.write(this.tracker.diff(notes));
+      return;
+    }
+
+    // Première sauvegarde : tous les shards et le manifeste sont écrits
+    this.resetShards();
+    notes.forEach(note => this.shardNotes[this.shardOf(note.getId())].set(note.getId(), note));
+    this.writeShards(this.shardNotes.map((_, shard) => shard));
+    this.tracker.reset(notes);
+    this.behind = false;
+    this.loaded = true;
+  }
+
+  /**
+   * Comme save(), en ne comparant à l'état persisté que les notes changed :
+   * les shards à réécrire se déduisent de leurs identifiants (toute la
+   * collection n'est parcourue qu'à la première sauvegarde ou après une
+   * écriture échouée)
+   */
+  public saveChanges(changed: ChangedNotes): void {
+    if (this.behind || !this.loaded || !fs.existsSync(this.getManifestPath())) {
+      this.save(changed.all());
+      return;
+    }
+    this.write(this.tracker.diffNotes(changed.ids, changed.find));
+  }
+
+  private write(changes: NoteChanges): void {
+    if (NoteChangeTracker.isEmpty(changes)) {
+      return;
+    }
+
+    const dirty = new Set<number>();
+    changes.upserted.forEach(note => {
+      const shard = this.shardOf(note.getId());
+      this.shardNotes[shard].set(note.getId(), note);
+      dirty.add(shard);
+    });
+    changes.removed.forEach(id => {
+      const shard = this.shardOf(id);
+      this.shardNotes[shard].delete(id);
+      dirty.add(shard);
+    });
+
+    try {
+      this.writeShards([...dirty]);
+    } catch (error) {
+      // Changements non écrits : saveChanges() ne les reverrait pas
+      this.behind = true;
+      throw error;
+    }
+    this.behind = false;
+    this.tracker.commit(changes);
+  }
+
+  private writeShards(shards: number[]): void {
+    try {
+      fs.mkdirSync(this.dirPath, { recursive: true });
+      shards.forEach(shard => this.writeShard(shard, [...this.shardNotes[shard].values()]));
+      this.writeManifest();
+    } catch (error) {
+      throw new Error(`Erreur lors de la sauvegarde: ${error}`);
+    }
+  }
+
+  public export(filePath: string, notes: INote[]): void {
+    this.json.export(filePath, notes);
+  }
+
+  public import(filePath: string): INote[] {
+    return this.json.import(filePath);
+  }
+
+  /**
+   * Empreinte de l'état persisté (condensat des empreintes des shards) ;
+   * undefined avant le chargement
+   */
+  public getFingerprint(): string | undefined {
+    if (!this.loaded) {
+      return undefined;
+    }
+    return crypto.createHash('sha1').update(this.checksums.join('\n')).digest('hex');
+  }
+
+  public getDirPath(): string {
+    return this.dirPath;
+  }
+
+  public getShardCount(): number {
+    return this.shardCount;
+  }
+
+  /**
+   * Shard d'une note : hachage FNV-1a 32 bits de son identifiant
+   */
+  public shardOf(noteId: string): number {
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < noteId.length; i++) {
+      hash ^= noteId.charCodeAt(i);
+      hash = Math.imul(hash, 0x01000193);
+    }
+    return (hash >>> 0) % this.shardCount;
+  }
+
+  private resetShards(): void {
+    this.checksums = new Array<string>(this.shardCount).fill('');
+    this.noteCounts = new Array<number>(this.shardCount).fill(0);
+    this.shardNotes = Array.from({ length: this.shardCount }, () => new Map<string, INote>());
+  }
+
+  private loadShard(file: string, shard: number, notes: INote[]): void {
+    if (!fs.existsSync(file)) {
+      return;
+    }
+    const digest = crypto.createHash('sha1');
+    const before = notes.length;
+    readNotesFile(file, noteData => notes.push(Note.fromJSON(noteData)), chunk => digest.update(chunk));
+    this.checksums[shard] = digest.digest('hex');
+    this.noteCounts[shard] = notes.length - before;
+  }
+
+  private shouldLoadInParallel(totalBytes: number): boolean {
+    if (this.parallelLoad !== undefined) {
+      return this.parallelLoad && this.shardCount > 1;
+    }
+    return this.shardCount > 1 && os.availableParallelism() > 1 && totalBytes >= PARALLEL_LOAD_MIN_BYTES;
+  }
+
+  /**
+   * Lit les shards dans des worker threads. IStorage.load() étant
+   * synchrone, le thread principal attend les workers sur un compteur
+   * partagé (Atomics.wait) puis relève leurs messages sans boucle
+   * d'événements (receiveMessageOnPort).
+   */
+  private loadInParallel(files: string[], notes: INote[]): void {
+    const present = files
+      .map((file, shard) => ({ file, shard }))
+      .filter(({ file }) => fs.existsSync(file));
+    const workerCount = Math.max(1, Math.min(os.availableParallelism(), present.length));
+    const groups: Array<typeof present> = Array.from({ length: workerCount }, () => []);
+    present.forEach((entry, i) => groups[i % workerCount].push(entry));
+
+    const signal = new Int32Array(new SharedArrayBuffer(4));
+    const channels = groups.map(() => new MessageChannel());
+    const workers = groups.map((group, i) => new Worker(LOAD_WORKER_SOURCE, {
+      eval: true,
+      workerData: { files: group.map(entry => entry.file), port: channels[i].port2, signal },
+      transferList: [channels[i].port2]
+    }));
+
+    try {
+      const deadline = Date.now() + PARALLEL_LOAD_TIMEOUT_MS;
+      let done: number;
+      while ((done = Atomics.load(signal, 0)) < workers.length) {
+        if (Date.now() > deadline) {
+          throw new Error('Délai dépassé lors du chargement parallèle des shards');
+        }
+        Atomics.wait(signal, 0, done, 1000);
+      }
+
+      channels.forEach((channel, i) => {
+        const result = receiveMessageOnPort(channel.port1)?.message as WorkerResult | undefined;
+        if (!result || 'error' in result) {
+          throw new Error(result ? result.error : 'Shard non lu');
+        }
+        result.shards.forEach((columns, j) => {
+          const shard = groups[i][j].shard;
+          this.checksums[shard] = columns.checksum;
+          this.noteCounts[shard] = columns.ids.length;
+          columns.ids.forEach((id, k) => notes.push(Note.fromJSON({
+            id,
+            title: columns.titles[k],
+            content: columns.contents[k],
+            tags: columns.tags[k],
+            createdAt: new Date(columns.createdAt[k]),
+            updatedAt: new Date(columns.updatedAt[k])
+          })));
+        });
+      });
+    } finally {
+      channels.forEach(channel => channel.port1.close());
+      workers.forEach(worker => void worker.terminate());
+    }
+  }
+
+  private writeShard(shard: number, notes: INote[]): void {
+    const filePath = path.join(this.dirPath, ShardedStorage.shardFile(shard));
+    const digest = crypto.createHash('sha1');
+    replaceFileSync(filePath, tempPath => writeNotesFile(tempPath, notes, text => digest.update(text, 'utf8')), this.writeMode);
+    this.checksums[shard] = digest.digest('hex');
+    this.noteCounts[shard] = notes.length;
+  }
+
+  private writeManifest(): void {
+    const manifest: ShardManifest = {
+      version: MANIFEST_VERSION,
+      shardCount: this.shardCount,
+      shards: this.checksums.map((checksum, shard) => ({
+        file: ShardedStorage.shardFile(shard),
+        notes: this.noteCounts[shard],
+        checksum
+      }))
+    };
+    replaceFileSync(
+      this.getManifestPath(),
+      tempPath => fs.writeFileSync(tempPath, JSON.stringify(manifest, null, 2), 'utf-8'),
+      this.writeMode
+    );
+  }
+
+  private readManifest(): ShardManifest | undefined {
+    const manifestPath = this.getManifestPath();
+    if (!fs.existsSync(manifestPath)) {
+      return undefined;
+    }
+    const manifest: ShardManifest = JSON.parse(fs.readFileSync(manifestPath, 'utf-8'));
+    if (manifest.version !== MANIFEST_VERSION || manifest.shards.length !== manifest.shardCount) {
+      throw new Error(`Manifeste de shards non pris en charge: ${manifestPath}`);
+    }
+    return manifest;
+  }
+
+  private getManifestPath(): string {
+    return path.join(this.dirPath, MANIFEST_FILE);
+  }
+
+  private static shardFile(shard: number): string {
+    return `shard-${String(shard).padStart(3, '0')}.json`;
+  }
+}
@@ -0,0 +1,356 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as path from 'path';
+import { ChangedNotes, IFingerprintedStorage, IIncrementalStorage } from '../interfaces/IStorage';
+import { INote, INoteData } from '../interfaces/INote';
+import { Note } from '../models/Note';
+import { WriteMode, replaceFile, syncDirectorySync } from './AtomicFile';
+import { JsonStorage } from './JsonStorage';
+import { NoteChangeTracker, NoteChanges } from './NoteChangeTracker';
+import { readNotesFile, writeNotesFileAsync } from './NoteStream';
+
+/**
+ * Enregistrement du journal : une ligne JSON par note créée/modifiée ou supprimée
+ */
+export type WalRecord =
+  | { op: 'put'; note: INoteData }
+  | { op: 'del'; id: string };
+
+export interface WalStorageOptions {
+  /** Taille du journal (en octets) au-delà de laquelle il est compacté */
+  compactionThreshold?: number;
+  /**
+   * 'durable' (défaut) : chaque ajout au journal est synchronisé sur disque
+   * avant que save() rende la main, et l'instantané est écrit de façon durable
+   */
+  writeMode?: WriteMode;
+}
+
+/**
+ * Stockage par journal en ajout seul (write-ahead log).
+ *
+ * - Le fichier principal est un instantané au format de JsonStorage,
+ *   complété par le numéro de génération du journal qui le suit
+ * - Chaque sauvegarde ajoute une ligne compacte par note modifiée au journal
+ *   courant (`<fichier>.<génération>.wal`) : coût O(taille du changement)
+ * - Le chargement relit l'instantané puis rejoue les journaux
+ * - Au-delà d'un seuil, le journal est compacté en arrière-plan : les ajouts
+ *   basculent sur une nouvelle génération, puis un nouvel instantané est écrit
+ * - L'empreinte de l'état persisté est un condensat de l'instantané et des
+ *   journaux, tenu à jour à chaque ajout sans relire les fichiers
+ * - saveChanges() ne reçoit et ne compare que les notes dont on sait
+ *   qu'elles ont changé ; l'état journalisé, réécrit par la compaction,
+ *   est tenu à jour à partir des changements
+ */
+export class WalStorage implements IFingerprintedStorage, IIncrementalStorage {
+  private filePath: string;
+  private compactionThreshold: number;
+  private writeMode: WriteMode;
+  private generation: number;
+  private logSize: number;
+  private tracker: NoteChangeTracker;
+  private persisted: Map<string, INote>; // notes telles que journalisées
+  private json: JsonStorage;
+  private compaction?: Promise<void>;
+  private compactionScheduled: boolean;
+  private behind: boolean; // un ajout a échoué : le prochain compare toute la collection
+  private digest?: crypto.Hash; // condensat de l'instantané puis des journaux relus ou ajoutés
+  private compactionLines?: string[]; // ajouts pendant la compaction, à ajouter à son condensat
+
+  constructor(filePath: string, options: WalStorageOptions = {}) {
+    this.filePath = filePath;
+    this.compactionThreshold = options.compactionThreshold ?? 4 * 1024 * 1024;
+    this.writeMode = options.writeMode ?? 'durable';
+    this.generation = 0;
+    this.logSize = 0;
+    this.tracker = new NoteChangeTracker();
+    this.persisted = new Map();
+    this.json = new JsonStorage(filePath);
+    this.compactionScheduled = false;
+    this.behind = false;
+  }
+
+  public load(): INote[] {
+    try {
+      const notes = new Map<string, INote>();
+      const digest = crypto.createHash('sha1');
+      let snapshotGeneration = 0;
+      this.digest = undefined;
+
+      if (fs.existsSync(this.filePath)) {
+        const fields = readNotesFile(
+          this.filePath,
+          noteData => notes.set(noteData.id, Note.fromJSON(noteData)),
+          chunk => digest.update(chunk)
+        );
+        snapshotGeneration = typeof fields.walGeneration === 'number' ? fields.walGeneration : 0;
+      }
+
+      this.generation = snapshotGeneration;
+      this.logSize = 0;
+
+      this.listLogGenerations().forEach(generation => {
+        const logPath = this.getLogPath(generation);
+        if (generation < snapshotGeneration) {
+          // Journal déjà intégré à l'instantané (compaction interrompue)
+          fs.unlinkSync(logPath);
+          return;
+        }
+        this.replay(logPath, notes, digest);
+        this.generation = generation;
+        this.logSize = fs.statSync(logPath).size;
+      });
+
+      this.persisted = notes;
+      const loaded = Array.from(notes.values());
+      this.tracker.reset(loaded);
+      this.behind = false;
+      this.digest = digest;
+      return loaded;
+    } catch (error) {
+      console.error('Erreur lors du chargement des notes:', error);
+      return [];
+    }
+  }
+
+  public save(notes: INote[]): void {
+    this.write(this.tracker.diff(notes));
+  }
+
+  /**
+   * Comme save(), en ne comparant à l'état persisté que les notes changed :
+   * coût proportionnel au changement, pas à la taille de la collection
+   * (sauf après un ajout échoué, où toute la collection est comparée)
+   */
+  public saveChanges(changed: ChangedNotes): void {
+    if (this.behind) {
+      this.save(changed.all());
+      return;
+    }
+    this.write(this.tracker.diffNotes(changed.ids, changed.find));
+  }
+
+  private write(changes: NoteChanges): void {
+    if (NoteChangeTracker.isEmpty(changes)) {
+      return;
+    }
+
+    const lines = this.serialize(changes);
+    try {
+      this.append(lines);
+    } catch (error) {
+      // Changements non journalisés : saveChanges() ne les reverrait pas
+      this.behind = true;
+      throw new Error(`Erreur lors de la sauvegarde: ${error}`);
+    }
+
+    this.behind = false;
+    this.tracker.commit(changes);
+    changes.upserted.forEach(note => this.persisted.set(note.getId(), note));
+    changes.removed.forEach(id => this.persisted.delete(id));
+    this.logSize += Buffer.byteLength(lines, 'utf-8');
+    this.digest?.update(lines, 'utf8');
+    this.compactionLines?.push(lines);
+
+    if (this.logSize >= this.compactionThreshold) {
+      this.scheduleCompaction();
+    }
+  }
+
+  public export(path: string, notes: INote[]): void {
+    this.json.export(path, notes);
+  }
+
+  public import(path: string): INote[] {
+    return this.json.import(path);
+  }
+
+  /**
+   * Compacte le journal : les ajouts suivants partent dans une nouvelle
+   * génération, et l'état journalisé est écrit comme nouvel instantané,
+   * note par note, en rendant la main entre deux blocs (writeNotesFileAsync).
+   * Une note modifiée pendant l'écriture peut y figurer dans son nouvel
+   * état : la nouvelle génération la rejoue de toute façon. L'empreinte est
+   * indisponible jusqu'à la fin de l'écriture (condensat des octets écrits,
+   * puis des ajouts faits entre-temps) ; si l'écriture échoue, elle le
+   * reste et les données dérivées seront reconstruites.
+   */
+  public compact(): Promise<void> {
+    if (this.compaction) {
+      return this.compaction;
+    }
+
+    const nextGeneration = this.generation + 1;
+    const notes = Array.from(this.persisted.values());
+    const digest = crypto.createHash('sha1');
+    const appended: string[] = [];
+    this.generation = nextGeneration;
+    this.logSize = 0;
+    this.digest = undefined;
+    this.compactionLines = appended;
+
+    this.compaction = this.writeSnapshot(notes, nextGeneration, digest)
+      .then(() => {
+        appended.forEach(lines => digest.update(lines, 'utf8'));
+        this.digest = digest;
+      })
+      .finally(() => {
+        this.compactionLines = undefined;
+        this.compaction = undefined;
+      });
+    return this.compaction;
+  }
+
+  /**
+   * Attend la fin d'une éventuelle compaction en cours
+   */
+  public async whenIdle(): Promise<void> {
+    while (this.compactionScheduled || this.compaction) {
+      if (this.compaction) {
+        await this.compaction;
+      } else {
+        await new Promise(resolve => setImmediate(resolve));
+      }
+    }
+  }
+
+  public getFilePath(): string {
+    return this.filePath;
+  }
+
+  public getLogSize(): number {
+    return this.logSize;
+  }
+
+  /**
+   * Empreinte de l'état persisté ; undefined avant le chargement et
+   * pendant une compaction (voir compact)
+   */
+  public getFingerprint(): string | undefined {
+    return this.digest?.copy().digest('hex');
+  }
+
+  private scheduleCompaction(): void {
+    if (this.compactionScheduled || this.compaction) {
+      return;
+    }
+    this.compactionScheduled = true;
+    setImmediate(() => {
+      this.compactionScheduled = false;
+      this.compact().catch(error => {
+        console.error('Erreur lors de la compaction du journal:', error);
+      });
+    });
+  }
+
+  private append(lines: string): void {
+    const logPath = this.getLogPath(this.generation);
+    const fd = fs.openSync(logPath, 'a');
+    try {
+      fs.writeFileSync(fd, lines, 'utf-8');
+      if (this.writeMode === 'durable') {
+        fs.fsyncSync(fd);
+      }
+    } finally {
+      fs.closeSync(fd);
+    }
+    if (this.writeMode === 'durable' && this.logSize === 0) {
+      // Nouveau journal : son entrée dans le répertoire doit aussi être durable
+      syncDirectorySync(path.dirname(logPath));
+    }
+  }
+
+  private async writeSnapshot(notes: INote[], generation: number, digest: crypto.Hash): Promise<void> {
+    await replaceFile(
+      this.filePath,
+      tempPath => writeNotesFileAsync(tempPath, notes, text => digest.update(text, 'utf8'), { walGeneration: generation }),
+      this.writeMode
+    );
+
+    // Les journaux antérieurs sont désormais couverts par l'instantané
+    for (const previous of this.listLogGenerations()) {
+      if (previous < generation) {
+        await fs.promises.unlink(this.getLogPath(previous));
+      }
+    }
+  }
+
+  private serialize(changes: NoteChanges): string {
+    const records: WalRecord[] = [
+      ...changes.upserted.map(note => ({ op: 'put' as const, note: note.toJSON() })),
+      ...changes.removed.map(id => ({ op: 'del' as const, id }))
+    ];
+    return records.map(record => JSON.stringify(record)).join('\n') + '\n';
+  }
+
+  /**
+   * Rejoue un journal sur l'état en mémoire. Un enregistrement illisible
+   * est ignoré, les suivants sont rejoués. Une dernière ligne non terminée
+   * (écriture interrompue) est retirée si elle est illisible, terminée
+   * sinon : les ajouts suivants commencent toujours sur une nouvelle ligne.
+   */
+  private replay(logPath: string, notes: Map<string, INote>, digest: crypto.Hash): void {
+    const content = fs.readFileSync(logPath);
+    const end = content.lastIndexOf(0x0a) + 1; // fin de la dernière ligne terminée
+    const lines = content.subarray(0, end).toString('utf-8').split('\n');
+    const unterminated = content.subarray(end).toString('utf-8');
+    digest.update(content.subarray(0, end));
+
+    lines.forEach(line => this.replayLine(logPath, line, notes));
+    if (unterminated.length === 0) {
+      return;
+    }
+    if (this.replayLine(logPath, unterminated, notes)) {
+      fs.appendFileSync(logPath, '\n', 'utf-8');
+      digest.update(`${unterminated}\n`, 'utf8');
+    } else {
+      fs.truncateSync(logPath, end);
+    }
+  }
+
+  /**
+   * Applique un enregistrement ; false s'il est illisible
+   */
+  private replayLine(logPath: string, line: string, notes: Map<string, INote>): boolean {
+    if (line.length === 0) {
+      return true;
+    }
+
+    let record: WalRecord;
+    try {
+      record = JSON.parse(line);
+    } catch (error) {
+      console.warn(`Enregistrement illisible ignoré dans ${logPath}`);
+      return false;
+    }
+
+    if (record.op === 'put') {
+      notes.set(record.note.id, Note.fromJSON(record.note));
+    } else {
+      notes.delete(record.id);
+    }
+    return true;
+  }
+
+  private getLogPath(generation: number): string {
+    return `${this.filePath}.${generation}.wal`;
+  }
+
+  /**
+   * Liste les générations de journaux présentes sur disque (triées)
+   */
+  private listLogGenerations(): number[] {
+    const dir = path.dirname(this.filePath);
+    const prefix = `${path.basename(this.filePath)}.`;
+
+    if (!fs.existsSync(dir)) {
+      return [];
+    }
+
+    return fs.readdirSync(dir)
+      .filter(name => name.startsWith(prefix) && name.endsWith('.wal'))
+      .map(name => Number(name.slice(prefix.length, -'.wal'.length)))
+      .filter(generation => Number.isInteger(generation) && generation >= 0)
+      .sort((a, b) => a - b);
+  }
+}
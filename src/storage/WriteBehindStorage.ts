@@ -0,0 +1,135 @@
+import { IAsyncStorage, IFingerprintedStorage, INonBlockingStorage, IStorage } from '../interfaces/IStorage';
+import { INote } from '../interfaces/INote';
+
+export interface WriteBehindStorageOptions {
+  /** Délai entre la première modification et l'écriture (ms) */
+  delayMs?: number;
+}
+
+/**
+ * Écriture différée devant un autre stockage.
+ *
+ * save() ne fait que mémoriser la collection à écrire et programmer une
+ * écriture : une rafale de modifications ne donne lieu qu'à une seule
+ * écriture, de l'état le plus récent. Les écritures ne se chevauchent
+ * jamais ; celles du stockage sous-jacent sont asynchrones s'il le permet
+ * (INonBlockingStorage), sinon synchrones mais hors du chemin des
+ * modifications.
+ *
+ * Une écriture programmée qui échoue est signalée sur la console et
+ * retentée au flush() suivant, qui lève alors l'erreur s'il échoue encore.
+ */
+export class WriteBehindStorage implements IAsyncStorage, IFingerprintedStorage {
+  private storage: IStorage;
+  private delayMs: number;
+  private pending?: INote[]; // collection à écrire, la plus récente
+  private writing?: Promise<void>; // écriture en cours
+  private timer?: NodeJS.Timeout;
+  private closed: boolean;
+  private writes: number;
+
+  constructor(storage: IStorage, options: WriteBehindStorageOptions = {}) {
+    this.storage = storage;
+    this.delayMs = options.delayMs ?? 50;
+    this.closed = false;
+    this.writes = 0;
+  }
+
+  public load(): INote[] {
+    return this.storage.load();
+  }
+
+  public save(notes: INote[]): void {
+    if (this.closed) {
+      throw new Error('Erreur lors de la sauvegarde: stockage fermé');
+    }
+    this.pending = notes;
+    if (!this.timer) {
+      this.timer = setTimeout(() => {
+        this.timer = undefined;
+        this.flush().catch(error => console.error('Erreur lors de la sauvegarde différée des notes:', error));
+      }, this.delayMs);
+    }
+  }
+
+  /**
+   * Attend que toutes les sauvegardes demandées jusqu'ici soient écrites
+   */
+  public async flush(): Promise<void> {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = undefined;
+    }
+    // Une écriture en cours peut précéder une collection plus récente
+    while (this.writing || this.pending) {
+      if (this.writing) {
+        await this.writing.catch(() => undefined);
+        continue;
+      }
+      this.writing = this.write(this.pending!);
+      try {
+        await this.writing;
+      } finally {
+        this.writing = undefined;
+      }
+    }
+  }
+
+  public async close(): Promise<void> {
+    this.closed = true;
+    await this.flush();
+  }
+
+  public isClosed(): boolean {
+    return this.closed;
+  }
+
+  public export(path: string, notes: INote[]): void {
+    this.storage.export(path, notes);
+  }
+
+  public import(path: string): INote[] {
+    return this.storage.import(path);
+  }
+
+  /**
+   * Empreinte du stockage sous-jacent ; undefined tant que des notes
+   * restent à écrire (elle ne correspondrait pas à l'état en mémoire)
+   */
+  public getFingerprint(): string | undefined {
+    if (this.pending || this.writing || !('getFingerprint' in this.storage)) {
+      return undefined;
+    }
+    return (this.storage as IFingerprintedStorage).getFingerprint();
+  }
+
+  /**
+   * Vrai si des notes restent à écrire
+   */
+  public hasPendingWrites(): boolean {
+    return this.pending !== undefined || this.writing !== undefined;
+  }
+
+  /**
+   * Nombre d'écritures effectuées dans le stockage sous-jacent
+   */
+  public getWriteCount(): number {
+    return this.writes;
+  }
+
+  private async write(notes: INote[]): Promise<void> {
+    this.pending = undefined;
+    try {
+      if ('saveAsync' in this.storage) {
+        await (this.storage as INonBlockingStorage).saveAsync(notes);
+      } else {
+        this.storage.save(notes);
+      }
+      this.writes++;
+    } catch (error) {
+      // À retenter, sauf si une collection plus récente la remplace
+      this.pending = this.pending ?? notes;
+      throw error;
+    }
+  }
+}
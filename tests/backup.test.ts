@@ -2,6 +2,20 @@ import { BackupService } from '../src/services/BackupService';
 import * as fs from 'fs';
 import * as path from 'path';
 import * as crypto from 'crypto';
+import * as zlib from 'zlib';
+import { NoteService } from '../src/services/NoteService';
+import { NoteRepository } from '../src/repositories/NoteRepository';
+import { SearchEngine } from '../src/search/SearchEngine';
+import { JsonStorage } from '../src/storage/JsonStorage';
+import { BinaryStorage } from '../src/storage/BinaryStorage';
+import { WalStorage } from '../src/storage/WalStorage';
+import { WriteBehindStorage } from '../src/storage/WriteBehindStorage';
+import { ContentChunker } from '../src/storage/ChunkStore';
+import { NoteChangeTracker } from '../src/storage/NoteChangeTracker';
+import { CompressionCodec, isCodecAvailable } from '../src/storage/CompressionCodec';
+import { BackupRunner, BackupScheduler, createBackupRunner } from '../src/services/BackupScheduler';
+import { WorkerBackupRunner } from '../src/services/BackupWorker';
+import { IBackupMetadata } from '../src/interfaces/IBackupService';
 
 describe('BackupService - Reliability Tests', () => {
   let backupService: BackupService;
@@ -53,6 +67,16 @@ describe('BackupService - Reliability Tests', () => {
       expect(backup1.checksum).toBe(backup2.checksum); // Même contenu
     });
 
+    it('devrait compter les notes du format de JsonStorage', async () => {
+      const notes = Array.from({ length: 3000 }, (_, i) => ({ id: `${i}`, title: `Note ${i}`, content: 'Contenu "cité" }', tags: [] }));
+      fs.writeFileSync(testDataFile, JSON.stringify({ notes }, null, 2));
+
+      const metadata = await backupService.createBackup();
+
+      expect(metadata.notesCount).toBe(3000);
+      expect(metadata.checksum).toBe(crypto.createHash('sha256').update(fs.readFileSync(testDataFile)).digest('hex'));
+    });
+
     it('devrait lever une erreur si le fichier de données n\'existe pas', async () => {
       const nonExistentFile = path.join(testDataDir, 'nonexistent.json');
       const service = new BackupService(nonExistentFile, backupsDir);
@@ -287,4 +311,611 @@ describe('BackupService - Reliability Tests', () => {
       expect(new Set(results.map(r => r.id)).size).toBe(5); // Tous uniques
     });
   });
+  describe('7. Backup automatique et écriture différée', () => {
+    it('devrait attendre le backup automatique et y inclure les écritures différées', async () => {
+      const storage = new WriteBehindStorage(new JsonStorage(testDataFile), { delayMs: 1000 });
+      const service = new NoteService(new NoteRepository(), storage, new SearchEngine(), backupService);
+      service.configureAutoBackup(3, 5);
+
+      for (let i = 0; i < 3; i++) {
+        service.createNote(`Nouvelle ${i}`, 'Contenu');
+      }
+      await service.flush();
+
+      const backups = backupService.listBackups();
+      expect(backups.length).toBe(1);
+      fs.writeFileSync(testDataFile, '');
+      await backupService.restoreBackup(backups[0].id);
+      expect(JSON.parse(fs.readFileSync(testDataFile, 'utf-8')).notes.length).toBe(5);
+      expect(storage.getWriteCount()).toBe(1);
+    });
+  });
+
+  describe('8. Backups incrémentaux (blocs dédupliqués)', () => {
+    const chunksDir = path.join(backupsDir, 'chunks');
+    const countChunks = (): number => fs.existsSync(chunksDir)
+      ? fs.readdirSync(chunksDir)
+        .filter(prefix => !prefix.startsWith('.'))
+        .reduce((total, prefix) => total + fs.readdirSync(path.join(chunksDir, prefix)).length, 0)
+      : 0;
+    const writeNotes = (count: number, modified: number = -1): string => {
+      const notes = Array.from({ length: count }, (_, i) => ({
+        id: `note-${i}`,
+        title: `Note ${i}`,
+        content: i === modified
+          ? 'Contenu modifié après le premier backup'
+          : `Contenu de la note ${i} : ${crypto.createHash('sha256').update(String(i)).digest('hex')}`,
+        tags: ['test', `groupe-${i % 10}`]
+      }));
+      const text = JSON.stringify({ notes }, null, 2);
+      fs.writeFileSync(testDataFile, text);
+      return text;
+    };
+
+    it('ne devrait écrire que les blocs modifiés depuis le backup précédent', async () => {
+      const original = writeNotes(3000);
+      const first = await backupService.createBackup();
+      const unchanged = await backupService.createBackup();
+      const modified = writeNotes(3000, 1500);
+      const second = await backupService.createBackup();
+
+      expect(first.storedBytes).toBeGreaterThan(0);
+      expect(first.storedBytes!).toBeLessThan(original.length);
+      expect(unchanged.storedBytes).toBe(0);
+      expect(second.storedBytes).toBeGreaterThan(0);
+      expect(second.storedBytes!).toBeLessThan(first.storedBytes! * 0.05);
+
+      await backupService.restoreBackup(first.id);
+      expect(fs.readFileSync(testDataFile, 'utf-8')).toBe(original);
+      await backupService.restoreBackup(second.id);
+      expect(fs.readFileSync(testDataFile, 'utf-8')).toBe(modified);
+    });
+
+    it('devrait supprimer les blocs des anciens backups sans toucher aux blocs partagés', async () => {
+      writeNotes(1000);
+      await backupService.createBackup();
+      writeNotes(1000, 10);
+      await backupService.createBackup();
+      const kept = writeNotes(1000, 900);
+      const last = await backupService.createBackup();
+      const before = countChunks();
+
+      backupService.cleanOldBackups(1);
+
+      expect(countChunks()).toBeLessThan(before);
+      expect(await backupService.verifyBackupIntegrity(last.id)).toBe(true);
+      fs.writeFileSync(testDataFile, '');
+      await backupService.restoreBackup(last.id);
+      expect(fs.readFileSync(testDataFile, 'utf-8')).toBe(kept);
+    });
+
+    it('devrait garder les blocs des backups créés par une autre instance', async () => {
+      writeNotes(1000);
+      await backupService.createBackup();
+      const other = new BackupService(testDataFile, backupsDir);
+      const kept = writeNotes(1000, 10);
+      const created = await other.createBackup();
+
+      // Cette instance ne connaît pas le backup de l'autre
+      backupService.cleanOldBackups(0);
+
+      fs.writeFileSync(testDataFile, '');
+      await other.restoreBackup(created.id);
+      expect(fs.readFileSync(testDataFile, 'utf-8')).toBe(kept);
+    });
+
+    it('ne devrait supprimer aucun bloc pendant l\'écriture d\'un backup par une autre instance', async () => {
+      writeNotes(1000);
+      await backupService.createBackup();
+      writeNotes(1000, 10);
+      await backupService.createBackup();
+      const before = countChunks();
+      const marker = path.join(chunksDir, `.writer-${process.pid}-autre`);
+      fs.writeFileSync(marker, String(process.pid));
+
+      backupService.cleanOldBackups(1);
+      expect(countChunks()).toBe(before);
+
+      fs.rmSync(marker);
+      writeNotes(1000, 20);
+      await backupService.createBackup();
+      backupService.cleanOldBackups(1);
+      expect(countChunks()).toBeLessThan(before);
+    });
+
+    it('devrait ignorer le marqueur d\'écriture d\'un processus arrêté', async () => {
+      writeNotes(1000);
+      await backupService.createBackup();
+      writeNotes(1000, 10);
+      await backupService.createBackup();
+      const before = countChunks();
+      // Pid hors des valeurs possibles : aucun processus actif
+      const marker = path.join(chunksDir, '.writer-0-arrete');
+      fs.writeFileSync(marker, '99999999');
+
+      backupService.cleanOldBackups(1);
+
+      expect(countChunks()).toBeLessThan(before);
+      expect(fs.existsSync(marker)).toBe(false);
+    });
+
+    it('devrait découper de la même façon quelle que soit la taille des lectures', () => {
+      const content = Buffer.from(writeNotes(2000));
+      const split = (blockSize: number): string[] => {
+        const chunker = new ContentChunker();
+        const chunks: Buffer[] = [];
+        for (let i = 0; i < content.length; i += blockSize) {
+          chunks.push(...chunker.push(content.subarray(i, i + blockSize)));
+        }
+        chunks.push(...chunker.end());
+        return chunks.map(chunk => crypto.createHash('sha256').update(chunk).digest('hex'));
+      };
+
+      const whole = split(content.length);
+      expect(whole.length).toBeGreaterThan(10);
+      expect(split(1000)).toEqual(whole);
+      expect(split(64 * 1024)).toEqual(whole);
+    });
+
+    it('devrait détecter un bloc manquant', async () => {
+      writeNotes(500);
+      const metadata = await backupService.createBackup();
+      const manifest = JSON.parse(fs.readFileSync(metadata.filePath, 'utf-8'));
+      const chunk: string = manifest.chunks[1];
+      fs.unlinkSync(path.join(chunksDir, chunk.slice(0, 2), `${chunk}.gz`));
+
+      expect(await backupService.verifyBackupIntegrity(metadata.id)).toBe(false);
+      await expect(backupService.restoreBackup(metadata.id)).rejects.toThrow('corrompu');
+    });
+
+    it('devrait toujours restaurer les anciens backups en copie complète', async () => {
+      const original = fs.readFileSync(testDataFile, 'utf-8');
+      const copyPath = path.join(backupsDir, 'backup_ancien.json');
+      fs.copyFileSync(testDataFile, copyPath);
+      const checksum = crypto.createHash('sha256').update(fs.readFileSync(copyPath)).digest('hex');
+      fs.writeFileSync(path.join(backupsDir, 'backups-metadata.json'), JSON.stringify([
+        { id: 'backup_ancien', timestamp: new Date(), checksum, notesCount: 2, filePath: copyPath }
+      ]));
+      const reloaded = new BackupService(testDataFile, backupsDir);
+      fs.writeFileSync(testDataFile, '[]');
+
+      expect(await reloaded.verifyBackupIntegrity('backup_ancien')).toBe(true);
+      await reloaded.restoreBackup('backup_ancien');
+      expect(fs.readFileSync(testDataFile, 'utf-8')).toBe(original);
+    });
+  });
+
+  describe('9. Compression des backups', () => {
+    const codecs: CompressionCodec[] = ['none', 'gzip', 'brotli', 'zstd'];
+    let original: string;
+
+    beforeEach(() => {
+      const notes = Array.from({ length: 500 }, (_, i) => ({ id: `${i}`, title: `Note ${i}`, content: `Contenu de la note ${i}`, tags: ['test'] }));
+      original = JSON.stringify({ notes }, null, 2);
+      fs.writeFileSync(testDataFile, original);
+    });
+
+    codecs.filter(isCodecAvailable).forEach(codec => {
+      it(`devrait restaurer un backup compressé avec ${codec}`, async () => {
+        const service = new BackupService(testDataFile, backupsDir, { compression: codec });
+        const metadata = await service.createBackup();
+        fs.writeFileSync(testDataFile, '[]');
+
+        expect(metadata.compression?.codec).toBe(codec);
+        expect(metadata.compression?.level).toBeDefined();
+        if (codec !== 'none') {
+          expect(metadata.storedBytes!).toBeLessThan(original.length / 3);
+        }
+        expect(await service.verifyBackupIntegrity(metadata.id)).toBe(true);
+        await service.restoreBackup(metadata.id);
+        expect(fs.readFileSync(testDataFile, 'utf-8')).toBe(original);
+        service.clearAllBackups();
+      });
+    });
+
+    it('devrait détecter un bloc compressé altéré à la vérification et à la restauration', async () => {
+      const metadata = await backupService.createBackup();
+      const manifest = JSON.parse(fs.readFileSync(metadata.filePath, 'utf-8'));
+      const chunk: string = manifest.chunks[0];
+      const chunkPath = path.join(backupsDir, 'chunks', chunk.slice(0, 2), `${chunk}.gz`);
+      const bytes = fs.readFileSync(chunkPath);
+      bytes[bytes.length - 10] ^= 0xff;
+      fs.writeFileSync(chunkPath, bytes);
+
+      expect(await backupService.verifyBackupIntegrity(metadata.id)).toBe(false);
+      await expect(backupService.restoreBackup(metadata.id)).rejects.toThrow('corrompu');
+      expect(fs.readFileSync(testDataFile, 'utf-8')).toBe(original);
+    });
+
+    it('devrait vérifier les blocs tels qu\'ils sont stockés, sans les décompresser', async () => {
+      const metadata = await backupService.createBackup();
+      const manifest = JSON.parse(fs.readFileSync(metadata.filePath, 'utf-8'));
+      expect(manifest.storedHashes.length).toBe(manifest.chunks.length);
+      // Même contenu, recompressé autrement : les octets stockés ne sont plus ceux du backup
+      const chunk: string = manifest.chunks[0];
+      const chunkPath = path.join(backupsDir, 'chunks', chunk.slice(0, 2), `${chunk}.gz`);
+      fs.writeFileSync(chunkPath, zlib.gzipSync(zlib.gunzipSync(fs.readFileSync(chunkPath)), { level: 1 }));
+
+      expect(await backupService.verifyBackupIntegrity(metadata.id)).toBe(false);
+      expect(await backupService.restoreBackup(metadata.id)).toBe(true);
+    });
+
+    it('devrait réécrire un bloc tronqué au lieu de le réutiliser', async () => {
+      const first = await backupService.createBackup();
+      const manifest = JSON.parse(fs.readFileSync(first.filePath, 'utf-8'));
+      const chunk: string = manifest.chunks[1];
+      const chunkPath = path.join(backupsDir, 'chunks', chunk.slice(0, 2), `${chunk}.gz`);
+      fs.truncateSync(chunkPath, 10);
+
+      const reloaded = new BackupService(testDataFile, backupsDir);
+      const second = await reloaded.createBackup();
+      fs.writeFileSync(testDataFile, '[]');
+
+      expect(second.storedBytes).toBeGreaterThan(0);
+      expect(await reloaded.verifyBackupIntegrity(second.id)).toBe(true);
+      await reloaded.restoreBackup(second.id);
+      expect(fs.readFileSync(testDataFile, 'utf-8')).toBe(original);
+    });
+
+    it('devrait écrire une seule fois les blocs de backups simultanés', async () => {
+      const alone = new BackupService(testDataFile, path.join(backupsDir, 'seul'));
+      const expected = (await alone.createBackup()).storedBytes!;
+      const [first, second] = await Promise.all([backupService.createBackup(), backupService.createBackup()]);
+
+      // Chaque bloc compté par un seul des deux backups
+      expect(first.storedBytes! + second.storedBytes!).toBe(expected);
+      expect(await backupService.verifyBackupIntegrity(first.id)).toBe(true);
+      expect(await backupService.verifyBackupIntegrity(second.id)).toBe(true);
+    });
+
+    it('devrait refuser un niveau de compression invalide', () => {
+      expect(() => new BackupService(testDataFile, backupsDir, { compression: 'gzip', compressionLevel: 12 })).toThrow('Niveau de compression invalide');
+    });
+  });
+
+  describe('10. Planification des backups', () => {
+    /**
+     * Runner dont chaque backup se termine à la demande
+     */
+    class ManualRunner implements BackupRunner {
+      public started = 0;
+      public fail = false;
+      private finishers: Array<() => void> = [];
+
+      public run(): Promise<IBackupMetadata> {
+        this.started++;
+        return new Promise((resolve, reject) => {
+          this.finishers.push(() => this.fail
+            ? reject(new Error('disque plein'))
+            : resolve({ id: `${this.started}` } as IBackupMetadata));
+        });
+      }
+
+      public async finish(): Promise<void> {
+        this.finishers.shift()?.();
+        await new Promise(resolve => setImmediate(resolve));
+      }
+
+      public async close(): Promise<void> {
+        // Rien à libérer
+      }
+    }
+
+    it('devrait déclencher un backup après le nombre de modifications', async () => {
+      const runner = new ManualRunner();
+      const scheduler = new BackupScheduler(runner, { everyModifications: 3 });
+
+      scheduler.recordModifications(2);
+      expect(runner.started).toBe(0);
+      scheduler.recordModifications(1);
+      expect(runner.started).toBe(1);
+      await runner.finish();
+      await scheduler.whenIdle();
+
+      expect(scheduler.getStatistics()).toEqual({ completed: 1, failed: 0, skipped: 0 });
+      expect(scheduler.getPendingModifications()).toBe(0);
+    });
+
+    it('devrait ignorer les déclenchements pendant un backup et n\'en relancer qu\'un', async () => {
+      const runner = new ManualRunner();
+      const scheduler = new BackupScheduler(runner, { everyModifications: 1 });
+
+      for (let i = 0; i < 10; i++) {
+        scheduler.recordModifications(1);
+      }
+      expect(runner.started).toBe(1);
+      expect(scheduler.getStatistics().skipped).toBe(9);
+
+      // Les 9 modifications suivantes sont dans un seul backup de rattrapage
+      await runner.finish();
+      expect(runner.started).toBe(2);
+      expect(scheduler.getPendingModifications()).toBe(0);
+      await runner.finish();
+      await scheduler.whenIdle();
+      expect(runner.started).toBe(2);
+    });
+
+    it('devrait garder les modifications d\'un backup échoué pour le suivant', async () => {
+      const runner = new ManualRunner();
+      const scheduler = new BackupScheduler(runner, { everyModifications: 2 });
+      runner.fail = true;
+      const errorSpy = jest.spyOn(console, 'error').mockImplementation(() => undefined);
+
+      scheduler.recordModifications(2);
+      await runner.finish();
+      await scheduler.whenIdle();
+      errorSpy.mockRestore();
+
+      // Pas de nouvelle tentative immédiate : au prochain déclenchement
+      expect(runner.started).toBe(1);
+      expect(scheduler.getStatistics().failed).toBe(1);
+      expect(scheduler.getPendingModifications()).toBe(2);
+      runner.fail = false;
+      scheduler.recordModifications(1);
+      expect(runner.started).toBe(2);
+      await runner.finish();
+      await scheduler.stop();
+    });
+
+    it('devrait déclencher un backup périodique seulement après des modifications', async () => {
+      const runner = new ManualRunner();
+      const scheduler = new BackupScheduler(runner, { intervalMs: 10 });
+
+      await new Promise(resolve => setTimeout(resolve, 50));
+      expect(runner.started).toBe(0);
+      scheduler.recordModifications(1);
+      await new Promise(resolve => setTimeout(resolve, 50));
+      expect(runner.started).toBe(1);
+      await runner.finish();
+      await scheduler.stop();
+
+      scheduler.recordModifications(1);
+      await new Promise(resolve => setTimeout(resolve, 50));
+      expect(runner.started).toBe(1);
+    });
+
+    it('devrait planifier les backups du service de notes jusqu\'à sa fermeture', async () => {
+      const service = new NoteService(new NoteRepository(), new JsonStorage(testDataFile), new SearchEngine(), backupService);
+      service.configureAutoBackup(2, 2, { runner: createBackupRunner(backupService) });
+
+      for (let i = 0; i < 10; i++) {
+        service.createNote(`Nouvelle ${i}`, 'Contenu');
+      }
+      await service.close();
+
+      expect(service.getBackupScheduler()).toBeUndefined();
+      const backups = backupService.listBackups();
+      expect(backups.length).toBeGreaterThan(0);
+      expect(backups.length).toBeLessThanOrEqual(2);
+      fs.writeFileSync(testDataFile, '');
+      await backupService.restoreBackup(backups[0].id);
+      expect(JSON.parse(fs.readFileSync(testDataFile, 'utf-8')).notes.length).toBe(12);
+    });
+
+    it('devrait exécuter les backups dans un thread séparé', async () => {
+      const runner = new WorkerBackupRunner(backupService);
+      try {
+        const metadata = await runner.run(5);
+
+        // Liste relue par le thread principal après le backup
+        expect(backupService.listBackups().map(backup => backup.id)).toEqual([metadata.id]);
+        expect(await backupService.verifyBackupIntegrity(metadata.id)).toBe(true);
+      } finally {
+        await runner.close();
+      }
+    }, 30000);
+
+    it('devrait laisser le journal des modifications au thread qui l\'écrit', async () => {
+      const logService = new BackupService(testDataFile, backupsDir, { pointInTime: true, mutationLogSegmentBytes: 100 });
+      const service = new NoteService(new NoteRepository(), new JsonStorage(testDataFile), new SearchEngine(), logService);
+      const mutationsDir = path.join(backupsDir, 'mutations');
+      for (let i = 0; i < 3; i++) {
+        service.createNote(`Note ${i}`, 'Contenu');
+      }
+      const segments = fs.readdirSync(mutationsDir).sort();
+      const old = new Date(Date.now() - 60000);
+      segments.forEach(name => fs.utimesSync(path.join(mutationsDir, name), old, old));
+      const runner = new WorkerBackupRunner(logService);
+
+      try {
+        await runner.run(1);
+        await runner.run(1);
+      } finally {
+        await runner.close();
+      }
+
+      // Segments anciens supprimés par le thread principal, sauf celui où il écrit
+      expect(fs.readdirSync(mutationsDir)).toEqual([segments[2]]);
+      service.createNote('Après', 'Contenu');
+      const { notes } = await logService.readNotesAt(new Date());
+      expect(notes.length).toBe(6);
+    }, 30000);
+
+    it('devrait refuser une planification invalide', () => {
+      expect(() => new BackupScheduler(new ManualRunner(), { intervalMs: 0 })).toThrow('Intervalle de backup invalide');
+    });
+  });
+
+  describe('11. Restauration à une date', () => {
+    const pause = (): Promise<void> => new Promise(resolve => setTimeout(resolve, 5));
+    const titles = (): string[] => JSON.parse(fs.readFileSync(testDataFile, 'utf-8')).notes
+      .map((note: { title: string }) => note.title).sort();
+    let service: NoteService;
+
+    beforeEach(() => {
+      fs.writeFileSync(testDataFile, JSON.stringify({ notes: [] }));
+      backupService = new BackupService(testDataFile, backupsDir, { pointInTime: true });
+      service = new NoteService(new NoteRepository(), new JsonStorage(testDataFile), new SearchEngine(), backupService);
+    });
+
+    it('ne devrait rien journaliser sans l\'option pointInTime', async () => {
+      const plainBackups = new BackupService(testDataFile, path.join(testDataDir, 'backups-simples'));
+      const plain = new NoteService(new NoteRepository(), new JsonStorage(testDataFile), new SearchEngine(), plainBackups);
+      plain.createNote('Note', 'Contenu');
+      await plainBackups.createBackup();
+
+      expect(fs.existsSync(path.join(testDataDir, 'backups-simples', 'mutations'))).toBe(false);
+      await expect(plainBackups.readNotesAt(new Date())).rejects.toThrow('non configurée');
+      await expect(plain.restoreToPointInTime(new Date())).rejects.toThrow('ne permet pas la restauration à une date');
+      plainBackups.clearAllBackups();
+    });
+
+    it('devrait restaurer l\'état entre deux backups en rejouant le journal', async () => {
+      const first = service.createNote('Première', 'Contenu');
+      const second = service.createNote('Seconde', 'Contenu');
+      // Les modifications de la milliseconde du début du backup sont rejouées
+      await pause();
+      await backupService.createBackup();
+      await pause();
+
+      service.updateNote(first.getId(), { title: 'Première modifiée' });
+      service.createNote('Troisième', 'Contenu');
+      await pause();
+      const afterCreate = new Date();
+      await pause();
+      await service.deleteNote(second.getId());
+      await pause();
+      const afterDelete = new Date();
+      await pause();
+
+      const result = await backupService.restoreToPointInTime(afterCreate);
+
+      expect(result.replayed).toBe(2);
+      expect(titles()).toEqual(['Première modifiée', 'Seconde', 'Troisième']);
+      await backupService.restoreToPointInTime(afterDelete);
+      expect(titles()).toEqual(['Première modifiée', 'Troisième']);
+    });
+
+    it('devrait partir du dernier backup antérieur sans relire tout le journal', async () => {
+      for (let i = 0; i < 3; i++) {
+        service.createNote(`Note ${i}`, 'Contenu');
+        await pause();
+        await backupService.createBackup();
+        await pause();
+      }
+      service.createNote('Après', 'Contenu');
+
+      const result = await backupService.restoreToPointInTime(new Date());
+
+      expect(result.backup.id).toBe(backupService.listBackups()[0].id);
+      expect(result.replayed).toBe(1);
+      expect(titles()).toEqual(['Après', 'Note 0', 'Note 1', 'Note 2']);
+    });
+
+    it('devrait journaliser la restauration elle-même', async () => {
+      service.createNote('Avant', 'Contenu');
+      await backupService.createBackup();
+      await pause();
+      const beforeChanges = new Date();
+      await pause();
+      service.createNote('Annulée', 'Contenu');
+      await backupService.restoreToPointInTime(beforeChanges);
+      await pause();
+
+      // La note annulée par la restauration ne réapparaît pas
+      await backupService.restoreToPointInTime(new Date());
+      expect(titles()).toEqual(['Avant']);
+    });
+
+    it('devrait recharger le service restauré : la sauvegarde suivante ne l\'écrase pas', async () => {
+      const kept = service.createNote('Gardée', 'Contenu');
+      await pause();
+      await backupService.createBackup();
+      await pause();
+      const beforeChanges = new Date();
+      await pause();
+      service.createNote('Annulée', 'Contenu');
+
+      const result = await service.restoreToPointInTime(beforeChanges);
+      service.updateNote(kept.getId(), { content: 'Modifiée après la restauration' });
+
+      expect(result.replayed).toBe(0);
+      expect(service.getAllNotes().map(note => note.getTitle())).toEqual(['Gardée']);
+      expect(service.searchNotes('Annulée')).toEqual([]);
+      expect(titles()).toEqual(['Gardée']);
+      // Journal cohérent avec le service : l'état courant se restaure à l'identique
+      await pause();
+      const { notes } = await backupService.readNotesAt(new Date());
+      expect(notes.map(note => [note.getTitle(), note.getContent()])).toEqual([['Gardée', 'Modifiée après la restauration']]);
+    });
+
+    it('ne devrait comparer que les notes modifiées à chaque sauvegarde', async () => {
+      const notes = Array.from({ length: 50 }, (_, i) => service.createNote(`Note ${i}`, 'Contenu'));
+      const tracked = jest.spyOn(NoteChangeTracker.prototype, 'diff');
+      try {
+        service.updateNote(notes[10].getId(), { content: 'Modifiée' });
+        await service.deleteNote(notes[20].getId());
+        expect(tracked).not.toHaveBeenCalled();
+      } finally {
+        tracked.mockRestore();
+      }
+      await pause();
+      await backupService.createBackup();
+
+      const { notes: restored } = await backupService.readNotesAt(new Date());
+      expect(restored.length).toBe(49);
+      expect(restored.find(note => note.getId() === notes[10].getId())?.getContent()).toBe('Modifiée');
+    });
+
+    it('devrait décoder un backup au format binaire et restaurer dans ce format', async () => {
+      const binaryFile = path.join(testDataDir, 'notes.bin');
+      const binaryBackups = new BackupService(binaryFile, path.join(testDataDir, 'backups-bin'), { pointInTime: true });
+      const binary = new NoteService(new NoteRepository(), new BinaryStorage(binaryFile), new SearchEngine(), binaryBackups);
+      binary.createNote('Avant', 'Contenu');
+      await pause();
+      const metadata = await binaryBackups.createBackup();
+      await pause();
+      binary.createNote('Après', 'Contenu');
+
+      expect(metadata.dataFormat).toBe('binary');
+      const { notes } = await binaryBackups.readNotesAt(new Date());
+      expect(notes.map(note => note.getTitle()).sort()).toEqual(['Après', 'Avant']);
+      await binaryBackups.restoreToPointInTime(new Date());
+      expect(new BinaryStorage(binaryFile).load().length).toBe(2);
+      binaryBackups.clearAllBackups();
+    });
+
+    it('devrait refuser la restauration à une date depuis l\'instantané d\'un journal', async () => {
+      const walFile = path.join(testDataDir, 'notes-wal.json');
+      const walBackups = new BackupService(walFile, path.join(testDataDir, 'backups-wal'), { pointInTime: true });
+      const storage = new WalStorage(walFile);
+      const wal = new NoteService(new NoteRepository(), storage, new SearchEngine(), walBackups);
+      wal.createNote('Note', 'Contenu');
+      await storage.compact();
+      const metadata = await walBackups.createBackup();
+
+      expect(metadata.dataFormat).toBe('wal');
+      await expect(walBackups.readNotesAt(new Date())).rejects.toThrow('instantané d\'un journal');
+      walBackups.clearAllBackups();
+    });
+
+    it('devrait refuser une date antérieure à tous les backups', async () => {
+      const before = new Date(Date.now() - 1000);
+      await backupService.createBackup();
+
+      await expect(backupService.restoreToPointInTime(before)).rejects.toThrow('Aucun backup antérieur');
+    });
+
+    it('devrait supprimer les segments du journal antérieurs aux backups conservés', async () => {
+      const logService = new BackupService(testDataFile, backupsDir, { pointInTime: true, mutationLogSegmentBytes: 100 });
+      const logged = new NoteService(new NoteRepository(), new JsonStorage(testDataFile), new SearchEngine(), logService);
+      const mutationsDir = path.join(backupsDir, 'mutations');
+      for (let i = 0; i < 5; i++) {
+        logged.createNote(`Note ${i}`, 'Contenu');
+      }
+      const segments = fs.readdirSync(mutationsDir);
+      expect(segments.length).toBe(5);
+      // Segments écrits bien avant les backups
+      const old = new Date(Date.now() - 60000);
+      segments.slice(0, 4).forEach(name => fs.utimesSync(path.join(mutationsDir, name), old, old));
+
+      await logService.createBackup();
+      await logService.createBackup();
+      logService.cleanOldBackups(1);
+
+      expect(fs.readdirSync(mutationsDir)).toEqual([segments[4]]);
+      await logService.restoreToPointInTime(new Date());
+      expect(titles().length).toBe(5);
+    });
+  });
 });
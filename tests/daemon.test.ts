@@ -0,0 +1,205 @@
+import * as fs from 'fs';
+import * as net from 'net';
+import * as os from 'os';
+import * as path from 'path';
+import { Readable, Writable } from 'stream';
+import { CLIController } from '../src/controllers/CLIController';
+import { forwardToDaemon } from '../src/daemon/DaemonClient';
+import { CommandRunner, NoteDaemon } from '../src/daemon/NoteDaemon';
+import { NoteRepository } from '../src/repositories/NoteRepository';
+import { SearchEngine } from '../src/search/SearchEngine';
+import { NoteService } from '../src/services/NoteService';
+import { JsonStorage } from '../src/storage/JsonStorage';
+
+describe('Serveur local (notes serve)', () => {
+  let testDir: string;
+  let socketPath: string;
+  let service: NoteService;
+  let daemon: NoteDaemon;
+
+  /**
+   * Sous-ensemble des commandes, sans commander : create <titre> <contenu>,
+   * list, batch
+   */
+  const run: CommandRunner = async (argv, _cwd, output, input) => {
+    const controller = new CLIController(service, output);
+    switch (argv[0]) {
+      case 'create':
+        controller.createNote(argv[1], argv[2], []);
+        return 0;
+      case 'list':
+        await controller.listNotes({ format: 'ndjson' });
+        return 0;
+      case 'batch':
+        await controller.runBatch(input!);
+        return controller.hasFailed() ? 1 : 0;
+      case 'crash':
+        throw new Error('panne simulée');
+      default:
+        controller.reportError(`Commande inconnue: ${argv[0]}`);
+        return 1;
+    }
+  };
+
+  /**
+   * Sortie qui accumule le texte reçu, éventuellement lentement
+   */
+  const capture = (delayMs: number = 0): Writable & { text: string } => {
+    const output = new Writable({
+      highWaterMark: 1024,
+      write(chunk, _encoding, callback) {
+        output.text += chunk.toString();
+        setTimeout(callback, delayMs);
+      }
+    }) as Writable & { text: string };
+    output.text = '';
+    return output;
+  };
+
+  const forward = async (argv: string[], stdout = capture(), stderr = capture(), stdin?: Readable) => {
+    const code = await forwardToDaemon(socketPath, argv, testDir, stdout, stderr, stdin);
+    return { code, out: stdout.text, err: stderr.text };
+  };
+
+  beforeEach(async () => {
+    testDir = fs.mkdtempSync(path.join(os.tmpdir(), 'notes-daemon-'));
+    socketPath = path.join(testDir, '.notes.sock');
+    service = new NoteService(new NoteRepository(), new JsonStorage(path.join(testDir, 'notes.json')), new SearchEngine());
+    daemon = new NoteDaemon(socketPath, run);
+    await daemon.listen();
+  });
+
+  afterEach(async () => {
+    await daemon.close();
+    fs.rmSync(testDir, { recursive: true, force: true });
+  });
+
+  describe('1. Transmission des commandes', () => {
+    it('devrait exécuter les commandes sur les notes gardées en mémoire', async () => {
+      const created = await forward(['create', 'Titre', 'Contenu']);
+      expect(created.code).toBe(0);
+      expect(created.out).toContain('Note créée');
+
+      const listed = await forward(['list']);
+      expect(listed.code).toBe(0);
+      expect(JSON.parse(listed.out.trim()).title).toBe('Titre');
+    });
+
+    it('devrait transmettre les erreurs et le code de sortie', async () => {
+      const unknown = await forward(['inconnue']);
+      expect(unknown.code).toBe(1);
+      expect(unknown.err).toContain('Commande inconnue');
+
+      const crashed = await forward(['crash']);
+      expect(crashed.code).toBe(1);
+      expect(crashed.err).toContain('panne simulée');
+    });
+
+    it('devrait exécuter les commandes simultanées l\'une après l\'autre', async () => {
+      const results = await Promise.all(
+        Array.from({ length: 10 }, (_, i) => forward(['create', `Note ${i}`, 'Contenu']))
+      );
+
+      expect(results.every(result => result.code === 0)).toBe(true);
+      expect(service.getNotesCount()).toBe(10);
+    });
+
+    it('devrait transmettre l\'entrée standard à batch', async () => {
+      const operations = Array.from({ length: 2000 }, (_, i) =>
+        `${JSON.stringify({ op: 'create', title: `Note ${i}`, content: 'Contenu '.repeat(20) })}\n`);
+
+      const result = await forward(['batch'], capture(), capture(), Readable.from(operations));
+
+      expect(result.code).toBe(0);
+      expect(result.out.trim().split('\n').length).toBe(2000);
+      expect(result.err).toContain('2000 opération(s) appliquée(s)');
+      expect(service.getNotesCount()).toBe(2000);
+    });
+
+    it('devrait suivre le rythme d\'un lecteur lent', async () => {
+      service.beginTransaction();
+      for (let i = 0; i < 3000; i++) {
+        service.createNote(`Note ${i}`, 'Contenu '.repeat(20));
+      }
+      service.commit();
+
+      const listed = await forward(['list'], capture(1));
+
+      expect(listed.out.trim().split('\n').length).toBe(3000);
+    });
+  });
+
+  describe('3. Clients déconnectés', () => {
+    const createMany = (count: number): void => {
+      service.beginTransaction();
+      for (let i = 0; i < count; i++) {
+        service.createNote(`Note ${i}`, 'Contenu '.repeat(20));
+      }
+      service.commit();
+    };
+
+    it('devrait abandonner une liste dont le client se déconnecte sans bloquer les suivants', async () => {
+      createMany(5000);
+
+      // Client qui ne lit pas : le serveur attend que le socket se vide, puis le client part
+      const socket = net.connect(socketPath);
+      await new Promise(resolve => socket.once('connect', resolve));
+      socket.pause();
+      socket.write(`${JSON.stringify({ argv: ['list'], cwd: testDir })}\n`);
+      await new Promise(resolve => setTimeout(resolve, 100));
+      socket.destroy();
+
+      const created = await forward(['create', 'Après', 'Contenu']);
+      expect(created.code).toBe(0);
+      expect(service.getNotesCount()).toBe(5001);
+    });
+
+    it('devrait s\'arrêter sans erreur quand la sortie du client se ferme (EPIPE)', async () => {
+      createMany(5000);
+      const closed = new Writable({
+        write(_chunk, _encoding, callback) {
+          callback(Object.assign(new Error('write EPIPE'), { code: 'EPIPE' }));
+        }
+      });
+
+      expect(await forwardToDaemon(socketPath, ['list'], testDir, closed, capture())).toBe(0);
+      expect((await forward(['create', 'Après', 'Contenu'])).code).toBe(0);
+    });
+
+    it('devrait n\'exécuter un batch qu\'une fois son entrée reçue en entier', async () => {
+      // Saisie au terminal : l'entrée reste ouverte
+      const typing = new Readable({ read: () => undefined });
+      typing.push(`${JSON.stringify({ op: 'create', title: 'Saisie', content: 'Contenu' })}\n`);
+      const batch = forward(['batch'], capture(), capture(), typing);
+
+      await new Promise(resolve => setTimeout(resolve, 50));
+      expect((await forward(['create', 'Autre client', 'Contenu'])).code).toBe(0);
+      expect(service.getNotesCount()).toBe(1);
+
+      typing.push(null);
+      expect((await batch).code).toBe(0);
+      expect(service.getNotesCount()).toBe(2);
+    });
+  });
+
+  describe('2. Démarrage et repli', () => {
+    it('devrait laisser la commande s\'exécuter localement sans serveur', async () => {
+      await daemon.close();
+
+      expect(await forwardToDaemon(socketPath, ['list'], testDir, capture(), capture())).toBeUndefined();
+      expect(await forwardToDaemon(path.join(testDir, 'absent.sock'), ['list'], testDir, capture(), capture())).toBeUndefined();
+    });
+
+    it('devrait refuser un second serveur et remplacer un socket abandonné', async () => {
+      await expect(new NoteDaemon(socketPath, run).listen()).rejects.toThrow('déjà actif');
+
+      await daemon.close();
+      if (process.platform !== 'win32') {
+        fs.writeFileSync(socketPath, '');
+      }
+      daemon = new NoteDaemon(socketPath, run);
+      await daemon.listen();
+      expect(await NoteDaemon.isAlive(socketPath)).toBe(true);
+    });
+  });
+});
@@ -6,6 +6,9 @@ import { JsonStorage } from '../src/storage/JsonStorage';
 import { SearchEngine } from '../src/search/SearchEngine';
 import { NoteService } from '../src/services/NoteService';
 import { NoteFactory } from '../src/factories/NoteFactory';
+import { CLIController } from '../src/controllers/CLIController';
+import { Readable, Writable } from 'stream';
+import { IBackupService } from '../src/interfaces/IBackupService';
 
 describe('Architecture Orientée Objet - Tests Fonctionnels', () => {
   const testDataPath = path.join(__dirname, 'test-notes.json');
@@ -116,6 +119,91 @@ describe('Architecture Orientée Objet - Tests Fonctionnels', () => {
 
       expect(found).toBeUndefined();
     });
+
+    test('Doit paginer les notes triées par titre avec un curseur', () => {
+      ['Delta', 'alpha', 'Charlie', 'bravo', 'Echo'].forEach(title => service.createNote(title, 'Contenu'));
+
+      const first = service.getNotesPage('title', undefined, 2);
+      expect(first.notes.map(note => note.getTitle())).toEqual(['alpha', 'bravo']);
+
+      // Une note ajoutée avant le curseur ne décale pas les pages suivantes
+      service.createNote('Aaron', 'Contenu');
+      const second = service.getNotesPage('title', first.nextCursor, 2);
+      expect(second.notes.map(note => note.getTitle())).toEqual(['Charlie', 'Delta']);
+
+      const last = service.getNotesPage('title', second.nextCursor, 2);
+      expect(last.notes.map(note => note.getTitle())).toEqual(['Echo']);
+      expect(last.nextCursor).toBeUndefined();
+      expect(service.getNotesCount()).toBe(6);
+    });
+
+    test('Doit lister une tranche triée en NDJSON', async () => {
+      ['Charlie', 'alpha', 'bravo', 'delta'].forEach(title => service.createNote(title, 'Contenu'));
+      let text = '';
+      const output = new Writable({
+        write(chunk, _encoding, callback) {
+          text += chunk.toString();
+          callback();
+        }
+      });
+
+      await new CLIController(service).listNotes({ sort: 'title', descending: true, offset: 1, limit: 2, format: 'ndjson' }, output);
+
+      const lines = text.trim().split('\n').map(line => JSON.parse(line));
+      expect(lines.map(note => note.title)).toEqual(['Charlie', 'bravo']);
+      expect(lines[0].id).toBeDefined();
+    });
+
+    test('Doit respecter la contre-pression d\'un lecteur lent', async () => {
+      service.beginTransaction();
+      for (let i = 0; i < 2000; i++) {
+        service.createNote(`Note ${i}`, 'Contenu '.repeat(40));
+      }
+      service.commit();
+      let lines = 0;
+      let maxBuffered = 0;
+      const output = new Writable({
+        highWaterMark: 1024,
+        write(chunk, _encoding, callback) {
+          lines += chunk.toString().split('\n').length - 1;
+          setTimeout(callback, 1);
+        }
+      });
+      const write = output.write.bind(output);
+      output.write = ((chunk: string) => {
+        const result = write(chunk);
+        maxBuffered = Math.max(maxBuffered, output.writableLength);
+        return result;
+      }) as typeof output.write;
+
+      await new CLIController(service).listNotes({ format: 'ndjson' }, output);
+      await new Promise(resolve => output.end(resolve));
+
+      expect(lines).toBe(2000);
+      // Jamais plus d'un bloc en attente dans le flux
+      expect(maxBuffered).toBeLessThanOrEqual(128 * 1024);
+    });
+
+    test('Doit replacer une note modifiée dans l\'ordre de modification', () => {
+      const repository = new NoteRepository();
+      const notes = [1, 2, 3].map(i => Note.fromJSON({
+        id: `n${i}`, title: `Note ${i}`, content: '', tags: [],
+        createdAt: new Date(2024, 0, i), updatedAt: new Date(2024, 0, i)
+      }));
+      notes.forEach(note => repository.add(note));
+      expect(Array.from(repository.scan('updatedAt', true)).map(note => note.getId())).toEqual(['n3', 'n2', 'n1']);
+      expect(Array.from(repository.scan('updatedAt', true, 1)).map(note => note.getId())).toEqual(['n2', 'n1']);
+      expect(Array.from(repository.scan(undefined, false, 2)).map(note => note.getId())).toEqual(['n3']);
+
+      notes[0].setTitle('Note 1 modifiée');
+      repository.update('n1', notes[0]);
+      repository.remove('n2');
+
+      expect(Array.from(repository.scan('updatedAt', true)).map(note => note.getId())).toEqual(['n1', 'n3']);
+      expect(repository.findPage('createdAt', undefined, 10).notes.map(note => note.getId())).toEqual(['n1', 'n3']);
+      expect(() => repository.findPage('createdAt', 'invalide', 10)).toThrow('Curseur invalide');
+      expect(repository.count()).toBe(2);
+    });
   });
 
   describe('Fonctionnalité: Associer des étiquettes (tags)', () => {
@@ -405,6 +493,170 @@ describe('Architecture Orientée Objet - Tests Fonctionnels', () => {
     });
   });
 
+  describe('Fonctionnalité: Transactions (batch)', () => {
+    test('Doit persister une seule fois pour un lot de créations', async () => {
+      const storage = new JsonStorage(testDataPath);
+      const saveSpy = jest.spyOn(storage, 'save');
+      const batchService = new NoteService(new NoteRepository(), storage, new SearchEngine());
+
+      await batchService.batch(() => {
+        for (let i = 0; i < 100; i++) {
+          batchService.createNote(`Note ${i}`, 'Contenu importé', ['import']);
+        }
+      });
+
+      expect(saveSpy).toHaveBeenCalledTimes(1);
+      expect(batchService.getNotesCount()).toBe(100);
+      expect(batchService.getNotesByTag('import').length).toBe(100);
+    });
+
+    test('Doit compter toutes les modifications pour le backup automatique', () => {
+      const backupService = {
+        incrementModificationCount: jest.fn(),
+        getModificationsSinceLastBackup: () => 0
+      } as unknown as IBackupService;
+      const batchService = new NoteService(
+        new NoteRepository(), new JsonStorage(testDataPath), new SearchEngine(), backupService
+      );
+      batchService.configureAutoBackup(100, 5);
+
+      batchService.beginTransaction();
+      const note = batchService.createNote('Note', 'Contenu');
+      batchService.updateNote(note.getId(), { title: 'Titre' });
+      batchService.createNote('Autre', 'Contenu');
+      batchService.commit();
+
+      expect(backupService.incrementModificationCount).toHaveBeenCalledTimes(3);
+    });
+
+    test('Doit tout annuler si le lot échoue', async () => {
+      const kept = service.createNote('Originale', 'Contenu original', ['garde']);
+      const removed = service.createNote('À supprimer', 'Contenu', ['garde']);
+
+      await expect(service.batch(async () => {
+        service.createNote('Nouvelle', 'Contenu', ['nouveau']);
+        service.updateNote(kept.getId(), { title: 'Modifiée', tags: ['change'] });
+        await service.deleteNote(removed.getId());
+        throw new Error('échec');
+      })).rejects.toThrow('échec');
+
+      expect(service.isInTransaction()).toBe(false);
+      expect(service.getNotesCount()).toBe(2);
+      expect(service.getNoteById(kept.getId())?.getTitle()).toBe('Originale');
+      expect(service.getNotesByTag('garde').length).toBe(2);
+      expect(service.getNotesByTag('nouveau').length).toBe(0);
+      expect(service.searchNotes('originale')[0].getTitle()).toBe('Originale');
+    });
+
+    test('Doit garder les recherches sur l\'état validé jusqu\'au commit', () => {
+      const kept = service.createNote('Originale', 'Contenu original', ['garde']);
+
+      service.beginTransaction();
+      service.updateNote(kept.getId(), { title: 'Modifiée', tags: ['change'] });
+      service.createNote('Nouvelle', 'Contenu', ['nouveau']);
+
+      expect(service.getNoteById(kept.getId())?.getTitle()).toBe('Modifiée');
+      expect(service.searchNotes('modifiée').length).toBe(0);
+      expect(service.searchNotes('originale')[0].getTitle()).toBe('Originale');
+      expect(service.getNotesByTag('garde').length).toBe(1);
+      expect(service.getNotesByTag('nouveau').length).toBe(0);
+
+      service.commit();
+      expect(service.searchNotes('originale').length).toBe(0);
+      expect(service.searchNotes('modifiée')[0].getTitle()).toBe('Modifiée');
+      expect(service.getNotesByTag('nouveau').length).toBe(1);
+    });
+
+    test('Doit ignorer les créations non validées quand les index sont vides', () => {
+      service.beginTransaction();
+      service.createNote('Première', 'Contenu', ['nouveau']);
+
+      expect(service.getNotesByTag('nouveau').length).toBe(0);
+      service.commit();
+      expect(service.getNotesByTag('nouveau').length).toBe(1);
+    });
+
+    test('Doit annuler un remplacement complet de la collection', () => {
+      service.createNote('Note 1', 'Contenu 1');
+      service.createNote('Note 2', 'Contenu 2');
+
+      service.beginTransaction();
+      service.clearAllNotes();
+      service.createNote('Seule', 'Contenu');
+      service.rollback();
+
+      expect(service.getAllNotes().map(n => n.getTitle()).sort()).toEqual(['Note 1', 'Note 2']);
+      expect(service.searchNotes('seule').length).toBe(0);
+    });
+
+    test('Doit refuser une transaction imbriquée', () => {
+      service.beginTransaction();
+
+      expect(() => service.beginTransaction()).toThrow();
+      service.commit();
+    });
+
+    test('Doit appliquer un lot NDJSON avec une seule sauvegarde (notes batch)', async () => {
+      const storage = new JsonStorage(testDataPath);
+      const batchService = new NoteService(new NoteRepository(), storage, new SearchEngine());
+      const existing = batchService.createNote('Existante', 'Contenu', ['ancien']);
+      const saveSpy = jest.spyOn(storage, 'save');
+
+      let results = '';
+      const errors: string[] = [];
+      const controller = new CLIController(batchService, {
+        log: () => undefined,
+        error: message => errors.push(message),
+        stream: new Writable({
+          write(chunk, _encoding, callback) {
+            results += chunk.toString();
+            callback();
+          }
+        })
+      });
+      const operations = [
+        ...Array.from({ length: 50 }, (_, i) => JSON.stringify({ op: 'create', title: `Note ${i}`, content: 'Lot', tags: ['lot'] })),
+        JSON.stringify({ op: 'tag', id: existing.getId(), add: ['nouveau'], remove: ['ancien'] }),
+        JSON.stringify({ op: 'update', id: existing.getId(), title: 'Renommée' }),
+        '',
+        JSON.stringify({ op: 'delete', id: 'inconnu' }),
+        '{invalide'
+      ];
+
+      await controller.runBatch(Readable.from([operations.join('\n')]));
+
+      const lines = results.trim().split('\n').map(line => JSON.parse(line));
+      expect(lines.length).toBe(54);
+      expect(lines.filter(line => line.ok).length).toBe(52);
+      expect(lines[53].line).toBe(55);
+      expect(lines[53].ok).toBe(false);
+      expect(saveSpy).toHaveBeenCalledTimes(1);
+      expect(batchService.getNotesByTag('lot').length).toBe(50);
+      expect(batchService.getNoteById(existing.getId())?.getTags()).toEqual(['nouveau']);
+      expect(batchService.searchNotes('renommée').length).toBe(1);
+      expect(errors[0]).toContain('52 opération(s) appliquée(s)');
+      expect(controller.hasFailed()).toBe(true);
+    });
+
+    test('Doit tout annuler si le lot ne peut être lu', async () => {
+      const errors: string[] = [];
+      const controller = new CLIController(service, {
+        log: () => undefined,
+        error: message => errors.push(message),
+        stream: new Writable({ write: (_chunk, _encoding, callback) => callback() })
+      });
+      const input = new Readable({ read() {} });
+      input.push(`${JSON.stringify({ op: 'create', title: 'Perdue', content: 'Contenu' })}\n`);
+      setTimeout(() => input.destroy(new Error('lecture interrompue')), 10);
+
+      await controller.runBatch(input);
+
+      expect(service.getNotesCount()).toBe(0);
+      expect(service.isInTransaction()).toBe(false);
+      expect(errors.join()).toContain('lecture interrompue');
+    });
+  });
+
   describe('Scénarios d\'utilisation complets', () => {
     test('Scénario: Gestion complète de notes de projet', () => {
       const note1 = service.createNote('Réunion initiale', 'Définir les objectifs', ['projet', 'reunion']);
@@ -1,6 +1,18 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import * as zlib from 'zlib';
 import { SearchEngine } from '../src/search/SearchEngine';
 import { Note } from '../src/models/Note';
 import { INote } from '../src/interfaces/INote';
+import { Trie } from '../src/search/Trie';
+import { BinaryStorage } from '../src/storage/BinaryStorage';
+import { JsonStorage } from '../src/storage/JsonStorage';
+import { NoteRepository } from '../src/repositories/NoteRepository';
+import { NoteService } from '../src/services/NoteService';
+import { WalStorage } from '../src/storage/WalStorage';
+import { BackupService } from '../src/services/BackupService';
+import { CompressionCodec, isCodecAvailable } from '../src/storage/CompressionCodec';
 
 describe('SearchEngine - Performance Tests', () => {
   let searchEngine: SearchEngine;
@@ -148,6 +160,26 @@ describe('SearchEngine - Performance Tests', () => {
       expect(time).toBeLessThan(500);
     });
 
+    it('devrait retourner les 20 meilleurs résultats classés en moins de 100ms', () => {
+      const time = measureExecutionTime(() => {
+        const hits = searchEngine.searchTopK('function', 20);
+        expect(hits.length).toBe(20);
+      });
+
+      console.log(`Top 20 BM25 (5000 notes): ${time.toFixed(2)}ms`);
+      expect(time).toBeLessThan(100);
+    });
+
+    it('devrait évaluer une phrase et des opérateurs booléens en moins de 100ms', () => {
+      const time = measureExecutionTime(() => {
+        const results = searchEngine.search(notes, '"topics related to programming" AND NOT tag:java');
+        expect(results.length).toBeGreaterThan(0);
+      });
+
+      console.log(`Requête booléenne avec phrase (5000 notes): ${time.toFixed(2)}ms`);
+      expect(time).toBeLessThan(100);
+    });
+
     it('devrait rechercher rapidement même avec un grand nombre de notes', () => {
       const time = measureExecutionTime(() => {
         const results = searchEngine.search(notes, 'function');
@@ -375,4 +407,254 @@ describe('SearchEngine - Performance Tests', () => {
       expect(maxTime).toBeLessThan(100);
     });
   });
+
+  describe('10. Recherche approximative', () => {
+    it('devrait tolérer une faute de frappe en moins de 100ms (1000 notes)', () => {
+      notes = generateNotes(1000);
+      searchEngine.buildIndexes(notes);
+
+      const time = measureExecutionTime(() => {
+        const results = searchEngine.search(notes, 'fucntion', { fuzzy: true });
+        expect(results.length).toBeGreaterThan(0);
+      });
+
+      console.log(`Recherche approchée (1000 notes): ${time.toFixed(2)}ms`);
+      expect(time).toBeLessThan(100);
+    });
+
+    it('devrait parcourir un grand dictionnaire sans comparer chaque terme', () => {
+      // Dictionnaire de termes pseudo-aléatoires (pire cas : peu de préfixes communs)
+      const dictionary = new Trie();
+      let seed = 42;
+      const nextChar = (): string => {
+        seed = (Math.imul(seed, 1103515245) + 12345) & 0x7fffffff;
+        return String.fromCharCode(97 + ((seed >>> 8) % 26));
+      };
+      const terms: string[] = [];
+      for (let i = 0; i < 200000; i++) {
+        let term = '';
+        const length = 4 + (i % 7);
+        for (let j = 0; j < length; j++) {
+          term += nextChar();
+        }
+        dictionary.insert(term);
+        if (i % 20000 === 0) {
+          terms.push(term);
+        }
+      }
+
+      const times = terms.map(term => measureExecutionTime(() => {
+        const typo = term.slice(0, -1) + (term.endsWith('z') ? 'y' : 'z');
+        expect(dictionary.fuzzy(typo, 2)).toContain(term);
+      }));
+      const maxTime = Math.max(...times);
+
+      console.log(`Recherche approchée (${dictionary.size()} termes): ${maxTime.toFixed(2)}ms au pire`);
+      expect(maxTime).toBeLessThan(100);
+    });
+  });
+
+  describe('11. Recherche multi-tags à grande échelle', () => {
+    it('devrait intersecter plusieurs tags en moins de 100ms (100 000 notes)', () => {
+      notes = generateNotes(100000);
+      searchEngine.buildIndexes(notes);
+
+      const time = measureExecutionTime(() => {
+        const results = searchEngine.searchMultipleTags(notes, ['javascript', 'typescript'], true);
+        expect(results.length).toBeGreaterThan(0);
+      });
+
+      console.log(`Intersection de tags (100000 notes): ${time.toFixed(2)}ms`);
+      expect(time).toBeLessThan(100);
+    }, 30000);
+  });
+
+  describe('12. Démarrage à froid depuis l\'instantané des index', () => {
+    it('devrait recharger les index plus vite qu\'une reconstruction (20 000 notes)', () => {
+      const snapshotDir = fs.mkdtempSync(path.join(os.tmpdir(), 'notes-index-'));
+      const snapshotPath = path.join(snapshotDir, 'notes.json.idx');
+      notes = generateNotes(20000);
+
+      try {
+        const built = new SearchEngine({ snapshotPath });
+        const buildTime = measureExecutionTime(() => built.buildIndexes(notes));
+        built.saveSnapshot('empreinte');
+
+        const reloaded = new SearchEngine({ snapshotPath });
+        const loadTime = measureExecutionTime(() => {
+          expect(reloaded.loadSnapshot(notes, 'empreinte')).toBe(true);
+        });
+
+        console.log(`Index (20000 notes): reconstruction ${buildTime.toFixed(0)}ms, instantané ${loadTime.toFixed(0)}ms`);
+        expect(loadTime).toBeLessThan(buildTime);
+        expect(reloaded.search(notes, 'function').length).toBe(built.search(notes, 'function').length);
+      } finally {
+        fs.rmSync(snapshotDir, { recursive: true, force: true });
+      }
+    }, 30000);
+  });
+  describe('13. Format binaire des notes', () => {
+    it('devrait être plus compact et plus rapide que JSON (20 000 notes)', () => {
+      const dataDir = fs.mkdtempSync(path.join(os.tmpdir(), 'notes-binary-'));
+      const json = new JsonStorage(path.join(dataDir, 'notes.json'));
+      const binary = new BinaryStorage(path.join(dataDir, 'notes.bin'));
+      notes = generateNotes(20000);
+
+      try {
+        const jsonSave = measureExecutionTime(() => json.save(notes));
+        const binarySave = measureExecutionTime(() => binary.save(notes));
+        let loaded: INote[] = [];
+        const jsonLoad = measureExecutionTime(() => json.load());
+        const binaryLoad = measureExecutionTime(() => { loaded = binary.load(); });
+        const jsonSize = fs.statSync(json.getFilePath()).size;
+        const binarySize = fs.statSync(binary.getFilePath()).size;
+
+        console.log(`JSON: ${(jsonSize / 1024).toFixed(0)} Ko, écriture ${jsonSave.toFixed(0)}ms, lecture ${jsonLoad.toFixed(0)}ms`);
+        console.log(`Binaire: ${(binarySize / 1024).toFixed(0)} Ko, écriture ${binarySave.toFixed(0)}ms, lecture ${binaryLoad.toFixed(0)}ms`);
+        expect(binarySize).toBeLessThan(jsonSize * 0.6);
+        expect(binaryLoad).toBeLessThan(jsonLoad);
+        expect(binarySave).toBeLessThan(jsonSave);
+        expect(loaded.map(note => note.toJSON())).toEqual(notes.map(note => note.toJSON()));
+      } finally {
+        fs.rmSync(dataDir, { recursive: true, force: true });
+      }
+    }, 30000);
+  });
+
+  describe('14. Coût des écritures durables', () => {
+    it('devrait mesurer la latence par écriture en mode durable et rapide', () => {
+      const dataDir = fs.mkdtempSync(path.join(os.tmpdir(), 'notes-durable-'));
+      notes = generateNotes(1000);
+
+      try {
+        (['fast', 'durable'] as const).forEach(writeMode => {
+          const json = new JsonStorage(path.join(dataDir, `${writeMode}.json`), { writeMode });
+          const wal = new WalStorage(path.join(dataDir, `${writeMode}-wal.json`), { writeMode });
+          wal.load();
+          const jsonTime = measureExecutionTime(() => {
+            for (let i = 0; i < 20; i++) {
+              json.save(notes);
+            }
+          }) / 20;
+          const walTime = measureExecutionTime(() => {
+            for (let i = 0; i < 20; i++) {
+              notes[i].setContent(`Modifiée ${writeMode}`);
+              wal.save(notes);
+            }
+          }) / 20;
+
+          console.log(`Écriture ${writeMode} (1000 notes): JsonStorage ${jsonTime.toFixed(2)}ms, WalStorage ${walTime.toFixed(2)}ms`);
+          expect(json.load().length).toBe(1000);
+          expect(new WalStorage(wal.getFilePath()).load().length).toBe(1000);
+        });
+        expect(fs.readdirSync(dataDir).some(file => file.endsWith('.tmp'))).toBe(false);
+      } finally {
+        fs.rmSync(dataDir, { recursive: true, force: true });
+      }
+    }, 30000);
+  });
+
+  describe('15. Démarrage paresseux', () => {
+    it('devrait afficher une note sans construire les index (20 000 notes)', () => {
+      const dataDir = fs.mkdtempSync(path.join(os.tmpdir(), 'notes-startup-'));
+      const dataPath = path.join(dataDir, 'notes.json');
+      notes = generateNotes(20000);
+      new JsonStorage(dataPath).save(notes);
+      const start = (): NoteService =>
+        new NoteService(new NoteRepository(), new JsonStorage(dataPath), new SearchEngine());
+
+      try {
+        let title: string | undefined;
+        const showTime = measureExecutionTime(() => {
+          title = start().getNoteById(notes[123].getId())?.getTitle();
+        });
+        const searchTime = measureExecutionTime(() => {
+          start().searchNotes('javascript');
+        });
+
+        console.log(`Démarrage 20 000 notes: show ${showTime.toFixed(0)}ms, search ${searchTime.toFixed(0)}ms (index construits)`);
+        expect(title).toBe(notes[123].getTitle());
+        expect(showTime).toBeLessThan(searchTime * 0.6);
+      } finally {
+        fs.rmSync(dataDir, { recursive: true, force: true });
+      }
+    }, 30000);
+  });
+
+  describe('16. Compression des backups', () => {
+    it('devrait mesurer la taille et la durée des backups par algorithme (100 000 notes)', async () => {
+      const dataDir = fs.mkdtempSync(path.join(os.tmpdir(), 'notes-compression-'));
+      const dataPath = path.join(dataDir, 'notes.json');
+      notes = generateNotes(100000);
+      new JsonStorage(dataPath).save(notes);
+      const original = fs.readFileSync(dataPath);
+      const codecs = (['none', 'gzip', 'brotli', 'zstd'] as CompressionCodec[]).filter(isCodecAvailable);
+      const sizes: Partial<Record<CompressionCodec, number>> = {};
+
+      try {
+        for (const codec of codecs) {
+          const service = new BackupService(dataPath, path.join(dataDir, `backups-${codec}`), { compression: codec });
+          const backupStart = performance.now();
+          const metadata = await service.createBackup();
+          const backupTime = performance.now() - backupStart;
+          const restoreStart = performance.now();
+          await service.restoreBackup(metadata.id);
+          const restoreTime = performance.now() - restoreStart;
+
+          sizes[codec] = metadata.storedBytes!;
+          console.log(`Backup ${codec} (${(original.length / 1e6).toFixed(1)} Mo): ${(metadata.storedBytes! / 1e6).toFixed(2)} Mo stockés, backup ${backupTime.toFixed(0)}ms, restauration ${restoreTime.toFixed(0)}ms`);
+          expect(fs.readFileSync(dataPath).equals(original)).toBe(true);
+        }
+        // Coût de la compression par bloc : le fichier entier, compressé d'un seul tenant
+        console.log(`Fichier entier gzip: ${(zlib.gzipSync(original).length / 1e6).toFixed(2)} Mo, par bloc: ${(sizes.gzip! / 1e6).toFixed(2)} Mo`);
+
+        codecs.filter(codec => codec !== 'none').forEach(codec => {
+          expect(sizes[codec]!).toBeLessThan(sizes.none! / 3);
+        });
+      } finally {
+        fs.rmSync(dataDir, { recursive: true, force: true });
+      }
+    }, 120000);
+  });
+
+  describe('17. Restauration à une date', () => {
+    it('devrait restaurer en rejouant seulement le journal qui suit le dernier backup (20 000 notes)', async () => {
+      const dataDir = fs.mkdtempSync(path.join(os.tmpdir(), 'notes-pitr-'));
+      const dataPath = path.join(dataDir, 'notes.json');
+      notes = generateNotes(20000);
+      new JsonStorage(dataPath).save(notes);
+      const backupService = new BackupService(dataPath, path.join(dataDir, 'backups'), { pointInTime: true });
+      const service = new NoteService(new NoteRepository(), new JsonStorage(dataPath, { writeMode: 'fast' }), new SearchEngine(), backupService);
+      const ids = service.getAllNotes().map(note => note.getId());
+
+      try {
+        // Historique : 5 backups, 20 modifications entre deux
+        let updates = 0;
+        for (let round = 0; round < 6; round++) {
+          if (round > 0) {
+            await new Promise(resolve => setTimeout(resolve, 2));
+            await backupService.createBackup();
+          }
+          for (let i = 0; i < 20; i++) {
+            service.updateNote(ids[updates * 37 % ids.length], { content: `Modification ${updates}` });
+            updates++;
+          }
+        }
+        await new Promise(resolve => setTimeout(resolve, 2));
+        const expected = fs.readFileSync(dataPath, 'utf-8');
+        const target = new Date();
+        fs.writeFileSync(dataPath, JSON.stringify({ notes: [] }));
+
+        const start = performance.now();
+        const { replayed } = await backupService.restoreToPointInTime(target);
+        const restoreTime = performance.now() - start;
+
+        console.log(`Restauration à une date (20 000 notes, 5 backups): ${restoreTime.toFixed(0)}ms, ${replayed} modifications rejouées`);
+        expect(replayed).toBe(20);
+        expect(fs.readFileSync(dataPath, 'utf-8')).toBe(expected);
+      } finally {
+        fs.rmSync(dataDir, { recursive: true, force: true });
+      }
+    }, 60000);
+  });
 });
@@ -0,0 +1,535 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { SearchEngine } from '../src/search/SearchEngine';
+import { Note } from '../src/models/Note';
+import { INote } from '../src/interfaces/INote';
+import { LRUCache } from '../src/search/LRUCache';
+import { PostingList } from '../src/search/PostingList';
+import { QueryParser } from '../src/search/QueryParser';
+
+describe('SearchEngine - Tests Fonctionnels', () => {
+  let searchEngine: SearchEngine;
+  let notes: INote[];
+
+  beforeEach(() => {
+    searchEngine = new SearchEngine();
+    notes = [
+      new Note('Réunion client', 'Discuter du projet alpha', ['travail', 'client'], 'n1'),
+      new Note('Liste de courses', 'Acheter du pain et du lait', ['personnel'], 'n2'),
+      new Note('Idée projet', 'Créer une app mobile', ['travail', 'projet'], 'n3')
+    ];
+    searchEngine.buildIndexes(notes);
+  });
+
+  describe('1. Maintenance incrémentale des index', () => {
+    it('devrait indexer une nouvelle note sans reconstruction', () => {
+      const note = new Note('Budget', 'Prévoir le budget alpha', ['finance'], 'n4');
+      searchEngine.indexNote(note);
+
+      expect(searchEngine.searchByTag([], 'finance').map(n => n.getId())).toEqual(['n4']);
+      expect(searchEngine.searchByContent([], 'alpha').length).toBe(2);
+    });
+
+    it('devrait réindexer une note modifiée', () => {
+      const note = notes[1];
+      note.setContent('Acheter des oeufs');
+      note.setTags(['maison']);
+      searchEngine.reindexNote(note);
+
+      expect(searchEngine.searchByContent([], 'pain').length).toBe(0);
+      expect(searchEngine.searchByContent([], 'oeufs').map(n => n.getId())).toEqual(['n2']);
+      expect(searchEngine.searchByTag([], 'personnel').length).toBe(0);
+      expect(searchEngine.searchByTag([], 'maison').length).toBe(1);
+    });
+
+    it('devrait retirer une note des index', () => {
+      searchEngine.removeNote('n3');
+
+      expect(searchEngine.searchByTag([], 'travail').map(n => n.getId())).toEqual(['n1']);
+      expect(searchEngine.search([], 'mobile').length).toBe(0);
+    });
+
+    it('devrait donner les mêmes résultats qu\'une reconstruction complète', () => {
+      const added = new Note('Projet beta', 'Suite du projet alpha', ['travail'], 'n4');
+      searchEngine.indexNote(added);
+      notes[0].setTitle('Réunion fournisseur');
+      searchEngine.reindexNote(notes[0]);
+      searchEngine.removeNote('n2');
+
+      const rebuilt = new SearchEngine();
+      rebuilt.buildIndexes([notes[0], notes[2], added]);
+
+      ['projet', 'alpha', 'travail', 'pain', 'fournisseur'].forEach(query => {
+        const incremental = searchEngine.search([], query).map(n => n.getId()).sort();
+        const full = rebuilt.search([], query).map(n => n.getId()).sort();
+        expect(incremental).toEqual(full);
+      });
+    });
+  });
+
+  describe('2. Invalidation sélective du cache', () => {
+    it('devrait conserver les entrées non touchées par une modification', () => {
+      const before = searchEngine.searchByTag([], 'personnel');
+      searchEngine.indexNote(new Note('Autre', 'Sans rapport', ['divers'], 'n4'));
+
+      // Même tableau : l'entrée du cache a survécu
+      expect(searchEngine.searchByTag([], 'personnel')).toBe(before);
+    });
+
+    it('devrait invalider les entrées qui dépendent des termes modifiés', () => {
+      expect(searchEngine.searchByTag([], 'client').length).toBe(1);
+      searchEngine.indexNote(new Note('Relance', 'Appeler', ['client'], 'n4'));
+
+      expect(searchEngine.searchByTag([], 'client').length).toBe(2);
+    });
+
+    it('devrait invalider la recherche générale quand un tag correspondant change', () => {
+      expect(searchEngine.search([], 'perso').length).toBe(1);
+      searchEngine.indexNote(new Note('Vacances', 'Réserver', ['personnel'], 'n4'));
+
+      expect(searchEngine.search([], 'perso').length).toBe(2);
+    });
+  });
+
+  describe('3. Classement BM25 (searchTopK)', () => {
+    it('devrait classer une correspondance dans le titre avant le contenu', () => {
+      const hits = searchEngine.searchTopK('projet', 10);
+
+      expect(hits.map(hit => hit.note.getId())).toEqual(['n3', 'n1']);
+      expect(hits[0].score).toBeGreaterThan(hits[1].score);
+    });
+
+    it('devrait favoriser la note où le terme est le plus fréquent', () => {
+      searchEngine.indexNote(new Note('A', 'alpha alpha alpha beta', [], 'a'));
+      searchEngine.indexNote(new Note('B', 'alpha beta gamma delta', [], 'b'));
+
+      const hits = searchEngine.searchTopK('alpha', 3);
+
+      expect(hits[0].note.getId()).toBe('a');
+    });
+
+    it('devrait limiter le nombre de résultats à k', () => {
+      for (let i = 0; i < 50; i++) {
+        searchEngine.indexNote(new Note(`Note ${i}`, 'contenu commun', [], `x${i}`));
+      }
+
+      expect(searchEngine.searchTopK('commun', 20).length).toBe(20);
+      expect(searchEngine.searchTopK('commun', 0).length).toBe(0);
+    });
+
+    it('devrait couvrir les mêmes notes que search()', () => {
+      const ranked = searchEngine.searchTopK('travail projet', 100).map(hit => hit.note.getId()).sort();
+      const unranked = searchEngine.search([], 'travail projet').map(n => n.getId()).sort();
+
+      expect(ranked).toEqual(unranked);
+    });
+  });
+
+  describe('4. Recherche par préfixe et autocomplétion', () => {
+    it('devrait trouver les notes dont un terme commence par le préfixe', () => {
+      searchEngine.indexNote(new Note('Performance', 'Mesurer les perfs du moteur', [], 'p1'));
+
+      const results = searchEngine.search([], 'perf*').map(n => n.getId()).sort();
+
+      expect(results).toEqual(['p1']);
+      expect(searchEngine.search([], 'proj*').map(n => n.getId()).sort()).toEqual(['n1', 'n3']);
+    });
+
+    it('devrait invalider une recherche par préfixe quand un terme correspondant apparaît', () => {
+      expect(searchEngine.search([], 'mob*').length).toBe(1);
+      searchEngine.indexNote(new Note('Mobilité', 'Télétravail et mobilité', [], 'm1'));
+
+      expect(searchEngine.search([], 'mob*').length).toBe(2);
+    });
+
+    it('devrait compléter les tags par préfixe', () => {
+      expect(searchEngine.autocompleteTags('p')).toEqual(['personnel', 'projet']);
+      expect(searchEngine.autocompleteTags('TRA')).toEqual(['travail']);
+      expect(searchEngine.autocompleteTags('zzz')).toEqual([]);
+    });
+
+    it('devrait retirer un tag de l\'autocomplétion quand plus aucune note ne l\'utilise', () => {
+      searchEngine.removeNote('n2');
+
+      expect(searchEngine.autocompleteTags('p')).toEqual(['projet']);
+      expect(searchEngine.search([], 'sonn').length).toBe(0);
+    });
+
+    it('devrait trouver les tags contenant la requête sans parcourir tous les tags', () => {
+      expect(searchEngine.search([], 'vail').map(n => n.getId()).sort()).toEqual(['n1', 'n3']);
+    });
+  });
+
+  describe('5. Recherche approximative (fautes de frappe)', () => {
+    it('devrait trouver les termes à une faute près', () => {
+      expect(searchEngine.search([], 'porjet').length).toBe(0);
+      expect(searchEngine.search([], 'porjet', { fuzzy: true }).map(n => n.getId()).sort())
+        .toEqual(['n1', 'n3']);
+      expect(searchEngine.search([], 'mobil', { fuzzy: true }).map(n => n.getId())).toEqual(['n3']);
+    });
+
+    it('devrait respecter la distance maximale demandée', () => {
+      expect(searchEngine.search([], 'prjt', { fuzzy: 1 }).length).toBe(0);
+      expect(searchEngine.search([], 'prjt', { fuzzy: 2 }).map(n => n.getId()).sort())
+        .toEqual(['n1', 'n3']);
+    });
+
+    it('devrait exiger que chaque mot du titre ait une correspondance proche', () => {
+      expect(searchEngine.searchByTitle([], 'liste de cources', { fuzzy: true }).map(n => n.getId()))
+        .toEqual(['n2']);
+      expect(searchEngine.searchByTitle([], 'liste de voyage', { fuzzy: true }).length).toBe(0);
+    });
+
+    it('devrait trouver les tags proches', () => {
+      expect(searchEngine.search([], 'travial', { fuzzy: true }).map(n => n.getId()).sort())
+        .toEqual(['n1', 'n3']);
+    });
+
+    it('devrait invalider une recherche approchée quand un terme proche apparaît', () => {
+      expect(searchEngine.search([], 'budjet', { fuzzy: true }).length).toBe(0);
+      searchEngine.indexNote(new Note('Budget', 'Prévoir les dépenses', [], 'b1'));
+
+      expect(searchEngine.search([], 'budjet', { fuzzy: true }).map(n => n.getId())).toEqual(['b1']);
+    });
+  });
+
+  describe('6. Listes de postings compactes', () => {
+    const listOf = (docs: number[]): PostingList => {
+      const list = new PostingList();
+      docs.forEach(doc => list.set(doc));
+      return list;
+    };
+
+    it('devrait garder les documents triés et sans doublon', () => {
+      const list = listOf([5, 1, 9, 1, 3]);
+      list.delete(9);
+
+      expect(Array.from(list.toArray())).toEqual([1, 3, 5]);
+      expect(list.has(3)).toBe(true);
+      expect(list.has(9)).toBe(false);
+    });
+
+    it('devrait croiser et réunir des listes de tailles différentes', () => {
+      const evens = listOf(Array.from({ length: 500 }, (_, i) => i * 2));
+      const triples = listOf(Array.from({ length: 400 }, (_, i) => i * 3));
+      const few = listOf([0, 6, 7, 600, 998]);
+
+      expect(Array.from(PostingList.intersect([evens, triples, few]))).toEqual([0, 6, 600]);
+      expect(Array.from(PostingList.union([few, listOf([1, 6])]))).toEqual([0, 1, 6, 7, 600, 998]);
+      expect(PostingList.intersect([]).length).toBe(0);
+    });
+
+    it('devrait fusionner plusieurs listes, vides et doublons compris', () => {
+      const lists = [listOf([4, 8]), listOf([]), listOf([1, 4, 9]), listOf([8, 9, 12]), listOf([0])];
+
+      expect(Array.from(PostingList.union(lists))).toEqual([0, 1, 4, 8, 9, 12]);
+      expect(PostingList.union([listOf([])]).length).toBe(0);
+    });
+
+    it('devrait renuméroter les documents en gardant l\'ordre', () => {
+      const list = listOf(Array.from({ length: 40 }, (_, i) => i * 3));
+      const renumbered = Array.from({ length: 120 }, (_, doc) => Math.floor(doc / 3));
+      list.renumber(renumbered);
+
+      expect(Array.from(list.toArray())).toEqual(Array.from({ length: 40 }, (_, i) => i));
+    });
+
+    it('devrait rester cohérent après le compactage des identifiants', () => {
+      const engine = new SearchEngine();
+      const notes = Array.from({ length: 3000 }, (_, i) =>
+        new Note(`Note ${i}`, `contenu ${i % 2 === 0 ? 'pair' : 'impair'} numéro${i}`, [`groupe${i % 3}`], `c${i}`));
+      engine.buildIndexes(notes);
+      // Assez de suppressions pour déclencher le compactage
+      notes.slice(0, 2500).forEach(note => engine.removeNote(note.getId()));
+      engine.indexNote(new Note('Ajout', 'contenu pair récent', ['groupe0'], 'nouvelle'));
+
+      const pairs = engine.search([], 'pair').map(n => n.getId());
+      expect(pairs.length).toBe(251);
+      expect(pairs[0]).toBe('c2500');
+      expect(pairs[pairs.length - 1]).toBe('nouvelle');
+      expect(engine.searchMultipleTags([], ['groupe0', 'groupe1']).length).toBe(334);
+      expect(engine.search([], '"contenu impair numéro2999"').map(n => n.getId())).toEqual(['c2999']);
+      engine.removeNote('c2999');
+      expect(engine.search([], 'numéro2999').length).toBe(0);
+    });
+
+    it('devrait intersecter les tags en exigeant tous les tags', () => {
+      expect(searchEngine.searchMultipleTags([], ['travail', 'projet'], true).map(n => n.getId()))
+        .toEqual(['n3']);
+      expect(searchEngine.searchMultipleTags([], ['travail', 'inconnu'], true).length).toBe(0);
+      expect(searchEngine.searchMultipleTags([], ['client', 'personnel']).map(n => n.getId()))
+        .toEqual(['n1', 'n2']);
+    });
+
+    it('devrait ne plus retourner une note retirée puis réindexée ailleurs', () => {
+      searchEngine.removeNote('n1');
+      searchEngine.indexNote(new Note('Réunion client', 'Nouvelle version', ['travail', 'client'], 'n1'));
+
+      expect(searchEngine.searchMultipleTags([], ['travail', 'client'], true).map(n => n.getId()))
+        .toEqual(['n1']);
+      expect(searchEngine.searchByTag([], 'travail').map(n => n.getId())).toEqual(['n3', 'n1']);
+    });
+  });
+
+  describe('7. Cache LRU borné en mémoire', () => {
+    it('devrait évincer l\'entrée la moins récemment utilisée', () => {
+      const cache = new LRUCache<string>({ maxBytes: 30, sizeOf: value => value.length });
+      cache.set('a', '0123456789');
+      cache.set('b', '0123456789');
+      cache.get('a');
+      cache.set('c', '0123456789');
+      cache.set('d', '0123456789');
+
+      expect(cache.has('a')).toBe(true);
+      expect(cache.has('b')).toBe(false);
+      expect(cache.getStats().evictions).toBe(1);
+      expect(cache.getStats().bytes).toBe(30);
+    });
+
+    it('devrait borner aussi le nombre d\'entrées', () => {
+      const cache = new LRUCache<string>({ maxBytes: 1000, maxEntries: 2, sizeOf: value => value.length });
+      cache.set('a', 'x');
+      cache.set('b', 'x');
+      cache.set('c', 'x');
+
+      expect(cache.has('a')).toBe(false);
+      expect(cache.size).toBe(2);
+      expect(cache.getStats().evictions).toBe(1);
+    });
+
+    it('devrait invalider les entrées par leurs dépendances', () => {
+      const cache = new LRUCache<string>({ maxBytes: 1000, sizeOf: value => value.length });
+      cache.set('a', 'x', ['word:projet', 'tag:client']);
+      cache.set('b', 'x', ['word:pain']);
+      cache.set('c', 'x', ['tag:client']);
+
+      expect(cache.invalidate(['tag:client', 'word:absent'])).toBe(2);
+      expect(cache.has('b')).toBe(true);
+      expect(cache.getStats().invalidations).toBe(2);
+      // Dépendances d'une entrée évincée ou remplacée oubliées
+      cache.set('b', 'y', ['word:autre']);
+      expect(cache.invalidate(['word:pain'])).toBe(0);
+    });
+
+    it('devrait ignorer une entrée plus grosse que le budget', () => {
+      const cache = new LRUCache<string>({ maxBytes: 5, sizeOf: value => value.length });
+      cache.set('gros', '0123456789');
+
+      expect(cache.size).toBe(0);
+    });
+
+    it('devrait compter les succès et les échecs de la recherche', () => {
+      searchEngine.searchByTag([], 'travail');
+      searchEngine.searchByTag([], 'travail');
+      searchEngine.searchByTag([], 'travail');
+      const stats = searchEngine.getCacheStats();
+
+      expect(stats.misses).toBe(1);
+      expect(stats.hits).toBe(2);
+      expect(stats.hitRate).toBeCloseTo(2 / 3);
+      expect(stats.bytes).toBeGreaterThan(0);
+    });
+
+    it('devrait respecter le budget mémoire configuré', () => {
+      const engine = new SearchEngine({ cacheMaxBytes: 2048 });
+      engine.buildIndexes(notes);
+      for (let i = 0; i < 50; i++) {
+        engine.search([], `requête ${i}`);
+      }
+      const stats = engine.getCacheStats();
+
+      expect(stats.bytes).toBeLessThanOrEqual(2048);
+      expect(stats.evictions).toBeGreaterThan(0);
+    });
+
+    it('devrait limiter le cache à 100 résultats par défaut', () => {
+      for (let i = 0; i < 150; i++) {
+        searchEngine.search([], `requête ${i}`);
+      }
+
+      expect(searchEngine.getCacheStats().entries).toBe(100);
+      expect(searchEngine.getCacheStats().maxEntries).toBe(100);
+    });
+
+    it('devrait invalider une recherche par préfixe quand un terme correspondant apparaît', () => {
+      const before = searchEngine.search([], 'fourn*');
+      searchEngine.indexNote(new Note('Autre', 'Sans rapport', ['divers'], 'n4'));
+      expect(searchEngine.search([], 'fourn*')).toBe(before);
+
+      searchEngine.indexNote(new Note('Commande', 'Fournitures de bureau', [], 'n5'));
+      expect(searchEngine.search([], 'fourn*').length).toBe(before.length + 1);
+    });
+
+    it('devrait conserver une requête fréquente malgré des modifications sans rapport', () => {
+      const hot = searchEngine.search([], 'projet');
+      searchEngine.indexNote(new Note('Courses', 'Acheter des pommes', ['maison'], 'n4'));
+      searchEngine.removeNote('n2');
+
+      expect(searchEngine.search([], 'projet')).toBe(hot);
+      expect(searchEngine.getCacheStats().invalidations).toBe(0);
+    });
+  });
+
+  describe('8. Langage de requête (booléens, phrases, champs)', () => {
+    const ids = (results: INote[]): string[] => results.map(n => n.getId()).sort();
+
+    it('devrait analyser opérateurs, phrases et champs', () => {
+      const parser = new QueryParser(text => text.toLowerCase().split(/\s+/).filter(Boolean));
+
+      expect(parser.parse('a b')).toEqual({
+        type: 'or',
+        children: [
+          { type: 'term', value: 'a', prefix: false, field: undefined },
+          { type: 'term', value: 'b', prefix: false, field: undefined }
+        ]
+      });
+      expect(parser.parse('title:"Compte rendu" AND NOT tag:Perso')).toEqual({
+        type: 'and',
+        children: [
+          { type: 'phrase', words: ['compte', 'rendu'], field: 'title' },
+          { type: 'not', child: { type: 'term', value: 'perso', prefix: false, field: 'tag' } }
+        ]
+      });
+      expect(parser.parse('AND ) (')).toBeUndefined();
+    });
+
+    it('devrait combiner AND, OR et NOT', () => {
+      expect(ids(searchEngine.search([], 'projet AND travail'))).toEqual(['n1', 'n3']);
+      expect(ids(searchEngine.search([], 'projet AND NOT client'))).toEqual(['n3']);
+      expect(ids(searchEngine.search([], 'pain OR mobile'))).toEqual(['n2', 'n3']);
+      expect(ids(searchEngine.search([], '(pain OR mobile) AND tag:travail'))).toEqual(['n3']);
+      expect(ids(searchEngine.search([], 'NOT travail'))).toEqual(['n2']);
+    });
+
+    it('devrait exiger des mots consécutifs pour une phrase', () => {
+      expect(ids(searchEngine.search([], '"projet alpha"'))).toEqual(['n1']);
+      expect(ids(searchEngine.search([], '"alpha projet"'))).toEqual([]);
+      expect(ids(searchEngine.search([], '"pain du lait"'))).toEqual([]);
+    });
+
+    it('devrait restreindre un terme à un champ', () => {
+      expect(ids(searchEngine.search([], 'title:projet'))).toEqual(['n3']);
+      expect(ids(searchEngine.search([], 'content:projet'))).toEqual(['n1']);
+      expect(ids(searchEngine.search([], 'tag:projet'))).toEqual(['n3']);
+      expect(ids(searchEngine.search([], 'tag:trav*'))).toEqual(['n1', 'n3']);
+    });
+
+    it('devrait mettre à jour une phrase quand les mots changent de place', () => {
+      expect(ids(searchEngine.search([], '"app mobile"'))).toEqual(['n3']);
+      notes[2].setContent('Créer une mobile app');
+      searchEngine.reindexNote(notes[2]);
+
+      expect(ids(searchEngine.search([], '"app mobile"'))).toEqual([]);
+      expect(ids(searchEngine.searchByContent([], 'mobile app'))).toEqual(['n3']);
+    });
+
+    it('devrait garder la correspondance par sous-chaîne des recherches par titre et contenu', () => {
+      // La requête n'a pas à finir sur un mot entier, ni à en respecter la ponctuation
+      expect(ids(searchEngine.searchByTitle([], 'idée proj'))).toEqual(['n3']);
+      expect(ids(searchEngine.searchByContent([], 'PAIN ET DU L'))).toEqual(['n2']);
+      expect(ids(searchEngine.searchByContent([], 'pain du lait'))).toEqual([]);
+      // Premier mot en fin de terme, dernier en début de terme, par les index
+      expect(ids(searchEngine.searchByContent([], 'ain et du lai'))).toEqual(['n2']);
+      expect(ids(searchEngine.searchByContent([], ' ain et du'))).toEqual([]);
+      expect(ids(searchEngine.searchByContent([], 'pain et du lai '))).toEqual([]);
+      expect(ids(searchEngine.searchByTitle([], 'unio clie'))).toEqual([]);
+      // Au moins un mot entier de la requête doit figurer dans la note
+      expect(ids(searchEngine.searchByContent([], 'lai'))).toEqual([]);
+      expect(ids(searchEngine.searchByContent([], 'du lai'))).toEqual(['n2']);
+
+      // Une nouvelle note correspondante invalide le cache
+      searchEngine.indexNote(new Note('Boulangerie', 'Du grain et du lait', [], 'n4'));
+      expect(ids(searchEngine.searchByContent([], 'ain et du lai'))).toEqual(['n2', 'n4']);
+      expect(ids(searchEngine.searchByTitle([], ''))).toEqual([]);
+      expect(ids(searchEngine.searchByContent([], '  '))).toEqual([]);
+    });
+
+    it('devrait invalider une négation seule à chaque modification', () => {
+      expect(ids(searchEngine.search([], 'NOT travail'))).toEqual(['n2']);
+      searchEngine.indexNote(new Note('Vacances', 'Réserver', ['loisir'], 'n4'));
+
+      expect(ids(searchEngine.search([], 'NOT travail'))).toEqual(['n2', 'n4']);
+    });
+
+    it('devrait classer uniquement les notes retenues par la requête', () => {
+      const hits = searchEngine.searchTopK('projet AND NOT client', 10);
+
+      expect(hits.map(hit => hit.note.getId())).toEqual(['n3']);
+      expect(hits[0].score).toBeGreaterThan(0);
+    });
+  });
+
+  describe('9. Instantané des index', () => {
+    const ids = (results: INote[]): string[] => results.map(n => n.getId()).sort();
+    let snapshotDir: string;
+    let snapshotPath: string;
+
+    beforeEach(() => {
+      snapshotDir = fs.mkdtempSync(path.join(os.tmpdir(), 'notes-index-'));
+      snapshotPath = path.join(snapshotDir, 'notes.json.idx');
+    });
+
+    afterEach(() => {
+      fs.rmSync(snapshotDir, { recursive: true, force: true });
+    });
+
+    const saved = (): SearchEngine => {
+      const engine = new SearchEngine({ snapshotPath });
+      engine.buildIndexes(notes);
+      engine.saveSnapshot('v1');
+      return engine;
+    };
+
+    it('devrait recharger des index identiques sans réindexer', () => {
+      const original = saved();
+      const reloaded = new SearchEngine({ snapshotPath });
+
+      expect(reloaded.loadSnapshot(notes, 'v1')).toBe(true);
+      ['projet', 'tag:travail', '"projet alpha"', 'proj*', 'NOT client', 'title:idée'].forEach(query => {
+        expect(ids(reloaded.search([], query))).toEqual(ids(original.search([], query)));
+      });
+      expect(reloaded.searchTopK('projet alpha', 3)).toEqual(original.searchTopK('projet alpha', 3));
+      expect(reloaded.autocompleteTags('tr')).toEqual(['travail']);
+    });
+
+    it('devrait refuser un instantané périmé, incomplet ou corrompu', () => {
+      saved();
+      const engine = new SearchEngine({ snapshotPath });
+
+      expect(engine.loadSnapshot(notes, 'v2')).toBe(false);
+      expect(engine.loadSnapshot(notes.slice(1), 'v1')).toBe(false);
+
+      fs.truncateSync(snapshotPath, fs.statSync(snapshotPath).size - 3);
+      expect(engine.loadSnapshot(notes, 'v1')).toBe(false);
+      expect(new SearchEngine().loadSnapshot(notes, 'v1')).toBe(false);
+    });
+
+    it('devrait maintenir les index d\'une note rechargée modifiée en place', () => {
+      saved();
+      const engine = new SearchEngine({ snapshotPath });
+      engine.loadSnapshot(notes, 'v1');
+
+      notes[0].setContent('Discuter du budget');
+      engine.reindexNote(notes[0]);
+      engine.removeNote('n3');
+
+      expect(ids(engine.search([], 'alpha'))).toEqual([]);
+      expect(ids(engine.search([], '"du budget"'))).toEqual(['n1']);
+      expect(ids(engine.searchByTag([], 'travail'))).toEqual(['n1']);
+    });
+
+    it('devrait renuméroter les notes retirées avant l\'écriture', () => {
+      const engine = saved();
+      const added = new Note('Projet gamma', 'Nouvelle idée', ['travail'], 'n4');
+      engine.removeNote('n1');
+      engine.indexNote(added);
+      engine.saveSnapshot('v2');
+
+      const reloaded = new SearchEngine({ snapshotPath });
+      expect(reloaded.loadSnapshot([notes[1], notes[2], added], 'v2')).toBe(true);
+      expect(ids(reloaded.searchByTag([], 'travail'))).toEqual(['n3', 'n4']);
+      expect(ids(reloaded.search([], 'projet'))).toEqual(['n3', 'n4']);
+    });
+  });
+});
@@ -0,0 +1,536 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { NoteRepository } from '../src/repositories/NoteRepository';
+import { SearchEngine } from '../src/search/SearchEngine';
+import { NoteService } from '../src/services/NoteService';
+import { Note } from '../src/models/Note';
+import { INoteData } from '../src/interfaces/INote';
+import { JsonStorage } from '../src/storage/JsonStorage';
+import { NoteStreamParser } from '../src/storage/NoteStream';
+import { ShardedStorage } from '../src/storage/ShardedStorage';
+import { BinaryStorage } from '../src/storage/BinaryStorage';
+import { WriteBehindStorage } from '../src/storage/WriteBehindStorage';
+import { decodeNotes, encodeNotes } from '../src/storage/NoteCodec';
+import { WalStorage } from '../src/storage/WalStorage';
+import { configFromEnvironment } from '../src/AppConfig';
+import { StorageFactory } from '../src/factories/StorageFactory';
+
+describe('Stockages - Tests Fonctionnels', () => {
+  const testDir = path.join(__dirname, 'test-storage');
+  const dataFile = path.join(testDir, 'notes.json');
+
+  const createService = (storage: WalStorage | ShardedStorage): NoteService =>
+    new NoteService(new NoteRepository(), storage, new SearchEngine());
+
+  beforeEach(() => {
+    fs.rmSync(testDir, { recursive: true, force: true });
+    fs.mkdirSync(testDir, { recursive: true });
+  });
+
+  afterEach(() => {
+    fs.rmSync(testDir, { recursive: true, force: true });
+  });
+
+  describe('1. WalStorage (journal en ajout seul)', () => {
+    it('devrait relire les notes créées, modifiées et supprimées', async () => {
+      const service = createService(new WalStorage(dataFile));
+      const kept = service.createNote('Note 1', 'Contenu 1', ['a']);
+      const removed = service.createNote('Note 2', 'Contenu 2');
+      service.updateNote(kept.getId(), { title: 'Note 1 modifiée' });
+      await service.deleteNote(removed.getId());
+
+      const reloaded = createService(new WalStorage(dataFile)).getAllNotes();
+
+      expect(reloaded.length).toBe(1);
+      expect(reloaded[0].getTitle()).toBe('Note 1 modifiée');
+      expect(reloaded[0].getTags()).toEqual(['a']);
+    });
+
+    it('devrait n\'ajouter au journal que la note modifiée', () => {
+      const storage = new WalStorage(dataFile);
+      const service = createService(storage);
+      for (let i = 0; i < 50; i++) {
+        service.createNote(`Note ${i}`, 'Contenu assez long pour peser dans le journal');
+      }
+
+      const sizeBefore = storage.getLogSize();
+      service.createNote('Une de plus', 'Contenu');
+      const appended = storage.getLogSize() - sizeBefore;
+
+      expect(appended).toBeLessThan(300);
+      expect(fs.existsSync(dataFile)).toBe(false);
+    });
+
+    it('devrait compacter le journal en un instantané', async () => {
+      const storage = new WalStorage(dataFile, { compactionThreshold: 512 });
+      const service = createService(storage);
+      for (let i = 0; i < 20; i++) {
+        service.createNote(`Note ${i}`, 'Contenu');
+      }
+
+      await storage.whenIdle();
+      service.createNote('Après compaction', 'Contenu');
+
+      expect(fs.existsSync(dataFile)).toBe(true);
+      expect(JSON.parse(fs.readFileSync(dataFile, 'utf-8')).walGeneration).toBeGreaterThan(0);
+      expect(createService(new WalStorage(dataFile)).getAllNotes().length).toBe(21);
+    });
+
+    it('devrait écrire l\'instantané par blocs et garder l\'empreinte des ajouts faits pendant la compaction', async () => {
+      const storage = new WalStorage(dataFile);
+      const service = createService(storage);
+      for (let i = 0; i < 2000; i++) {
+        service.createNote(`Note ${i}`, 'Contenu assez long pour remplir plusieurs blocs de l\'instantané');
+      }
+
+      const compaction = storage.compact();
+      expect(storage.getFingerprint()).toBeUndefined();
+      service.createNote('Pendant la compaction', 'Contenu');
+      await compaction;
+
+      const reloaded = new WalStorage(dataFile);
+      expect(reloaded.load().length).toBe(2001);
+      expect(JSON.parse(fs.readFileSync(dataFile, 'utf-8')).walGeneration).toBe(1);
+      expect(storage.getFingerprint()).toBe(reloaded.getFingerprint());
+    });
+
+    it('devrait ignorer un enregistrement tronqué en fin de journal', () => {
+      const service = createService(new WalStorage(dataFile));
+      service.createNote('Note complète', 'Contenu');
+      fs.appendFileSync(`${dataFile}.0.wal`, '{"op":"put","note":{"id":"x"');
+
+      const reloaded = createService(new WalStorage(dataFile));
+      reloaded.createNote('Note suivante', 'Contenu');
+
+      expect(createService(new WalStorage(dataFile)).getAllNotes().length).toBe(2);
+    });
+
+    it('devrait terminer une dernière ligne valide avant d\'ajouter au journal', () => {
+      const service = createService(new WalStorage(dataFile));
+      service.createNote('Note complète', 'Contenu');
+      const logPath = `${dataFile}.0.wal`;
+      fs.truncateSync(logPath, fs.statSync(logPath).size - 1);
+
+      createService(new WalStorage(dataFile)).createNote('Note suivante', 'Contenu');
+
+      expect(createService(new WalStorage(dataFile)).getAllNotes().length).toBe(2);
+    });
+
+    it('devrait ignorer seulement un enregistrement illisible au milieu du journal', () => {
+      const service = createService(new WalStorage(dataFile));
+      service.createNote('Note 1', 'Contenu');
+      fs.appendFileSync(`${dataFile}.0.wal`, '{"op":"put","note":\n');
+      service.createNote('Note 2', 'Contenu');
+      service.createNote('Note 3', 'Contenu');
+
+      const titles = createService(new WalStorage(dataFile)).getAllNotes().map(note => note.getTitle());
+
+      expect(titles.sort()).toEqual(['Note 1', 'Note 2', 'Note 3']);
+    });
+
+    it('devrait journaliser les modifications sans comparer toute la collection', () => {
+      const storage = new WalStorage(dataFile);
+      const repository = new NoteRepository();
+      const service = new NoteService(repository, storage, new SearchEngine());
+      service.prepareSearchIndexes();
+      const saveSpy = jest.spyOn(storage, 'save');
+      const findAllSpy = jest.spyOn(repository, 'findAll');
+      const note = service.createNote('Note 1', 'Contenu');
+      service.updateNote(note.getId(), { title: 'Note 1 modifiée' });
+
+      expect(saveSpy).toHaveBeenCalledTimes(0);
+      expect(findAllSpy).toHaveBeenCalledTimes(0);
+      // Ajout en échec : le suivant rattrape les changements non journalisés
+      const logPath = `${dataFile}.0.wal`;
+      const logged = fs.readFileSync(logPath);
+      fs.rmSync(logPath);
+      fs.mkdirSync(logPath);
+      expect(() => service.createNote('Note 2', 'Contenu')).toThrow('sauvegarde');
+      fs.rmdirSync(logPath);
+      fs.writeFileSync(logPath, logged);
+      service.createNote('Note 3', 'Contenu');
+
+      const titles = createService(new WalStorage(dataFile)).getAllNotes().map(n => n.getTitle());
+      expect(titles.sort()).toEqual(['Note 1 modifiée', 'Note 2', 'Note 3']);
+    });
+  });
+
+  describe('2. Instantané des index au démarrage', () => {
+    const snapshotPath = path.join(testDir, 'notes.json.idx');
+
+    const start = (storage: JsonStorage | WalStorage): { service: NoteService; engine: SearchEngine } => {
+      const engine = new SearchEngine({ snapshotPath });
+      jest.spyOn(engine, 'buildIndexes');
+      return { service: new NoteService(new NoteRepository(), storage, engine), engine };
+    };
+
+    it('devrait réutiliser l\'instantané tant que le fichier de données est inchangé', () => {
+      const first = start(new JsonStorage(dataFile));
+      first.service.createNote('Réunion', 'Budget alpha', ['travail']);
+      first.service.saveSearchSnapshot();
+
+      const second = start(new JsonStorage(dataFile));
+
+      expect(second.engine.buildIndexes).not.toHaveBeenCalled();
+      expect(second.service.searchNotes('alpha').length).toBe(1);
+      expect(second.service.getNotesByTag('travail').length).toBe(1);
+    });
+
+    it('devrait reconstruire les index si les données ont changé depuis', () => {
+      const first = start(new JsonStorage(dataFile));
+      first.service.createNote('Réunion', 'Budget alpha');
+      first.service.saveSearchSnapshot();
+      // Modification hors de l'application
+      const data = JSON.parse(fs.readFileSync(dataFile, 'utf-8'));
+      data.notes[0].content = 'Budget beta';
+      fs.writeFileSync(dataFile, JSON.stringify(data), 'utf-8');
+
+      const second = start(new JsonStorage(dataFile));
+
+      expect(second.service.searchNotes('alpha').length).toBe(0);
+      expect(second.service.searchNotes('beta').length).toBe(1);
+      expect(second.engine.buildIndexes).toHaveBeenCalled();
+    });
+
+    it('devrait suivre l\'empreinte du journal de WalStorage', () => {
+      const first = start(new WalStorage(dataFile));
+      first.service.createNote('Note 1', 'Contenu');
+      first.service.saveSearchSnapshot();
+
+      const second = start(new WalStorage(dataFile));
+      second.service.createNote('Note 2', 'Contenu');
+      expect(second.engine.buildIndexes).not.toHaveBeenCalled();
+
+      const third = start(new WalStorage(dataFile));
+      expect(third.service.searchNotes('contenu').length).toBe(2);
+      expect(third.engine.buildIndexes).toHaveBeenCalled();
+    });
+
+    it('ne devrait charger les index qu\'à leur première utilisation', () => {
+      const first = start(new JsonStorage(dataFile));
+      const note = first.service.createNote('Réunion', 'Budget alpha', ['travail']);
+      // Données modifiées sans instantané : la prochaine recherche reconstruira
+      fs.rmSync(snapshotPath, { force: true });
+
+      const second = start(new JsonStorage(dataFile));
+      const loadSpy = jest.spyOn(second.engine, 'loadSnapshot');
+      expect(second.service.getNoteById(note.getId())?.getTitle()).toBe('Réunion');
+      expect(second.service.getNotesCount()).toBe(1);
+      second.service.saveSearchSnapshot();
+      expect(loadSpy).not.toHaveBeenCalled();
+      expect(second.engine.buildIndexes).not.toHaveBeenCalled();
+      expect(fs.existsSync(snapshotPath)).toBe(false);
+
+      expect(second.service.getNotesByTag('travail').length).toBe(1);
+      expect(second.engine.buildIndexes).toHaveBeenCalledTimes(1);
+    });
+  });
+
+  describe('3. Lecture et écriture en flux', () => {
+    const parseInChunks = (text: string, chunkSize: number): { ids: string[]; fields: Record<string, unknown> } => {
+      const ids: string[] = [];
+      const parser = new NoteStreamParser((data: INoteData) => ids.push(data.id));
+      for (let i = 0; i < text.length; i += chunkSize) {
+        parser.write(text.slice(i, i + chunkSize));
+      }
+      return { ids, fields: parser.end() };
+    };
+
+    it('devrait lire les notes quel que soit le découpage du texte', () => {
+      const notes = [
+        new Note('Accolades } ] {', 'Guillemets \\" échappés\nsur deux lignes', ['a'], 'n1'),
+        new Note('Unicode', 'Café 🚀', [], 'n2')
+      ].map(note => note.toJSON());
+      const text = JSON.stringify({ walGeneration: 3, notes, extra: { nested: [1, 2] } }, null, 2);
+
+      [1, 7, text.length].forEach(chunkSize => {
+        const { ids, fields } = parseInChunks(text, chunkSize);
+        expect(ids).toEqual(['n1', 'n2']);
+        expect(fields).toEqual({ walGeneration: 3, extra: { nested: [1, 2] } });
+      });
+      expect(parseInChunks(JSON.stringify(notes), 5).ids).toEqual(['n1', 'n2']);
+      expect(parseInChunks('{"notes": []}', 3).ids).toEqual([]);
+    });
+
+    it('devrait rejeter un fichier tronqué ou invalide', () => {
+      const text = JSON.stringify({ notes: [new Note('A', 'B', [], 'n1').toJSON()] });
+
+      expect(() => parseInChunks(text.slice(0, -2), 4)).toThrow('JSON incomplet');
+      expect(() => parseInChunks('{"notes": [1]}', 4)).toThrow('JSON invalide');
+      expect(() => parseInChunks('{"notes": [{"id": "n1"},]}', 4)).toThrow('JSON invalide');
+    });
+
+    it('devrait écrire exactement le format historique de JsonStorage', () => {
+      const storage = new JsonStorage(dataFile);
+      const notes = [new Note('Titre', 'Contenu\navec "guillemets"', ['x', 'y'], 'n1'), new Note('Autre', '', [], 'n2')];
+
+      storage.save(notes);
+      expect(fs.readFileSync(dataFile, 'utf-8')).toBe(JSON.stringify({ notes: notes.map(note => note.toJSON()) }, null, 2));
+      expect(storage.load().map(note => note.toJSON())).toEqual(notes.map(note => note.toJSON()));
+
+      storage.save([]);
+      expect(fs.readFileSync(dataFile, 'utf-8')).toBe(JSON.stringify({ notes: [] }, null, 2));
+    });
+  });
+
+  describe('4. ShardedStorage (notes réparties par identifiant)', () => {
+    const shardDir = path.join(testDir, 'notes.shards');
+    const shardFiles = (): Record<string, number> =>
+      Object.fromEntries(fs.readdirSync(shardDir)
+        .filter(file => file.startsWith('shard-'))
+        .map(file => [file, fs.statSync(path.join(shardDir, file)).mtimeMs]));
+
+    it('devrait répartir les notes entre les shards et les relire', async () => {
+      const service = createService(new ShardedStorage(shardDir, { shardCount: 4 }));
+      const notes = Array.from({ length: 20 }, (_, i) => service.createNote(`Note ${i}`, `Contenu ${i}`, [`t${i % 3}`]));
+      service.updateNote(notes[0].getId(), { title: 'Note 0 modifiée' });
+      await service.deleteNote(notes[1].getId());
+
+      const manifest = JSON.parse(fs.readFileSync(path.join(shardDir, 'manifest.json'), 'utf-8'));
+      expect(manifest.shardCount).toBe(4);
+      expect(manifest.shards.reduce((total: number, shard: { notes: number }) => total + shard.notes, 0)).toBe(19);
+      expect(manifest.shards.filter((shard: { notes: number }) => shard.notes > 0).length).toBeGreaterThan(1);
+
+      const reloaded = createService(new ShardedStorage(shardDir)).getAllNotes();
+      expect(reloaded.length).toBe(19);
+      expect(reloaded.find(note => note.getId() === notes[0].getId())?.getTitle()).toBe('Note 0 modifiée');
+      expect(reloaded.some(note => note.getId() === notes[1].getId())).toBe(false);
+    });
+
+    it('devrait ne réécrire que le shard de la note modifiée', () => {
+      const storage = new ShardedStorage(shardDir, { shardCount: 8 });
+      const service = createService(storage);
+      const notes = Array.from({ length: 40 }, (_, i) => service.createNote(`Note ${i}`, 'Contenu'));
+      const before = shardFiles();
+      const fingerprint = storage.getFingerprint();
+
+      // Les horodatages de fichier doivent pouvoir différer
+      const wait = Date.now() + 20;
+      while (Date.now() < wait) { /* attente active */ }
+      service.updateNote(notes[5].getId(), { content: 'Modifié' });
+
+      const after = shardFiles();
+      const changed = Object.keys(after).filter(file => after[file] !== before[file]);
+      expect(changed).toEqual([`shard-00${storage.shardOf(notes[5].getId())}.json`]);
+      expect(storage.getFingerprint()).not.toBe(fingerprint);
+    });
+
+    it('devrait déduire les shards à réécrire des seules notes changées', async () => {
+      const storage = new ShardedStorage(shardDir, { shardCount: 8 });
+      const repository = new NoteRepository();
+      const service = new NoteService(repository, storage, new SearchEngine());
+      service.prepareSearchIndexes();
+      const first = service.createNote('Note 0', 'Contenu');
+      const saveSpy = jest.spyOn(storage, 'save');
+      const findAllSpy = jest.spyOn(repository, 'findAll');
+
+      const notes = Array.from({ length: 20 }, (_, i) => service.createNote(`Note ${i + 1}`, 'Contenu'));
+      service.updateNote(notes[3].getId(), { title: 'Note 4 modifiée' });
+      await service.deleteNote(first.getId());
+
+      expect(saveSpy).toHaveBeenCalledTimes(0);
+      expect(findAllSpy).toHaveBeenCalledTimes(0);
+      const reloaded = new ShardedStorage(shardDir);
+      const titles = reloaded.load().map(note => note.getTitle());
+      expect(titles.length).toBe(20);
+      expect(titles).toContain('Note 4 modifiée');
+      expect(titles).not.toContain('Note 0');
+      expect(reloaded.getFingerprint()).toBe(storage.getFingerprint());
+    });
+
+    it('devrait lire les shards en parallèle comme en séquentiel', () => {
+      const storage = new ShardedStorage(shardDir, { shardCount: 4 });
+      const service = createService(storage);
+      for (let i = 0; i < 30; i++) {
+        service.createNote(`Note ${i}`, `Contenu "${i}" é`, [`t${i % 2}`]);
+      }
+
+      const sequential = new ShardedStorage(shardDir, { parallelLoad: false });
+      const parallel = new ShardedStorage(shardDir, { parallelLoad: true });
+      const byId = (notes: Note[]) => notes.map(note => note.toJSON()).sort((a, b) => a.id.localeCompare(b.id));
+
+      expect(byId(parallel.load() as Note[])).toEqual(byId(sequential.load() as Note[]));
+      expect(parallel.getFingerprint()).toBe(sequential.getFingerprint());
+      expect(parallel.getFingerprint()).toBe(storage.getFingerprint());
+    });
+  });
+  describe('5. Format binaire', () => {
+    const binaryFile = path.join(testDir, 'notes.bin');
+
+    it('devrait relire exactement les notes enregistrées', () => {
+      const storage = new BinaryStorage(binaryFile);
+      const old = Note.fromJSON({
+        id: 'n2', title: 'Ancienne', content: '', tags: [],
+        createdAt: new Date('1969-07-20T20:17:40.123Z'), updatedAt: new Date('2024-01-01T00:00:00Z')
+      });
+      const notes = [new Note('Café 🚀', 'Ligne 1\nLigne "2"', ['travail', 'urgent'], 'n1'), old, new Note('Autre', 'x', ['travail'], 'n3')];
+
+      storage.save(notes);
+      const reloaded = new BinaryStorage(binaryFile).load();
+
+      expect(reloaded.map(note => note.toJSON())).toEqual(notes.map(note => note.toJSON()));
+      expect(new BinaryStorage(binaryFile).getFingerprint()).toBe(storage.getFingerprint());
+    });
+
+    it('devrait rejeter un contenu tronqué ou d\'une autre version', () => {
+      const bytes = encodeNotes([new Note('Titre', 'Contenu', ['a'], 'n1')]);
+
+      expect(() => decodeNotes(bytes.subarray(0, bytes.length - 3))).toThrow('tronqué');
+      expect(() => decodeNotes(Buffer.from('{"notes": []}'))).toThrow('invalide');
+      const otherVersion = Buffer.from(bytes);
+      otherVersion[4] = 99;
+      expect(() => decodeNotes(otherVersion)).toThrow('version');
+    });
+
+    it('devrait exporter et importer dans l\'un ou l\'autre format', () => {
+      const service = new NoteService(new NoteRepository(), new JsonStorage(dataFile), new SearchEngine());
+      service.createNote('Note 1', 'Contenu 1', ['a']);
+      service.createNote('Note 2', 'Contenu 2');
+      const exported = path.join(testDir, 'export.bin');
+      const exportedJson = path.join(testDir, 'export.json');
+
+      service.exportNotes(exported, StorageFactory.forExport(exported));
+      expect(BinaryStorage.isBinaryFile(exported)).toBe(true);
+      const binaryService = new NoteService(new NoteRepository(), new BinaryStorage(binaryFile), new SearchEngine());
+      binaryService.importNotes(exported, false, StorageFactory.forImport(exported));
+      expect(binaryService.getNotesCount()).toBe(2);
+
+      binaryService.exportNotes(exportedJson, StorageFactory.forExport(exportedJson));
+      expect(JSON.parse(fs.readFileSync(exportedJson, 'utf-8')).notes.length).toBe(2);
+      binaryService.importNotes(exportedJson, true, StorageFactory.forImport(exportedJson));
+      expect(binaryService.getNotesCount()).toBe(4);
+      expect(new BinaryStorage(binaryFile).load().length).toBe(4);
+    });
+
+    it('devrait choisir le format d\'échange par option, extension ou en-tête', () => {
+      expect(StorageFactory.forExport(path.join(testDir, 'a.BIN'))).toBeInstanceOf(BinaryStorage);
+      expect(StorageFactory.forExport(path.join(testDir, 'a.json'))).toBeInstanceOf(JsonStorage);
+      expect(StorageFactory.forExport(path.join(testDir, 'a.bin'), 'json')).toBeInstanceOf(JsonStorage);
+      // Extension inconnue : format du stockage des notes
+      expect(StorageFactory.forExport(path.join(testDir, 'a.txt'))).toBeUndefined();
+
+      const exported = path.join(testDir, 'export.data');
+      StorageFactory.createFileStorage(exported, 'binary').export(exported, [new Note('T', 'C', [], 'n1')]);
+      expect(StorageFactory.forImport(exported)).toBeInstanceOf(BinaryStorage);
+      expect(StorageFactory.forImport(path.join(testDir, 'absent.bin'))).toBeUndefined();
+    });
+  });
+  describe('6. Écriture différée', () => {
+    const readNotes = () => JSON.parse(fs.readFileSync(dataFile, 'utf-8')).notes;
+
+    it('devrait regrouper une rafale de modifications en une seule écriture', async () => {
+      const storage = new WriteBehindStorage(new JsonStorage(dataFile), { delayMs: 1000 });
+      const service = new NoteService(new NoteRepository(), storage, new SearchEngine());
+      for (let i = 0; i < 20; i++) {
+        service.createNote(`Note ${i}`, 'Contenu');
+      }
+      expect(fs.existsSync(dataFile)).toBe(false);
+      expect(storage.getFingerprint()).toBeUndefined();
+
+      await service.flush();
+
+      expect(storage.getWriteCount()).toBe(1);
+      expect(readNotes().length).toBe(20);
+      expect(storage.getFingerprint()).toBeDefined();
+    });
+
+    it('devrait écrire d\'elle-même après le délai', async () => {
+      const storage = new WriteBehindStorage(new JsonStorage(dataFile), { delayMs: 5 });
+      const service = new NoteService(new NoteRepository(), storage, new SearchEngine());
+      service.createNote('Note', 'Contenu');
+
+      await new Promise(resolve => setTimeout(resolve, 50));
+
+      expect(storage.hasPendingWrites()).toBe(false);
+      expect(readNotes().length).toBe(1);
+    });
+
+    it('devrait écrire ce qui reste à la fermeture puis refuser les modifications', async () => {
+      const service = new NoteService(new NoteRepository(), new WriteBehindStorage(new JsonStorage(dataFile)), new SearchEngine());
+      service.createNote('Note', 'Contenu');
+
+      await service.close();
+
+      expect(readNotes().length).toBe(1);
+      const [note] = service.getAllNotes();
+      expect(() => service.createNote('Trop tard', 'Contenu')).toThrow('stockage fermé');
+      expect(() => service.updateNote(note.getId(), { title: 'Trop tard' })).toThrow('stockage fermé');
+      expect(() => service.clearAllNotes()).toThrow('stockage fermé');
+      await expect(service.deleteNote(note.getId())).rejects.toThrow('stockage fermé');
+      // Le repository n'a pas été modifié
+      expect(service.getNotesCount()).toBe(1);
+      expect(note.getTitle()).toBe('Note');
+    });
+
+    it('devrait lire le délai des sauvegardes différées dans l\'environnement', () => {
+      expect(configFromEnvironment({}).writeBehindMs).toBeUndefined();
+      expect(configFromEnvironment({ NOTES_WRITE_BEHIND_MS: '0' }).writeBehindMs).toBe(0);
+      expect(() => configFromEnvironment({ NOTES_WRITE_BEHIND_MS: '-5' })).toThrow('Délai de sauvegarde différée invalide');
+      expect(() => configFromEnvironment({ NOTES_WRITE_BEHIND_MS: 'vite' })).toThrow('Délai de sauvegarde différée invalide');
+    });
+
+    it('devrait laisser la boucle d\'événements tourner pendant une grosse sauvegarde', async () => {
+      const notes = Array.from({ length: 2000 }, (_, i) => new Note(`Note ${i}`, 'Contenu '.repeat(50), ['a'], `n${i}`));
+      let ticks = 0;
+      const ticker = setInterval(() => ticks++, 0);
+
+      try {
+        await new JsonStorage(dataFile).saveAsync(notes);
+      } finally {
+        clearInterval(ticker);
+      }
+
+      expect(ticks).toBeGreaterThan(0);
+      expect(readNotes().length).toBe(2000);
+    });
+  });
+  describe('7. Écritures atomiques', () => {
+    class BrokenNote extends Note {
+      public toJSON(): INoteData {
+        throw new Error('panne simulée');
+      }
+    }
+
+    it('devrait laisser le fichier intact si l\'écriture échoue en cours de route', () => {
+      (['durable', 'fast'] as const).forEach(writeMode => {
+        const storage = new JsonStorage(dataFile, { writeMode });
+        const notes = Array.from({ length: 500 }, (_, i) => new Note(`Note ${i}`, 'Contenu '.repeat(50), [], `n${i}`));
+        storage.save(notes);
+        const before = fs.readFileSync(dataFile, 'utf-8');
+
+        expect(() => storage.save([...notes, new BrokenNote('Cassée', '')])).toThrow('panne simulée');
+
+        expect(fs.readFileSync(dataFile, 'utf-8')).toBe(before);
+        expect(fs.existsSync(`${dataFile}.tmp`)).toBe(false);
+        expect(new JsonStorage(dataFile).load().length).toBe(500);
+      });
+    });
+
+    it('devrait remplacer un fichier d\'export d\'un bloc, quel que soit le format', () => {
+      const notes = [new Note('Titre', 'Contenu', [], 'n1')];
+      const binaryExport = path.join(testDir, 'export.bin');
+      const jsonExport = path.join(testDir, 'export.json');
+      new BinaryStorage(dataFile).export(binaryExport, notes);
+      new JsonStorage(dataFile).export(jsonExport, notes);
+
+      expect(() => new JsonStorage(dataFile).export(jsonExport, [new BrokenNote('Cassée', '')])).toThrow('panne simulée');
+
+      expect(new BinaryStorage(dataFile).import(binaryExport).map(note => note.getId())).toEqual(['n1']);
+      expect(new JsonStorage(dataFile).import(jsonExport).map(note => note.getId())).toEqual(['n1']);
+      expect(fs.readdirSync(testDir).filter(file => file.endsWith('.tmp'))).toEqual([]);
+    });
+
+    it('devrait écrire de façon atomique en asynchrone et avec le format binaire', async () => {
+      const notes = [new Note('Titre', 'Contenu', [], 'n1')];
+      const binaryFile = path.join(testDir, 'notes.bin');
+      await new JsonStorage(dataFile).saveAsync(notes);
+      new BinaryStorage(binaryFile, { writeMode: 'fast' }).save(notes);
+
+      await expect(new JsonStorage(dataFile).saveAsync([new BrokenNote('Cassée', '')])).rejects.toThrow('panne simulée');
+
+      expect(new JsonStorage(dataFile).load().map(note => note.getId())).toEqual(['n1']);
+      expect(new BinaryStorage(binaryFile).load().map(note => note.getId())).toEqual(['n1']);
+      expect(fs.readdirSync(testDir).filter(file => file.endsWith('.tmp'))).toEqual([]);
+    });
+  });
+});